@@ -57,6 +57,7 @@ class BatchSettings:
         self.save_vehicle_physical_effects_files = None
         self.save_vehicle_cost_effects_files = None
         self.save_input_files = False
+        self.vehicle_emission_rate_tables_folder = None
 
         self._dict = dict()
         self.session_dict = dict()
@@ -508,3 +509,9 @@ class BatchSettings:
         if self.save_input_files in self.true_false_dict:
             self.save_input_files = self.true_false_dict[self.save_input_files]
             effects_log.logwrite(f'{string_id} is {self.save_input_files}')
+
+        # optional, vehicle emission rate tables are not saved unless a folder is provided
+        string_id = 'Vehicle Emission Rate Tables Folder'
+        if (string_id, 'all') in self._dict and not pd.isna(self._dict[(string_id, 'all')]['full_path']):
+            self.vehicle_emission_rate_tables_folder = self.get_attribute_value((string_id, 'all'), 'full_path')
+            effects_log.logwrite(f'{string_id} is {self.vehicle_emission_rate_tables_folder}')
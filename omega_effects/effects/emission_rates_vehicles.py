@@ -66,13 +66,31 @@ Data Column Name and Description
     :equation:
         The linear fit emission rate equation used to calculate an emission rate at the given independent variable.
 
+**RATE TABLES FILE**
+
+The rate equations are evaluated into rate tables when the input file is loaded.  If the batch settings provide a
+``Vehicle Emission Rate Tables Folder``, the rate tables are saved there as a NumPy ``.npz`` file, named after the input
+file, and loaded from it by later runs instead of being rebuilt.  The file holds the input file checksum and is ignored,
+and overwritten, if the input file has changed.  It is not an input file and may be deleted at any time.
+
+File Type
+    NumPy compressed array archive (npz)
+
 ----
 
 **CODE**
 
 """
 
+import hashlib
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
 from omega_effects.general.general_functions import read_input_file
+from omega_effects.general.compiled_expression import CompiledExpression, log_compile_report
 from omega_effects.general.input_validation import \
     validate_template_version_info, validate_template_column_names
 
@@ -83,13 +101,22 @@ class EmissionRatesVehicles:
     """
     Loads and provides access to vehicle emission factors by model year, age, legacy reg class ID and in-use fuel ID.
 
+    The rate equations are evaluated once, at init, into rate tables: one dense model year by age array per sourcetype,
+    reg class, in-use fuel and rate name, from the earliest input start year to the latest, so that rates are looked up
+    rather than calculated.  The tables may be saved to, and loaded from, a rate tables file.
+
     """
+    age_max_default = 50  # initial rate table age limit, tables are extended as needed for older vehicles
+
     def __init__(self):
         self._data = dict()  # private dict, emission factors vehicles by model year, age, legacy reg class ID and in-use fuel ID
-        self._cache = dict()
+        self._rate_tables = None  # rates by rate table index, model year index and age
+        self._rate_table_index = dict()  # rate table index by sourcetype, reg class ID, in-use fuel ID and rate name
         self.startyear_min = 0
+        self.startyear_max = 0
+        self.input_checksum = None
 
-    def init_from_file(self, filepath, effects_log):
+    def init_from_file(self, filepath, effects_log, rate_tables_file=None):
         """
 
         Initialize class data from input file.
@@ -97,6 +124,8 @@ class EmissionRatesVehicles:
         Args:
             filepath: the Path object to the file.
             effects_log: an instance of the EffectsLog class.
+            rate_tables_file: optional Path object to a ``.npz`` file of rate tables, loaded if it was saved from the
+                same input file, otherwise the rate tables are built and saved to it.
 
         Returns:
             Nothing, but reads the appropriate input file.
@@ -131,13 +160,145 @@ class EmissionRatesVehicles:
         )
         df.set_index(rate_keys, inplace=True)
 
-        self.startyear_min = min(df['start_year'])
+        self.startyear_min = int(min(df['start_year']))
+        self.startyear_max = int(max(df['start_year']))
 
         self._data = df.to_dict('index')
 
-        for rate_key in rate_keys:
+        for rate_key in self._data:
             rate_eq = self._data[rate_key]['equation']
-            self._data[rate_key].update({'equation': compile(rate_eq, '<string>', 'eval')})
+            self._data[rate_key].update({'equation': CompiledExpression(rate_eq, name=str(rate_key))})
+
+        log_compile_report([v['equation'] for v in self._data.values()], effects_log, 'vehicle emission rate')
+
+        with open(filepath, 'rb') as f:
+            self.input_checksum = hashlib.sha1(f.read()).hexdigest()
+
+        if rate_tables_file is not None and self.load_rate_tables(rate_tables_file):
+            effects_log.logwrite(f'Loaded vehicle emission rate tables from {rate_tables_file}')
+        else:
+            self.build_rate_tables(self.age_max_default)
+            if rate_tables_file is not None:
+                try:
+                    self.save_rate_tables(rate_tables_file)
+                    effects_log.logwrite(f'Saved vehicle emission rate tables to {rate_tables_file}')
+                except OSError as e:
+                    effects_log.logwrite(f'Unable to save vehicle emission rate tables to {rate_tables_file}, {e}')
+
+    def build_rate_tables(self, age_max):
+        """
+        Evaluate the rate equations into rate tables of model years from ``startyear_min`` to ``startyear_max`` and
+        ages from 0 to ``age_max``.
+
+        A model year uses the equation with the latest start year not after the model year, or the earliest start
+        year if all are after the model year.  As in the input equations, a negative rate at any age is replaced by the
+        rate at the prior age.
+
+        Args:
+            age_max (int): the maximum rate table age
+
+        Returns:
+            Nothing, but sets the rate tables.
+
+        """
+        model_years = np.arange(self.startyear_min, self.startyear_max + 1)
+        ages = np.arange(age_max + 1)
+
+        start_years = dict()
+        for start_year, sourcetype_name, reg_class_id, in_use_fuel_id, rate_name in self._data:
+            start_years.setdefault((sourcetype_name, reg_class_id, in_use_fuel_id, rate_name), []).append(start_year)
+
+        self._rate_tables = np.zeros((len(start_years), len(model_years), len(ages)))
+        self._rate_table_index = dict()
+
+        for table_index, (rate_id, rate_start_years) in enumerate(start_years.items()):
+            rate_start_years = np.sort(rate_start_years)
+
+            rates = np.zeros((len(rate_start_years), len(ages)))
+            for idx, start_year in enumerate(rate_start_years.tolist()):
+                rates[idx] = self._data[(start_year, *rate_id)]['equation'].evaluate({'age': ages})
+
+            # carry the last non-negative rate forward
+            valid_index = np.where(rates >= 0, ages, 0)
+            rates = np.take_along_axis(rates, np.maximum.accumulate(valid_index, axis=1), axis=1)
+
+            start_year_index = np.maximum(np.searchsorted(rate_start_years, model_years, side='right') - 1, 0)
+
+            self._rate_tables[table_index] = rates[start_year_index]
+            self._rate_table_index[rate_id] = table_index
+
+    def save_rate_tables(self, filepath):
+        """
+
+        Args:
+            filepath: the Path object to the ``.npz`` file to save.
+
+        Returns:
+            Nothing, but saves the rate tables, and the checksum of the input file they were built from.
+
+        """
+        rate_ids = list(self._rate_table_index)
+
+        # write to a temporary file and move it into place so a partially written file is never loaded
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = '%s.%d.tmp' % (filepath, os.getpid())
+        try:
+            with open(temp_filepath, 'wb') as f:
+                np.savez(f,
+                         rate_tables=self._rate_tables,
+                         rate_ids=np.array(rate_ids, dtype=str).reshape(-1, 4),
+                         input_checksum=self.input_checksum)
+            os.replace(temp_filepath, filepath)
+        finally:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+
+    def load_rate_tables(self, filepath):
+        """
+
+        Args:
+            filepath: the Path object to the ``.npz`` file to load.
+
+        Returns:
+            ``True`` if the rate tables were loaded, ``False`` if the file doesn't exist, can't be read or was saved
+            from a different input file.
+
+        """
+        try:
+            with np.load(filepath, allow_pickle=False) as data:
+                if str(data['input_checksum']) != self.input_checksum:
+                    return False
+
+                self._rate_tables = data['rate_tables']
+                self._rate_table_index = dict((tuple(rate_id), table_index)
+                                              for table_index, rate_id in enumerate(data['rate_ids'].tolist()))
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            return False
+
+        return True
+
+    def get_rate_table_rows(self, model_year, sourcetype_name, reg_class_id, in_use_fuel_id, age_max, rate_names):
+        """
+
+        Args:
+            model_year (int): vehicle model year for which to get emission factors
+            sourcetype_name (str): the MOVES sourcetype name (e.g., 'passenger car', 'light commercial truck')
+            reg_class_id (str): the regulatory class, e.g., 'car' or 'truck'
+            in_use_fuel_id (str): the liquid fuel ID, e.g., 'pump gasoline'
+            age_max (int): the maximum age that will be looked up, the rate tables are extended if necessary
+            rate_names: names of emission rates to get
+
+        Returns:
+            A list of arrays of rates by age, one per rate name.
+
+        """
+        if age_max >= self._rate_tables.shape[2]:
+            self.build_rate_tables(max(age_max, 2 * (self._rate_tables.shape[2] - 1)))
+
+        model_year_index = int(min(max(model_year, self.startyear_min), self.startyear_max) - self.startyear_min)
+
+        return [self._rate_tables[self._rate_table_index[(sourcetype_name, reg_class_id, in_use_fuel_id, rate_name)],
+                                  model_year_index] for rate_name in rate_names]
 
     def get_emission_rate(self, model_year, sourcetype_name, reg_class_id, in_use_fuel_id, age, *rate_names):
         """
@@ -154,50 +315,30 @@ class EmissionRatesVehicles:
             A list of emission rates for the given type of vehicle of the given model_year and age.
 
         """
-        locals_dict = locals()
-        rate = 0
-        return_rates = list()
-
-        if model_year < self.startyear_min:
-            model_year = self.startyear_min
-
-        for rate_name in rate_names:
-
-            cache_key = (model_year, sourcetype_name, reg_class_id, in_use_fuel_id, age, rate_name)
-            if cache_key in self._cache:
-                rate = self._cache[cache_key]
-            else:
-                rate_keys = [
-                    k for k in self._data
-                    if k[0] <= model_year
-                       and k[1] == sourcetype_name
-                       and k[2] == reg_class_id
-                       and k[3] == in_use_fuel_id
-                       and k[4] == rate_name
-                ]
-                if not rate_keys:
-                    rate_keys = [
-                        k for k in self._data
-                        if k[1] == sourcetype_name
-                           and k[2] == reg_class_id
-                           and k[3] == in_use_fuel_id
-                           and k[4] == rate_name
-                    ]
-                    start_year = min([k[0] for k in rate_keys])
-                else:
-                    max_start_year = max([k[0] for k in rate_keys])
-                    start_year = min(model_year, max_start_year)
-
-                rate_key = start_year, sourcetype_name, reg_class_id, in_use_fuel_id, rate_name
-
-                rate = eval(self._data[rate_key]['equation'], {}, locals_dict)
-
-                if rate < 0:
-                    temp_key = (model_year, sourcetype_name, reg_class_id, in_use_fuel_id, age - 1, rate_name)
-                    rate = self._cache[temp_key]
-
-                self._cache[cache_key] = rate
-
-            return_rates.append(rate)
-
-        return return_rates
+        age = int(age)
+
+        rates = self.get_rate_table_rows(model_year, sourcetype_name, reg_class_id, in_use_fuel_id, age, rate_names)
+
+        return [rate[age].item() for rate in rates]
+
+    def get_emission_rates_by_age(self, model_year, sourcetype_name, reg_class_id, in_use_fuel_id, ages, *rate_names):
+        """
+
+        Args:
+            model_year (int): vehicle model year for which to get emission factors
+            sourcetype_name (str): the MOVES sourcetype name (e.g., 'passenger car', 'light commercial truck')
+            reg_class_id (str): the regulatory class, e.g., 'car' or 'truck'
+            in_use_fuel_id (str): the liquid fuel ID, e.g., 'pump gasoline'
+            ages (array-like): vehicle ages in years
+            rate_names: name of emission rate(s) to get
+
+        Returns:
+            A list of emission rate arrays, one per rate name, with one rate per age.
+
+        """
+        ages = np.asarray(ages, dtype=int)
+
+        rates = self.get_rate_table_rows(model_year, sourcetype_name, reg_class_id, in_use_fuel_id, ages.max(),
+                                         rate_names)
+
+        return [rate[ages] for rate in rates]
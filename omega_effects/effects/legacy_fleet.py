@@ -81,6 +81,9 @@ Data Column Name and Description
 **CODE**
 
 """
+import numpy as np
+import pandas as pd
+
 from omega_effects.general.general_functions import read_input_file
 from omega_effects.general.input_validation import \
     validate_template_version_info, validate_template_column_names
@@ -96,8 +99,9 @@ class LegacyFleet:
         Loads and provides access to legacy fleet data by model year and age.
 
         """
-        self._data = {}  # private dict, the legacy_fleet_file data
-        self._legacy_fleet = {}  # the built legacy fleet for the analysis
+        self._data = pd.DataFrame()  # private DataFrame, the legacy_fleet_file data
+        self._legacy_fleet = pd.DataFrame()  # the built legacy fleet for the analysis, by vehicle_id and calendar_year
+        self._adjusted_legacy_fleet = pd.DataFrame()  # the adjusted legacy fleet, by vehicle_id and calendar_year
         self.adjusted_legacy_fleet = {}
         self.legacy_fleet_calendar_year_max = 0
         self.legacy_fleet_vehicle_id_start = pow(10, 6)
@@ -159,7 +163,7 @@ class LegacyFleet:
         df.insert(len(df.columns), 'annual_vmt', 0)
         df.insert(len(df.columns), 'odometer', 0)
         df.insert(len(df.columns), 'vmt', 0)
-        self._data = df.to_dict(orient='index')
+        self._data = df.reset_index(drop=True)
 
     def update_legacy_fleet(self, vehicle_id, calendar_year, update_dict):
         """
@@ -170,60 +174,70 @@ class LegacyFleet:
             update_dict: Dictionary; represents the attribute-value pairs to be updated.
 
         Returns:
-            Nothing, but updates the object dictionary with update_dict
+            Nothing, but updates the legacy fleet with update_dict
 
         """
         key = (vehicle_id, calendar_year)
-        if key in self._legacy_fleet:
-            for attribute_name, attribute_value in update_dict.items():
-                self._legacy_fleet[key][attribute_name] = attribute_value
-
-        else:
-            self._legacy_fleet.update({key: {}})
-            for attribute_name, attribute_value in update_dict.items():
-                self._legacy_fleet[key].update({attribute_name: attribute_value})
+        for attribute_name, attribute_value in update_dict.items():
+            self._legacy_fleet.loc[key, attribute_name] = attribute_value
 
     def build_legacy_fleet_for_analysis(self, batch_settings):
         """
+        Build the legacy fleet for each calendar year of the analysis, one row per legacy fleet vehicle (model year,
+        market class, etc.) and calendar year in which the vehicle is still registered.  Vehicle ids are assigned in
+        order of the first calendar year in which each vehicle is registered, then by input file row.
 
         Args:
             batch_settings: an instance of the BatchSettings class.
 
         Returns:
-            Nothing, but it builds and updates the instance dictionary.
+            Nothing, but it builds the legacy fleet DataFrame, indexed by vehicle_id and calendar_year.
 
         """
-        vehicle_id_increment = 0
-        for calendar_year in batch_settings.calendar_years:
-
-            for k, v in self._data.items():
-
-                last_age, last_calendar_year, model_year = v['age'], v['calendar_year'], v['model_year']
-                reg_class_id, market_class_id, fuel_id = v['reg_class_id'], v['market_class_id'], v['in_use_fuel_id']
-                new_age = calendar_year - model_year
-
-                reregistered_proportion \
-                    = batch_settings.reregistration.get_reregistered_proportion(model_year, market_class_id, new_age)
-                new_registered_count = v['registered_count'] * reregistered_proportion
-                if new_registered_count == 0 or new_age == 0:
-                    pass
-
-                else:
-                    vehicle_id_increment += 1
-                    annual_vmt = batch_settings.onroad_vmt.get_vmt(calendar_year, market_class_id, new_age)
-                    if v['vehicle_id'] == self.legacy_fleet_vehicle_id_start:
-                        self._data[k].update({'vehicle_id': v['vehicle_id'] + vehicle_id_increment})
-
-                    update_dict = v.copy()
-                    update_dict['age'] = new_age
-                    update_dict['calendar_year'] = calendar_year
-                    update_dict['registered_count'] = new_registered_count
-                    update_dict['annual_vmt'] = annual_vmt
-                    update_dict['odometer'] = batch_settings.onroad_vmt.get_cumulative_vmt(market_class_id, new_age)
-                    update_dict['vmt'] = new_registered_count * annual_vmt
-
-                    self.update_legacy_fleet(update_dict['vehicle_id'], calendar_year, update_dict)
-                    self.legacy_fleet_calendar_year_max = max(self.legacy_fleet_calendar_year_max, calendar_year)
+        calendar_years = np.array(batch_settings.calendar_years)
+        num_rows, num_years = len(self._data), len(calendar_years)
+
+        # one row per input file row and calendar year, by calendar year then input file row
+        df = self._data.iloc[np.tile(np.arange(num_rows), num_years)].reset_index(drop=True)
+        df['calendar_year'] = np.repeat(calendar_years, num_rows)
+        df['age'] = df['calendar_year'] - df['model_year']
+
+        reregistered_proportion = [
+            batch_settings.reregistration.get_reregistered_proportion(model_year, market_class_id, age)
+            for model_year, market_class_id, age in zip(df['model_year'], df['market_class_id'], df['age'])
+        ]
+        df['registered_count'] = df['registered_count'] * reregistered_proportion
+
+        registered = ((df['registered_count'] != 0) & (df['age'] != 0)).values
+
+        # vehicle ids count the registered rows up to and including the first calendar year each vehicle is registered
+        registered_by_year = registered.reshape(num_years, num_rows)
+        vehicle_id_increment = np.cumsum(registered).reshape(num_years, num_rows)
+        first_registered_year = registered_by_year.argmax(axis=0)
+        vehicle_ids = np.where(registered_by_year.any(axis=0),
+                               self.legacy_fleet_vehicle_id_start +
+                               vehicle_id_increment[first_registered_year, np.arange(num_rows)],
+                               self._data['vehicle_id'])
+        self._data['vehicle_id'] = vehicle_ids
+
+        df['vehicle_id'] = np.tile(vehicle_ids, num_years)
+        df = df.loc[registered]
+
+        df['annual_vmt'] = [
+            batch_settings.onroad_vmt.get_vmt(calendar_year, market_class_id, age)
+            for calendar_year, market_class_id, age in zip(df['calendar_year'], df['market_class_id'], df['age'])
+        ]
+        df['odometer'] = [
+            batch_settings.onroad_vmt.get_cumulative_vmt(market_class_id, age)
+            for market_class_id, age in zip(df['market_class_id'], df['age'])
+        ]
+        df['vmt'] = df['registered_count'] * df['annual_vmt']
+
+        self._legacy_fleet = df.set_index(['vehicle_id', 'calendar_year'], drop=False)
+
+        if len(df):
+            self.legacy_fleet_calendar_year_max = \
+                max(self.legacy_fleet_calendar_year_max, int(df['calendar_year'].max()))
 
     def get_legacy_fleet_price(self, vehicle_id, calendar_year):
         """
@@ -233,13 +247,25 @@ class LegacyFleet:
             calendar_year (int): the calendar year.
 
         Returns:
+            The legacy fleet vehicle transaction price.
 
         """
-        price = [v['transaction_price_dollars'] for v in self._legacy_fleet.values()
-                 if v['vehicle_id'] == vehicle_id
-                 and v['calendar_year'] == calendar_year][0]
+        return self._legacy_fleet.at[(vehicle_id, calendar_year), 'transaction_price_dollars'].item()
 
-        return price
+    def get_legacy_fleet_vmt_and_stock(self, calendar_year):
+        """
+
+        Args:
+            calendar_year (int): the calendar year.
+
+        Returns:
+            The legacy fleet vmt and registered count (stock) in the given calendar year.
+
+        """
+        calendar_year_legacy_fleet = self._legacy_fleet.loc[self._legacy_fleet['calendar_year'].values == calendar_year]
+
+        return sum(calendar_year_legacy_fleet['vmt'].tolist()), \
+            sum(calendar_year_legacy_fleet['registered_count'].tolist())
 
     def get_adjusted_legacy_fleet_odometer(self, vehicle_id, calendar_year):
         """
@@ -249,13 +275,10 @@ class LegacyFleet:
             calendar_year (int): the calendar year for which the vehicle's odometer value is sought.
 
         Returns:
+            The adjusted legacy fleet vehicle odometer.
 
         """
-        odometer = [v['odometer'] for v in self.adjusted_legacy_fleet.values()
-                    if v['vehicle_id'] == vehicle_id
-                    and v['calendar_year'] == calendar_year][0]
-
-        return odometer
+        return self._adjusted_legacy_fleet.at[(vehicle_id, calendar_year), 'odometer'].item()
 
     def adjust_legacy_fleet_stock_and_vmt(self, batch_settings, vmt_adjustments_session):
         """
@@ -272,47 +295,52 @@ class LegacyFleet:
             There is no rebound VMT calculated for the legacy fleet.
 
         """
-        self.adjusted_legacy_fleet = {}
-
         calendar_years = batch_settings.calendar_years
 
-        for v in self._legacy_fleet.values():
-
-            vehicle_id, calendar_year, age = v['vehicle_id'], v['calendar_year'], v['age']
-            registered_count = v['registered_count']
-
-            # adjust vmt and legacy fleet stock
-            calendar_year_vmt_adj = vmt_adjustments_session.get_vmt_adjustment(calendar_year)
-            vmt_adjusted = v['vmt'] * calendar_year_vmt_adj
-
-            calendar_year_stock_adj = vmt_adjustments_session.get_stock_adjustment(calendar_year)
-            stock_adjusted = registered_count * calendar_year_stock_adj
-
-            annual_vmt_adjusted = vmt_adjusted / stock_adjusted
-
-            if v['calendar_year'] == calendar_years[0]:
-                annual_vmt = v['annual_vmt']
-                odometer = v['odometer']
-                odometer_adjusted = odometer - annual_vmt + annual_vmt_adjusted
-            else:
-                odometer_last_year = self.get_adjusted_legacy_fleet_odometer(vehicle_id, calendar_year - 1)
-                odometer_adjusted = odometer_last_year + annual_vmt_adjusted
-
-            update_dict = {
-                'vehicle_id': vehicle_id,
-                'age': age,
-                'calendar_year': calendar_year,
-                'registered_count': stock_adjusted,
-                'context_vmt_adjustment': calendar_year_vmt_adj,
-                'annual_vmt': annual_vmt_adjusted,
-                'odometer': odometer_adjusted,
-                'vmt': vmt_adjusted,
-                'market_class_id': v['market_class_id'],
-                'reg_class_id': v['reg_class_id'],
-                'in_use_fuel_id': v['in_use_fuel_id'],
-                'body_style': v['body_style'],
-                'curbweight_lbs': v['curbweight_lbs'],
-                'miles_per_gallon': v['miles_per_gallon'],
-                'kwh_per_mile': v['kwh_per_mile'],
-            }
-            self.adjusted_legacy_fleet[(vehicle_id, calendar_year)] = update_dict
+        df = self._legacy_fleet
+
+        # adjust vmt and legacy fleet stock
+        calendar_year_vmt_adj = df['calendar_year'].map(
+            {calendar_year: vmt_adjustments_session.get_vmt_adjustment(calendar_year)
+             for calendar_year in df['calendar_year'].unique()})
+        vmt_adjusted = df['vmt'] * calendar_year_vmt_adj
+
+        calendar_year_stock_adj = df['calendar_year'].map(
+            {calendar_year: vmt_adjustments_session.get_stock_adjustment(calendar_year)
+             for calendar_year in df['calendar_year'].unique()})
+        stock_adjusted = df['registered_count'] * calendar_year_stock_adj
+
+        annual_vmt_adjusted = vmt_adjusted / stock_adjusted
+
+        # adjusted odometer is the cumulative sum over age of the adjusted annual vmt, starting from the (adjusted)
+        # odometer in the first calendar year
+        first_year = (df['calendar_year'] == calendar_years[0]).values
+        odometer_increment = np.where(first_year, df['odometer'] - df['annual_vmt'] + annual_vmt_adjusted,
+                                      annual_vmt_adjusted)
+
+        vehicle_ids, vehicle_index = np.unique(df['vehicle_id'].values, return_inverse=True)
+        year_index = df['calendar_year'].values - calendar_years[0]
+        odometer_increments = np.zeros((len(vehicle_ids), len(calendar_years)))
+        odometer_increments[vehicle_index, year_index] = odometer_increment
+        odometer_adjusted = np.cumsum(odometer_increments, axis=1)[vehicle_index, year_index]
+
+        self._adjusted_legacy_fleet = pd.DataFrame({
+            'vehicle_id': df['vehicle_id'],
+            'age': df['age'],
+            'calendar_year': df['calendar_year'],
+            'registered_count': stock_adjusted,
+            'context_vmt_adjustment': calendar_year_vmt_adj,
+            'annual_vmt': annual_vmt_adjusted,
+            'odometer': odometer_adjusted,
+            'vmt': vmt_adjusted,
+            'market_class_id': df['market_class_id'],
+            'reg_class_id': df['reg_class_id'],
+            'in_use_fuel_id': df['in_use_fuel_id'],
+            'body_style': df['body_style'],
+            'curbweight_lbs': df['curbweight_lbs'],
+            'miles_per_gallon': df['miles_per_gallon'],
+            'kwh_per_mile': df['kwh_per_mile'],
+        }, index=df.index)
+
+        self.adjusted_legacy_fleet = \
+            dict(zip(df.index.tolist(), self._adjusted_legacy_fleet.to_dict(orient='records')))
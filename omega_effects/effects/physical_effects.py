@@ -10,22 +10,18 @@ calculate from them the pollutant inventories, including fuel consumed, for each
 **CODE**
 
 """
+import numpy as np
 import pandas as pd
 
 
-def get_vehicle_emission_rate(session_settings, model_year, sourcetype_name, reg_class_id, fuel, ind_var_value):
+def get_vehicle_emission_rate_names(fuel):
     """
 
     Args:
-        session_settings: an instance of the SessionSettings class.
-        model_year (int): The model year of the specific vehicle.
-        sourcetype_name (str): The MOVES sourcetype name (e.g., 'passenger car', 'passenger truck', 'light commercial truck')
-        reg_class_id (str): The regulatory class ID of the vehicle.
-        fuel (str): The fuel ID (i.e., pump gasoline, pump diesel)
-        ind_var_value (str): The independent variable value, e.g., age or odometer
+        fuel (str): The fuel ID (i.e., pump gasoline, pump diesel, US electricity)
 
     Returns:
-        A list of emission rates for the given model year vehicle in a given calendar year.
+        A list of the names of the vehicle emission rates that apply to the given fuel.
 
     """
     if 'gasoline' in fuel:
@@ -95,12 +91,55 @@ def get_vehicle_emission_rate(session_settings, model_year, sourcetype_name, reg
     else:
         rate_names = []
 
+    return rate_names
+
+
+def get_vehicle_emission_rate(session_settings, model_year, sourcetype_name, reg_class_id, fuel, ind_var_value):
+    """
+
+    Args:
+        session_settings: an instance of the SessionSettings class.
+        model_year (int): The model year of the specific vehicle.
+        sourcetype_name (str): The MOVES sourcetype name (e.g., 'passenger car', 'passenger truck', 'light commercial truck')
+        reg_class_id (str): The regulatory class ID of the vehicle.
+        fuel (str): The fuel ID (i.e., pump gasoline, pump diesel)
+        ind_var_value (str): The independent variable value, e.g., age or odometer
+
+    Returns:
+        A list of emission rates for the given model year vehicle in a given calendar year.
+
+    """
+    rate_names = get_vehicle_emission_rate_names(fuel)
+
     rates = session_settings.emission_rates_vehicles.get_emission_rate(model_year, sourcetype_name, reg_class_id, fuel,
                                                                        ind_var_value, *rate_names)
 
     return rates
 
 
+def get_vehicle_emission_rates_by_age(session_settings, model_year, sourcetype_name, reg_class_id, fuel, ages):
+    """
+
+    Args:
+        session_settings: an instance of the SessionSettings class.
+        model_year (int): The model year of the vehicles.
+        sourcetype_name (str): The MOVES sourcetype name (e.g., 'passenger car', 'light commercial truck')
+        reg_class_id (str): The regulatory class ID of the vehicles.
+        fuel (str): The fuel ID (i.e., pump gasoline, pump diesel, US electricity)
+        ages (array-like): The vehicle ages.
+
+    Returns:
+        A dictionary of emission rate arrays, with one rate per age, keyed by rate name.
+
+    """
+    rate_names = get_vehicle_emission_rate_names(fuel)
+
+    rates = session_settings.emission_rates_vehicles.get_emission_rates_by_age(model_year, sourcetype_name,
+                                                                               reg_class_id, fuel, ages, *rate_names)
+
+    return dict(zip(rate_names, rates))
+
+
 def get_egu_emission_rate(session_settings, calendar_year, kwh_consumption):
     """
 
@@ -235,6 +274,102 @@ def get_inputs_for_effects(batch_settings, arg=None):
         return values
 
 
+# vehicle exhaust pollutants, by pollutant, with rates in grams per mile, e.g., 'pm25_exhaust_grams_per_mile'
+exhaust_pollutants = (
+    'pm25',
+    'nmog',
+    'co',
+    'nox',
+    'acetaldehyde',
+    'acrolein',
+    'benzene',
+    'ethylbenzene',
+    'formaldehyde',
+    'naphthalene',
+    '13_butadiene',
+    '15pah',
+)
+
+# vehicle evaporative emission rate names, in grams per gallon, by pollutant; rates are summed in the order listed
+evaporative_rate_names = {
+    'nmog': (
+        'nmog_evap_permeation_grams_per_gallon',
+        'nmog_evap_fuel_vapor_venting_grams_per_gallon',
+        'nmog_evap_fuel_leaks_grams_per_gallon',
+        'nmog_refueling_displacement_grams_per_gallon',
+        'nmog_refueling_spillage_grams_per_gallon',
+    ),
+    'benzene': (
+        'benzene_evap_permeation_grams_per_gallon',
+        'benzene_evap_fuel_vapor_venting_grams_per_gallon',
+        'benzene_evap_fuel_leaks_grams_per_gallon',
+        'benzene_refueling_displacement_grams_per_gallon',
+        'benzene_refueling_spillage_grams_per_gallon',
+    ),
+    'ethylbenzene': (
+        'ethylbenzene_evap_fuel_vapor_venting_grams_per_gallon',
+        'ethylbenzene_evap_fuel_leaks_grams_per_gallon',
+        'ethylbenzene_evap_permeation_grams_per_gallon',
+        'ethylbenzene_refueling_displacement_grams_per_gallon',
+        'ethylbenzene_refueling_spillage_grams_per_gallon',
+    ),
+    'naphthalene': (
+        'naphthalene_refueling_spillage_grams_per_gallon',
+    ),
+}
+
+# upstream pollutants, in the order of the rates returned by get_egu_emission_rate and get_refinery_ef
+egu_pollutants = ('voc', 'co', 'nox', 'pm25', 'sox', 'co2', 'ch4', 'n2o', 'hcl', 'hg')
+refinery_pollutants = ('voc', 'co', 'nox', 'pm25', 'sox', 'co2', 'ch4', 'n2o')
+
+
+def get_sourcetype_name(base_year_reg_class_id, body_style):
+    """
+
+    Args:
+        base_year_reg_class_id (str): The base year regulatory class ID of the vehicle.
+        body_style (str): The vehicle body style, e.g., 'sedan', 'cuv_suv', 'pickup'.
+
+    Returns:
+        The MOVES sourcetype name for use with vehicle emission rates, or None if there is none for the given
+        base year reg class and body style.
+
+    """
+    if base_year_reg_class_id == 'car':
+        return 'passenger car'
+    elif base_year_reg_class_id == 'truck':
+        return 'passenger truck'
+    elif base_year_reg_class_id == 'mediumduty' and 'cuv' in body_style:
+        return 'passenger truck'
+    elif base_year_reg_class_id == 'mediumduty' and 'pickup' in body_style:
+        return 'light commercial truck'
+
+    return None
+
+
+def get_key_groups(*key_arrays):
+    """
+
+    Args:
+        key_arrays: equal length arrays of key values, e.g., calendar years and fuel IDs.
+
+    Returns:
+        A list of (key, rows) tuples, one per unique combination of key values, where key is a tuple of the key values
+        and rows is an array of the positions of the rows that have them.
+
+    """
+    codes = np.zeros(len(key_arrays[0]), dtype=np.int64)
+    for key_array in key_arrays:
+        unique_values, index = np.unique(key_array, return_inverse=True)
+        codes = codes * len(unique_values) + index
+
+    unique_codes, first_rows, group_index = np.unique(codes, return_index=True, return_inverse=True)
+    keys = zip(*[np.asarray(key_array)[first_rows].tolist() for key_array in key_arrays])
+    rows = np.split(np.argsort(group_index, kind='stable'), np.cumsum(np.bincount(group_index))[:-1])
+
+    return list(zip(keys, rows))
+
+
 def calc_physical_effects(batch_settings, session_settings, safety_effects_dict):
     """
 
@@ -244,9 +379,15 @@ def calc_physical_effects(batch_settings, session_settings, safety_effects_dict)
         safety_effects_dict: The dictionary generated via the safety_effects module.
 
     Returns:
-        A dictionary of physical effects where keys are a (vehicle_id, calendar_year, age) tuple and values are a
+        A dictionary of physical effects where keys are a (vehicle_id, calendar_year) tuple and values are a
         dictionary of attribute_name and attribute_value pairs of physical effects.
 
+    Note:
+        The effects are calculated as columns, i.e. arrays with one value per vehicle annual data record, with vehicle
+        attributes joined to the vehicle annual data once and vehicle emission rates looked up by model year,
+        sourcetype, reg class and fuel for all ages at once.  Attributes that do not apply to a vehicle's fuel(s) are
+        left as integer zeros, as are the battery kWh of vehicles older than age 0.
+
     """
     vehicle_attribute_list = [
         'base_year_vehicle_id',
@@ -272,446 +413,358 @@ def calc_physical_effects(batch_settings, session_settings, safety_effects_dict)
         diesel_energy_density_ratio, fuel_reduction_leading_to_reduced_domestic_refining \
         = get_inputs_for_effects(batch_settings)
 
-    physical_effects_dict = {}
-    vehicle_info_dict = {}
     calendar_years = batch_settings.calendar_years
-    for calendar_year in calendar_years:
-
-        vads = session_settings.vehicle_annual_data.get_adjusted_vehicle_annual_data_by_calendar_year(calendar_year)
-
-        # UPDATE physical effects data
-        calendar_year_effects_dict = {}
-
-        # first a loop to determine kwh demand for this calendar year
-        fuel_consumption_kWh_annual = fuel_generation_kWh_annual = 0
-        for vad in vads:
-
-            # need vehicle info once for each vehicle, not every calendar year for each vehicle
-            vehicle_id = int(vad['vehicle_id'])
-            age = int(vad['age'])
-
-            if vehicle_id not in vehicle_info_dict:
-                vehicle_info_dict[vehicle_id] \
-                    = session_settings.vehicles.get_vehicle_attributes(vehicle_id, *vehicle_attribute_list)
-
-            base_year_vehicle_id, mfr_id, name, model_year, base_year_reg_class_id, reg_class_id, in_use_fuel_id, \
-                market_class_id, fueling_class, base_year_powertrain_type, footprint, workfactor, \
-                target_co2e_grams_per_mile, onroad_direct_co2e_grams_per_mile, onroad_direct_kwh_per_mile, \
-                body_style, battery_kwh \
-                        = vehicle_info_dict[vehicle_id]
-
-            fuel_dict = eval(in_use_fuel_id)
-            for fuel, fuel_share in fuel_dict.items():
-                if fuel == 'US electricity' and onroad_direct_kwh_per_mile:
-                    transmission_efficiency \
-                        = batch_settings.onroad_fuels.get_fuel_attribute(calendar_year, fuel, 'transmission_efficiency')
 
-                    vmt = safety_effects_dict[(vehicle_id, calendar_year)]['vmt']
-                    vmt_electricity = vmt * fuel_share
-                    fuel_consumption_kWh_annual += vmt_electricity * onroad_direct_kwh_per_mile
-
-        # upstream EGU emission rates for this calendar year to apply to electric fuel operation
-        voc_egu_rate, co_egu_rate, nox_egu_rate, pm25_egu_rate, sox_egu_rate, \
-            co2_egu_rate, ch4_egu_rate, n2o_egu_rate, hcl_egu_rate, hg_egu_rate \
-            = get_egu_emission_rate(session_settings, calendar_year, fuel_consumption_kWh_annual)
-
-        for vad in vads:
-
-            vehicle_id = int(vad['vehicle_id'])
-            age = int(vad['age'])
-
-            base_year_vehicle_id, mfr_id, name, model_year, base_year_reg_class_id, reg_class_id, in_use_fuel_id, \
-                market_class_id, fueling_class, base_year_powertrain_type, footprint, workfactor, \
-                target_co2e_grams_per_mile, onroad_direct_co2e_grams_per_mile, onroad_direct_kwh_per_mile, body_style, \
-                battery_kwh \
-                    = vehicle_info_dict[vehicle_id]
-
-            # for physical effects, we want battery kwh implemented on new vehicles (age=0)
-            if age == 0:
-                battery_kwh = battery_kwh * vad['registered_count']
+    # vehicle annual data in calendar year order
+    vads = [(k[1], v) for k, v in session_settings.vehicle_annual_data.vad_adjusted.items() if k[1] in calendar_years]
+    vads = [vads[i] for i in np.argsort([calendar_year for calendar_year, vad in vads], kind='stable')]
+
+    vad_calendar_year = np.array([calendar_year for calendar_year, vad in vads], dtype=int)
+    vad_vehicle_id = np.array([int(vad['vehicle_id']) for calendar_year, vad in vads], dtype=int)
+
+    # join vehicle attributes to the vehicle annual data
+    vehicle_ids, vehicle_index = np.unique(vad_vehicle_id, return_inverse=True)
+    vehicle_info = [session_settings.vehicles.get_vehicle_attributes(vehicle_id, *vehicle_attribute_list)
+                    for vehicle_id in vehicle_ids.tolist()]
+    vehicle_info = np.array(vehicle_info, dtype=object).reshape(-1, len(vehicle_attribute_list))[vehicle_index]
+    vehicle_info = dict(zip(vehicle_attribute_list, vehicle_info.T))
+
+    onroad_direct_co2e_grams_per_mile = vehicle_info['onroad_direct_co2e_grams_per_mile'].astype(float)
+    onroad_direct_kwh_per_mile = vehicle_info['onroad_direct_kwh_per_mile'].astype(float)
+
+    # fuels and fuel shares by position in the in-use fuel dict, '' where a vehicle has fewer fuels
+    in_use_fuel_ids, fuel_index = np.unique(vehicle_info['in_use_fuel_id'].astype(str), return_inverse=True)
+    fuel_dicts = [list(eval(in_use_fuel_id).items()) for in_use_fuel_id in in_use_fuel_ids]
+    num_fuels = max([len(fuel_dict) for fuel_dict in fuel_dicts], default=0)
+
+    fuels, fuel_shares, electric, liquid = [], [], [], []
+    for fuel_num in range(num_fuels):
+        fuel = np.array([fd[fuel_num][0] if fuel_num < len(fd) else '' for fd in fuel_dicts],
+                        dtype=object)[fuel_index]
+        fuels.append(fuel)
+        fuel_shares.append(np.array([fd[fuel_num][1] if fuel_num < len(fd) else 0 for fd in fuel_dicts],
+                                    dtype=float)[fuel_index])
+        electric.append((fuel == 'US electricity') & (onroad_direct_kwh_per_mile != 0))
+        liquid.append((fuel != '') & (fuel != 'US electricity') & (onroad_direct_co2e_grams_per_mile != 0))
+
+    # need vehicle effects for analysis fleet vehicles with a target co2e
+    effects_rows = np.flatnonzero(
+        (vehicle_info['model_year'] >= calendar_years[0]).astype(bool)
+        & np.array([target is not None for target in vehicle_info['target_co2e_grams_per_mile']], dtype=bool))
+    needs_safety = np.zeros(len(vads), dtype=bool)
+    needs_safety[effects_rows] = True
+    for electric_fuel in electric:
+        needs_safety |= electric_fuel
+
+    vmt = np.array([safety_effects_dict[(vehicle_id, calendar_year)]['vmt'] if needed else np.nan
+                    for vehicle_id, calendar_year, needed in
+                    zip(vad_vehicle_id.tolist(), vad_calendar_year.tolist(), needs_safety.tolist())], dtype=float)
+
+    # upstream EGU emission rates for each calendar year to apply to electric fuel operation, based on the kWh demand
+    # summed in vehicle annual data order
+    kwh_consumption = np.zeros((len(vads), num_fuels))
+    for fuel_num in range(num_fuels):
+        kwh_consumption[:, fuel_num] = vmt * fuel_shares[fuel_num] * onroad_direct_kwh_per_mile
+    electric_consumption = np.column_stack(electric) if num_fuels else np.zeros((len(vads), 0), dtype=bool)
+
+    egu_rates = dict()
+    for calendar_year in calendar_years:
+        start, end = np.searchsorted(vad_calendar_year, [calendar_year, calendar_year + 1])
+        kwh_values = kwh_consumption[start:end][electric_consumption[start:end]]
+        fuel_consumption_kWh_annual = np.cumsum(kwh_values)[-1].item() if len(kwh_values) else 0
+
+        egu_rates[calendar_year] = get_egu_emission_rate(session_settings, calendar_year, fuel_consumption_kWh_annual)
+
+    # vehicle effects
+    vads = [vads[i][1] for i in effects_rows]
+    calendar_year = vad_calendar_year[effects_rows]
+    vehicle_id = vad_vehicle_id[effects_rows]
+    age = np.array([int(vad['age']) for vad in vads], dtype=int)
+    vmt = vmt[effects_rows]
+    onroad_direct_co2e_grams_per_mile = onroad_direct_co2e_grams_per_mile[effects_rows]
+    onroad_direct_kwh_per_mile = onroad_direct_kwh_per_mile[effects_rows]
+    for attribute_name in vehicle_info:
+        vehicle_info[attribute_name] = vehicle_info[attribute_name][effects_rows]
+    for fuel_num in range(num_fuels):
+        fuels[fuel_num] = fuels[fuel_num][effects_rows]
+        fuel_shares[fuel_num] = fuel_shares[fuel_num][effects_rows]
+        electric[fuel_num] = electric[fuel_num][effects_rows]
+        liquid[fuel_num] = liquid[fuel_num][effects_rows]
+
+    num_rows = len(vads)
+    model_year = vehicle_info['model_year']
+    base_year_reg_class_id = vehicle_info['base_year_reg_class_id']
+    bev = vehicle_info['fueling_class'] == 'BEV'
+
+    sourcetype_name = [get_sourcetype_name(reg_class_id, body_style)
+                       for reg_class_id, body_style in zip(base_year_reg_class_id, vehicle_info['body_style'])]
+    if None in sourcetype_name:
+        improper_keys = sorted(set((reg_class_id, body_style) for reg_class_id, body_style, name
+                                   in zip(base_year_reg_class_id, vehicle_info['body_style'], sourcetype_name)
+                                   if name is None))
+        raise Exception('Improper sourcetype_name for vehicle emission rates, no sourcetype for '
+                        '(base_year_reg_class_id, body_style) %s' % ', '.join(str(key) for key in improper_keys))
+    sourcetype_name = np.array(sourcetype_name, dtype=object)
+
+    vmt_liquid_fuel, vmt_electricity, onroad_gallons_per_mile, fuel_consumption_gallons, onroad_miles_per_gallon, \
+        fuel_generation_kWh, fuel_consumption_kWh, pure_share, energy_density_ratio \
+        = np.zeros((9, num_rows))
+
+    liquid_rate_names = dict.fromkeys(get_vehicle_emission_rate_names('pump gasoline')
+                                      + get_vehicle_emission_rate_names('pump diesel'))
+    liquid_rates = dict((rate_name, np.zeros(num_rows)) for rate_name in liquid_rate_names)
+    electric_rates = dict((rate_name, np.zeros(num_rows))
+                          for rate_name in get_vehicle_emission_rate_names('US electricity'))
+    refinery_rates = dict((pollutant, np.zeros(num_rows)) for pollutant in refinery_pollutants)
+
+    exhaust_ustons = dict((pollutant, np.zeros(num_rows)) for pollutant in exhaust_pollutants + ('sox', ))
+    evaporative_ustons = dict((pollutant, np.zeros(num_rows)) for pollutant in evaporative_rate_names)
+    vehicle_metrictons = dict((pollutant, np.zeros(num_rows)) for pollutant in ('co2', 'ch4', 'n2o'))
+
+    any_electric = np.zeros(num_rows, dtype=bool)
+    any_liquid = np.zeros(num_rows, dtype=bool)
+
+    for fuel_num in range(num_fuels):
+        fuel, fuel_share = fuels[fuel_num], fuel_shares[fuel_num]
+
+        transmission_efficiency, co2_emissions_grams_per_unit = np.ones((2, num_rows))
+        fuel_rows = np.flatnonzero(electric[fuel_num] | liquid[fuel_num])
+        for (year, fuel_id), rows in get_key_groups(calendar_year[fuel_rows], fuel[fuel_rows]):
+            rows = fuel_rows[rows]
+            refuel_efficiency = batch_settings.onroad_fuels.get_fuel_attribute(year, fuel_id, 'refuel_efficiency')
+            transmission_efficiency[rows] \
+                = batch_settings.onroad_fuels.get_fuel_attribute(year, fuel_id, 'transmission_efficiency')
+            co2_emissions_grams_per_unit[rows] \
+                = batch_settings.onroad_fuels.get_fuel_attribute(year, fuel_id, 'direct_co2e_grams_per_unit') \
+                / refuel_efficiency
+
+        # electric fuel consumption
+        rows = np.flatnonzero(electric[fuel_num])
+        any_electric[rows] = True
+        vmt_electricity[rows] = vmt[rows] * fuel_share[rows]
+        fuel_consumption_kWh[rows] += vmt_electricity[rows] * onroad_direct_kwh_per_mile[rows]
+        fuel_generation_kWh[rows] = fuel_consumption_kWh[rows] / transmission_efficiency[rows]
+
+        # vehicle emission rates; PHEVs use the ICE vehicle rates
+        bev_rows = rows[bev[rows]]
+        for (group_model_year, sourcetype, reg_class_id, fuel_id), group_rows in get_key_groups(
+                model_year[bev_rows], sourcetype_name[bev_rows], base_year_reg_class_id[bev_rows], fuel[bev_rows]):
+            group_rows = bev_rows[group_rows]
+            rates = get_vehicle_emission_rates_by_age(session_settings, group_model_year, sourcetype, reg_class_id,
+                                                      fuel_id, age[group_rows])
+            for rate_name, rate in rates.items():
+                electric_rates[rate_name][group_rows] = rate
+
+        # liquid fuel consumption
+        rows = np.flatnonzero(liquid[fuel_num])
+        any_liquid[rows] = True
+        vmt_liquid_fuel[rows] = vmt[rows] * fuel_share[rows]
+        onroad_gallons_per_mile[rows] += onroad_direct_co2e_grams_per_mile[rows] / co2_emissions_grams_per_unit[rows]
+        fuel_consumption_gallons[rows] = \
+            vmt_liquid_fuel[rows] * onroad_gallons_per_mile[rows] / transmission_efficiency[rows]
+        onroad_miles_per_gallon[rows] = 1 / onroad_gallons_per_mile[rows]
+
+        rate_rows = rows[np.isin(fuel[rows], ['pump gasoline', 'pump diesel'])]
+        for (group_model_year, sourcetype, reg_class_id, fuel_id), group_rows in get_key_groups(
+                model_year[rate_rows], sourcetype_name[rate_rows], base_year_reg_class_id[rate_rows],
+                fuel[rate_rows]):
+            group_rows = rate_rows[group_rows]
+            rates = get_vehicle_emission_rates_by_age(session_settings, group_model_year, sourcetype, reg_class_id,
+                                                      fuel_id, age[group_rows])
+            for rate_name, rate in rates.items():
+                liquid_rates[rate_name][group_rows] = rate
+
+            if fuel_id == 'pump gasoline':
+                energy_density_ratio[group_rows], pure_share[group_rows] = e0_energy_density_ratio, e0_share
             else:
-                battery_kwh = 0
-
-            if model_year >= calendar_years[0]:
-
-                # get vmt and session fatalities from safety_effects_dict
-                safety = safety_effects_dict[(vehicle_id, calendar_year)]
-                session_fatalities, vmt, annual_vmt, odometer, calendar_year_vmt_adj, vmt_rebound, annual_vmt_rebound, \
-                    size_class \
-                    = safety['session_fatalities'], \
-                    safety['vmt'], \
-                    safety['annual_vmt'], \
-                    safety['odometer'], \
-                    safety['context_vmt_adjustment'], \
-                    safety['vmt_rebound'], \
-                    safety['annual_vmt_rebound'], \
-                    safety['context_size_class']
-
-                if base_year_reg_class_id == 'car':
-                    sourcetype_name = 'passenger car'
-                elif base_year_reg_class_id == 'truck':
-                    sourcetype_name = 'passenger truck'
-                elif base_year_reg_class_id == 'mediumduty' and 'cuv' in body_style:
-                    sourcetype_name = 'passenger truck'
-                elif base_year_reg_class_id == 'mediumduty' and 'pickup' in body_style:
-                    sourcetype_name = 'light commercial truck'
-                else:
-                    print('Improper sourcetype_name for vehicle emission rates.')
-
-                # need vehicle effects for each vehicle and for each calendar year since they change year-over-year
-                vehicle_effects_dict = {}
-                if target_co2e_grams_per_mile is not None:
-
-                    liquid_fuel = None
-                    electric_fuel = None
-
-                    vmt_liquid_fuel = vmt_electricity \
-                        = onroad_gallons_per_mile = fuel_consumption_gallons = onroad_miles_per_gallon \
-                        = fuel_generation_kWh = fuel_consumption_kWh = 0
-
-                    nmog_exh_ustons = nmog_evap_ustons = nmog_veh_ustons = 0
-                    co_exh_ustons = co_veh_ustons = 0
-                    nox_exh_ustons = nox_veh_ustons = 0
-                    sox_exh_ustons = sox_veh_ustons = 0
-                    pm25_exh_ustons = pm25_brakewear_ustons = pm25_tirewear_ustons = pm25_veh_ustons = 0
-                    acetaldehyde_exh_ustons = acetaldehyde_veh_ustons = 0
-                    acrolein_exh_ustons = acrolein_veh_ustons = 0
-                    benzene_exh_ustons = benzene_evap_ustons = benzene_veh_ustons = 0
-                    ethylbenzene_exh_ustons = ethylbenzene_evap_ustons = ethylbenzene_veh_ustons = 0
-                    naphthalene_exh_ustons = naphthalene_evap_ustons = naphthalene_veh_ustons = 0
-                    formaldehyde_exh_ustons = formaldehyde_veh_ustons = 0
-                    butadiene13_exh_ustons = butadiene13_veh_ustons = 0
-                    pah15_exh_ustons = pah15_veh_ustons = 0
-                    co2_exh_metrictons = co2_veh_metrictons = 0
-                    ch4_exh_metrictons = ch4_veh_metrictons = 0
-                    n2o_exh_metrictons = n2o_veh_metrictons = 0
-
-                    co2_upstream_metrictons = ch4_upstream_metrictons = n2o_upstream_metrictons = 0
-                    voc_upstream_ustons = co_upstream_ustons = nox_upstream_ustons = pm25_upstream_ustons = 0
-                    sox_upstream_ustons = hcl_upstream_ustons = hg_upstream_ustons = 0
-
-                    pm25_brakewear_rate_l = pm25_brakewear_rate_e = pm25_tirewear_rate_l = pm25_tirewear_rate_e = 0
-                    pm25_exh_rate = co_exh_rate = nox_exh_rate = sox_exh_rate = ch4_exh_rate = n2o_exh_rate = 0
-                    nmog_exh_rate = nmog_permeation_rate = nmog_venting_rate = 0
-                    nmog_leaks_rate = nmog_refuel_disp_rate = nmog_refuel_spill_rate = 0
-                    acetaldehyde_exh_rate = acrolein_exh_rate = 0
-                    benzene_exh_rate = benzene_permeation_rate = benzene_venting_rate = 0
-                    benzene_leaks_rate = benzene_refuel_disp_rate = benzene_refuel_spill_rate = 0
-                    ethylbenzene_exh_rate = ethylbenzene_permeation_rate = ethylbenzene_venting_rate = 0
-                    ethylbenzene_leaks_rate = ethylbenzene_refuel_disp_rate = ethylbenzene_refuel_spill_rate = 0
-                    formaldehyde_exh_rate = naphthalene_exh_rate = naphthalene_refuel_spill_rate = 0
-                    butadiene13_exh_rate = pah15_exh_rate = 0
-
-                    voc_ref_rate = co_ref_rate = nox_ref_rate = pm25_ref_rate = sox_ref_rate = 0
-                    co2_ref_rate = ch4_ref_rate = n2o_ref_rate = 0
-                    # benzene_ref = butadiene13_ref = formaldehyde_ref = acetaldehyde_ref = acrolein_ref = 0
-
-                    pure_share = energy_density_ratio = 0
-
-                    veh_rates_by = 'age'  # for now; set as an input if we want to; value can be 'age' or 'odometer'
-                    ind_var_value = pd.to_numeric(vad['age'])
-                    if veh_rates_by == 'odometer':
-                        ind_var_value = pd.to_numeric(vad['odometer'])
-
-                    fuel_dict = eval(in_use_fuel_id)
-                    for fuel, fuel_share in fuel_dict.items():
-                        refuel_efficiency \
-                            = batch_settings.onroad_fuels.get_fuel_attribute(calendar_year, fuel,
-                                                                             'refuel_efficiency')
-                        transmission_efficiency \
-                            = batch_settings.onroad_fuels.get_fuel_attribute(calendar_year, fuel,
-                                                                             'transmission_efficiency')
-                        co2_emissions_grams_per_unit \
-                            = batch_settings.onroad_fuels.get_fuel_attribute(
-                                calendar_year, fuel, 'direct_co2e_grams_per_unit') / refuel_efficiency
-
-                        # calc fuel consumption and get emission rates
-                        if fuel == 'US electricity' and onroad_direct_kwh_per_mile:
-                            electric_fuel = fuel
-                            vmt_electricity = vmt * fuel_share
-                            fuel_consumption_kWh += vmt_electricity * onroad_direct_kwh_per_mile
-                            fuel_generation_kWh = fuel_consumption_kWh / transmission_efficiency
-
-                            # vehicle emission rates; PHEVs use the ICE vehicle rates
-                            if fueling_class == 'BEV':
-                                pm25_brakewear_rate_e, pm25_tirewear_rate_e \
-                                    = get_vehicle_emission_rate(
-                                        session_settings, model_year, sourcetype_name, base_year_reg_class_id,
-                                        fuel, ind_var_value)
-
-                        elif fuel != 'US electricity' and onroad_direct_co2e_grams_per_mile:
-                            liquid_fuel = fuel
-                            vmt_liquid_fuel = vmt * fuel_share
-                            onroad_gallons_per_mile += onroad_direct_co2e_grams_per_mile / co2_emissions_grams_per_unit
-                            fuel_consumption_gallons = \
-                                vmt_liquid_fuel * onroad_gallons_per_mile / transmission_efficiency
-                            onroad_miles_per_gallon = 1 / onroad_gallons_per_mile
-
-                            if fuel == 'pump gasoline':
-                                pm25_brakewear_rate_l, pm25_tirewear_rate_l, pm25_exh_rate, \
-                                    nmog_exh_rate, nmog_permeation_rate, nmog_venting_rate, nmog_leaks_rate, \
-                                    nmog_refuel_disp_rate, nmog_refuel_spill_rate, co_exh_rate, nox_exh_rate, \
-                                    sox_exh_rate, ch4_exh_rate, n2o_exh_rate, acetaldehyde_exh_rate, \
-                                    acrolein_exh_rate, benzene_exh_rate, benzene_permeation_rate, \
-                                    benzene_venting_rate, benzene_leaks_rate, benzene_refuel_disp_rate, \
-                                    benzene_refuel_spill_rate, ethylbenzene_exh_rate, ethylbenzene_permeation_rate, \
-                                    ethylbenzene_venting_rate, ethylbenzene_leaks_rate, \
-                                    ethylbenzene_refuel_disp_rate, ethylbenzene_refuel_spill_rate, \
-                                    formaldehyde_exh_rate, naphthalene_exh_rate, \
-                                    butadiene13_exh_rate, pah15_exh_rate \
-                                    = get_vehicle_emission_rate(
-                                        session_settings, model_year, sourcetype_name, base_year_reg_class_id, fuel,
-                                        ind_var_value)
-
-                                energy_density_ratio, pure_share = e0_energy_density_ratio, e0_share
-
-                            elif fuel == 'pump diesel':
-                                pm25_brakewear_rate_l, pm25_tirewear_rate_l, pm25_exh_rate, \
-                                    nmog_exh_rate, nmog_refuel_spill_rate, co_exh_rate, nox_exh_rate, \
-                                    sox_exh_rate, ch4_exh_rate, n2o_exh_rate, acetaldehyde_exh_rate, \
-                                    acrolein_exh_rate, benzene_exh_rate, benzene_refuel_spill_rate, \
-                                    ethylbenzene_exh_rate, ethylbenzene_refuel_spill_rate, \
-                                    formaldehyde_exh_rate, naphthalene_exh_rate, naphthalene_refuel_spill_rate, \
-                                    butadiene13_exh_rate, pah15_exh_rate \
-                                    = get_vehicle_emission_rate(
-                                        session_settings, model_year, sourcetype_name, base_year_reg_class_id, fuel,
-                                        ind_var_value)
-
-                                energy_density_ratio, pure_share = diesel_energy_density_ratio, 1
-                            else:
-                                pass  # add additional liquid fuels (E85) if necessary
-
-                            # upstream refinery emission factors for liquid fuel operation
-                            if session_settings.emission_factors_refinery:
-                                voc_ref_rate, co_ref_rate, nox_ref_rate, pm25_ref_rate, sox_ref_rate, \
-                                    co2_ref_rate, ch4_ref_rate, n2o_ref_rate \
-                                        = get_refinery_ef(session_settings, calendar_year, liquid_fuel)
-                            else:
-                                voc_ref_rate, nox_ref_rate, pm25_ref_rate, sox_ref_rate = \
-                                    get_refinery_emission_rate(session_settings, calendar_year)
-
-                            # calc exhaust and evaporative emissions for liquid fuel operation
-                            factor = vmt_liquid_fuel / grams_per_us_ton
-                            pm25_exh_ustons += pm25_exh_rate * factor
-                            nmog_exh_ustons += nmog_exh_rate * factor
-                            co_exh_ustons += co_exh_rate * factor
-                            nox_exh_ustons += nox_exh_rate * factor
-                            acetaldehyde_exh_ustons += acetaldehyde_exh_rate * factor
-                            acrolein_exh_ustons += acrolein_exh_rate * factor
-                            benzene_exh_ustons += benzene_exh_rate * factor
-                            ethylbenzene_exh_ustons += ethylbenzene_exh_rate * factor
-                            formaldehyde_exh_ustons += formaldehyde_exh_rate * factor
-                            naphthalene_exh_ustons += naphthalene_exh_rate * factor
-                            butadiene13_exh_ustons += butadiene13_exh_rate * factor
-                            pah15_exh_ustons += pah15_exh_rate * factor
-
-                            factor = fuel_consumption_gallons / grams_per_us_ton
-                            sox_exh_ustons += sox_exh_rate * factor
-                            nmog_evap_ustons += sum([nmog_permeation_rate,
-                                                     nmog_venting_rate,
-                                                     nmog_leaks_rate,
-                                                     nmog_refuel_disp_rate,
-                                                     nmog_refuel_spill_rate]) * factor
-                            benzene_evap_ustons += sum([benzene_permeation_rate,
-                                                        benzene_venting_rate,
-                                                        benzene_leaks_rate,
-                                                        benzene_refuel_disp_rate,
-                                                        benzene_refuel_spill_rate]) * factor
-                            ethylbenzene_evap_ustons += sum([ethylbenzene_permeation_rate,
-                                                             ethylbenzene_venting_rate,
-                                                             ethylbenzene_leaks_rate,
-                                                             ethylbenzene_refuel_disp_rate,
-                                                             ethylbenzene_refuel_spill_rate]) * factor
-                            naphthalene_evap_ustons += naphthalene_refuel_spill_rate * factor
-
-                            factor = vmt_liquid_fuel / grams_per_metric_ton
-                            ch4_veh_metrictons += ch4_exh_rate * factor
-                            n2o_veh_metrictons += n2o_exh_rate * factor
-                            co2_veh_metrictons += onroad_direct_co2e_grams_per_mile * factor
-
-                            # calc vehicle inventories as exhaust plus evap (where applicable)
-                            nmog_veh_ustons = nmog_exh_ustons + nmog_evap_ustons
-                            co_veh_ustons = co_exh_ustons
-                            nox_veh_ustons = nox_exh_ustons
-                            sox_veh_ustons = sox_exh_ustons
-                            acetaldehyde_veh_ustons = acetaldehyde_exh_ustons
-                            acrolein_veh_ustons = acrolein_exh_ustons
-                            benzene_veh_ustons = benzene_exh_ustons + benzene_evap_ustons
-                            ethylbenzene_veh_ustons = ethylbenzene_exh_ustons + ethylbenzene_evap_ustons
-                            formaldehyde_veh_ustons = formaldehyde_exh_ustons
-                            naphthalene_veh_ustons = naphthalene_exh_ustons + naphthalene_evap_ustons
-                            butadiene13_veh_ustons = butadiene13_exh_ustons
-                            pah15_veh_ustons = pah15_exh_ustons
-
-                    # calc vehicle pm25 emissions
-                    pm25_brakewear_ustons += \
-                        (vmt_liquid_fuel * pm25_brakewear_rate_l + vmt_electricity * pm25_brakewear_rate_e) \
-                        / grams_per_us_ton
-                    pm25_tirewear_ustons += \
-                        (vmt_liquid_fuel * pm25_tirewear_rate_l + vmt_electricity * pm25_tirewear_rate_e) \
-                        / grams_per_us_ton
-
-                    pm25_veh_ustons = pm25_exh_ustons + pm25_brakewear_ustons + pm25_tirewear_ustons
-
-                    # calc upstream emissions for both liquid and electric fuel operation
-                    kwhs, gallons = fuel_generation_kWh, fuel_consumption_gallons
-                    ref_factor = fuel_reduction_leading_to_reduced_domestic_refining
-                    voc_upstream_ustons = \
-                        (kwhs * voc_egu_rate + gallons * voc_ref_rate * ref_factor) / grams_per_us_ton
-                    co_upstream_ustons = \
-                        (kwhs * co_egu_rate + gallons * co_ref_rate * ref_factor) / grams_per_us_ton
-                    nox_upstream_ustons = \
-                        (kwhs * nox_egu_rate + gallons * nox_ref_rate * ref_factor) / grams_per_us_ton
-                    pm25_upstream_ustons = \
-                        (kwhs * pm25_egu_rate + gallons * pm25_ref_rate * ref_factor) / grams_per_us_ton
-                    sox_upstream_ustons = \
-                        (kwhs * sox_egu_rate + gallons * sox_ref_rate * ref_factor) / grams_per_us_ton
-                    hcl_upstream_ustons = (kwhs * hcl_egu_rate) / grams_per_us_ton
-                    hg_upstream_ustons = (kwhs * hg_egu_rate) / grams_per_us_ton
-                    # benzene_upstream_ustons = (kwhs * benzene_ps + gallons * benzene_ref) / grams_per_us_ton
-                    # butadiene13_upstream_ustons = (kwhs * butadiene13_ps + gallons * butadiene13_ref) / grams_per_us_ton
-                    # formaldehyde_upstream_ustons = (kwhs * formaldehyde_ps + gallons * formaldehyde_ref) / grams_per_us_ton
-                    # acetaldehyde_upstream_ustons = (kwhs * acetaldehyde_ps + gallons * acetaldehyde_ref) / grams_per_us_ton
-                    # acrolein_upstream_ustons = (kwhs * acrolein_ps + gallons * acrolein_ref) / grams_per_us_ton
-
-                    co2_upstream_metrictons = \
-                        (kwhs * co2_egu_rate + gallons * co2_ref_rate * ref_factor) / grams_per_metric_ton
-                    ch4_upstream_metrictons = \
-                        (kwhs * ch4_egu_rate + gallons * ch4_ref_rate * ref_factor) / grams_per_metric_ton
-                    n2o_upstream_metrictons = \
-                        (kwhs * n2o_egu_rate + gallons * n2o_ref_rate * ref_factor) / grams_per_metric_ton
-
-                    # sum vehicle and upstream into totals
-                    voc_total_ustons = voc_upstream_ustons  # + voc_tailpipe_ustons
-                    nmog_total_ustons = nmog_veh_ustons  # + nmog_upstream_ustons
-                    co_total_ustons = co_veh_ustons + co_upstream_ustons
-                    nox_total_ustons = nox_veh_ustons + nox_upstream_ustons
-                    pm25_total_ustons = pm25_veh_ustons + pm25_upstream_ustons
-                    sox_total_ustons = sox_veh_ustons + sox_upstream_ustons
-                    acetaldehyde_total_ustons = acetaldehyde_veh_ustons  # + acetaldehyde_upstream_ustons
-                    acrolein_total_ustons = acrolein_veh_ustons  # + acrolein_upstream_ustons
-                    benzene_total_ustons = benzene_veh_ustons  # + benzene_upstream_ustons
-                    ethylbenzene_total_ustons = ethylbenzene_veh_ustons  # + ethylbenzene_upstream_ustons
-                    formaldehyde_total_ustons = formaldehyde_veh_ustons  # + formaldehyde_upstream_ustons
-                    naphthalene_total_ustons = naphthalene_veh_ustons  # + naphlathene_upstream_ustons
-                    butadiene13_total_ustons = butadiene13_veh_ustons  # + butadiene13_upstream_ustons
-                    pah15_total_ustons = pah15_veh_ustons  # + pah15_upstream_ustons
-                    co2_total_metrictons = co2_veh_metrictons + co2_upstream_metrictons
-                    ch4_total_metrictons = ch4_veh_metrictons + ch4_upstream_metrictons
-                    n2o_total_metrictons = n2o_veh_metrictons + n2o_upstream_metrictons
-
-                    # calc energy security related attributes and comparisons to year_for_compares
-                    oil_bbl = fuel_consumption_gallons * pure_share * energy_density_ratio / gal_per_bbl
-                    imported_oil_bbl = oil_bbl * get_energysecurity_cf(batch_settings, calendar_year)
-                    imported_oil_bbl_per_day = imported_oil_bbl / 365
-
-                    vehicle_effects_dict.update({
-                        'session_policy': session_settings.session_policy,
-                        'session_name': session_settings.session_name,
-                        'vehicle_id': vehicle_id,
-                        'base_year_vehicle_id': int(base_year_vehicle_id),
-                        'manufacturer_id': mfr_id,
-                        'name': name,
-                        'calendar_year': int(calendar_year),
-                        'model_year': calendar_year - age,
-                        'age': age,
-                        'base_year_reg_class_id': base_year_reg_class_id,
-                        'reg_class_id': reg_class_id,
-                        'context_size_class': size_class,
-                        'in_use_fuel_id': in_use_fuel_id,
-                        'market_class_id': market_class_id,
-                        'fueling_class': fueling_class,
-                        'base_year_powertrain_type': base_year_powertrain_type,
-                        'body_style': body_style,
-                        'footprint_ft2': footprint,
-                        'workfactor': workfactor,
-                        'registered_count': vad['registered_count'],
-                        'context_vmt_adjustment': calendar_year_vmt_adj,
-                        'annual_vmt': annual_vmt,
-                        'odometer': odometer,
-                        'vmt': vmt,
-                        'annual_vmt_rebound': annual_vmt_rebound,
-                        'vmt_rebound': vmt_rebound,
-                        'vmt_liquid_fuel': vmt_liquid_fuel,
-                        'vmt_electricity': vmt_electricity,
-                        'battery_kwh': battery_kwh,
-                        'onroad_direct_co2e_grams_per_mile': onroad_direct_co2e_grams_per_mile,
-                        'onroad_direct_kwh_per_mile': onroad_direct_kwh_per_mile,
-                        'onroad_gallons_per_mile': onroad_gallons_per_mile,
-                        'onroad_miles_per_gallon': onroad_miles_per_gallon,
-                        'fuel_consumption_gallons': fuel_consumption_gallons,
-                        'fuel_consumption_kWh': fuel_consumption_kWh,
-                        'fuel_generation_kWh': fuel_generation_kWh,
-
-                        'barrels_of_oil': oil_bbl,
-                        'barrels_of_imported_oil': imported_oil_bbl,
-                        'barrels_of_imported_oil_per_day': imported_oil_bbl_per_day,
-
-                        'session_fatalities': session_fatalities,
-
-                        'nmog_exhaust_ustons': nmog_exh_ustons,
-                        'nmog_evaporative_ustons': nmog_evap_ustons,
-                        'nmog_vehicle_ustons': nmog_veh_ustons,
-                        'co_vehicle_ustons': co_veh_ustons,
-                        'nox_vehicle_ustons': nox_veh_ustons,
-                        'pm25_exhaust_ustons': pm25_exh_ustons,
-                        'pm25_brakewear_ustons': pm25_brakewear_ustons,
-                        'pm25_tirewear_ustons': pm25_tirewear_ustons,
-                        'pm25_vehicle_ustons': pm25_veh_ustons,
-                        'sox_vehicle_ustons': sox_veh_ustons,
-                        'acetaldehyde_vehicle_ustons': acetaldehyde_veh_ustons,
-                        'acrolein_vehicle_ustons': acrolein_veh_ustons,
-                        'benzene_exhaust_ustons': benzene_exh_ustons,
-                        'benzene_evaporative_ustons': benzene_evap_ustons,
-                        'benzene_vehicle_ustons': benzene_veh_ustons,
-                        'ethylbenzene_exhaust_ustons': ethylbenzene_exh_ustons,
-                        'ethylbenzene_evaporative_ustons': ethylbenzene_evap_ustons,
-                        'ethylbenzene_vehicle_ustons': ethylbenzene_veh_ustons,
-                        'formaldehyde_vehicle_ustons': formaldehyde_veh_ustons,
-                        'naphthalene_exhaust_ustons': naphthalene_exh_ustons,
-                        'naphthalene_evaporative_ustons': naphthalene_evap_ustons,
-                        'naphthalene_vehicle_ustons': naphthalene_veh_ustons,
-                        '13_butadiene_vehicle_ustons': butadiene13_veh_ustons,
-                        '15pah_vehicle_ustons': pah15_veh_ustons,
-
-                        'ch4_vehicle_metrictons': ch4_veh_metrictons,
-                        'n2o_vehicle_metrictons': n2o_veh_metrictons,
-                        'co2_vehicle_metrictons': co2_veh_metrictons,
-
-                        'voc_upstream_ustons': voc_upstream_ustons,
-                        'co_upstream_ustons': co_upstream_ustons,
-                        'nox_upstream_ustons': nox_upstream_ustons,
-                        'pm25_upstream_ustons': pm25_upstream_ustons,
-                        'sox_upstream_ustons': sox_upstream_ustons,
-                        'hcl_upstream_ustons': hcl_upstream_ustons,
-                        'hg_upstream_ustons': hg_upstream_ustons,
-
-                        'ch4_upstream_metrictons': ch4_upstream_metrictons,
-                        'n2o_upstream_metrictons': n2o_upstream_metrictons,
-                        'co2_upstream_metrictons': co2_upstream_metrictons,
-
-                        'nmog_and_voc_total_ustons': nmog_total_ustons + voc_total_ustons,
-                        'co_total_ustons': co_total_ustons,
-                        'nox_total_ustons': nox_total_ustons,
-                        'pm25_total_ustons': pm25_total_ustons,
-                        'sox_total_ustons': sox_total_ustons,
-                        'acetaldehyde_total_ustons': acetaldehyde_total_ustons,
-                        'acrolein_total_ustons': acrolein_total_ustons,
-                        'benzene_total_ustons': benzene_total_ustons,
-                        'ethylbenzene_total_ustons': ethylbenzene_total_ustons,
-                        'formaldehyde_total_ustons': formaldehyde_total_ustons,
-                        'naphthalene_total_ustons': naphthalene_total_ustons,
-                        '13_butadiene_total_ustons': butadiene13_total_ustons,
-                        '15pah_total_ustons': pah15_total_ustons,
-                        'co2_total_metrictons': co2_total_metrictons,
-                        'ch4_total_metrictons': ch4_total_metrictons,
-                        'n2o_total_metrictons': n2o_total_metrictons,
-                    }
-                    )
+                energy_density_ratio[group_rows], pure_share[group_rows] = diesel_energy_density_ratio, 1
 
-                    calendar_year_effects_dict[(vehicle_id, calendar_year)] = vehicle_effects_dict
+        # upstream refinery emission factors for liquid fuel operation
+        for (year, fuel_id), group_rows in get_key_groups(calendar_year[rows], fuel[rows]):
+            group_rows = rows[group_rows]
+            if session_settings.emission_factors_refinery:
+                rates = zip(refinery_pollutants, get_refinery_ef(session_settings, year, fuel_id))
+            else:
+                rates = zip(('voc', 'nox', 'pm25', 'sox'), get_refinery_emission_rate(session_settings, year))
+            for pollutant, rate in rates:
+                refinery_rates[pollutant][group_rows] = rate
 
-        physical_effects_dict.update(calendar_year_effects_dict)
+        # calc exhaust and evaporative emissions for liquid fuel operation
+        factor = vmt_liquid_fuel[rows] / grams_per_us_ton
+        for pollutant in exhaust_pollutants:
+            exhaust_ustons[pollutant][rows] += liquid_rates['%s_exhaust_grams_per_mile' % pollutant][rows] * factor
+
+        factor = fuel_consumption_gallons[rows] / grams_per_us_ton
+        exhaust_ustons['sox'][rows] += liquid_rates['sox_exhaust_grams_per_gallon'][rows] * factor
+        for pollutant, rate_names in evaporative_rate_names.items():
+            evaporative_rate = liquid_rates[rate_names[0]][rows]
+            for rate_name in rate_names[1:]:
+                evaporative_rate = evaporative_rate + liquid_rates[rate_name][rows]
+            evaporative_ustons[pollutant][rows] += evaporative_rate * factor
+
+        factor = vmt_liquid_fuel[rows] / grams_per_metric_ton
+        vehicle_metrictons['ch4'][rows] += liquid_rates['ch4_exhaust_grams_per_mile'][rows] * factor
+        vehicle_metrictons['n2o'][rows] += liquid_rates['n2o_exhaust_grams_per_mile'][rows] * factor
+        vehicle_metrictons['co2'][rows] += onroad_direct_co2e_grams_per_mile[rows] * factor
+
+    # calc vehicle inventories as exhaust plus evap (where applicable)
+    vehicle_ustons = dict(exhaust_ustons)
+    for pollutant in evaporative_ustons:
+        vehicle_ustons[pollutant] = exhaust_ustons[pollutant] + evaporative_ustons[pollutant]
+
+    # calc vehicle pm25 emissions
+    pm25_brakewear_ustons = \
+        (vmt_liquid_fuel * liquid_rates['pm25_brakewear_grams_per_mile']
+         + vmt_electricity * electric_rates['pm25_brakewear_grams_per_mile']) / grams_per_us_ton
+    pm25_tirewear_ustons = \
+        (vmt_liquid_fuel * liquid_rates['pm25_tirewear_grams_per_mile']
+         + vmt_electricity * electric_rates['pm25_tirewear_grams_per_mile']) / grams_per_us_ton
+
+    pm25_veh_ustons = exhaust_ustons['pm25'] + pm25_brakewear_ustons + pm25_tirewear_ustons
+
+    # calc upstream emissions for both liquid and electric fuel operation
+    unique_calendar_years, calendar_year_index = np.unique(calendar_year, return_inverse=True)
+    egu_rates = np.array([egu_rates[year] for year in unique_calendar_years.tolist()],
+                         dtype=float).reshape(-1, len(egu_pollutants))[calendar_year_index]
+    egu_rates = dict(zip(egu_pollutants, egu_rates.T))
+
+    kwhs, gallons = fuel_generation_kWh, fuel_consumption_gallons
+    ref_factor = fuel_reduction_leading_to_reduced_domestic_refining
+    upstream = dict()
+    for pollutant in ('voc', 'co', 'nox', 'pm25', 'sox'):
+        upstream[pollutant] = \
+            (kwhs * egu_rates[pollutant] + gallons * refinery_rates[pollutant] * ref_factor) / grams_per_us_ton
+    for pollutant in ('hcl', 'hg'):
+        upstream[pollutant] = (kwhs * egu_rates[pollutant]) / grams_per_us_ton
+    for pollutant in ('co2', 'ch4', 'n2o'):
+        upstream[pollutant] = \
+            (kwhs * egu_rates[pollutant] + gallons * refinery_rates[pollutant] * ref_factor) / grams_per_metric_ton
+
+    # calc energy security related attributes
+    energysecurity_cf = np.array([get_energysecurity_cf(batch_settings, year)
+                                  for year in unique_calendar_years.tolist()], dtype=float)[calendar_year_index]
+    oil_bbl = fuel_consumption_gallons * pure_share * energy_density_ratio / gal_per_bbl
+    imported_oil_bbl = oil_bbl * energysecurity_cf
+    imported_oil_bbl_per_day = imported_oil_bbl / 365
+
+    # for physical effects, we want battery kwh implemented on new vehicles (age=0)
+    registered_count = [vad['registered_count'] for vad in vads]
+    battery_kwh = vehicle_info['battery_kwh'].astype(float) * np.array(registered_count, dtype=float)
+
+    def liquid_values(values):
+        return np.where(any_liquid, values.astype(object), 0).tolist()
+
+    def electric_values(values):
+        return np.where(any_electric, values.astype(object), 0).tolist()
+
+    safety = [safety_effects_dict[key] for key in zip(vehicle_id.tolist(), calendar_year.tolist())]
+
+    effects = {
+        'session_policy': [session_settings.session_policy] * num_rows,
+        'session_name': [session_settings.session_name] * num_rows,
+        'vehicle_id': vehicle_id.tolist(),
+        'base_year_vehicle_id': [int(v) for v in vehicle_info['base_year_vehicle_id']],
+        'manufacturer_id': vehicle_info['manufacturer_id'].tolist(),
+        'name': vehicle_info['name'].tolist(),
+        'calendar_year': calendar_year.tolist(),
+        'model_year': (calendar_year - age).tolist(),
+        'age': age.tolist(),
+        'base_year_reg_class_id': base_year_reg_class_id.tolist(),
+        'reg_class_id': vehicle_info['reg_class_id'].tolist(),
+        'context_size_class': [s['context_size_class'] for s in safety],
+        'in_use_fuel_id': vehicle_info['in_use_fuel_id'].tolist(),
+        'market_class_id': vehicle_info['market_class_id'].tolist(),
+        'fueling_class': vehicle_info['fueling_class'].tolist(),
+        'base_year_powertrain_type': vehicle_info['base_year_powertrain_type'].tolist(),
+        'body_style': vehicle_info['body_style'].tolist(),
+        'footprint_ft2': vehicle_info['footprint_ft2'].tolist(),
+        'workfactor': vehicle_info['workfactor'].tolist(),
+        'registered_count': registered_count,
+        'context_vmt_adjustment': [s['context_vmt_adjustment'] for s in safety],
+        'annual_vmt': [s['annual_vmt'] for s in safety],
+        'odometer': [s['odometer'] for s in safety],
+        'vmt': [s['vmt'] for s in safety],
+        'annual_vmt_rebound': [s['annual_vmt_rebound'] for s in safety],
+        'vmt_rebound': [s['vmt_rebound'] for s in safety],
+        'vmt_liquid_fuel': liquid_values(vmt_liquid_fuel),
+        'vmt_electricity': electric_values(vmt_electricity),
+        'battery_kwh': np.where(age == 0, battery_kwh.astype(object), 0).tolist(),
+        'onroad_direct_co2e_grams_per_mile': vehicle_info['onroad_direct_co2e_grams_per_mile'].tolist(),
+        'onroad_direct_kwh_per_mile': vehicle_info['onroad_direct_kwh_per_mile'].tolist(),
+        'onroad_gallons_per_mile': liquid_values(onroad_gallons_per_mile),
+        'onroad_miles_per_gallon': liquid_values(onroad_miles_per_gallon),
+        'fuel_consumption_gallons': liquid_values(fuel_consumption_gallons),
+        'fuel_consumption_kWh': electric_values(fuel_consumption_kWh),
+        'fuel_generation_kWh': electric_values(fuel_generation_kWh),
+
+        'barrels_of_oil': oil_bbl.tolist(),
+        'barrels_of_imported_oil': imported_oil_bbl.tolist(),
+        'barrels_of_imported_oil_per_day': imported_oil_bbl_per_day.tolist(),
+
+        'session_fatalities': [s['session_fatalities'] for s in safety],
+
+        'nmog_exhaust_ustons': liquid_values(exhaust_ustons['nmog']),
+        'nmog_evaporative_ustons': liquid_values(evaporative_ustons['nmog']),
+        'nmog_vehicle_ustons': liquid_values(vehicle_ustons['nmog']),
+        'co_vehicle_ustons': liquid_values(vehicle_ustons['co']),
+        'nox_vehicle_ustons': liquid_values(vehicle_ustons['nox']),
+        'pm25_exhaust_ustons': liquid_values(exhaust_ustons['pm25']),
+        'pm25_brakewear_ustons': pm25_brakewear_ustons.tolist(),
+        'pm25_tirewear_ustons': pm25_tirewear_ustons.tolist(),
+        'pm25_vehicle_ustons': pm25_veh_ustons.tolist(),
+        'sox_vehicle_ustons': liquid_values(vehicle_ustons['sox']),
+        'acetaldehyde_vehicle_ustons': liquid_values(vehicle_ustons['acetaldehyde']),
+        'acrolein_vehicle_ustons': liquid_values(vehicle_ustons['acrolein']),
+        'benzene_exhaust_ustons': liquid_values(exhaust_ustons['benzene']),
+        'benzene_evaporative_ustons': liquid_values(evaporative_ustons['benzene']),
+        'benzene_vehicle_ustons': liquid_values(vehicle_ustons['benzene']),
+        'ethylbenzene_exhaust_ustons': liquid_values(exhaust_ustons['ethylbenzene']),
+        'ethylbenzene_evaporative_ustons': liquid_values(evaporative_ustons['ethylbenzene']),
+        'ethylbenzene_vehicle_ustons': liquid_values(vehicle_ustons['ethylbenzene']),
+        'formaldehyde_vehicle_ustons': liquid_values(vehicle_ustons['formaldehyde']),
+        'naphthalene_exhaust_ustons': liquid_values(exhaust_ustons['naphthalene']),
+        'naphthalene_evaporative_ustons': liquid_values(evaporative_ustons['naphthalene']),
+        'naphthalene_vehicle_ustons': liquid_values(vehicle_ustons['naphthalene']),
+        '13_butadiene_vehicle_ustons': liquid_values(vehicle_ustons['13_butadiene']),
+        '15pah_vehicle_ustons': liquid_values(vehicle_ustons['15pah']),
+
+        'ch4_vehicle_metrictons': liquid_values(vehicle_metrictons['ch4']),
+        'n2o_vehicle_metrictons': liquid_values(vehicle_metrictons['n2o']),
+        'co2_vehicle_metrictons': liquid_values(vehicle_metrictons['co2']),
+
+        'voc_upstream_ustons': upstream['voc'].tolist(),
+        'co_upstream_ustons': upstream['co'].tolist(),
+        'nox_upstream_ustons': upstream['nox'].tolist(),
+        'pm25_upstream_ustons': upstream['pm25'].tolist(),
+        'sox_upstream_ustons': upstream['sox'].tolist(),
+        'hcl_upstream_ustons': upstream['hcl'].tolist(),
+        'hg_upstream_ustons': upstream['hg'].tolist(),
+
+        'ch4_upstream_metrictons': upstream['ch4'].tolist(),
+        'n2o_upstream_metrictons': upstream['n2o'].tolist(),
+        'co2_upstream_metrictons': upstream['co2'].tolist(),
+
+        'nmog_and_voc_total_ustons': (vehicle_ustons['nmog'] + upstream['voc']).tolist(),
+        'co_total_ustons': (vehicle_ustons['co'] + upstream['co']).tolist(),
+        'nox_total_ustons': (vehicle_ustons['nox'] + upstream['nox']).tolist(),
+        'pm25_total_ustons': (pm25_veh_ustons + upstream['pm25']).tolist(),
+        'sox_total_ustons': (vehicle_ustons['sox'] + upstream['sox']).tolist(),
+        'acetaldehyde_total_ustons': liquid_values(vehicle_ustons['acetaldehyde']),
+        'acrolein_total_ustons': liquid_values(vehicle_ustons['acrolein']),
+        'benzene_total_ustons': liquid_values(vehicle_ustons['benzene']),
+        'ethylbenzene_total_ustons': liquid_values(vehicle_ustons['ethylbenzene']),
+        'formaldehyde_total_ustons': liquid_values(vehicle_ustons['formaldehyde']),
+        'naphthalene_total_ustons': liquid_values(vehicle_ustons['naphthalene']),
+        '13_butadiene_total_ustons': liquid_values(vehicle_ustons['13_butadiene']),
+        '15pah_total_ustons': liquid_values(vehicle_ustons['15pah']),
+        'co2_total_metrictons': (vehicle_metrictons['co2'] + upstream['co2']).tolist(),
+        'ch4_total_metrictons': (vehicle_metrictons['ch4'] + upstream['ch4']).tolist(),
+        'n2o_total_metrictons': (vehicle_metrictons['n2o'] + upstream['n2o']).tolist(),
+    }
+
+    attribute_names = list(effects)
+    physical_effects_dict = dict(zip(zip(vehicle_id.tolist(), calendar_year.tolist()),
+                                     [dict(zip(attribute_names, values)) for values in zip(*effects.values())]))
 
     return physical_effects_dict
 
@@ -0,0 +1,105 @@
+"""
+
+**OMEGA effects compiled expression module.**
+
+Compiles input file equations once, at init, into functions of the equation variables which may be evaluated for
+scalars or numpy arrays, e.g. an emission rate equation evaluated for a vector of vehicle ages.
+
+The model imports ``CompiledExpression`` from here too, see ``omega_model.common.omega_eval``, so the module must not
+depend on other ``omega_effects`` modules.
+
+----
+
+**CODE**
+
+"""
+
+import ast
+import builtins
+import time
+
+import numpy as np
+
+
+class CompiledExpression:
+    """
+    Compiles an input file equation into a (vectorizable) function of its variables.
+
+    """
+    def __init__(self, source, name=None, global_vars=None):
+        """
+
+        Args:
+            source (str): the expression source, e.g. '((2.0575e-05 * age) + 0.02556)'
+            name (str): optional expression name for the compile report, defaults to the source
+            global_vars (dict): global variables available to the expression, defaults to {'np': np}
+
+        """
+        start_time = time.time()
+
+        if global_vars is None:
+            global_vars = {'np': np}
+
+        self.source = str(source)
+        self.name = name if name is not None else self.source
+
+        tree = ast.parse(self.source.strip(), mode='eval')
+
+        self.variables = sorted(set(node.id for node in ast.walk(tree)
+                                    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load))
+                                - set(global_vars) - set(dir(builtins)))
+
+        self.function = eval(compile('lambda %s: (%s)' % (', '.join(self.variables), self.source.strip()),
+                                     '<%s>' % self.name, 'eval'), global_vars)
+
+        self.is_constant = not self.variables
+        self.value = self.function() if self.is_constant else None
+
+        self.compile_time = time.time() - start_time
+
+    def evaluate(self, variables):
+        """
+
+        Args:
+            variables (mapping): values of the expression variables, values may be scalars or numpy arrays.
+
+        Returns:
+            The value of the expression, an array if any of the required variables are arrays.
+
+        """
+        if self.is_constant:
+            return self.value
+
+        return self.function(*[variables[v] for v in self.variables])
+
+    def __call__(self, **variables):
+        """
+
+        Args:
+            **variables: values of the expression variables, e.g. ``expression(age=ages)``.
+
+        Returns:
+            The value of the expression.
+
+        """
+        return self.evaluate(variables)
+
+
+def log_compile_report(expressions, effects_log, description):
+    """
+
+    Args:
+        expressions (list): the CompiledExpression objects to report.
+        effects_log: an instance of the EffectsLog class.
+        description (str): description of the expressions, e.g. the input file name.
+
+    Returns:
+        Nothing, but writes the compile time of each expression and the total compile time to the effects log.
+
+    """
+    for expression in expressions:
+        effects_log.logwrite(f'compiled {expression.name} in {expression.compile_time * 1000:.3f} ms',
+                             echo_console=False)
+
+    effects_log.logwrite(f'compiled {len(expressions)} {description} expressions in '
+                         f'{sum(expression.compile_time for expression in expressions) * 1000:.1f} ms')
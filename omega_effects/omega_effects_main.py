@@ -151,8 +151,12 @@ def main():
 
         # physical effects _____________________________________________________________________________________________
         effects_log.logwrite(f'\nCalculating analysis fleet physical effects for {session_name}')
-        analysis_fleet_physical_effects_dict \
-            = calc_physical_effects(batch_settings, session_settings, analysis_fleet_safety_effects_dict)
+        try:
+            analysis_fleet_physical_effects_dict \
+                = calc_physical_effects(batch_settings, session_settings, analysis_fleet_safety_effects_dict)
+        except Exception as e:
+            effects_log.logwrite(f'{e}')
+            sys.exit()
 
         effects_log.logwrite(f'Calculating legacy fleet physical effects for {session_name}')
         legacy_fleet_physical_effects_dict \
@@ -194,6 +194,7 @@ class SessionSettings:
         self.refinery_emission_factors_file = None
         self.refinery_emission_rates_file = None
         self.vehicle_emission_rates_file = None
+        self.vehicle_emission_rate_tables_file = None
         self.safety_values_file = None
         self.fatality_rates_file = None
         self.powertrain_cost_file = None
@@ -279,6 +280,9 @@ class SessionSettings:
 
         self.vehicle_emission_rates_file \
             = batch_settings.get_attribute_value(('Context Vehicle Emission Rates File', f'{self.session_policy}'), 'full_path')
+        if batch_settings.vehicle_emission_rate_tables_folder is not None:
+            self.vehicle_emission_rate_tables_file = \
+                batch_settings.vehicle_emission_rate_tables_folder / f'{self.vehicle_emission_rates_file.stem}.npz'
         self.safety_values_file \
             = batch_settings.get_attribute_value(('Context Safety Values File', f'{self.session_policy}'), 'full_path')
         self.fatality_rates_file \
@@ -355,7 +359,8 @@ class SessionSettings:
                 self.inputs_filelist.append(self.refinery_emission_rates_file)
 
             self.emission_rates_vehicles = EmissionRatesVehicles()
-            self.emission_rates_vehicles.init_from_file(self.vehicle_emission_rates_file, effects_log)
+            self.emission_rates_vehicles.init_from_file(
+                self.vehicle_emission_rates_file, effects_log, rate_tables_file=self.vehicle_emission_rate_tables_file)
             self.inputs_filelist.append(self.vehicle_emission_rates_file)
 
             self.safety_values = SafetyValues()
@@ -797,24 +797,29 @@ class Form(QObject):
         # Call OMEGA 2 batch as a subprocess with command line options from above
         status_bar_message = "Status = Model Running ..."
 
-        # While the subprocess is running, output communication from the batch process to the event monitor
-        # First find the log files
-        log_file_array = []  # Clear log file array
-        log_counter_array = []  # Clear counter array
-        log_ident_array = []  # Clear log identifier array
-        file_timer = 0  # Counter for file search timer
-        file_timer1 = 0  # Counter for item output timer
-
         import omega_model.omega_batch as omega_batch
         import threading, time
         import multiprocessing
+
+        mp_context = multiprocessing.get_context('spawn')
+
+        # While the subprocess is running, output communication from the batch process to the event monitor.
+        # Log text and progress events are sent through a queue, except for dispy runs where the sessions run on
+        # dispy nodes, in which case newly appended text is read from the log files
+        progress_queue = None
+        if not multiprocessor_mode_selected:
+            progress_queue = mp_context.Queue()
+            command_line_dict['progress_queue'] = progress_queue
+
+        progress_monitor = ProgressMonitor(progress_queue, output_batch_subdirectory + "/")
+
         # t = threading.Thread(target=omega_batch.run_omega_batch, kwargs=command_line_dict, daemon=False)
-        t = multiprocessing.Process(target=omega_batch.run_omega_batch, kwargs=command_line_dict, daemon=False)
+        t = mp_context.Process(target=omega_batch.run_omega_batch, kwargs=command_line_dict, daemon=False)
         t.name = input_batch_file
         t.start()
 
         # self.load_plots_2()
-        # Keep looking for communication from other processes through the log files
+        # Keep looking for communication from the batch process
         # while omega_batch.poll() is None:
         while t.is_alive():
             # This command allows the GUI to catch up and repaint itself
@@ -830,74 +835,10 @@ class Form(QObject):
             elapsed_time = "Model Running\n" + elapsed_time[:-4] + "\nError Count = " + str(model_error_count)
             self.window.model_status_label.setText(elapsed_time)
 
-            # Look for new log files
-            file_timer = file_timer + 1
-            if file_timer > 20:  # Look for new files every 2 seconds to reduce overhead
-                file_timer = 0
-                directory = output_batch_subdirectory + "/"  # Define output directory to search
-                for root, dirs, files in os.walk(directory):  # Search includes subdirectories
-                    for file in files:  # Begin search
-                        # Add if .txt file is found and it does not already exist in the log file array
-                        if file.endswith('.txt') and 'log' in file and not any(file in x for x in log_file_array):
-                            fullpath = os.path.join(root, file)  # Generate complete path of file
-                            log_file_array.append(fullpath)  # Append filename to log file array
-                            log_counter_array.append(0)  # Add another log counter for new file
-                            f = open(fullpath)  # Get identifier for status output
-                            lines = f.readlines()  # Read file
-                            f.close()  # Close file
-                            j = lines[0]  # Get first line
-                            # h = j.find('session')  # Look for 'session'
-                            if j.find('session') > -1:  # See if 'session' found
-                                l = j.find('session') + 8
-                                i = j.find(' ', l)  # Find the end of the next word after 'session'
-                                k = j[l:i]  # Save the next word
-                            elif j.find('batch') > -1:  # See if 'batch' found:
-                                k = 'Batch'  # Save the word for output
-                            else:
-                                k = ""  # Not recognized
-                            log_ident_array.append(k)
-
-            # Get number of lines in the log files if they exist
-            file_timer1 = file_timer1 + 1
-            if file_timer1 > 10:  # Check every 1 second to reduce overhead
-                file_timer1 = 0
-                for log_loop in range(0, len(log_file_array)):
-                    if os.path.isfile(log_file_array[log_loop]):
-                        log_lines = sum(1 for line in open(log_file_array[log_loop]))
-                        log_status = 1
-                    else:
-                        log_lines = 0
-                        log_status = 0
-
-                    # Read and output all new lines from log files
-                    while log_counter_array[log_loop] < log_lines and log_status == 1:
-                        try:
-                            f = open(log_file_array[log_loop])
-                        except Exception as e:
-                            print("%%%%% File Missing: ", e)
-                            break
-                        lines = f.readlines()
-                        f.close()
-
-                        # j = lines[0]  # Get first line
-                        # h = j.find('session')
-                        # l = h + 8
-                        # i = j.find(' ', 21)
-                        # k = j[l:i]
-                        # print('&&&', j, h, i, k)
-
-                        g = lines[log_counter_array[log_loop]]
-                        g = g.rstrip("\n")
-                        g = '[' + log_ident_array[log_loop] + '] ' + g
-                        # Select output color
-                        color = status_output_color(g)
-                        if color == "red":
-                            model_error_count = model_error_count + 1
-                            # print('***', model_error_count)
-                        # Output to event monitor
-                        self.event_monitor(g, color, 'dt')
-                        # Increment total number of read lines in log file counter
-                        log_counter_array[log_loop] = log_counter_array[log_loop] + 1
+            # Output new log lines and progress messages
+            model_error_count = self.output_progress(progress_monitor.get_lines(), model_error_count)
+
+        model_error_count = self.output_progress(progress_monitor.finish(), model_error_count)
 
         # Play a model end sound
         # sound2 = subprocess.Popen(['python', os.path.realpath('gui/sound_gui.py'), model_sound_stop], close_fds=True)
@@ -924,6 +865,25 @@ class Form(QObject):
         self.enable_gui_run_functions(1)
         # CU
 
+    def output_progress(self, lines, model_error_count):
+        """
+        Outputs log lines and progress messages to the event monitor.
+
+        :param lines: List of lines from the progress monitor
+        :param model_error_count: Number of errors so far
+        :return: Updated number of errors
+        """
+
+        for g in lines:
+            # Select output color
+            color = status_output_color(g)
+            if color == "red":
+                model_error_count = model_error_count + 1
+            # Output to event monitor
+            self.event_monitor(g, color, 'dt')
+
+        return model_error_count
+
     @staticmethod
     def showbox(message_title, message):
         """
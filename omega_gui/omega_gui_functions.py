@@ -13,6 +13,8 @@ from matplotlib import cm
 
 import psutil
 import os
+import queue
+import time
 
 # import pyqtgraph as pg
 
@@ -160,6 +162,174 @@ def status_output_color(g):
     return g
 
 
+def get_log_source(first_line):
+    """
+    Gets the event monitor identifier of a log file from its first line.
+
+    :param first_line: First line of the log file
+    :return: Session name (first word), 'Batch' or '' if not recognized
+    """
+
+    if first_line.find('session') > -1:  # See if 'session' found
+        l = first_line.find('session') + 8
+        i = first_line.find(' ', l)  # Find the end of the next word after 'session'
+        return first_line[l:i]  # Save the next word
+    elif first_line.find('batch') > -1:  # See if 'batch' found:
+        return 'Batch'  # Save the word for output
+    else:
+        return ""  # Not recognized
+
+
+class ProgressMonitor:
+    """
+    Collects new batch and session log lines, and analysis year progress, for the event monitor.
+
+    Log text and progress events are read from the batch progress queue if there is one (see
+    ``omega_batch.run_omega_batch()``), otherwise only the newly appended text of the log files in the batch output
+    directory is read.  Either way the cost of an update depends on the amount of new log text, not on the size of the
+    log files.
+
+    """
+
+    def __init__(self, progress_queue=None, log_directory=None):
+        """
+        Creates the progress monitor.
+
+        :param progress_queue: Queue of (event type, source, value) progress events, or None to read the log files
+        :param log_directory: Directory to search (including subdirectories) for log files if there's no queue
+        """
+
+        self.progress_queue = progress_queue
+        self.log_directory = log_directory
+        self.log_files = dict()  # Read position and identifier, by log file path
+        self.partial_lines = dict()  # Unterminated log text, by identifier
+        self.file_search_time = 0
+        self.file_read_time = 0
+
+    def get_lines(self):
+        """
+        Gets new log lines and progress messages.
+
+        :return: List of lines, prefixed by the session name or 'Batch' in square brackets
+        """
+
+        lines = []
+
+        if self.progress_queue is not None:
+            while True:
+                try:
+                    event_type, source, value = self.progress_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if event_type == 'log':
+                    self.add_text(lines, source, value)
+                elif event_type == 'year':
+                    lines.append('[%s] Year %d complete, %s pass %d, %d iteration(s), %.1f seconds' %
+                                 (source, value['calendar_year'], value['compliance_id'], value['pass_num'],
+                                  value['iterations'], value['elapsed_time']))
+        else:
+            if time.time() - self.file_search_time > 2:  # Look for new files every 2 seconds to reduce overhead
+                self.file_search_time = time.time()
+                self.find_log_files()
+
+            if time.time() - self.file_read_time > 1:  # Check every 1 second to reduce overhead
+                self.file_read_time = time.time()
+                self.read_log_files(lines)
+
+        return lines
+
+    def finish(self):
+        """
+        Gets any remaining log lines and progress messages, including unterminated lines, after the model run.
+
+        :return: List of lines, prefixed by the session name or 'Batch' in square brackets
+        """
+
+        if self.progress_queue is not None:
+            lines = self.get_lines()
+        else:
+            lines = []
+            self.find_log_files()
+            self.read_log_files(lines, complete_lines_only=False)
+
+        for source, text in self.partial_lines.items():
+            if text:
+                lines.append('[' + source + '] ' + text)
+
+        self.partial_lines = dict()
+
+        return lines
+
+    def add_text(self, lines, source, text):
+        """
+        Splits log text into lines, unterminated text is kept until the rest of the line arrives.
+
+        :param lines: List of lines to add to
+        :param source: Session name or 'Batch'
+        :param text: Log text
+        :return: Nothing, updates lines
+        """
+
+        text_lines = (self.partial_lines.get(source, '') + text).split('\n')
+        self.partial_lines[source] = text_lines.pop()
+
+        for line in text_lines:
+            lines.append('[' + source + '] ' + line)
+
+    def find_log_files(self):
+        """
+        Searches the log directory for new log files.
+
+        :return: Nothing, updates the log files
+        """
+
+        for root, dirs, files in os.walk(self.log_directory):  # Search includes subdirectories
+            for file in files:  # Begin search
+                fullpath = os.path.join(root, file)  # Generate complete path of file
+                # Add if .txt file is found and it does not already exist in the log files
+                if file.endswith('.txt') and 'log' in file and fullpath not in self.log_files:
+                    self.log_files[fullpath] = {'position': 0, 'source': None}
+
+    def read_log_files(self, lines, complete_lines_only=True):
+        """
+        Reads the text appended to the log files since the last read.
+
+        :param lines: List of lines to add to
+        :param complete_lines_only: If True then unterminated text is left for the next read
+        :return: Nothing, updates lines
+        """
+
+        for fullpath, log_file in self.log_files.items():
+            try:
+                size = os.path.getsize(fullpath)
+                if size < log_file['position']:
+                    log_file['position'] = 0  # File was re-created
+                if size == log_file['position']:
+                    continue
+
+                with open(fullpath, 'rb') as f:
+                    f.seek(log_file['position'])
+                    data = f.read()
+            except Exception as e:
+                print("%%%%% File Missing: ", e)
+                continue
+
+            if complete_lines_only:
+                data = data[:data.rfind(b'\n') + 1]
+
+            if not data:
+                continue
+
+            log_file['position'] += len(data)
+            text = data.decode(errors='replace').replace('\r\n', '\n')
+
+            if log_file['source'] is None:
+                log_file['source'] = get_log_source(text.split('\n')[0])
+
+            self.add_text(lines, log_file['source'], text)
+
+
 def test_plot_2(plot_selection, scenario_selection, plot_select_directory_name, plot_select_directory):
     """
     Reads a csv file and plots selected graph.
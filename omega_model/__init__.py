@@ -189,6 +189,9 @@ try:
             self.credit_market_efficiency = 1.0
             self.consolidate_manufacturers = None
             self.force_two_pass = False
+            self.credit_strategy_search = False  # search multi-year credit earn and burn paths, adds a session pass
+            self.credit_strategy_offset_fractions = [-0.1, -0.05, 0.0, 0.05, 0.1]  # strategic offsets, frac of target
+            self.credit_strategy_lookahead_years = 3  # credit strategy tree depth, None to search all remaining years
             self.include_manufacturers_list = 'all'
             self.exclude_manufacturers_list = 'none'
             self.manufacturers_file = path + 'proposal_inputs/manufacturers_20220329.csv'
@@ -272,6 +275,10 @@ try:
             self.producer_num_tech_options_per_bev_vehicle = 1
             self.cost_curve_frontier_affinity_factor = 0.75
             self.slice_tech_combo_cloud_tables = False
+            self.cost_cloud_batch_mode = True  # calculate cost cloud points as arrays instead of one at a time
+            self.cloud_cache_folder = None  # folder for the on-disk cost cloud and cost curve cache, None to disable
+            self.cloud_cache_max_size_MB = 2000  # least recently used cache entries are removed above this size
+            self.incremental_composite_cost_curve = True  # False to use full cartesian product composite cost curves
             self.verbose = False
             self.iterate_producer_consumer = True
 
@@ -293,11 +300,20 @@ try:
             self.producer_compliance_search_convergence_factor = 0.9
             self.producer_compliance_search_tolerance = 1e-6
             self.producer_compliance_search_multipoint = True  # disable for zevregion batches
+            self.producer_compliance_search_chunk_size = 250000  # max production options evaluated or retained at once
+            # 'grid' (sweeps), 'root-finder' (bracket and solve for the target) or 'root-finder-check' (compare both):
+            self.producer_compliance_search_strategy = 'grid'
+            self.producer_compliance_search_warm_start = False  # seed p-c iterations with the prior search result
+            self.producer_compliance_search_warm_start_share_range = 0.3  # initial share range of warm start searches
             self.producer_cross_subsidy_price_tolerance = 5e-3
+            self.producer_cross_subsidy_parallel_search = False  # search market categories concurrently, on threads
             self.producer_strategic_compliance_buffer = 0.0
             self.run_profiler = False
             self.multiprocessing = True and not self.run_profiler and not getattr(sys, 'frozen', False)
             self.non_context_session_process_scaler = 1
+            self.session_max_processes = None  # optional limit on the number of session processes (Pool size)
+            self.persistent_worker_pool = True  # keep the worker processes for later passes and sessions, same inputs
+            self.buffered_logging = True  # write the session log from a background thread, see common.omega_log
             self.flat_context = False
             self.flat_context_year = 2021
 
@@ -315,7 +331,7 @@ try:
             # list of modules to allow verbose log files, or empty to disable:
             self.verbose_log_modules = ['database_', 'producer_compliance_search', 'cross_subsidy_search_',
                                         'cv_cost_curves_', 'v_cost_curves_', 'v_cost_clouds_', 'v_cloud_plots_',
-                                        'effects_']
+                                        'effects_', 'stock_']
 
             # list of modules to allow verbose console output, or empty to disable
             self.verbose_console_modules = ['producer_compliance_search_',
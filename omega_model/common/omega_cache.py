@@ -0,0 +1,517 @@
+"""
+
+**Routines to implement a persistent, content-addressed, on-disk cache of calculation results.**
+
+Cache entries are ``DataFrame`` s, plus optional extra data, stored as ``.npz`` files named by a hash of the inputs
+to the calculation that produced them, so any session (or re-run) with identical inputs can reuse them.  The least
+recently used entries are removed when the cache grows beyond its size limit.
+
+Entries hold plain data only, i.e. numeric and string columns and arrays, and are loaded without unpickling, so a
+shared cache folder can't inject objects into a session, see ``OMEGADiskCache.put()``.
+
+Used to cache vehicle cost clouds and cost curves, see ``get_cloud_cache()``.  The cache is enabled when
+``omega_globals.options.cloud_cache_folder`` is set, which ``omega_batch`` does for bundled batches if the batch file
+``Cloud Cache`` setting is ``TRUE``.
+
+----
+
+**CODE**
+
+"""
+
+print('importing %s' % __file__)
+
+import os
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from common import omega_globals, omega_log
+from common.omega_types import OMEGABase
+
+_cache = dict()
+
+# input files that do not affect vehicle cost clouds, e.g. inputs used only to calculate generalized costs and sales
+cloud_cache_excluded_files = ['context_fuel_prices_file', 'context_new_vehicle_market_file', 'sales_share_file',
+                              'producer_generalized_cost_file', 'vehicle_reregistration_file', 'onroad_vmt_file',
+                              'vehicle_price_modifications_file', 'production_constraints_file',
+                              'required_sales_share_file', 'ghg_credits_file', 'ghg_credit_params_file']
+
+# session settings that do not affect vehicle cost clouds, by setting name prefix
+cloud_cache_excluded_settings = ('analysis_final_year', 'auto_close_figures', 'battery_GWh_limit',
+                                 'buffered_logging', 'calc_effects',
+                                 'cloud_cache_', 'consumer_', 'context_', 'credit_market_efficiency',
+                                 'credit_strategy_',
+                                 'database_dump_folder', 'end_time', 'flat_context', 'force_two_pass',
+                                 'generate_context_calibration_files', 'inputfile_metadata',
+                                 'iterate_producer_consumer', 'log_consumer_', 'log_producer_', 'logfile',
+                                 'multiprocessing',
+                                 'new_vehicle_price_elasticity_of_demand', 'non_context_session_process_scaler',
+                                 'notification_', 'omega_model_path', 'output_folder', 'persistent_worker_pool',
+                                 'prerun_context_folder',
+                                 'producer_', 'run_profiler', 'save_preliminary_outputs', 'session_', 'start_time',
+                                 'timestamp_str', 'use_prerun_context_outputs', 'vehicles_file_base_year', 'verbose')
+
+# session settings that do not affect any session results, e.g. output and logging settings, by setting name prefix
+cost_curve_cache_excluded_settings = ('auto_close_figures', 'buffered_logging', 'cloud_cache_', 'database_dump_folder',
+                                      'end_time', 'inputfile_metadata', 'log_consumer_', 'log_producer_', 'logfile',
+                                      'multiprocessing', 'notification_', 'omega_model_path', 'output_folder',
+                                      'persistent_worker_pool', 'run_profiler', 'session_', 'standalone_run',
+                                      'start_time', 'timestamp_str', 'verbose')
+
+
+def _update_hash(hasher, value):
+    """
+    Update a hash with the given value, recursing into containers.
+
+    Args:
+        hasher (hashlib hash object): the hash to update
+        value: the value to hash, e.g. a scalar, string, list, dict or array
+
+    Returns:
+        Nothing, updates ``hasher``
+
+    """
+    if isinstance(value, dict):
+        hasher.update(b'{')
+        for k in sorted(value, key=str):
+            _update_hash(hasher, k)
+            _update_hash(hasher, value[k])
+        hasher.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'[')
+        for v in value:
+            _update_hash(hasher, v)
+        hasher.update(b']')
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            _update_hash(hasher, value.tolist())
+        else:
+            hasher.update(str((value.dtype.str, value.shape)).encode())
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, pd.DataFrame):
+        hasher.update(str(list(value.columns)).encode())
+        hasher.update(pd.util.hash_pandas_object(value).values.tobytes())
+    elif isinstance(value, pd.Series):
+        hasher.update(str(value.name).encode())
+        hasher.update(pd.util.hash_pandas_object(value).values.tobytes())
+    else:
+        hasher.update(('%s:%r;' % (type(value).__name__, value)).encode())
+
+
+def hash_values(*values):
+    """
+    Calculate a hash of the given values, for use as a cache key.
+
+    Args:
+        *values: the values to hash
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    hasher = hashlib.sha1()
+
+    _update_hash(hasher, values)
+
+    return hasher.hexdigest()
+
+
+class OMEGADiskCache(OMEGABase):
+    """
+    **Implements a content-addressed, on-disk cache of DataFrames with a least recently used size limit.**
+
+    Entries are written to a temporary file and then renamed so that sessions running in parallel can share the cache
+    folder.
+
+    """
+    def __init__(self, folder, max_size_MB):
+        """
+        Create an OMEGADiskCache.
+
+        Args:
+            folder (str): the cache folder, created if it doesn't exist
+            max_size_MB (float): the cache size limit, in megabytes
+
+        """
+        self.folder = folder
+        self.max_size_bytes = max_size_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.skipped_writes = 0
+        self.evictions = 0
+        self.skipped_write_reasons = set()
+
+        os.makedirs(folder, exist_ok=True)
+
+        self.size_bytes = sum(entry.stat().st_size for entry in os.scandir(folder) if entry.name.endswith('.npz'))
+
+    def _get_filename(self, key):
+        return os.path.join(self.folder, key + '.npz')
+
+    @staticmethod
+    def _encode_extras(extras, arrays):
+        """
+        Encode extra data as arrays, for saving without pickling.
+
+        Args:
+            extras (dict or None): extra data, by name, values may be ``None``, numeric or string scalars or
+                (non-object) arrays
+            arrays (dict): arrays to save, updated with one array per extra data value
+
+        Returns:
+            A JSON string describing the extra data, or ``None`` if the extra data isn't plain data
+
+        """
+        if extras is None:
+            return json.dumps(None)
+
+        if not isinstance(extras, dict):
+            return None
+
+        manifest = []
+        for i, (k, v) in enumerate(extras.items()):
+            if v is None:
+                kind = 'none'
+            elif isinstance(v, np.ndarray) and v.dtype != object:
+                kind = 'array'
+            elif isinstance(v, np.generic) and not isinstance(v, np.object_):
+                kind = 'numpy'
+            elif isinstance(v, (bool, int, float, str)):
+                kind = 'python'
+            else:
+                return None
+
+            if v is not None:
+                arrays['e%d' % i] = np.asarray(v)
+            manifest.append((str(k), kind))
+
+        return json.dumps(manifest)
+
+    @staticmethod
+    def _decode_extras(data):
+        """
+        Decode extra data saved by ``_encode_extras()``.
+
+        Args:
+            data (NpzFile): the loaded cache entry
+
+        Returns:
+            The extra data
+
+        """
+        manifest = json.loads(str(data['__extras__']))
+
+        if manifest is None:
+            return None
+
+        extras = dict()
+        for i, (k, kind) in enumerate(manifest):
+            if kind == 'none':
+                extras[k] = None
+            elif kind == 'array':
+                extras[k] = data['e%d' % i]
+            elif kind == 'numpy':
+                extras[k] = data['e%d' % i][()]
+            else:
+                extras[k] = data['e%d' % i].item()
+
+        return extras
+
+    def get(self, key):
+        """
+        Get a cache entry.
+
+        Args:
+            key (str): the cache key, e.g. from ``hash_values()``
+
+        Returns:
+            Tuple of the cached ``DataFrame`` and extra data, or ``None`` if the key is not in the cache
+
+        """
+        filename = self._get_filename(key)
+
+        try:
+            with np.load(filename, allow_pickle=False) as data:
+                columns = data['__columns__'].tolist()
+                object_columns = set(data['__object_columns__'].tolist())
+                index = data['__index__']
+                if np.array_equal(index, np.arange(len(index))):
+                    index = pd.RangeIndex(len(index))
+                df = pd.DataFrame({c: data['c%d' % i].astype(object) if i in object_columns else data['c%d' % i]
+                                   for i, c in enumerate(columns)}, index=index, columns=columns)
+                extras = self._decode_extras(data)
+
+            os.utime(filename)  # mark as recently used
+        except Exception:
+            # missing, partially written or evicted entry
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return df, extras
+
+    def put(self, key, df, extras=None):
+        """
+        Add an entry to the cache, then remove least recently used entries if the cache is over its size limit.
+
+        Entries are saved without pickling, so object columns must hold strings and extra data values must be
+        ``None``, numeric or string scalars or (non-object) arrays, otherwise the entry is not cached.
+
+        Args:
+            key (str): the cache key, e.g. from ``hash_values()``
+            df (DataFrame): the data to cache
+            extras (dict): optional additional data to cache, by name
+
+        Returns:
+            Nothing, writes the cache entry file
+
+        """
+        filename = self._get_filename(key)
+        temp_filename = '%s.%d.tmp' % (filename, os.getpid())
+
+        if df.index.dtype == object or not all(isinstance(c, str) for c in df.columns):
+            self.skip_write('index or column names are not plain data')
+            return
+
+        arrays = dict()
+        object_columns = []
+        for i, c in enumerate(df.columns):
+            values = df[c].values
+            if values.dtype == object:
+                if not all(isinstance(v, str) for v in values):
+                    self.skip_write('column %s holds objects other than strings' % c)
+                    return
+                values = values.astype(str)
+                object_columns.append(i)
+            arrays['c%d' % i] = values
+
+        arrays['__columns__'] = np.array(list(df.columns), dtype=str)
+        arrays['__object_columns__'] = np.array(object_columns, dtype=int)
+        arrays['__index__'] = df.index.values
+
+        extras_manifest = self._encode_extras(extras, arrays)
+        if extras_manifest is None:
+            self.skip_write('extra data is not plain data')
+            return
+
+        arrays['__extras__'] = np.array(extras_manifest)
+
+        try:
+            with open(temp_filename, 'wb') as f:
+                np.savez(f, **arrays)
+
+            os.replace(temp_filename, filename)
+        except OSError as e:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            self.skip_write('unable to write cache entry, %s' % e.strerror)
+            return
+
+        self.writes += 1
+        self.size_bytes += os.path.getsize(filename)
+
+        if self.size_bytes > self.max_size_bytes:
+            self.evict()
+
+    def skip_write(self, reason):
+        """
+        Count a cache entry that could not be written and log the reason, the first time it occurs.
+
+        Args:
+            reason (str): the reason the entry was not written
+
+        Returns:
+            Nothing, updates ``skipped_writes``
+
+        """
+        self.skipped_writes += 1
+
+        if reason not in self.skipped_write_reasons:
+            self.skipped_write_reasons.add(reason)
+            omega_log.logwrite('Cloud cache %s: entry not written, %s' % (self.folder, reason))
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache is below 90% of its size limit.
+
+        Returns:
+            Nothing, removes cache entry files
+
+        """
+        entries = sorted([entry for entry in os.scandir(self.folder) if entry.name.endswith('.npz')],
+                         key=lambda entry: entry.stat().st_mtime)
+
+        self.size_bytes = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if self.size_bytes <= 0.9 * self.max_size_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self.size_bytes -= size
+                self.evictions += 1
+            except OSError:
+                pass  # already removed by another session
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            Cache statistics string, e.g. for the session log
+
+        """
+        lookups = self.hits + self.misses
+
+        return '%s: %d hits, %d misses (%.1f%% hit rate), %d writes, %d skipped writes, %d evictions, %.1f MB' % \
+               (self.folder, self.hits, self.misses, 100 * self.hits / max(1, lookups), self.writes,
+                self.skipped_writes, self.evictions, self.size_bytes / 1024 / 1024)
+
+
+def get_cloud_cache(kind):
+    """
+    Get the on-disk cache for the given kind of data, if enabled by ``omega_globals.options.cloud_cache_folder``.
+
+    Args:
+        kind (str): the kind of data to cache, e.g. 'cost_clouds', 'cost_curves', used as the cache subfolder name
+
+    Returns:
+        The ``OMEGADiskCache`` for the given kind of data, or ``None`` if caching is disabled
+
+    """
+    if not omega_globals.options.cloud_cache_folder:
+        return None
+
+    if kind not in _cache:
+        _cache[kind] = OMEGADiskCache(os.path.join(omega_globals.options.cloud_cache_folder, kind),
+                                      omega_globals.options.cloud_cache_max_size_MB)
+
+    return _cache[kind]
+
+
+def calc_inputs_key(excluded_files=(), excluded_settings=()):
+    """
+    Calculate a hash of the session inputs, i.e. the input file checksums and session settings, excluding the given
+    input files and settings.
+
+    Input files are identified by template name rather than path, since bundled sessions each have their own copy.
+
+    Args:
+        excluded_files (iterable): names of the session settings of the input files to exclude, e.g.
+            'sales_share_file'
+        excluded_settings (tuple): prefixes of the names of the session settings to exclude
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    options = omega_globals.options
+
+    excluded_files = set(os.path.normpath(getattr(options, f)) for f in excluded_files if getattr(options, f, None))
+
+    file_checksums = sorted(set(
+        tuple(str(m) for m in metadata[2:]) for metadata in options.inputfile_metadata
+        if os.path.normpath(os.path.join(metadata[0], metadata[1])) not in excluded_files))
+
+    settings = dict()
+    for k, v in vars(options).items():
+        if not k.endswith('_file') and not k.startswith(tuple(excluded_settings)) and \
+                (v is None or isinstance(v, (bool, int, float, str, list, tuple, np.generic))):
+            settings[k] = v
+
+    return hash_values(file_checksums, settings)
+
+
+def get_cloud_inputs_key():
+    """
+    Get a hash of the session inputs that affect vehicle cost clouds, i.e. the input file checksums and session
+    settings, excluding those listed in ``cloud_cache_excluded_files`` and ``cloud_cache_excluded_settings``.
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    if 'inputs_key' not in _cache:
+        _cache['inputs_key'] = calc_inputs_key(cloud_cache_excluded_files, cloud_cache_excluded_settings)
+
+    return _cache['inputs_key']
+
+
+def get_cost_curve_inputs_key():
+    """
+    Get a hash of the session inputs that affect vehicle cost curves, i.e. the input file checksums and session
+    settings, excluding those listed in ``cost_curve_cache_excluded_settings``.  Cost curves depend on the generalized
+    cost inputs as well as the cost cloud inputs.
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    if 'cost_curve_inputs_key' not in _cache:
+        _cache['cost_curve_inputs_key'] = calc_inputs_key(excluded_settings=cost_curve_cache_excluded_settings)
+
+    return _cache['cost_curve_inputs_key']
+
+
+def _is_value_data(value):
+    """
+    Check if a value is plain data, i.e. a scalar, string or array, or a container of plain data, as opposed to an
+    object reference whose representation is not repeatable from one run to the next.
+
+    Args:
+        value: the value to check
+
+    Returns:
+        ``True`` if the value is plain data
+
+    """
+    if value is None or isinstance(value, (bool, int, float, str, np.generic, np.ndarray)):
+        return True
+    elif isinstance(value, (list, tuple)):
+        return all(_is_value_data(v) for v in value)
+    elif isinstance(value, dict):
+        return all(_is_value_data(k) and _is_value_data(v) for k, v in value.items())
+    else:
+        return False
+
+
+def get_object_attributes_key(obj, excluded_attributes=(), included_attributes=None):
+    """
+    Get a hash of an object's attribute values, e.g. a vehicle's, for use as part of a cache key.  Only attributes
+    with plain data values (scalars, strings, arrays and containers thereof) are included.
+
+    Args:
+        obj (object): the object whose attributes to hash
+        excluded_attributes (iterable): names of attributes to exclude from the hash
+        included_attributes (iterable): names of the attributes to hash, if not ``None``
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    attributes = dict()
+    for k, v in vars(obj).items():
+        if (included_attributes is None or k in included_attributes) and k not in excluded_attributes and \
+                _is_value_data(v):
+            attributes[k] = v
+
+    return hash_values(attributes)
+
+
+def init_cloud_cache():
+    """
+    Initialize the module by clearing the session cache key and cache statistics.
+
+    Returns:
+        Empty list on success
+
+    """
+    _cache.clear()
+
+    return []
@@ -2,14 +2,21 @@
 
 **Code to handle runtime compilation of eval statemetns.**
 
+``Eval`` caches compiled code for arbitrary eval statements.  ``CompiledExpression`` compiles input file equations
+once, at init, into functions of the equation variables which may be evaluated for scalars or numpy arrays.
+
 ----
 
 **CODE**
 
 """
 
+import numpy as np
+
 from common.omega_types import *
 
+from omega_effects.general.compiled_expression import CompiledExpression as _CompiledExpression
+
 
 class Eval(OMEGABase):
     """
@@ -42,6 +49,45 @@ class Eval(OMEGABase):
         return eval(cls._compiled_source[source], global_vars, local_vars)
 
 
+class CompiledExpression(_CompiledExpression, OMEGABase):
+    """
+    **Class to compile an input file equation into a (vectorizable) function of its variables.**
+
+    The equation variables are found when the expression is compiled, so evaluation passes only the required
+    values to the function, rather than going through ``eval()`` with a dict of local variables each time.
+    Expressions with no variables are evaluated once, when compiled.
+
+    The compiler is shared with the effects post-processing, see ``omega_effects.general.compiled_expression``, this
+    class adds the session log compile report.
+
+    """
+    @staticmethod
+    def log_compile_report(expressions, verbose=False):
+        """
+        Write a compile summary, and optionally the name, variables and compile time of each expression, to the
+        session log.
+
+        Args:
+            expressions (list): the ``CompiledExpression`` s to report, e.g. the equations from an input file
+            verbose (bool): log each expression if ``True``, else just the summary
+
+        Returns:
+            Nothing, updates the session log
+
+        """
+        from common import omega_log
+
+        if verbose:
+            for expression in expressions:
+                omega_log.logwrite('compiled %-45s %8.3f ms %s' %
+                                   (expression.name, expression.compile_time * 1000,
+                                    'constant' if expression.is_constant else '(%s)' % ' '.join(expression.variables)))
+
+        omega_log.logwrite('compiled %d expressions (%d constant) in %.1f ms' %
+                           (len(expressions), sum(expression.is_constant for expression in expressions),
+                            sum(expression.compile_time for expression in expressions) * 1000))
+
+
 if __name__ == "__main__":
     try:
         import time
@@ -63,6 +109,10 @@ if __name__ == "__main__":
         print(Eval.eval('foo+1', {}, locals()))
         print(time.time() - start_time)
 
+        expression = CompiledExpression('np.maximum(2 * KW + 1, MIN_COST)', name='example')
+        print(expression(KW=np.array([1, 2, 3]), MIN_COST=5))
+        print(expression.evaluate({'KW': 10, 'MIN_COST': 5}))
+
     except:
         print("\n#RUNTIME FAIL\n%s\n" % traceback.format_exc())
         os._exit(-1)
@@ -101,16 +101,25 @@ def sales_weight_average_dataframe(df):
     numeric_columns = [c for c in df.columns if is_numeric_dtype(df[c])]
     non_numeric_columns = [c for c in df.columns if not is_numeric_dtype(df[c])]
 
-    avg_df = pd.Series(dtype='float64')
+    sales = df['sales'].values
+    total_sales = np.sum(sales)
+
+    # gather the values in a dict and create the Series once, growing a Series one value at a time is slow
+    avg_values = dict()
 
     for c in numeric_columns:
         if 'sales' not in c and c != 'model_year':
-            avg_df[c] = np.nansum(df[c].values * df['sales'].values) / np.sum(df['sales'].values)
+            avg_values[c] = np.nansum(df[c].values * sales) / total_sales
         elif 'sales' in c:
-            avg_df[c] = df[c].sum()
+            avg_values[c] = df[c].sum()
 
     for c in non_numeric_columns:
-        avg_df[c] = ':'.join(df[c].unique())
+        avg_values[c] = ':'.join(df[c].unique())
+
+    if non_numeric_columns:
+        avg_df = pd.Series(avg_values, dtype=object)
+    else:
+        avg_df = pd.Series(avg_values, dtype='float64')
 
     return avg_df
 
@@ -153,6 +162,8 @@ def calc_frontier(cloud, x_key, y_key, allow_upslope=False, invert_x_axis=True):
     """
     Calculate the frontier of a cloud.
 
+    The frontier points are found by ``calc_frontier_indices()`` and then gathered from the cloud in one step.
+
     Args:
         cloud (DataFrame): a set of points to find the frontier of
         x_key (str): name of the column holding x-axis data
@@ -187,6 +198,160 @@ def calc_frontier(cloud, x_key, y_key, allow_upslope=False, invert_x_axis=True):
     """
     cloud_non_numeric_columns = omega_globals.options.CostCloud.cloud_non_numeric_columns
 
+    if len(cloud) > 1:
+        # drop non-numeric columns so dtypes don't become "object"
+        cloud = cloud.drop(columns=cloud_non_numeric_columns, errors='ignore')
+
+        x = cloud[x_key].values
+        y = cloud[y_key].values
+
+        frontier_indices, frontier_factors = calc_frontier_indices(x, y, allow_upslope, invert_x_axis)
+
+        frontier_df = pd.DataFrame(cloud.values[frontier_indices], columns=cloud.columns,
+                                   index=cloud.index[frontier_indices])
+
+        # normalized data, as used to find the frontier
+        if invert_x_axis:
+            x_sign = -1
+        else:
+            x_sign = 1
+
+        frontier_df['y_norm'] = (y[frontier_indices] - y.min()) / (y.max() - y.min())
+        frontier_df['x_norm'] = x_sign * ((x[frontier_indices] - x.min()) / (x.max() - x.min()))
+
+        if len(frontier_indices) > 1:
+            frontier_df['frontier_factor'] = frontier_factors
+    else:
+        frontier_df = cloud
+
+    return frontier_df
+
+
+def calc_frontier_indices(x, y, allow_upslope=False, invert_x_axis=True, affinity_factor=None):
+    """
+    Calculate the frontier of a set of x-y points and return the row indices of the frontier points.
+
+    The points are normalized and sorted by x-value, after which the frontier is found in a single forward sweep:
+    candidate points for each new frontier point are always the suffix of the sorted arrays beyond the prior
+    frontier point, so no data is copied or culled as the frontier grows.
+
+    Args:
+        x (numeric array-like): x-axis data
+        y (numeric array-like): y-axis data
+        allow_upslope (bool): allow U-shaped frontier if ``True``
+        invert_x_axis (bool): invert x-axis if ``True``
+        affinity_factor (float): frontier affinity factor, defaults to
+            ``omega_globals.options.cost_curve_frontier_affinity_factor`` if ``None``
+
+    Returns:
+        Tuple of frontier point row indices (positions into ``x`` and ``y``) and the frontier factor of each
+        frontier point relative to the prior frontier point (``NaN`` for the starting point), both as arrays
+        ordered the same way as the frontier returned by ``calc_frontier()``
+
+    """
+    if affinity_factor is None:
+        affinity_factor = omega_globals.options.cost_curve_frontier_affinity_factor
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    if invert_x_axis:
+        x_sign = -1
+    else:
+        x_sign = 1
+
+    # normalize data (helps with up-slope frontier)
+    y_norm = (y - y.min()) / (y.max() - y.min())
+    x_norm = x_sign * ((x - x.min()) / (x.max() - x.min()))
+
+    # stable sort keeps original row order within equal x-values, NaNs sort to the end
+    sort_order = np.argsort(x_norm, kind='stable')
+    x_sorted = x_norm[sort_order]
+    y_sorted = y_norm[sort_order]
+    num_valid = np.count_nonzero(~np.isnan(x_sorted))
+
+    # find frontier starting point, lowest x-value, and add to frontier
+    frontier_indices = [sort_order[0]]
+    frontier_factors = [np.nan]
+    min_frontier_factor = 0
+
+    if x_norm.min() != x_norm.max():
+        prior_x = x_sorted[0]
+        prior_y = y_sorted[0]
+
+        while (min_frontier_factor <= 0 or allow_upslope) and not np.isinf(min_frontier_factor):
+            # candidate points are all points to the right of the prior frontier point
+            start = np.searchsorted(x_sorted[:num_valid], prior_x, side='right')
+
+            if start >= num_valid:
+                break
+
+            candidate_x = x_sorted[start:num_valid]
+            candidate_y = y_sorted[start:num_valid]
+            candidate_indices = sort_order[start:num_valid]
+
+            # calculate frontier factor (more negative is more better) = slope of each point relative
+            # to prior frontier point if frontier_social_affinity_factor = 1.0, else a "weighted" slope
+            frontier_factor = (candidate_y - prior_y) / (candidate_x - prior_x) ** affinity_factor
+            min_frontier_factor = frontier_factor.min()
+
+            if min_frontier_factor > 0 and allow_upslope:
+                # frontier factor is different for up-slope (swap x & y and invert "y")
+                frontier_factor = (prior_x - candidate_x) / (candidate_y - prior_y) ** affinity_factor
+                min_frontier_factor = frontier_factor.min()
+
+            if not (allow_upslope or min_frontier_factor <= 0):
+                break
+
+            if not np.isinf(min_frontier_factor):
+                is_min = frontier_factor == min_frontier_factor
+                if np.count_nonzero(is_min) > 1:
+                    # if multiple points with the same slope, take the one with the highest x-value
+                    is_min &= candidate_x == candidate_x[is_min].max()
+                elif np.all(np.isnan(frontier_factor)):
+                    is_min = candidate_indices == candidate_indices.max()
+                else:
+                    is_min = frontier_factor == np.nanmin(frontier_factor)
+            else:
+                is_min = frontier_factor == frontier_factor.max()
+
+            # resolve any remaining ties by original row order
+            idx = np.flatnonzero(is_min)[np.argmin(candidate_indices[is_min])]
+
+            frontier_indices.append(candidate_indices[idx])
+            frontier_factors.append(frontier_factor[idx])
+            prior_x = candidate_x[idx]
+            prior_y = candidate_y[idx]
+
+    if invert_x_axis:
+        frontier_indices.reverse()
+        frontier_factors.reverse()
+
+    return np.array(frontier_indices, dtype=int), np.array(frontier_factors)
+
+
+def calc_frontier_iterative(cloud, x_key, y_key, allow_upslope=False, invert_x_axis=True):
+    """
+    Calculate the frontier of a cloud by walking the cloud one frontier point at a time.
+
+    Reference implementation of ``calc_frontier()``, retained for validation and benchmarking.
+
+    Args:
+        cloud (DataFrame): a set of points to find the frontier of
+        x_key (str): name of the column holding x-axis data
+        y_key (str): name of the column holding y-axis data
+        allow_upslope (bool): allow U-shaped frontier if ``True``
+        invert_x_axis (bool): invert x-axis if ``True``
+
+    Returns:
+        DataFrame containing the frontier points
+
+    See Also:
+        ``calc_frontier()``
+
+    """
+    cloud_non_numeric_columns = omega_globals.options.CostCloud.cloud_non_numeric_columns
+
     if len(cloud) > 1:
         frontier_pts = []
 
@@ -632,6 +797,43 @@ def distribute_by_attribute(obj_list, value, weight_by, distribute_to):
         o.__setattr__(distribute_to, value * o.__getattribute__(weight_by) / attribute_total)
 
 
+def interp1d_columns(x, xp, fp):
+    """
+    Linearly interpolate each column of a 2-D array at the same point.  Equivalent to ``np.interp(x, xp, fp[:, i])``
+    for each column ``i``, but ``xp`` is only searched once.
+
+    Args:
+        x (float): the x-coordinate at which to interpolate, must not be NaN
+        xp (1-D numeric Array): the x-coordinates of the data points, must be strictly increasing
+        fp (2-D numeric Array): the y-coordinates of the data points, one row per ``xp`` value
+
+    Returns:
+        1-D Array of interpolated values, one per column of ``fp``
+
+    """
+    if x > xp[-1]:
+        return fp[-1]
+    elif x < xp[0]:
+        return fp[0]
+
+    j = np.searchsorted(xp, x, side='right') - 1
+
+    if j == len(xp) - 1 or xp[j] == x:
+        return fp[j]
+
+    slope = (fp[j + 1] - fp[j]) / (xp[j + 1] - xp[j])
+    values = slope * (x - xp[j]) + fp[j]
+
+    # if we get nan in one direction, try the other, same as np.interp()
+    nan_values = np.isnan(values)
+    if nan_values.any():
+        values[nan_values] = slope[nan_values] * (x - xp[j + 1]) + fp[j + 1][nan_values]
+        nan_values = np.isnan(values) & (fp[j] == fp[j + 1])
+        values[nan_values] = fp[j][nan_values]
+
+    return values
+
+
 def weighted_value(objects, weight_attribute, attribute, attribute_args=None):
     """
     Calculate a weighted value from values taken from a set of objects.  The contribution of each object is normalized
@@ -987,6 +1189,97 @@ if __name__ == '__main__':
                          min_constraints={'NO_ALT_BEV': 0.01},
                          max_constraints={'NO_ALT_BEV': 0.01}, verbose=True)
 
+        # interp1d_columns benchmark and equivalence check versus np.interp() of each column
+        import time
+
+        rng = np.random.default_rng(0)
+
+        # composite vehicle cost curves are typically tens of points, with a column per source vehicle attribute
+        for num_points, num_columns in [(25, 10), (25, 100), (50, 1000), (50, 5000)]:
+            xp = np.cumsum(rng.uniform(0.1, 1, num_points))
+            fp = rng.uniform(-100, 100, (num_points, num_columns))
+            fp[rng.integers(0, num_points, num_columns // 10), rng.integers(0, num_columns, num_columns // 10)] = np.nan
+
+            # below, above, on and between the data points
+            test_x = np.concatenate([[xp[0] - 1, xp[-1] + 1], xp[::5], rng.uniform(xp[0], xp[-1], 20)])
+
+            start_time = time.time()
+            interp_values = [np.array([np.interp(x, xp, fp[:, i]) for i in range(num_columns)]) for x in test_x]
+            interp_time = time.time() - start_time
+
+            start_time = time.time()
+            columns_values = [interp1d_columns(x, xp, fp) for x in test_x]
+            columns_time = time.time() - start_time
+
+            for x, interp_value, columns_value in zip(test_x, interp_values, columns_values):
+                assert np.array_equal(interp_value, columns_value, equal_nan=True), \
+                    'interp1d_columns() mismatch at x=%f' % x
+
+            print('interp1d_columns %2d points x %4d columns: np.interp %7.4fs, interp1d_columns %7.4fs, %6.1fx' %
+                  (num_points, num_columns, interp_time, columns_time, interp_time / columns_time))
+
+        # frontier benchmark, array-based frontier versus iterative reference implementation, on the cost clouds of
+        # the base year vehicles of the test inputs
+        from omega_model import OMEGASessionSettings
+        from omega_model.omega import init_omega
+
+        init_fail = init_omega(OMEGASessionSettings())
+
+        if not init_fail:
+            from producer.vehicles import VehicleFinal, Vehicle, transfer_vehicle_data, is_up_for_redesign, \
+                cost_curve_interp_key
+
+            model_year = omega_globals.options.analysis_initial_year
+
+            iterative_time = 0
+            frontier_time = 0
+            num_clouds = 0
+            num_points = 0
+            mismatches = []
+
+            for compliance_id in VehicleFinal.compliance_ids:
+                for prior_vehicle in VehicleFinal.get_compliance_vehicles(model_year - 1, compliance_id):
+                    vehicle = Vehicle()
+                    transfer_vehicle_data(prior_vehicle, vehicle, model_year=model_year)
+                    vehicle.global_cumulative_battery_GWh = omega_globals.cumulative_battery_GWh
+
+                    if not (vehicle.in_production or is_up_for_redesign(vehicle)):
+                        continue
+
+                    cost_cloud = omega_globals.options.CostCloud.get_cloud(vehicle)
+
+                    if cost_cloud[cost_curve_interp_key].min() == cost_cloud[cost_curve_interp_key].max():
+                        continue
+
+                    for allow_upslope in [False, True]:
+                        start_time = time.time()
+                        iterative_df = calc_frontier_iterative(cost_cloud, cost_curve_interp_key,
+                                                               'new_vehicle_mfr_generalized_cost_dollars',
+                                                               allow_upslope)
+                        iterative_time += time.time() - start_time
+
+                        start_time = time.time()
+                        frontier_df = calc_frontier(cost_cloud, cost_curve_interp_key,
+                                                    'new_vehicle_mfr_generalized_cost_dollars', allow_upslope)
+                        frontier_time += time.time() - start_time
+
+                        try:
+                            pd.testing.assert_frame_equal(iterative_df, frontier_df, check_dtype=False)
+                        except AssertionError:
+                            mismatches.append((vehicle.name, allow_upslope))
+
+                        num_clouds += 1
+                        num_points += len(cost_cloud)
+
+            print('frontier %d clouds, %.0f points average: iterative %.4fs, array %.4fs, %.1fx, %d mismatches' %
+                  (num_clouds, num_points / max(1, num_clouds), iterative_time, frontier_time,
+                   iterative_time / max(frontier_time, sys.float_info.epsilon), len(mismatches)))
+
+            for mismatch in mismatches:
+                print('frontier mismatch %s, allow_upslope=%s' % mismatch)
+        else:
+            print(init_fail)
+
     except:
         import os
         import traceback
@@ -2,6 +2,17 @@
 
 **Functions to manage batch and session log files.**
 
+If ``omega_globals.options.buffered_logging`` is ``True`` then session log messages (and ``IterationLog`` data) are
+added to a bounded in-memory buffer and written by a background thread, through a single open file handle per log
+file, see ``OMEGALogWriter``.  The buffer is flushed at the end of each analysis year, at the end of the session
+and before the process forks worker processes.
+
+Worker processes (and any process without a log writer) write messages directly, opening the log file in append
+mode for each message.
+
+If a progress queue has been set, see ``set_progress_queue()``, batch and session log text and analysis year
+progress events are also sent to the queue, e.g. for the GUI event monitor.
+
 ----
 
 **CODE**
@@ -10,9 +21,124 @@
 
 print('importing %s' % __file__)
 
+import os
+import atexit
+import queue
+import threading
+import multiprocessing
+
 from common import omega_globals  # import global variables
 from common.omega_types import OMEGABase
 
+_cache = {'writer': None, 'progress_queue': None}
+
+max_buffered_messages = 10000  #: log writer buffer size, writes block while the buffer is full
+max_open_files = 8  #: log writer open file limit, least recently written files are closed first
+
+
+class OMEGALogWriter(OMEGABase):
+    """
+    **Writes log files from a background thread.**
+
+    Messages are added to a bounded buffer (a ``queue.Queue``) and written by the writer thread in the order they were
+    added.  Log files are kept open between writes.
+
+    """
+    def __init__(self):
+        """
+        Create OMEGALogWriter object and start the writer thread.
+
+        """
+        self.buffer = queue.Queue(maxsize=max_buffered_messages)
+        self.files = dict()  # open files by filename, in least to most recently written order
+        self.pid = os.getpid()
+        self.error = None
+
+        self.thread = threading.Thread(target=self._write_messages, name='OMEGALogWriter', daemon=True)
+        self.thread.start()
+
+    def write(self, filename, text, mode='a', newline=None):
+        """
+        Add text to the buffer, to be written to the given file.
+
+        Args:
+            filename (str): the name of the file to write
+            text (str): the text to write
+            mode (str): 'w' to (re)create the file, 'a' to append
+            newline (str): newline translation mode, used when the file is opened, see ``open()``
+
+        """
+        self.buffer.put(('write', filename, text, mode, newline))
+
+    def flush(self, close_files=False):
+        """
+        Write all buffered text and flush the open files.
+
+        Args:
+            close_files (bool): close the open files if ``True``
+
+        """
+        self.buffer.put(('flush', close_files))
+        self.buffer.join()
+
+    def _open(self, filename, mode, newline):
+        """
+        Get the open file for the given filename, opening (or re-creating) it if necessary.
+
+        Args:
+            filename (str): the name of the file
+            mode (str): 'w' to (re)create the file, 'a' to append
+            newline (str): newline translation mode, see ``open()``
+
+        Returns:
+            The open file
+
+        """
+        file = self.files.pop(filename, None)
+
+        if file is not None and mode == 'w':
+            file.close()
+            file = None
+
+        if file is None:
+            if len(self.files) >= max_open_files:
+                self.files.pop(next(iter(self.files))).close()
+            if mode == 'w':
+                open(filename, 'w').close()
+            # always append, worker processes may also write to the file
+            file = open(filename, 'a', newline=newline)
+
+        self.files[filename] = file
+
+        return file
+
+    def _write_messages(self):
+        """
+        Writer thread loop, writes buffered text to files and handles flush requests.
+
+        """
+        while True:
+            command, *args = self.buffer.get()
+            try:
+                if command == 'write':
+                    filename, text, mode, newline = args
+                    self._open(filename, mode, newline).write(text)
+                else:
+                    close_files, = args
+                    for file in self.files.values():
+                        if close_files:
+                            file.close()
+                        else:
+                            file.flush()
+                    if close_files:
+                        self.files.clear()
+            except Exception as e:
+                if self.error is None:
+                    print('OMEGALogWriter error: %s' % e)
+                self.error = e
+            finally:
+                self.buffer.task_done()
+
 
 class IterationLog(OMEGABase):
     """
@@ -43,11 +169,12 @@ class IterationLog(OMEGABase):
 
 
         """
+        # to_csv() terminates lines with os.linesep, write without newline translation
         if self.create_file:
-            dataframe.to_csv(self.logfilename, mode='w')
+            write(self.logfilename, dataframe.to_csv(), mode='w', newline='')
             self.create_file = False
         else:
-            dataframe.to_csv(self.logfilename, mode='a', header=False)
+            write(self.logfilename, dataframe.to_csv(header=False), mode='a', newline='')
 
 
 class OMEGABatchLog(OMEGABase):
@@ -71,9 +198,12 @@ class OMEGABatchLog(OMEGABase):
         self.verbose = verbose
         self.start_time = time.time()
 
+        text = 'OMEGA %s batch started at %s %s\n\n' % (code_version, datetime.date.today(), time.strftime('%H:%M:%S'))
+
         with open(self.logfilename, 'w') as log:
-            log.write('OMEGA %s batch started at %s %s\n\n' %
-                      (code_version, datetime.date.today(), time.strftime('%H:%M:%S')))
+            log.write(text)
+
+        send_progress('log', 'Batch', text)
 
     def logwrite(self, message, terminator='\n'):
         """
@@ -84,15 +214,18 @@ class OMEGABatchLog(OMEGABase):
             terminator (str): end of message terminator, default is newline (``\\n``)
 
         """
+        if type(message) is list:
+            text = ''.join(m + terminator for m in message)
+        else:
+            text = message + terminator
+
         with open(self.logfilename, 'a') as log:
-            if type(message) is list:
-                for m in message:
-                    log.write(m + terminator)
-            else:
-                log.write(message + terminator)
+            log.write(text)
             if self.verbose:
                 print(message)
 
+        send_progress('log', 'Batch', text)
+
     def end_logfile(self, message):
         """
         End logfile with closing message, record elapsed time.
@@ -114,9 +247,179 @@ class OMEGABatchLog(OMEGABase):
         self.logwrite(message, terminator='')
 
 
+class OMEGABatchQueueLog(OMEGABase):
+    """
+    Sends batch log messages to a queue, used by sessions running in separate processes to write to the batch log
+    of the parent process.
+
+    """
+    def __init__(self, status_queue, session_num):
+        """
+        Create OMEGABatchQueueLog object
+
+        Args:
+            status_queue (multiprocessing.Queue): the queue to send messages to
+            session_num (int): the number of the session sending the messages
+
+        """
+        self.status_queue = status_queue
+        self.session_num = session_num
+
+    def logwrite(self, message, terminator='\n'):
+        """
+        Send a message to the batch log queue
+
+        Args:
+            message (str): message string to write
+            terminator (str): end of message terminator, default is newline (``\\n``)
+
+        """
+        if type(message) is list:
+            message = terminator.join(message)
+
+        self.status_queue.put(('log', self.session_num, message + terminator.rstrip('\n')))
+
+    def end_logfile(self, message):
+        """
+        Send a closing message to the batch log queue
+
+        Args:
+            message (str): message string to write
+
+        """
+        self.logwrite(message)
+
+
+def set_progress_queue(progress_queue):
+    """
+    Set the queue to send log text and progress events to, see ``send_progress()``.
+
+    Args:
+        progress_queue (multiprocessing.Queue): the queue, or ``None`` to stop sending progress events
+
+    """
+    _cache['progress_queue'] = progress_queue
+
+
+def get_progress_queue():
+    """
+    Get the progress queue, if any.
+
+    Returns:
+        The progress queue or ``None``
+
+    """
+    return _cache['progress_queue']
+
+
+def send_progress(event_type, source, value):
+    """
+    Send a progress event to the progress queue, if any.  Events are tuples of ``(event_type, source, value)``.
+
+    Args:
+        event_type (str): 'log' for log file text, 'year' for the results of an analysis year
+        source (str): the source of the event, 'Batch' or the session name
+        value: the log text (which may contain several lines, or partial lines) or, for 'year' events, a dict with
+            'calendar_year', 'compliance_id', 'pass_num', 'iterations' and 'elapsed_time' (seconds) keys
+
+    """
+    progress_queue = _cache['progress_queue']
+
+    if progress_queue is not None:
+        progress_queue.put((event_type, source, value))
+
+
+def get_writer():
+    """
+    Get the log writer of the current process, if any.
+
+    Returns:
+        The ``OMEGALogWriter`` or ``None``
+
+    """
+    writer = _cache['writer']
+
+    if writer is not None and writer.pid != os.getpid():
+        writer = _cache['writer'] = None  # inherited from the parent process, its thread doesn't exist here
+
+    return writer
+
+
+def start_writer():
+    """
+    Start the log writer of the current process, if it's not already running.
+
+    Returns:
+        The ``OMEGALogWriter``
+
+    """
+    if get_writer() is None:
+        _cache['writer'] = OMEGALogWriter()
+
+    return _cache['writer']
+
+
+def write(filename, text, mode='a', newline=None):
+    """
+    Write text to a file, through the log writer if there is one, otherwise directly.
+
+    Args:
+        filename (str): the name of the file to write
+        text (str): the text to write
+        mode (str): 'w' to (re)create the file, 'a' to append
+        newline (str): newline translation mode, see ``open()``
+
+    """
+    writer = get_writer()
+
+    if writer is not None:
+        writer.write(filename, text, mode, newline)
+    else:
+        with open(filename, mode, newline=newline) as f:
+            f.write(text)
+
+
+def flush(close_files=False):
+    """
+    Write all buffered log messages, e.g. at the end of an analysis year.
+
+    Args:
+        close_files (bool): close the log writer's open files if ``True``
+
+    """
+    writer = get_writer()
+
+    if writer is not None:
+        writer.flush(close_files)
+
+
+def _close_files():
+    """
+    Flush and close the log writer's open files, called at exit.
+
+    """
+    flush(close_files=True)
+
+
+def _after_fork_in_child():
+    """
+    Drop the parent process's log writer in forked child processes, they write directly.
+
+    """
+    _cache['writer'] = None
+
+
+atexit.register(_close_files)
+
+if hasattr(os, 'register_at_fork'):
+    # flush before forking so children don't inherit buffered data (or the writer mid-write)
+    os.register_at_fork(before=flush, after_in_child=_after_fork_in_child)
+
+
 def init_logfile():
     """
-    Create a session logfile.
+    Create a session logfile.  Starts the log writer if ``omega_globals.options.buffered_logging`` is ``True``, except
+    in worker processes, which may exit without flushing.
 
     """
     import time, datetime
@@ -129,9 +432,15 @@ def init_logfile():
         omega_globals.options.output_folder + omega_globals.options.logfile_prefix,
         omega_globals.options.session_unique_name)
 
-    with open(omega_globals.options.logfilename, 'w') as log:
-        log.write('OMEGA %s session %s started at %s %s\n\n' % (
-            code_version, omega_globals.options.session_name, datetime.date.today(), time.strftime('%H:%M:%S')))
+    if getattr(omega_globals.options, 'buffered_logging', False) and not multiprocessing.current_process().daemon:
+        start_writer()
+
+    text = 'OMEGA %s session %s started at %s %s\n\n' % (
+        code_version, omega_globals.options.session_name, datetime.date.today(), time.strftime('%H:%M:%S'))
+
+    write(omega_globals.options.logfilename, text, mode='w')
+
+    send_progress('log', omega_globals.options.session_name, text)
 
 
 def end_logfile(message):
@@ -149,6 +458,7 @@ def end_logfile(message):
     logwrite('\nSession ended at %s %s' % (datetime.date.today(), time.strftime('%H:%M:%S')))
     logwrite('Session elapsed time %.2f seconds\n' % elapsed_time)
     logwrite(message, terminator='')
+    flush(close_files=True)
 
 
 def logwrite(message, echo_console=True, terminator='\n'):
@@ -161,11 +471,14 @@ def logwrite(message, echo_console=True, terminator='\n'):
         terminator (str): end of message terminator, default is newline (``\\n``)
 
     """
-    with open(omega_globals.options.logfilename, 'a') as log:
-        if type(message) is list:
-            for m in message:
-                log.write(m + terminator)
-        else:
-            log.write(message + terminator)
-        if omega_globals.options.verbose or echo_console:
-            print(message)
+    if type(message) is list:
+        text = ''.join(m + terminator for m in message)
+    else:
+        text = message + terminator
+
+    write(omega_globals.options.logfilename, text)
+
+    send_progress('log', omega_globals.options.session_name, text)
+
+    if omega_globals.options.verbose or echo_console:
+        print(message)
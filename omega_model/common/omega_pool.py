@@ -0,0 +1,182 @@
+"""
+
+**Routines to manage the session worker process pool.**
+
+The pool is created for the first session pass that uses multiprocessing and, if
+``omega_globals.options.persistent_worker_pool`` is ``True``, is kept for the following passes and for following
+sessions of a batch run in the same process, as long as the worker inputs are unchanged, see
+``get_worker_inputs_key()``.
+
+Where the platform starts processes by forking, the workers are forked from the initialized session process and share
+its (read-only) input tables, e.g. cost cloud RSEs, powertrain costs, drive cycle weights, mass scaling, etc,
+copy-on-write rather than re-reading the input files and rebuilding the database.  Otherwise each worker runs
+``init_omega()`` once, when the pool is created.
+
+Session settings that may vary from one pass or session to the next, i.e. those excluded from the worker inputs key,
+are sent to the workers with each task, see ``get_worker_pass_settings()`` and ``apply_async()``, so a reused worker
+logs to the current session log file, writes to the current output folder, etc.
+
+----
+
+**CODE**
+
+"""
+
+print('importing %s' % __file__)
+
+import multiprocessing
+
+from common import omega_globals, omega_log
+from common.omega_cache import calc_inputs_key, hash_values
+
+_cache = dict()
+
+_worker_state = {'pass_settings_id': None}
+
+# input files that are not used by worker tasks and vary from one pass to the next
+worker_excluded_files = ['context_new_vehicle_generalized_costs_file', 'sales_share_calibration_file']
+
+# session settings that are not used by worker tasks or that vary from one pass to the next, by setting name prefix
+worker_excluded_settings = ('buffered_logging', 'consolidate_manufacturers', 'database_dump_folder', 'end_time',
+                            'inputfile_metadata', 'logfile', 'manufacturer_gigawatthour_data', 'output_folder',
+                            'persistent_worker_pool', 'producer_consumer_max_iterations', 'session_', 'standalone_run',
+                            'start_time', 'timestamp_str')
+
+# excluded session settings that are not used by worker tasks and are not sent to the workers, by setting name prefix
+worker_unsent_settings = ('inputfile_metadata', 'manufacturer_gigawatthour_data')
+
+
+def get_worker_inputs_key():
+    """
+    Get a hash of the session inputs that affect the worker processes, i.e. the input file checksums and session
+    settings, excluding those listed in ``worker_excluded_files`` and ``worker_excluded_settings``.
+
+    Returns:
+        The hash, as a string of hex digits
+
+    """
+    return calc_inputs_key(worker_excluded_files, worker_excluded_settings)
+
+
+def get_worker_pass_settings():
+    """
+    Get the session settings to send to the workers with each task, i.e. the settings that may vary from one pass or
+    session to the next while the pool is reused, those in ``worker_excluded_settings``, except those in
+    ``worker_unsent_settings``.
+
+    Returns:
+        Dict of session setting values by setting name
+
+    """
+    return dict((k, v) for k, v in vars(omega_globals.options).items()
+                if k.startswith(worker_excluded_settings) and not k.startswith(worker_unsent_settings))
+
+
+def start_pool(num_processes):
+    """
+    Start the worker pool for a session pass, or reuse the existing pool if it was started with the same number of
+    processes and worker inputs and ``omega_globals.options.persistent_worker_pool`` is ``True``.
+
+    Call after ``init_omega()``.
+
+    Args:
+        num_processes (int): the number of worker processes
+
+    Returns:
+        The worker pool
+
+    """
+    from omega_model import omega
+
+    worker_inputs_key = get_worker_inputs_key()
+
+    if _cache.get('pool') is not None and \
+            (not omega_globals.options.persistent_worker_pool or _cache['num_processes'] != num_processes or
+             _cache['worker_inputs_key'] != worker_inputs_key):
+        shutdown_pool()
+
+    if _cache.get('pool') is None:
+        if multiprocessing.get_start_method() == 'fork':
+            # workers inherit the initialized session
+            pool = multiprocessing.Pool(processes=num_processes)
+        else:
+            pool = multiprocessing.Pool(processes=num_processes, initializer=omega.init_omega,
+                                        initargs=[omega_globals.options])
+
+        results = []
+        for i in range(num_processes):
+            results.append(pool.apply_async(func=omega.poolstart, callback=None, error_callback=omega.error_callback))
+
+        [r.get() for r in results]
+
+        _cache['pool'] = pool
+        _cache['num_processes'] = num_processes
+        _cache['worker_inputs_key'] = worker_inputs_key
+
+        omega_log.logwrite('Started %d worker processes' % num_processes)
+    else:
+        omega_log.logwrite('Reusing %d worker processes' % num_processes)
+
+    pass_settings = get_worker_pass_settings()
+    _cache['pass_settings'] = (hash_values(pass_settings), pass_settings)
+
+    return _cache['pool']
+
+
+def apply_async(func, args, error_callback=None):
+    """
+    Run a function in a worker process, with the current session pass settings.
+
+    Args:
+        func (function): the (module-level) function to run
+        args (list): the function arguments
+        error_callback (function): optional function to call with the exception if the function fails
+
+    Returns:
+        The ``AsyncResult`` of the function
+
+    """
+    return _cache['pool'].apply_async(func=run_worker_task, args=(_cache['pass_settings'], func, args),
+                                      error_callback=error_callback)
+
+
+def run_worker_task(pass_settings, func, args):
+    """
+    Update the worker session settings, if the session pass has changed since the worker's last task, then run the
+    given function.
+
+    Args:
+        pass_settings (tuple): the pass settings ID and a dict of session setting values, see
+            ``get_worker_pass_settings()``
+        func (function): the function to run
+        args (list): the function arguments
+
+    Returns:
+        The function return value
+
+    """
+    pass_settings_id, settings = pass_settings
+
+    if _worker_state['pass_settings_id'] != pass_settings_id:
+        for k, v in settings.items():
+            omega_globals.options.__setattr__(k, v)
+        _worker_state['pass_settings_id'] = pass_settings_id
+
+    return func(*args)
+
+
+def shutdown_pool():
+    """
+    Shut down the worker pool, if any.
+
+    Returns:
+        Nothing, closes the pool and waits for the workers to exit
+
+    """
+    pool = _cache.pop('pool', None)
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    _cache.clear()
@@ -19,6 +19,8 @@ class _OMEGATree(OMEGABase):
     def __init__(self, root_omeganode):
         self.root = root_omeganode
         self.best_path_cost = None
+        self.best_path = None
+        self.num_nodes = 1
 
 
 class _OMEGANode(OMEGABase):
@@ -237,6 +239,64 @@ class WeightedTree(OMEGABase):
         else:
             return self.tree.get_node(node_id).data.value, eq_str
 
+    def calc_leaf_weights(self, node_id=None, weighted=False):
+        """
+        Flatten the tree below the given ``node_id``, or the root if no ``node_id`` is provided, into the overall
+        weight of each leaf, i.e. the product of the weights from the node to the leaf, such that the node value
+        (or weighted value) is the sum of the leaf values times their overall weights.
+
+        Leaves with a weight of ``None`` (or zero) do not contribute to the node value and are omitted.  Leaves below a
+        node with a zero (or ``None``) weight are kept, with an overall weight of zero, so that missing or ``NaN``
+        results still propagate to the node value, as they do for ``calc_value()``.
+
+        Args:
+            node_id (str): node id to calculate leaf weights of, or tree root if not provided
+            weighted (bool): if True then include the node's own weight, as for its weighted value
+
+        Returns:
+            Dict of overall leaf weights by leaf id
+
+        """
+        if node_id is None:
+            node_id = self.tree.root
+
+        leaf_weights = dict()
+
+        if weighted:
+            weight = self.tree.get_node(node_id).data.weight
+        else:
+            weight = 1
+
+        if weight is not None:
+            WeightedTree._calc_node_leaf_weights(self.tree, node_id, weight, leaf_weights)
+
+        return leaf_weights
+
+    @staticmethod
+    def _calc_node_leaf_weights(tree, node_id, weight, leaf_weights):
+        """
+        Recursively calculate the overall weights of the leaves below the given node.
+
+        Args:
+            tree (treelib.Tree): the tree to query
+            node_id (str): the id of the node to query
+            weight (float): the overall weight of the node
+            leaf_weights (dict): the leaf weights by leaf id, updated in place
+
+        Returns:
+            Nothing, updates ``leaf_weights``
+
+        """
+        children = tree.children(node_id)
+
+        if not children:
+            leaf_weights[node_id] = weight
+        else:
+            for child in children:
+                if child.data.weight or tree.children(child.identifier):
+                    WeightedTree._calc_node_leaf_weights(tree, child.identifier, weight * (child.data.weight or 0),
+                                                         leaf_weights)
+
     def show(self):
         """
         Print the tree to the console.
@@ -0,0 +1,180 @@
+"""
+
+**Routines to evaluate GCAM-style logit market shares for many price options at once.**
+
+Used by the ``sales_share`` modules to calculate consumer desired shares within a market category for all of the
+cross-subsidy price options of a cross-subsidy search iteration, see ``SalesShare.calc_shares_gcam()``.  Consumer
+generalized costs, logit share numerators and share constraints are calculated as arrays of price options by market
+class, so the market class data ``DataFrame`` is only updated once per call, see ``update_dataframe_columns()``.
+
+----
+
+**CODE**
+
+"""
+
+print('importing %s' % __file__)
+
+from omega_model import *
+
+
+class GCAMLogitEvaluator(OMEGABase):
+    """
+    **Calculates consumer generalized costs and logit market shares for a matrix of price options.**
+
+    The price-independent terms of the consumer generalized cost (fuel costs, annualization factors, etc) and the logit
+    parameters are gathered once per market category, when the evaluator is created.
+
+    """
+    def __init__(self, calendar_year, producer_decision, parent_market_class, child_market_classes, get_gcam_params,
+                 constrain_shares=True):
+        """
+        Create the evaluator for the given market category.
+
+        Args:
+            calendar_year (int): calendar year to calculate market shares in
+            producer_decision (Series): selected producer compliance option with
+                'average_ALT_retail_fuel_price_dollars_per_unit_MC',
+                'average_ALT_onroad_direct_co2e_gpmi_MC', 'average_ALT_onroad_direct_kwh_pmi_MC' attributes,
+                where MC = market class ID
+            parent_market_class (str): e.g. 'non_hauling', used for the share constraints, if any
+            child_market_classes ([strs]): e.g. ['non_hauling.BEV', 'non_hauling.ICE']
+            get_gcam_params (function): function that returns the GCAM parameters for a calendar year and market
+                class, e.g. ``SalesShare.get_gcam_params``
+            constrain_shares (bool): if ``True`` then relative shares are limited to the market category min and max
+                share constraints, ``omega_globals.constraints``
+
+        """
+        from context.onroad_fuels import OnroadFuel
+
+        self.child_market_classes = list(child_market_classes)
+
+        carbon_intensity_gasoline = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline',
+                                                                  'direct_co2e_grams_per_unit')
+        refuel_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline', 'refuel_efficiency')
+        recharge_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'US electricity', 'refuel_efficiency')
+
+        annualization_factor = []
+        annual_o_m_costs = []
+        annual_VMT = []
+        average_occupancy = []
+        fuel_cost_per_VMT = []
+        share_weight = []
+        logit_exponent_mu = []
+
+        for market_class_id in self.child_market_classes:
+            gcam_data_cy = get_gcam_params(calendar_year, market_class_id)
+
+            price_amortization_period = float(gcam_data_cy['price_amortization_period'])
+            discount_rate = gcam_data_cy['discount_rate']
+            annualization_factor.append(discount_rate + discount_rate / (
+                    ((1 + discount_rate) ** price_amortization_period) - 1))
+
+            fuel_cost = producer_decision['average_ALT_retail_fuel_price_dollars_per_unit_%s' % market_class_id]
+            average_co2e_gpmi = producer_decision['average_ALT_onroad_direct_co2e_gpmi_%s' % market_class_id]
+            average_kwh_pmi = producer_decision['average_ALT_onroad_direct_kwh_pmi_%s' % market_class_id]
+
+            # TODO: will eventually need utility factor for PHEVs here
+            market_class_fuel_cost_per_VMT = fuel_cost * average_kwh_pmi / recharge_efficiency
+            market_class_fuel_cost_per_VMT += \
+                fuel_cost * average_co2e_gpmi / carbon_intensity_gasoline / refuel_efficiency
+            fuel_cost_per_VMT.append(market_class_fuel_cost_per_VMT)
+
+            annual_o_m_costs.append(gcam_data_cy['o_m_costs'])
+            annual_VMT.append(float(gcam_data_cy['annual_vmt']))
+            average_occupancy.append(gcam_data_cy['average_occupancy'])
+            share_weight.append(gcam_data_cy['share_weight'])
+            logit_exponent_mu.append(gcam_data_cy['logit_exponent_mu'])
+
+        self.annualization_factor = np.array(annualization_factor, dtype=float)
+        self.annual_o_m_costs = np.array(annual_o_m_costs, dtype=float)
+        self.annual_VMT = np.array(annual_VMT, dtype=float)
+        self.average_occupancy = np.array(average_occupancy, dtype=float)
+        self.fuel_cost_per_VMT = np.array(fuel_cost_per_VMT, dtype=float)
+        self.share_weight = np.array(share_weight, dtype=float)
+        self.logit_exponent_mu = np.array(logit_exponent_mu, dtype=float)
+
+        self.min_shares = None
+        self.max_shares = None
+
+        if constrain_shares:
+            min_constraints = omega_globals.constraints['min_constraints_%s' % parent_market_class]
+            max_constraints = omega_globals.constraints['max_constraints_%s' % parent_market_class]
+
+            share_names = [mc.replace(parent_market_class + '.', '') for mc in self.child_market_classes]
+
+            self.min_shares = np.array([min_constraints[share_name] for share_name in share_names], dtype=float)
+            self.max_shares = np.array([max_constraints[share_name] for share_name in share_names], dtype=float)
+
+    def calc_generalized_costs(self, prices):
+        """
+        Calculate consumer generalized costs.  Also used for single market class generalized costs, see
+        ``SalesShare.calc_consumer_generalized_cost()``.
+
+        Args:
+            prices (2-D numeric Array): average modified cross subsidized prices, one row per price option, one column
+                per child market class
+
+        Returns:
+            2-D Array of consumer generalized costs, $/passenger-mile, same shape as ``prices``
+
+        """
+        annualized_capital_costs = self.annualization_factor * prices
+        total_non_fuel_costs_per_VMT = (annualized_capital_costs + self.annual_o_m_costs) / 1.383 / self.annual_VMT
+        total_cost_w_fuel_per_VMT = total_non_fuel_costs_per_VMT + self.fuel_cost_per_VMT
+
+        return total_cost_w_fuel_per_VMT / self.average_occupancy
+
+    def calc_shares(self, prices):
+        """
+        Calculate consumer generalized costs and logit relative market shares, limited to the share constraints, if
+        any.
+
+        Args:
+            prices (2-D numeric Array): average modified cross subsidized prices, one row per price option, one column
+                per child market class
+
+        Returns:
+            Tuple of consumer generalized costs and relative shares (2-D Arrays, same shape as ``prices``), and
+            ``True`` if any market class share is at its max constraint for all of the price options
+
+        """
+        generalized_costs = self.calc_generalized_costs(prices)
+
+        sales_share_numerators = self.share_weight * generalized_costs ** self.logit_exponent_mu
+
+        shares = sales_share_numerators / sales_share_numerators.sum(axis=1, keepdims=True)
+
+        constrained = False
+        if self.min_shares is not None:
+            # constrain relative (and by extension, absolute) shares RV
+            shares = np.minimum(np.maximum(self.min_shares, shares), self.max_shares)
+            constrained = bool((shares == self.max_shares).all(axis=0).any())
+
+        return generalized_costs, shares, constrained
+
+
+def update_dataframe_columns(df, data):
+    """
+    Update ``DataFrame`` columns, existing columns are updated in place and new columns are appended in a single
+    concatenation, in the order given by ``data``.
+
+    Args:
+        df (DataFrame): the ``DataFrame`` to update
+        data (dict): column values (arrays or scalars) by column name
+
+    Returns:
+        The updated ``DataFrame``
+
+    """
+    new_data = dict()
+    for column, values in data.items():
+        if column in df.columns:
+            df[column] = values
+        else:
+            new_data[column] = values
+
+    if new_data:
+        df = pd.concat([df, pd.DataFrame(new_data, index=df.index)], axis=1)
+
+    return df
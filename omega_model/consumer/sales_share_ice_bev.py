@@ -75,6 +75,7 @@ Data Column Name and Description
 print('importing %s' % __file__)
 
 from omega_model import *
+from consumer.gcam_logit import GCAMLogitEvaluator, update_dataframe_columns
 
 
 class SalesShare(OMEGABase, SalesShareBase):
@@ -147,70 +148,29 @@ class SalesShare(OMEGABase, SalesShareBase):
             MC = market class ID
 
         """
-        from context.onroad_fuels import OnroadFuel
-
         if omega_globals.options.flat_context:
             calendar_year = omega_globals.options.flat_context_year
 
-        sales_share_denominator = 0
-        sales_share_numerator = dict()
-
-        for pass_num in [0, 1]:
-            for market_class_id in child_market_classes:
-                if pass_num == 0:
-                    fuel_cost = producer_decision['average_ALT_retail_fuel_price_dollars_per_unit_%s' % market_class_id]
-
-                    gcam_data_cy = SalesShare.get_gcam_params(calendar_year, market_class_id)
-
-                    logit_exponent_mu = gcam_data_cy['logit_exponent_mu']
-
-                    price_amortization_period = float(gcam_data_cy['price_amortization_period'])
-                    discount_rate = gcam_data_cy['discount_rate']
-                    annualization_factor = discount_rate + discount_rate / (
-                            ((1 + discount_rate) ** price_amortization_period) - 1)
-
-                    total_capital_costs = market_class_data[
-                        'average_ALT_modified_cross_subsidized_price_%s' % market_class_id].values
-                    average_co2e_gpmi = producer_decision['average_ALT_onroad_direct_co2e_gpmi_%s' % market_class_id]
-                    average_kwh_pmi = producer_decision['average_ALT_onroad_direct_kwh_pmi_%s' % market_class_id]
-
-                    carbon_intensity_gasoline = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline',
-                                                                              'direct_co2e_grams_per_unit')
-
-                    refuel_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline',
-                                                                      'refuel_efficiency')
-
-                    recharge_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'US electricity',
-                                                                        'refuel_efficiency')
-
-                    annual_o_m_costs = gcam_data_cy['o_m_costs']
+        gcam_logit = GCAMLogitEvaluator(calendar_year, producer_decision, parent_market_class, child_market_classes,
+                                        SalesShare.get_gcam_params, constrain_shares=False)
 
-                    # TODO: will eventually need utility factor for PHEVs here
-                    fuel_cost_per_VMT = fuel_cost * average_kwh_pmi / recharge_efficiency
-                    fuel_cost_per_VMT += fuel_cost * average_co2e_gpmi / carbon_intensity_gasoline / refuel_efficiency
+        prices = np.column_stack([market_class_data['average_ALT_modified_cross_subsidized_price_%s' % mc].values
+                                  for mc in child_market_classes])
 
-                    # consumer_generalized_cost_dollars = total_capital_costs
-                    annualized_capital_costs = annualization_factor * total_capital_costs
-                    annual_VMT = float(gcam_data_cy['annual_vmt'])
+        generalized_costs, shares, _ = gcam_logit.calc_shares(prices)
 
-                    total_non_fuel_costs_per_VMT = (annualized_capital_costs + annual_o_m_costs) / 1.383 / annual_VMT
-                    total_cost_w_fuel_per_VMT = total_non_fuel_costs_per_VMT + fuel_cost_per_VMT
-                    total_cost_w_fuel_per_PMT = total_cost_w_fuel_per_VMT / gcam_data_cy['average_occupancy']
-                    sales_share_numerator[market_class_id] = gcam_data_cy['share_weight'] * (
-                            total_cost_w_fuel_per_PMT ** logit_exponent_mu)
+        parent_share = market_class_data['consumer_abs_share_frac_%s' % parent_market_class].values
 
-                    market_class_data[
-                        'consumer_generalized_cost_dollars_%s' % market_class_id] = total_cost_w_fuel_per_PMT
+        share_data = dict()
 
-                    sales_share_denominator += sales_share_numerator[market_class_id]
+        for idx, market_class_id in enumerate(child_market_classes):
+            share_data['consumer_generalized_cost_dollars_%s' % market_class_id] = generalized_costs[:, idx]
 
-                else:
-                    demanded_share = sales_share_numerator[market_class_id] / sales_share_denominator
-                    demanded_absolute_share = \
-                        demanded_share * market_class_data['consumer_abs_share_frac_%s' % parent_market_class].values
+        for idx, market_class_id in enumerate(child_market_classes):
+            share_data['consumer_share_frac_%s' % market_class_id] = shares[:, idx]
+            share_data['consumer_abs_share_frac_%s' % market_class_id] = shares[:, idx] * parent_share
 
-                    market_class_data['consumer_share_frac_%s' % market_class_id] = demanded_share
-                    market_class_data['consumer_abs_share_frac_%s' % market_class_id] = demanded_absolute_share
+        market_class_data = update_dataframe_columns(market_class_data, share_data)
 
         return market_class_data.copy()
 
@@ -77,6 +77,7 @@ import numpy as np
 print('importing %s' % __file__)
 
 from omega_model import *
+from consumer.gcam_logit import GCAMLogitEvaluator, update_dataframe_columns
 from context.new_vehicle_market import NewVehicleMarket
 from context.fuel_prices import FuelPrice
 from common.omega_functions import sales_weight_average_dataframe
@@ -183,13 +184,6 @@ class SalesShare(OMEGABase, SalesShareBase):
             Consumer cost in $/mi
 
         """
-        fuel_cost = producer_decision['average_ALT_retail_fuel_price_dollars_per_unit_%s' % market_class_id]
-        gcam_data_cy = SalesShare.get_gcam_params(calendar_year, market_class_id)
-        price_amortization_period = float(gcam_data_cy['price_amortization_period'])
-        discount_rate = gcam_data_cy['discount_rate']
-        annualization_factor = discount_rate + discount_rate / (
-                ((1 + discount_rate) ** price_amortization_period) - 1)
-
         if type(market_class_data) is pd.DataFrame:
             total_capital_costs = market_class_data[
                 'average_ALT_modified_cross_subsidized_price_%s' % market_class_id].values
@@ -197,24 +191,15 @@ class SalesShare(OMEGABase, SalesShareBase):
             total_capital_costs = market_class_data[
                 'average_ALT_modified_cross_subsidized_price_%s' % market_class_id]
 
-        average_co2e_gpmi = producer_decision['average_ALT_onroad_direct_co2e_gpmi_%s' % market_class_id]
-        average_kwh_pmi = producer_decision['average_ALT_onroad_direct_kwh_pmi_%s' % market_class_id]
-        carbon_intensity_gasoline = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline',
-                                                                  'direct_co2e_grams_per_unit')
-        refuel_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'pump gasoline',
-                                                          'refuel_efficiency')
-        recharge_efficiency = OnroadFuel.get_fuel_attribute(calendar_year, 'US electricity',
-                                                            'refuel_efficiency')
-        annual_o_m_costs = gcam_data_cy['o_m_costs']
-        # TODO: will eventually need utility factor for PHEVs here
-        fuel_cost_per_VMT = fuel_cost * average_kwh_pmi / recharge_efficiency
-        fuel_cost_per_VMT += fuel_cost * average_co2e_gpmi / carbon_intensity_gasoline / refuel_efficiency
-        # consumer_generalized_cost_dollars = total_capital_costs
-        annualized_capital_costs = annualization_factor * total_capital_costs
-        annual_VMT = float(gcam_data_cy['annual_vmt'])
-        total_non_fuel_costs_per_VMT = (annualized_capital_costs + annual_o_m_costs) / 1.383 / annual_VMT
-        total_cost_w_fuel_per_VMT = total_non_fuel_costs_per_VMT + fuel_cost_per_VMT
-        total_cost_w_fuel_per_PMT = total_cost_w_fuel_per_VMT / gcam_data_cy['average_occupancy']
+        prices = np.asarray(total_capital_costs, dtype=float)
+
+        gcam_logit = GCAMLogitEvaluator(calendar_year, producer_decision, None, [market_class_id],
+                                        SalesShare.get_gcam_params, constrain_shares=False)
+
+        total_cost_w_fuel_per_PMT = gcam_logit.calc_generalized_costs(prices.reshape(-1, 1))[:, 0]
+
+        if prices.ndim == 0:
+            total_cost_w_fuel_per_PMT = total_cost_w_fuel_per_PMT[0]
 
         return total_cost_w_fuel_per_PMT
 
@@ -242,64 +227,37 @@ class SalesShare(OMEGABase, SalesShareBase):
             MC = market class ID
 
         """
-        from context.onroad_fuels import OnroadFuel
-
         if omega_globals.options.flat_context:
             calendar_year = omega_globals.options.flat_context_year
 
-        sales_share_denominator = 0
-        sales_share_numerator = dict()
-
-        market_class_data['consumer_constrained_%s' % parent_market_class] = FALSE
-
-        for pass_num in [0, 1]:
-            for market_class_id in child_market_classes:
-                if pass_num == 0:
-                    total_cost_w_fuel_per_PMT = SalesShare.calc_consumer_generalized_cost(calendar_year,
-                                                                                          market_class_data,
-                                                                                          market_class_id,
-                                                                                          producer_decision)
-
-                    market_class_data['consumer_generalized_cost_dollars_%s' % market_class_id] = \
-                        total_cost_w_fuel_per_PMT
-
-                    gcam_data_cy = SalesShare.get_gcam_params(calendar_year, market_class_id)
-                    logit_exponent_mu = gcam_data_cy['logit_exponent_mu']
-                    sales_share_numerator[market_class_id] = gcam_data_cy['share_weight'] * (
-                            total_cost_w_fuel_per_PMT ** logit_exponent_mu)
+        gcam_logit = GCAMLogitEvaluator(calendar_year, producer_decision, parent_market_class, child_market_classes,
+                                        SalesShare.get_gcam_params)
 
-                    sales_share_denominator += sales_share_numerator[market_class_id]
+        prices = np.column_stack([market_class_data['average_ALT_modified_cross_subsidized_price_%s' % mc].values
+                                  for mc in child_market_classes])
 
-                else:
-                    min_constraints = omega_globals.constraints['min_constraints_%s' % parent_market_class]
-                    max_constraints = omega_globals.constraints['max_constraints_%s' % parent_market_class]
+        generalized_costs, shares, constrained = gcam_logit.calc_shares(prices)
 
-                    demanded_share = sales_share_numerator[market_class_id] / sales_share_denominator
+        min_constraints = omega_globals.constraints['min_constraints_%s' % parent_market_class]
+        parent_share = market_class_data['consumer_abs_share_frac_%s' % parent_market_class].values
 
-                    # constrain relative (and by extension, absolute) shares RV
-                    share_name = market_class_id.replace(parent_market_class + '.', '')
-                    demanded_share = np.minimum(np.maximum(min_constraints[share_name], demanded_share),
-                                                max_constraints[share_name])
+        share_data = {'consumer_constrained_%s' % parent_market_class: TRUE if constrained else FALSE}
 
-                    if all(demanded_share == max_constraints[share_name]):
-                        market_class_data['consumer_constrained_%s' % parent_market_class] = TRUE
+        for idx, market_class_id in enumerate(child_market_classes):
+            share_data['consumer_generalized_cost_dollars_%s' % market_class_id] = generalized_costs[:, idx]
 
-                    parent_share = market_class_data['consumer_abs_share_frac_%s' % parent_market_class].values
+        for idx, market_class_id in enumerate(child_market_classes):
+            demanded_absolute_share = shares[:, idx] * parent_share
 
-                    demanded_absolute_share = demanded_share * parent_share
+            share_data['consumer_share_frac_%s' % market_class_id] = shares[:, idx]
+            share_data['consumer_abs_share_frac_%s' % market_class_id] = demanded_absolute_share
 
-                    market_class_data['consumer_share_frac_%s' % market_class_id] = demanded_share
-                    market_class_data['consumer_abs_share_frac_%s' % market_class_id] = demanded_absolute_share
+            # distribute absolute shares to ALT / NO_ALT, NO_ALT first:
+            no_alt_share = min_constraints['producer_abs_share_frac_%s.NO_ALT' % market_class_id] * parent_share
+            share_data['consumer_abs_share_frac_%s.NO_ALT' % market_class_id] = no_alt_share
+            share_data['consumer_abs_share_frac_%s.ALT' % market_class_id] = demanded_absolute_share - no_alt_share
 
-                    # distribute absolute shares to ALT / NO_ALT, NO_ALT first:
-                    for alt in ['NO_ALT', 'ALT']:
-                        share_id = 'consumer_abs_share_frac_%s.%s' % (market_class_id, alt)
-                        if alt == 'NO_ALT':
-                            market_class_data[share_id] = \
-                                min_constraints[share_id.replace('consumer', 'producer')] * parent_share
-                            demanded_absolute_share -= market_class_data[share_id]
-                        else:
-                            market_class_data[share_id] = demanded_absolute_share
+        market_class_data = update_dataframe_columns(market_class_data, share_data)
 
         return market_class_data.copy()
 
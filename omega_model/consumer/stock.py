@@ -12,6 +12,8 @@ from omega_model import *
 
 vehicles_cache = dict()
 
+stock_timing = dict()  # update_stock() run times, in seconds, by compliance id and calendar year
+
 
 def get_vehicle_info(vehicle_id):
     """
@@ -33,11 +35,75 @@ def get_vehicle_info(vehicle_id):
     return vehicles_cache[vehicle_id]
 
 
+def get_vehicles_info(vehicle_ids):
+    """
+    Gets vehicle info for the given database vehicle IDs, vehicles that are not yet cached are queried together.
+
+    Args:
+        vehicle_ids (int Array): the database vehicle IDs
+
+    Returns:
+        Tuple of vehicle market_class_id, model_year and initial_registered_count arrays
+
+    """
+    from producer.vehicles import VehicleFinal
+
+    new_vehicle_ids = [vehicle_id for vehicle_id in set(vehicle_ids.tolist()) if vehicle_id not in vehicles_cache]
+
+    # query in batches to stay within the database query parameter limit
+    for batch_start in range(0, len(new_vehicle_ids), 500):
+        batch_ids = new_vehicle_ids[batch_start:batch_start + 500]
+
+        for vehicle_id, market_class_id, model_year, initial_registered_count in \
+                omega_globals.session.query(VehicleFinal.vehicle_id, VehicleFinal.market_class_id,
+                                            VehicleFinal.model_year, VehicleFinal._initial_registered_count)\
+                .filter(VehicleFinal.vehicle_id.in_(batch_ids)):
+            vehicles_cache[vehicle_id] = (market_class_id, model_year, initial_registered_count)
+
+    vehicles_info = [vehicles_cache[vehicle_id] for vehicle_id in vehicle_ids.tolist()]
+
+    market_class_ids = np.array([vi[0] for vi in vehicles_info], dtype=object)
+    model_years = np.array([vi[1] for vi in vehicles_info], dtype=int)
+    initial_registered_counts = np.array([vi[2] for vi in vehicles_info], dtype=float)
+
+    return market_class_ids, model_years, initial_registered_counts
+
+
+def gather_lookup(lookup_function, *key_arrays):
+    """
+    Gather lookup function values for arrays of keys.  The lookup function is called once per unique key.
+
+    Args:
+        lookup_function (function): the lookup function, e.g. ``Reregistration.get_reregistered_proportion``
+        *key_arrays (Arrays or scalars): the lookup function arguments, scalars apply to all the keys
+
+    Returns:
+        Array of lookup function values, one per key
+
+    """
+    num_keys = max([len(k) for k in key_arrays if np.ndim(k) > 0])
+
+    key_arrays = [k if np.ndim(k) > 0 else np.full(num_keys, k, dtype=type(k)) for k in key_arrays]
+
+    if num_keys == 0:
+        return np.array([], dtype=float)
+
+    key_codes, unique_keys = pd.factorize(pd.MultiIndex.from_arrays(key_arrays))
+
+    lookup_table = np.array([lookup_function(*key) for key in unique_keys.tolist()], dtype=float)
+
+    return lookup_table[key_codes]
+
+
 def update_stock(calendar_year, compliance_id=None):
     """
     Re-register vehicles by calendar year, as a function of vehicle attributes (e.g. age, market class...)
     Also calculates vehicle miles travelled for each vehilce by market class and age.
 
+    The whole calendar year fleet is processed at once, as arrays of vehicle attributes.  Re-registration and annual
+    VMT values are gathered from the ``Reregistration`` and ``OnroadVMT`` classes once per unique key and new vehicle
+    annual data records are added in bulk.
+
     Args:
         compliance_id (str): optional argument, manufacturer name, or 'consolidated_OEM'
         calendar_year (int): calendar year to re-register vehicles in
@@ -48,77 +114,91 @@ def update_stock(calendar_year, compliance_id=None):
     """
     from producer.vehicle_annual_data import VehicleAnnualData
 
+    start_time = time.time()
+
     if calendar_year < omega_globals.options.analysis_initial_year:
         vehicles_cache.clear()
 
-    # pull in this year's vehicle ids:
-    this_years_vehicle_annual_data = VehicleAnnualData.get_vehicle_annual_data(calendar_year, compliance_id)
-
-    last_years_vehicle_annual_data = VehicleAnnualData.get_vehicle_annual_data(calendar_year-1, compliance_id)
-
-    # omega_globals.session.add_all(this_years_vehicle_annual_data)
-    # UPDATE vehicle annual data for this year's stock
-    for vad in this_years_vehicle_annual_data:
-        market_class_id, model_year, initial_registered_count = get_vehicle_info(vad['vehicle_id'])
-        age = calendar_year - model_year
-
-        reregistration_factor = omega_globals.options.Reregistration.\
-            get_reregistered_proportion(model_year, market_class_id, age)
-
-        if initial_registered_count > 0:
-            annual_vmt = omega_globals.options.OnroadVMT.get_vmt(calendar_year, market_class_id, age)
-        else:
-            annual_vmt = 0
+    Reregistration = omega_globals.options.Reregistration
+    OnroadVMT = omega_globals.options.OnroadVMT
 
-        if age == 0:
-            odometer = annual_vmt
-        else:
-            odometer = max(0, odometer_data[odometer_data['vehicle_id'].values == vad.vehicle_id]['odometer'].values)
-            odometer += annual_vmt
+    # pull in this year's and last year's vehicle annual data rows:
+    this_years_rows = VehicleAnnualData.get_rows(calendar_year, compliance_id)
 
-        if reregistration_factor > 0:
-            registered_count = initial_registered_count * reregistration_factor
-            vad['annual_vmt'] = annual_vmt
-            vad['odometer'] = odometer
-            vad['vmt'] = annual_vmt * registered_count
+    last_years_rows = VehicleAnnualData.get_rows(calendar_year - 1, compliance_id)
 
-    if not last_years_vehicle_annual_data:
-        prior_year_vehicle_data = []
-    else:
-        prior_year_vehicle_data = [(v['vehicle_id'], v['odometer']) for v in last_years_vehicle_annual_data]
-
-    vad_list = []
+    # UPDATE vehicle annual data for this year's stock
+    if len(this_years_rows):
+        vehicle_ids = VehicleAnnualData.get_values('vehicle_id', this_years_rows)
+        market_class_ids, model_years, initial_registered_counts = get_vehicles_info(vehicle_ids)
+        ages = calendar_year - model_years
+
+        reregistration_factors = gather_lookup(Reregistration.get_reregistered_proportion, model_years,
+                                               market_class_ids, ages)
+
+        annual_vmts = np.zeros(len(vehicle_ids))
+        has_vmt = initial_registered_counts > 0
+        annual_vmts[has_vmt] = gather_lookup(OnroadVMT.get_vmt, calendar_year, market_class_ids[has_vmt],
+                                             ages[has_vmt])
+
+        odometers = annual_vmts.copy()
+        if (ages != 0).any():
+            prior_odometers = dict(zip(VehicleAnnualData.get_values('vehicle_id', last_years_rows).tolist(),
+                                       VehicleAnnualData.get_values('odometer', last_years_rows).tolist()))
+            for idx in np.flatnonzero(ages != 0):
+                odometers[idx] += max(0, prior_odometers.get(vehicle_ids[idx], 0))
+
+        registered = reregistration_factors > 0
+        rows = this_years_rows[registered]
+        registered_counts = initial_registered_counts[registered] * reregistration_factors[registered]
+        VehicleAnnualData.set_values('annual_vmt', rows, annual_vmts[registered])
+        VehicleAnnualData.set_values('odometer', rows, odometers[registered])
+        VehicleAnnualData.set_values('vmt', rows, annual_vmts[registered] * registered_counts)
+
+    num_new_records = 0
 
     # CREATE vehicle annual data for last year's stock, now one year older:
-    if prior_year_vehicle_data:
-        for vehicle_id, prior_odometer in prior_year_vehicle_data:
-            market_class_id, model_year, initial_registered_count = get_vehicle_info(vehicle_id)
-            age = int(calendar_year - model_year)
-
-            reregistration_factor = omega_globals.options.Reregistration.\
-                get_reregistered_proportion(model_year, market_class_id, age)
-
-            registered_count = initial_registered_count * reregistration_factor
-
-            if reregistration_factor > 0:
-                if initial_registered_count > 0:
-                    annual_vmt = omega_globals.options.OnroadVMT.get_vmt(calendar_year, market_class_id, age)
-                else:
-                    annual_vmt = 0
-
-                odometer = max(0, prior_odometer)
-                odometer += annual_vmt
-
-                vad_list.append(VehicleAnnualData.create(calendar_year=calendar_year,
-                                  vehicle_id=int(vehicle_id),
-                                  compliance_id=compliance_id,
-                                  age=age,
-                                  registered_count=registered_count,
-                                  annual_vmt=annual_vmt,
-                                  odometer=odometer,
-                                  vmt=annual_vmt * registered_count))
-
-        VehicleAnnualData.add_all(vad_list)
+    if len(last_years_rows):
+        vehicle_ids = VehicleAnnualData.get_values('vehicle_id', last_years_rows)
+        prior_odometers = VehicleAnnualData.get_values('odometer', last_years_rows)
+        market_class_ids, model_years, initial_registered_counts = get_vehicles_info(vehicle_ids)
+        ages = calendar_year - model_years
+
+        reregistration_factors = gather_lookup(Reregistration.get_reregistered_proportion, model_years,
+                                               market_class_ids, ages)
+
+        registered = reregistration_factors > 0
+
+        vehicle_ids = vehicle_ids[registered]
+        prior_odometers = prior_odometers[registered]
+        market_class_ids = market_class_ids[registered]
+        initial_registered_counts = initial_registered_counts[registered]
+        ages = ages[registered]
+        registered_counts = initial_registered_counts * reregistration_factors[registered]
+
+        annual_vmts = np.zeros(len(vehicle_ids))
+        has_vmt = initial_registered_counts > 0
+        annual_vmts[has_vmt] = gather_lookup(OnroadVMT.get_vmt, calendar_year, market_class_ids[has_vmt],
+                                             ages[has_vmt])
+
+        num_new_records = len(vehicle_ids)
+
+        VehicleAnnualData.add_columns(num_new_records,
+                                      {'calendar_year': calendar_year,
+                                       'vehicle_id': vehicle_ids,
+                                       'compliance_id': compliance_id,
+                                       'age': ages,
+                                       'registered_count': registered_counts,
+                                       'annual_vmt': annual_vmts,
+                                       'odometer': np.maximum(0, prior_odometers) + annual_vmts,
+                                       'vmt': annual_vmts * registered_counts})
+
+    stock_timing[compliance_id, calendar_year] = time.time() - start_time
+
+    if 'stock' in omega_globals.options.verbose_log_modules:
+        omega_log.logwrite('update_stock %s %d: %d vehicles updated, %d vehicles re-registered, %.3f seconds' %
+                           (compliance_id, calendar_year, len(this_years_rows), num_new_records,
+                            stock_timing[compliance_id, calendar_year]))
 
 
 if __name__ == '__main__':
@@ -57,6 +57,7 @@ print('importing %s' % __file__)
 
 from common.omega_types import *
 from common.input_validation import *
+from common.omega_eval import CompiledExpression
 from context.ip_deflators import ImplictPriceDeflators
 
 _cache = dict()
@@ -112,15 +113,19 @@ class PowertrainCost(OMEGABase):
     battery_cost_scalers = dict()
 
     @staticmethod
-    def calc_cost(vehicle, pkg_info, powertrain_type):
+    def calc_cost(vehicle, pkg_info, powertrain_type, trans=None):
         """
         Calculate the value of the response surface equation for the given powertrain type, cost curve class (tech
         package) for the full factorial combination of the iterable terms.
 
+        The ``pkg_info`` values may be scalars, for a single package, or numpy arrays, for packages that share the
+        same powertrain type and transmission (see ``calc_costs()``).
+
         Args:
             powertrain_type:
             vehicle (Vehicle): the vehicle to calc costs for
             pkg_info (dict-like): the necessary information for developing cost estimates.
+            trans (str): optional transmission code, e.g. 'TRX12', determined by ``get_trans(pkg_info)`` if ``None``
 
         Returns:
             A list of cost values indexed the same as pkg_df.
@@ -137,16 +142,16 @@ class PowertrainCost(OMEGABase):
         else:
             if reg_class_id != 'mediumduty':
                 locals_dict.update({'CUMULATIVE_GWH': vehicle.global_cumulative_battery_GWh[model_year - 1]})
-                learning_pev_battery_scaling_factor = eval(_cache['PEV', 'battery_GWh_learning_curve']['value'],
-                                                           {'np': np}, locals_dict)
+                learning_pev_battery_scaling_factor = \
+                    _cache['PEV', 'battery_GWh_learning_curve']['value'].evaluate(locals_dict)
                 if learning_pev_battery_scaling_factor > 1:
                     gwh = vehicle.global_cumulative_battery_GWh[model_year - 2]
                     locals_dict.update({'CUMULATIVE_GWH': vehicle.global_cumulative_battery_GWh[model_year - 1] + gwh})
-                    learning_pev_battery_scaling_factor = eval(_cache['PEV', 'battery_GWh_learning_curve']['value'],
-                                                               {'np': np}, locals_dict)
+                    learning_pev_battery_scaling_factor = \
+                        _cache['PEV', 'battery_GWh_learning_curve']['value'].evaluate(locals_dict)
             else:
                 cumulative_GWh_ld_dict = \
-                    eval(_cache['PEV', 'cumulative_GWh_LD_noIRA']['value'], {'np': np}, locals_dict)
+                    _cache['PEV', 'cumulative_GWh_LD_noIRA']['value'].evaluate(locals_dict)
                 if model_year - 1 in cumulative_GWh_ld_dict['GWh']:
                     gwh = cumulative_GWh_ld_dict['GWh'][model_year - 1]
                     locals_dict.update({'CUMULATIVE_GWH': vehicle.global_cumulative_battery_GWh[model_year - 1] + gwh})
@@ -154,22 +159,22 @@ class PowertrainCost(OMEGABase):
                     year = max(yr for yr in cumulative_GWh_ld_dict['GWh'])
                     gwh = cumulative_GWh_ld_dict['GWh'][year]
                     locals_dict.update({'CUMULATIVE_GWH': vehicle.global_cumulative_battery_GWh[model_year - 1] + gwh})
-                learning_pev_battery_scaling_factor = eval(_cache['PEV', 'battery_GWh_learning_curve']['value'],
-                                                           {'np': np}, locals_dict)
+                learning_pev_battery_scaling_factor = \
+                    _cache['PEV', 'battery_GWh_learning_curve']['value'].evaluate(locals_dict)
 
         # markups and learning
-        MARKUP_ICE = eval(_cache['ICE', 'markup']['value'], {'np': np}, locals_dict)
-        MARKUP_HEV = eval(_cache['HEV', 'markup']['value'], {'np': np}, locals_dict)
-        MARKUP_PHEV = eval(_cache['PHEV', 'markup']['value'], {'np': np}, locals_dict)
-        MARKUP_BEV = eval(_cache['BEV', 'markup']['value'], {'np': np}, locals_dict)
-        MARKUP_ALL = eval(_cache['ALL', 'markup']['value'], {'np': np}, locals_dict)
-
-        learning_rate = eval(_cache['ALL', 'learning_rate']['value'], {'np': np}, locals_dict)
-        learning_start = eval(_cache['ALL', 'learning_start']['value'], {'np': np}, locals_dict)
-        legacy_sales_scaler_ice = eval(_cache['ICE', 'legacy_sales_learning_scaler']['value'], {'np': np}, locals_dict)
-        legacy_sales_scaler_pev = eval(_cache['PEV', 'legacy_sales_learning_scaler']['value'], {'np': np}, locals_dict)
-        sales_scaler_ice = eval(_cache['ICE', 'sales_scaler']['value'], {'np': np}, locals_dict)
-        sales_scaler_pev = eval(_cache['PEV', 'sales_scaler']['value'], {'np': np}, locals_dict)
+        MARKUP_ICE = _cache['ICE', 'markup']['value'].evaluate(locals_dict)
+        MARKUP_HEV = _cache['HEV', 'markup']['value'].evaluate(locals_dict)
+        MARKUP_PHEV = _cache['PHEV', 'markup']['value'].evaluate(locals_dict)
+        MARKUP_BEV = _cache['BEV', 'markup']['value'].evaluate(locals_dict)
+        MARKUP_ALL = _cache['ALL', 'markup']['value'].evaluate(locals_dict)
+
+        learning_rate = _cache['ALL', 'learning_rate']['value'].evaluate(locals_dict)
+        learning_start = _cache['ALL', 'learning_start']['value'].evaluate(locals_dict)
+        legacy_sales_scaler_ice = _cache['ICE', 'legacy_sales_learning_scaler']['value'].evaluate(locals_dict)
+        legacy_sales_scaler_pev = _cache['PEV', 'legacy_sales_learning_scaler']['value'].evaluate(locals_dict)
+        sales_scaler_ice = _cache['ICE', 'sales_scaler']['value'].evaluate(locals_dict)
+        sales_scaler_pev = _cache['PEV', 'sales_scaler']['value'].evaluate(locals_dict)
         cumulative_sales_ice = abs(sales_scaler_ice * (model_year - learning_start))
         cumulative_sales_pev = abs(sales_scaler_pev * (model_year - learning_start))
         learning_factor_ice = \
@@ -203,13 +208,14 @@ class PowertrainCost(OMEGABase):
         gasoline_flag = diesel_flag = 0
 
         CURBWT = pkg_info['curbweight_lbs']
-        # VEHICLE_SIZE_CLASS = np.array([weight_bins.index(min([v for v in weight_bins if cw < v])) for cw in CURBWT])
-        VEHICLE_SIZE_CLASS = weight_bins.index(min([v for v in weight_bins if CURBWT < v]))
+        # index of the first weight bin greater than the curb weight
+        VEHICLE_SIZE_CLASS = np.searchsorted(weight_bins, CURBWT, side='right')
 
         # powertrain costs for anything with a liquid fueled engine
         if powertrain_type in ['ICE', 'HEV', 'PHEV', 'MHEV']:
 
-            trans = get_trans(pkg_info)
+            if trans is None:
+                trans = get_trans(pkg_info)
 
             gasoline_flag = 1
             diesel_flag = 0
@@ -224,75 +230,75 @@ class PowertrainCost(OMEGABase):
 
             # PGM costs and loadings for gasoline
             if gasoline_flag == 1:
-                PT_USD_PER_OZ = eval(_cache['ALL', 'pt_dollars_per_oz']['value'], {'np': np}, locals_dict)
-                PD_USD_PER_OZ = eval(_cache['ALL', 'pd_dollars_per_oz']['value'], {'np': np}, locals_dict)
-                RH_USD_PER_OZ = eval(_cache['ALL', 'rh_dollars_per_oz']['value'], {'np': np}, locals_dict)
-                PT_GRAMS_PER_LITER_TWC = eval(_cache['ALL', 'twc_pt_grams_per_liter']['value'], {'np': np}, locals_dict)
-                PD_GRAMS_PER_LITER_TWC = eval(_cache['ALL', 'twc_pd_grams_per_liter']['value'], {'np': np}, locals_dict)
-                RH_GRAMS_PER_LITER_TWC = eval(_cache['ALL', 'twc_rh_grams_per_liter']['value'], {'np': np}, locals_dict)
-                OZ_PER_GRAM = eval(_cache['ALL', 'troy_oz_per_gram']['value'], {'np': np}, locals_dict)
+                PT_USD_PER_OZ = _cache['ALL', 'pt_dollars_per_oz']['value'].evaluate(locals_dict)
+                PD_USD_PER_OZ = _cache['ALL', 'pd_dollars_per_oz']['value'].evaluate(locals_dict)
+                RH_USD_PER_OZ = _cache['ALL', 'rh_dollars_per_oz']['value'].evaluate(locals_dict)
+                PT_GRAMS_PER_LITER_TWC = _cache['ALL', 'twc_pt_grams_per_liter']['value'].evaluate(locals_dict)
+                PD_GRAMS_PER_LITER_TWC = _cache['ALL', 'twc_pd_grams_per_liter']['value'].evaluate(locals_dict)
+                RH_GRAMS_PER_LITER_TWC = _cache['ALL', 'twc_rh_grams_per_liter']['value'].evaluate(locals_dict)
+                OZ_PER_GRAM = _cache['ALL', 'troy_oz_per_gram']['value'].evaluate(locals_dict)
 
-            turb_input_scaler = eval(_cache['ALL', 'turb_scaler']['value'], {'np': np}, locals_dict)
+            turb_input_scaler = _cache['ALL', 'turb_scaler']['value'].evaluate(locals_dict)
 
             learn = learning_factor_ice
             # determine trans and calc cost
             adj_factor = _cache['ALL', trans]['dollar_adjustment']
-            trans_cost = eval(_cache['ALL', trans]['value'], {'np': np}, locals_dict) \
+            trans_cost = _cache['ALL', trans]['value'].evaluate(locals_dict) \
                          * adj_factor * learn
 
             # cylinder cost
             adj_factor = _cache['ALL', 'dollars_per_cylinder']['dollar_adjustment']
-            cyl_cost = eval(_cache['ALL', 'dollars_per_cylinder']['value'], {'np': np}, locals_dict) \
+            cyl_cost = _cache['ALL', 'dollars_per_cylinder']['value'].evaluate(locals_dict) \
                        * adj_factor * learn
 
             # displacement cost
             adj_factor = _cache['ALL', 'dollars_per_liter']['dollar_adjustment']
-            liter_cost = eval(_cache['ALL', 'dollars_per_liter']['value'], {'np': np}, locals_dict) \
+            liter_cost = _cache['ALL', 'dollars_per_liter']['value'].evaluate(locals_dict) \
                          * adj_factor * learn
 
             # high efficiency alternator cost
             adj_factor = _cache['ALL', 'high_eff_alternator']['dollar_adjustment']
-            high_eff_alt_cost = eval(_cache['ALL', 'high_eff_alternator']['value'], {'np': np}, locals_dict) \
+            high_eff_alt_cost = _cache['ALL', 'high_eff_alternator']['value'].evaluate(locals_dict) \
                                 * adj_factor * learn * pkg_info['high_eff_alternator']
 
             # start_stop cost
             adj_factor = _cache['ALL', 'start_stop']['dollar_adjustment']
-            start_stop_cost = eval(_cache['ALL', 'start_stop']['value'], {'np': np}, locals_dict) \
+            start_stop_cost = _cache['ALL', 'start_stop']['value'].evaluate(locals_dict) \
                               * adj_factor * learn * pkg_info['start_stop']
 
             # deac_pd cost
             adj_factor = _cache['ALL', 'deac_pd']['dollar_adjustment']
-            deac_pd_cost = eval(_cache['ALL', 'deac_pd']['value'], {'np': np}, locals_dict) \
+            deac_pd_cost = _cache['ALL', 'deac_pd']['value'].evaluate(locals_dict) \
                            * adj_factor * learn * pkg_info['deac_pd']
 
             # deac_fc cost
             adj_factor = _cache['ALL', 'deac_fc']['dollar_adjustment']
-            deac_fc_cost = eval(_cache['ALL', 'deac_fc']['value'], {'np': np}, locals_dict) \
+            deac_fc_cost = _cache['ALL', 'deac_fc']['value'].evaluate(locals_dict) \
                            * adj_factor * learn * pkg_info['deac_fc']
 
             # cegr cost
             adj_factor = _cache['ALL', 'cegr']['dollar_adjustment']
-            cegr_cost = eval(_cache['ALL', 'cegr']['value'], {'np': np}, locals_dict) \
+            cegr_cost = _cache['ALL', 'cegr']['value'].evaluate(locals_dict) \
                         * adj_factor * learn * pkg_info['cegr']
 
             # atk2 cost
             adj_factor = _cache['ALL', 'atk2']['dollar_adjustment']
-            atk2_cost = eval(_cache['ALL', 'atk2']['value'], {'np': np}, locals_dict) \
+            atk2_cost = _cache['ALL', 'atk2']['value'].evaluate(locals_dict) \
                         * adj_factor * learn * pkg_info['atk2']
 
             # gdi cost
             adj_factor = _cache['ALL', 'gdi']['dollar_adjustment']
-            gdi_cost = eval(_cache['ALL', 'gdi']['value'], {'np': np}, locals_dict) \
+            gdi_cost = _cache['ALL', 'gdi']['value'].evaluate(locals_dict) \
                        * adj_factor * learn * pkg_info['gdi']
 
             # turb12 cost
             adj_factor = _cache['ALL', 'turb12']['dollar_adjustment']
-            turb12_cost = eval(_cache['ALL', 'turb12']['value'], {'np': np}, locals_dict) \
+            turb12_cost = _cache['ALL', 'turb12']['value'].evaluate(locals_dict) \
                           * adj_factor * learn * pkg_info['turb12']
 
             # turb11 cost
             adj_factor = _cache['ALL', 'turb11']['dollar_adjustment']
-            turb11_cost = eval(_cache['ALL', 'turb11']['value'], {'np': np}, locals_dict) \
+            turb11_cost = _cache['ALL', 'turb11']['value'].evaluate(locals_dict) \
                           * adj_factor * learn * pkg_info['turb11']
 
             turb_scaler += (turb_input_scaler - turb_scaler) * (pkg_info['turb11'] | pkg_info['turb12'])
@@ -302,21 +308,21 @@ class PowertrainCost(OMEGABase):
                 adj_factor_sub = _cache['ALL', 'twc_substrate']['dollar_adjustment']
                 adj_factor_wash = _cache['ALL', 'twc_washcoat']['dollar_adjustment']
                 adj_factor_can = _cache['ALL', 'twc_canning']['dollar_adjustment']
-                TWC_SWEPT_VOLUME = eval(_cache['ALL', 'twc_swept_volume']['value'], {'np': np}, locals_dict)
+                TWC_SWEPT_VOLUME = _cache['ALL', 'twc_swept_volume']['value'].evaluate(locals_dict)
                 locals_dict = locals()
-                twc_substrate = eval(_cache['ALL', 'twc_substrate']['value'], {'np': np}, locals_dict) \
+                twc_substrate = _cache['ALL', 'twc_substrate']['value'].evaluate(locals_dict) \
                                 * adj_factor_sub * learn
-                twc_washcoat = eval(_cache['ALL', 'twc_washcoat']['value'], {'np': np}, locals_dict) \
+                twc_washcoat = _cache['ALL', 'twc_washcoat']['value'].evaluate(locals_dict) \
                                * adj_factor_wash * learn
-                twc_canning = eval(_cache['ALL', 'twc_canning']['value'], {'np': np}, locals_dict) \
+                twc_canning = _cache['ALL', 'twc_canning']['value'].evaluate(locals_dict) \
                               * adj_factor_can * learn
-                twc_pgm = eval(_cache['ALL', 'twc_pgm']['value'], {'np': np}, locals_dict)
+                twc_pgm = _cache['ALL', 'twc_pgm']['value'].evaluate(locals_dict)
                 twc_cost = (twc_substrate + twc_washcoat + twc_canning + twc_pgm)
 
                 # gpf cost
                 adj_factor_gpf = _cache['ALL', 'gpf_cost']['dollar_adjustment']
                 locals_dict = locals()
-                gpf_cost = eval(_cache['ALL', 'gpf_cost']['value'], {'np': np}, locals_dict) \
+                gpf_cost = _cache['ALL', 'gpf_cost']['value'].evaluate(locals_dict) \
                            * adj_factor_gpf * learn
 
             # diesel exhaust aftertreatment cost
@@ -324,7 +330,7 @@ class PowertrainCost(OMEGABase):
                 adj_factor_diesel_eas = _cache['ALL', 'diesel_aftertreatment_system']['dollar_adjustment']
                 locals_dict = locals()
                 diesel_eas_cost = \
-                    eval(_cache['ALL', 'diesel_aftertreatment_system']['value'], {'np': np}, locals_dict) * \
+                    _cache['ALL', 'diesel_aftertreatment_system']['value'].evaluate(locals_dict) * \
                     adj_factor_diesel_eas * learn
 
         if powertrain_type in ['MHEV', 'HEV', 'PHEV', 'BEV']:
@@ -340,19 +346,11 @@ class PowertrainCost(OMEGABase):
             elif powertrain_type == 'MHEV':
                 obc_kw = 0
             elif powertrain_type == 'PHEV':
-                obc_kw = 1.9
-                if KWH < 10:
-                    obc_kw = 1.1
-                elif KWH < 7:
-                    obc_kw = 0.7
+                obc_kw = (KWH < 10) * 1.1 + (KWH >= 10) * 1.9
             else:
-                obc_kw = 19
-                if KWH < 100:
-                    obc_kw = 11
-                elif KWH < 70:
-                    obc_kw = 7
+                obc_kw = (KWH < 100) * 11 + (KWH >= 100) * 19
 
-            dcdc_converter_kw = eval(_cache[powertrain_type, 'DCDC_converter_kW']['value'], {'np': np}, locals_dict)
+            dcdc_converter_kw = _cache[powertrain_type, 'DCDC_converter_kW']['value'].evaluate(locals_dict)
 
             OBC_AND_DCDC_CONVERTER_KW = dcdc_converter_kw + obc_kw
 
@@ -361,7 +359,7 @@ class PowertrainCost(OMEGABase):
             # battery cost
             if powertrain_type in ['MHEV', 'HEV', 'PHEV', 'BEV']:
                 # battery_cost_scaler_dict \
-                #     = eval(_cache['ALL', 'battery_cost_scalers']['value'], {'np': np}, locals_dict)
+                #     = _cache['ALL', 'battery_cost_scalers']['value'].evaluate(locals_dict)
                 #
                 # if model_year in battery_cost_scaler_dict['scaler'].keys():
                 #     cost_scaler = battery_cost_scaler_dict['scaler'][model_year]
@@ -379,11 +377,11 @@ class PowertrainCost(OMEGABase):
                 #     PowertrainCost.battery_cost_scalers[model_year] = cost_scaler
 
                 adj_factor = _cache[powertrain_type, 'battery']['dollar_adjustment']
-                battery_cost = eval(_cache[powertrain_type, 'battery']['value'], {'np': np}, locals_dict) \
+                battery_cost = _cache[powertrain_type, 'battery']['value'].evaluate(locals_dict) \
                                * adj_factor * learning_pev_battery_scaling_factor
 
             if powertrain_type == 'BEV':
-                battery_offset_dict = eval(_cache[powertrain_type, 'battery_offset']['value'], {'np': np}, locals_dict)
+                battery_offset_dict = _cache[powertrain_type, 'battery_offset']['value'].evaluate(locals_dict)
                 battery_offset_min_year = min(battery_offset_dict['dollars_per_kwh'].keys())
                 battery_offset_max_year = max(battery_offset_dict['dollars_per_kwh'].keys())
                 if battery_offset_min_year <= model_year <= battery_offset_max_year:
@@ -393,81 +391,81 @@ class PowertrainCost(OMEGABase):
             # electrified powertrain cost
             adj_factor = _cache[powertrain_type, f'motor_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'motor_{tractive_motor}']['quantity']
-            motor_cost = eval(_cache[powertrain_type, f'motor_{tractive_motor}']['value'], {'np': np}, locals_dict) \
+            motor_cost = _cache[powertrain_type, f'motor_{tractive_motor}']['value'].evaluate(locals_dict) \
                          * adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, f'inverter_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'inverter_{tractive_motor}']['quantity']
             inverter_cost = \
-                eval(_cache[powertrain_type, f'inverter_{tractive_motor}']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, f'inverter_{tractive_motor}']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, f'induction_motor_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'induction_motor_{tractive_motor}']['quantity']
             induction_motor_cost = \
-                eval(_cache[powertrain_type, f'induction_motor_{tractive_motor}']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, f'induction_motor_{tractive_motor}']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, f'induction_inverter_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'induction_inverter_{tractive_motor}']['quantity']
             induction_inverter_cost = \
-                eval(_cache[powertrain_type, f'induction_inverter_{tractive_motor}']['value'],
-                     {'np': np}, locals_dict) * adj_factor * learn * quantity
+                _cache[powertrain_type, f'induction_inverter_{tractive_motor}']['value'].evaluate(locals_dict) * \
+                adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'OBC_and_DCDC_converter']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'OBC_and_DCDC_converter']['quantity']
             obc_and_dcdc_converter_cost = \
-                eval(_cache[powertrain_type, 'OBC_and_DCDC_converter']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'OBC_and_DCDC_converter']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'HV_orange_cables']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'HV_orange_cables']['quantity']
             hv_orange_cables_cost = \
-                eval(_cache[powertrain_type, 'HV_orange_cables']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'HV_orange_cables']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, f'single_speed_gearbox_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'single_speed_gearbox_{tractive_motor}']['quantity']
             single_speed_gearbox_cost = \
-                eval(_cache[powertrain_type, f'single_speed_gearbox_{tractive_motor}']['value'],
-                     {'np': np}, locals_dict) * adj_factor * learn * quantity
+                _cache[powertrain_type, f'single_speed_gearbox_{tractive_motor}']['value'].evaluate(locals_dict) * \
+                adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, f'powertrain_cooling_loop_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'powertrain_cooling_loop_{tractive_motor}']['quantity']
             powertrain_cooling_loop_cost = \
-                eval(_cache[powertrain_type, f'powertrain_cooling_loop_{tractive_motor}']['value'],
-                     {'np': np}, locals_dict) * adj_factor * learn * quantity
+                _cache[powertrain_type, f'powertrain_cooling_loop_{tractive_motor}']['value'].evaluate(locals_dict) * \
+                adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'charging_cord_kit']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'charging_cord_kit']['quantity']
             charging_cord_kit_cost = \
-                eval(_cache[powertrain_type, 'charging_cord_kit']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'charging_cord_kit']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'DC_fast_charge_circuitry']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'DC_fast_charge_circuitry']['quantity']
             dc_fast_charge_circuitry_cost = \
-                eval(_cache[powertrain_type, 'DC_fast_charge_circuitry']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'DC_fast_charge_circuitry']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'power_management_and_distribution']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'power_management_and_distribution']['quantity']
             power_management_and_distribution_cost = \
-                eval(_cache[powertrain_type, 'power_management_and_distribution']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'power_management_and_distribution']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = _cache[powertrain_type, 'brake_sensors_actuators']['dollar_adjustment']
             quantity = _cache[powertrain_type, 'brake_sensors_actuators']['quantity']
             brake_sensors_actuators_cost = \
-                eval(_cache[powertrain_type, 'brake_sensors_actuators']['value'], {'np': np}, locals_dict) *\
+                _cache[powertrain_type, 'brake_sensors_actuators']['value'].evaluate(locals_dict) *\
                 adj_factor * learn * quantity
 
             adj_factor = \
                 _cache[powertrain_type, f'additional_pair_of_half_shafts_{tractive_motor}']['dollar_adjustment']
             quantity = _cache[powertrain_type, f'additional_pair_of_half_shafts_{tractive_motor}']['quantity']
             additional_pair_of_half_shafts_cost = \
-                eval(_cache[powertrain_type, f'additional_pair_of_half_shafts_{tractive_motor}']['value'],
-                     {'np': np}, locals_dict) * adj_factor * learn * quantity
+                _cache[powertrain_type, f'additional_pair_of_half_shafts_{tractive_motor}']['value'] \
+                .evaluate(locals_dict) * adj_factor * learn * quantity
 
             emachine_cost = motor_cost + induction_motor_cost
 
@@ -480,29 +478,29 @@ class PowertrainCost(OMEGABase):
 
         # ac leakage cost
         adj_factor = _cache['ALL', 'ac_leakage']['dollar_adjustment']
-        ac_leakage_cost = eval(_cache['ALL', 'ac_leakage']['value'], {'np': np}, locals_dict) \
+        ac_leakage_cost = _cache['ALL', 'ac_leakage']['value'].evaluate(locals_dict) \
                           * adj_factor * learning_factor_ice
 
         # ac efficiency cost
         adj_factor = _cache['ALL', 'ac_efficiency']['dollar_adjustment']
-        ac_efficiency_cost = eval(_cache['ALL', 'ac_efficiency']['value'], {'np': np}, locals_dict) \
+        ac_efficiency_cost = _cache['ALL', 'ac_efficiency']['value'].evaluate(locals_dict) \
                              * adj_factor * learning_factor_ice
 
         # low voltage battery and hvac
         adj_factor = _cache[powertrain_type, 'LV_battery']['dollar_adjustment']
         quantity = _cache[powertrain_type, 'LV_battery']['quantity']
-        lv_battery_cost = eval(_cache[powertrain_type, 'LV_battery']['value'], {'np': np}, locals_dict) \
+        lv_battery_cost = _cache[powertrain_type, 'LV_battery']['value'].evaluate(locals_dict) \
                           * adj_factor * learn * quantity
 
         adj_factor = _cache[powertrain_type, 'HVAC']['dollar_adjustment']
         quantity = _cache[powertrain_type, 'HVAC']['quantity']
-        hvac_cost = eval(_cache[powertrain_type, 'HVAC']['value'], {'np': np}, locals_dict) \
+        hvac_cost = _cache[powertrain_type, 'HVAC']['value'].evaluate(locals_dict) \
                     * adj_factor * learn * quantity
 
         diesel_engine_cost_scaler = 1
         if diesel_flag == 1:
             diesel_engine_cost_scaler = \
-                eval(_cache['ALL', 'diesel_engine_cost_scaler']['value'], {'np': np}, locals_dict)
+                _cache['ALL', 'diesel_engine_cost_scaler']['value'].evaluate(locals_dict)
 
         engine_cost = (cyl_cost + liter_cost) * turb_scaler * diesel_engine_cost_scaler \
                       + deac_pd_cost + deac_fc_cost \
@@ -517,6 +515,49 @@ class PowertrainCost(OMEGABase):
 
         return engine_cost, driveline_cost, emachine_cost, battery_cost, electrified_driveline_cost
 
+    @staticmethod
+    def calc_costs(vehicle, pkg_df):
+        """
+        Calculate powertrain costs for a set of packages, e.g. a cost cloud.  Packages are grouped by powertrain type
+        and transmission and the costs for each group are calculated as arrays by ``calc_cost()``.
+
+        Args:
+            vehicle (Vehicle): the vehicle to calc costs for
+            pkg_df (DataFrame): the necessary information for developing cost estimates, including the
+                ``powertrain_type`` of each package
+
+        Returns:
+            An array of cost values, one row per package and one column per cost term returned by ``calc_cost()``
+
+        """
+        trans_flags = [tf for tf in ['trx10', 'trx11', 'trx12', 'trx21', 'trx22', 'ecvt'] if tf in pkg_df]
+
+        group_df = pkg_df[['powertrain_type'] + trans_flags].fillna(0)
+
+        pkg_data = dict((c, pkg_df[c].values) for c in pkg_df.columns)
+
+        costs = np.zeros((len(pkg_df), 5))
+
+        for group_key, group_rows in group_df.groupby(list(group_df.columns), sort=False).indices.items():
+            if not isinstance(group_key, tuple):
+                group_key = (group_key,)
+
+            group_info = dict(zip(group_df.columns, group_key))
+            powertrain_type = group_info['powertrain_type']
+
+            trans = None
+            if powertrain_type in ['ICE', 'HEV', 'PHEV', 'MHEV']:
+                trans = get_trans(group_info)
+
+            group_pkg_info = dict((c, v[group_rows]) for c, v in pkg_data.items())
+
+            group_costs = PowertrainCost.calc_cost(vehicle, group_pkg_info, powertrain_type, trans=trans)
+
+            for idx, cost in enumerate(group_costs):
+                costs[group_rows, idx] = cost
+
+        return costs
+
     @staticmethod
     def init_from_file(filename, verbose=False):
         """
@@ -575,6 +616,9 @@ class PowertrainCost(OMEGABase):
                         adj_factor = ImplictPriceDeflators.dollar_adjustment_factor(int(cost_info['dollar_basis']))
                         _cache[cost_key]['dollar_adjustment'] = adj_factor
 
-                    _cache[cost_key]['value'] = compile(str(cost_info['value']), '<string>', 'eval')
+                    _cache[cost_key]['value'] = CompiledExpression(cost_info['value'], name='%s %s' % cost_key)
+
+                CompiledExpression.log_compile_report([cost_info['value'] for cost_info in _cache.values()],
+                                                      verbose=verbose)
 
         return template_errors
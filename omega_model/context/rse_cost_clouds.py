@@ -181,8 +181,13 @@ from policy.drive_cycle_ballast import DriveCycleBallast
 
 from producer.vehicles import VehicleOnroadCalculations, Vehicle, is_up_for_redesign
 
+from common.omega_cache import get_cloud_cache, get_cloud_inputs_key, get_object_attributes_key, hash_values
+
 _cache = dict()
 
+# stacked (all cost curve classes at once) RSE templates and coefficients, by powertrain type
+_rse_stack_cache = dict()
+
 # define list of non-numeric columns to ignore during frontier creation since they goof up pandas auto-typing of
 # columns when switching between Series and DataFrame representations
 
@@ -208,8 +213,135 @@ class CostCloud(OMEGABase, CostCloudBase):
     cloud_non_numeric_columns = ['cost_curve_class', 'structure_material', 'powertrain_type', 'vehicle_name']
     cloud_non_numeric_data_columns = ['cost_curve_class', 'structure_material', 'powertrain_type']
 
+    # for reporting powertrain cost breakdowns, in the order returned by ``PowertrainCost.calc_cost()``
+    powertrain_cost_terms = ['engine_cost', 'driveline_cost', 'emachine_cost', 'battery_cost',
+                             'electrified_driveline_cost']
+
     tech_flags = set()
 
+    # vehicle attributes that do not affect the vehicle's cost cloud, in addition to the tech flags
+    cloud_cache_excluded_attributes = {'cloud_cache_key', 'projected_sales', 'initial_registered_count',
+                                       '_initial_registered_count', 'model_year_prevalence', 'in_production',
+                                       'target_co2e_grams_per_mile', 'tech_option_iteration_num'}
+
+    convergence_tolerance = 0.01  # relative tolerance for cloud point mass, rated hp and battery size convergence
+
+    @staticmethod
+    def _get_initial_rated_hp(vehicle):
+        """
+        Get the starting rated horsepower for cloud point convergence, based on the vehicle's current tech flags.
+
+        Args:
+            vehicle (Vehicle): the vehicle, with tech flags set
+
+        Returns:
+            Starting rated horsepower
+
+        """
+        if vehicle.bev:
+            rated_hp = vehicle.motor_kw * 1.34102
+        elif vehicle.ice:
+            rated_hp = vehicle.eng_rated_hp
+        else:  # RV
+            rated_hp = vehicle.eng_rated_hp + vehicle.motor_kw * 1.34102
+
+        return rated_hp
+
+    @staticmethod
+    def _get_powertrain_type(vehicle):
+        """
+        Get the powertrain type implied by the vehicle's current tech flags.
+
+        Args:
+            vehicle (Vehicle): the vehicle, with tech flags set
+
+        Returns:
+            Powertrain type, e.g. 'BEV', 'HEV', 'PHEV' or 'ICE'
+
+        """
+        if vehicle.bev:
+            powertrain_type = 'BEV'
+        elif vehicle.hev or vehicle.mhev:  # mhev/hev have same mass calcs for now
+            powertrain_type = 'HEV'
+        elif vehicle.phev:
+            powertrain_type = 'PHEV'
+        # elif vehicle.fcv:
+        #     powertrain_type = 'FCV'
+        else:
+            powertrain_type = 'ICE'
+
+        return powertrain_type
+
+    @staticmethod
+    def _init_rse_stack(powertrain_type):
+        """
+        Convert each RSE column of the given powertrain type into template expressions whose numeric literals are
+        replaced by per cost curve class coefficients, so that the RSE can be evaluated for points from many cost curve
+        classes in one vectorized call.  Cost curve classes whose expressions share a common form are grouped
+        together, e.g. a column that is a constant for some classes and a polynomial for others has two groups.
+
+        Args:
+            powertrain_type (str): e.g. 'ICE', 'BEV', 'PHEV'
+
+        Returns:
+            Nothing, updates ``_rse_stack_cache[powertrain_type]``
+
+        """
+        import ast
+
+        class _CoefficientNamer(ast.NodeTransformer):
+            def __init__(self):
+                self.coefficients = []
+
+            def _name(self, value):
+                self.coefficients.append(value)
+                return ast.Name(id='_c%d' % (len(self.coefficients) - 1), ctx=ast.Load())
+
+            def visit_UnaryOp(self, node):
+                if isinstance(node.op, (ast.USub, ast.UAdd)) and isinstance(node.operand, ast.Constant) and \
+                        type(node.operand.value) in (int, float):
+                    return self._name(-node.operand.value if isinstance(node.op, ast.USub) else node.operand.value)
+                return self.generic_visit(node)
+
+            def visit_Constant(self, node):
+                if type(node.value) in (int, float):
+                    return self._name(node.value)
+                return node
+
+        ccc_names = list(_cache[powertrain_type])
+
+        _rse_stack_cache[powertrain_type] = {'ccc_index': dict((ccc, idx) for idx, ccc in enumerate(ccc_names)),
+                                             'rse': dict()}
+
+        if not ccc_names:
+            return
+
+        rse_names = _cache[powertrain_type][ccc_names[0]]['rse_names']
+
+        # template -> list of coefficient lists, by RSE name
+        templates = dict((rn, dict()) for rn in rse_names)
+        group_index = dict((rn, []) for rn in rse_names)
+        group_row = dict((rn, []) for rn in rse_names)
+        for ccc in ccc_names:
+            rse_tuple = ast.parse(_cache[powertrain_type][ccc]['rse_tuple'], mode='eval').body
+            rse_exprs = rse_tuple.elts if isinstance(rse_tuple, ast.Tuple) else [rse_tuple]
+            for rn, rse_expr in zip(_cache[powertrain_type][ccc]['rse_names'], rse_exprs):
+                namer = _CoefficientNamer()
+                template = ast.unparse(namer.visit(rse_expr))
+                if template not in templates[rn]:
+                    templates[rn][template] = []
+                group_index[rn].append(list(templates[rn]).index(template))
+                group_row[rn].append(len(templates[rn][template]))
+                templates[rn][template].append(namer.coefficients)
+
+        for rn in rse_names:
+            _rse_stack_cache[powertrain_type]['rse'][rn] = {
+                'groups': [(compile(template, '<string>', 'eval'), np.array(coefficients, dtype=float))
+                           for template, coefficients in templates[rn].items()],
+                'group_index': np.array(group_index[rn]),
+                'group_row': np.array(group_row[rn]),
+            }
+
     @staticmethod
     def init_from_ice_file(filename, powertrain_type='ICE', verbose=False):
         """
@@ -287,6 +419,8 @@ class CostCloud(OMEGABase, CostCloudBase):
 
                     CostCloud.tech_flags.update(tech_flags)
 
+                CostCloud._init_rse_stack(powertrain_type)
+
         return template_errors
 
     @staticmethod
@@ -361,6 +495,8 @@ class CostCloud(OMEGABase, CostCloudBase):
 
                     CostCloud.tech_flags.update(tech_flags)
 
+                CostCloud._init_rse_stack(powertrain_type)
+
         return template_errors
 
     @staticmethod
@@ -396,6 +532,7 @@ class CostCloud(OMEGABase, CostCloudBase):
 
         """
         _cache.clear()
+        _rse_stack_cache.clear()
 
         CostCloud.tech_flags = set()
         CostCloud.cost_cloud_data_columns = set()
@@ -413,57 +550,25 @@ class CostCloud(OMEGABase, CostCloudBase):
         return template_errors
 
     @staticmethod
-    def get_cloud(vehicle):
+    def calc_cloud_points(vehicle, cost_curve_classes, structure_materials, vehicle_footprints, rlhp20s, rlhp60s):
         """
-        Retrieve cost cloud for the given vehicle.
+        Calculate cost cloud points one at a time, iterating each point to mass, rated horsepower and battery size
+        convergence before moving on to the next.
 
         Args:
-            vehicle (Vehicle): the vehicle to get the cloud for
+            vehicle (Vehicle): the vehicle to calculate the cloud for
+            cost_curve_classes (dict): cost curve class data from ``_cache``, by cost curve class
+            structure_materials (list): structure materials to sweep, e.g. ['steel', 'aluminum']
+            vehicle_footprints (list): footprints to sweep, square feet
+            rlhp20s (list): 20 mph roadload horsepowers to sweep
+            rlhp60s (list): 60 mph roadload horsepowers to sweep
 
         Returns:
-            Copy of the requested cost cload data.
+            Cost cloud DataFrame, including powertrain costs
 
         """
-
-        vehicle_rlhp20 = \
-            calc_roadload_hp(vehicle.base_year_target_coef_a, vehicle.base_year_target_coef_b,
-                             vehicle.base_year_target_coef_c, 20)
-
-        vehicle_rlhp60 = \
-            calc_roadload_hp(vehicle.base_year_target_coef_a, vehicle.base_year_target_coef_b,
-                             vehicle.base_year_target_coef_c, 60)
-
-        if is_up_for_redesign(vehicle):
-            # sweep vehicle params
-            rlhp20s = np.unique((vehicle_rlhp20 * omega_globals.options.rlhp20_min_scaler,
-                                 vehicle_rlhp20,
-                                 vehicle_rlhp20 * omega_globals.options.rlhp20_max_scaler))
-
-            rlhp60s = np.unique((vehicle_rlhp60 * omega_globals.options.rlhp60_min_scaler,
-                                 vehicle_rlhp60,
-                                 vehicle_rlhp60 * omega_globals.options.rlhp60_max_scaler))
-
-            vehicle_footprints = \
-                np.unique((vehicle.base_year_footprint_ft2 * omega_globals.options.footprint_min_scaler,
-                           vehicle.base_year_footprint_ft2,
-                           vehicle.base_year_footprint_ft2 * omega_globals.options.footprint_max_scaler))
-
-            structure_materials = MassScaling.structure_materials
-
-            cost_curve_classes = _cache[vehicle.fueling_class]
-
-            vehicle.prior_redesign_year = vehicle.model_year
-        else:
-            # maintain vehicle params
-            rlhp20s = [vehicle_rlhp20]
-            rlhp60s = [vehicle_rlhp60]
-            vehicle_footprints = [vehicle.footprint_ft2]
-            structure_materials = [vehicle.structure_material]
-
-            cost_curve_classes = {vehicle.cost_curve_class: _cache[vehicle.fueling_class][vehicle.cost_curve_class]}
-
         # convergence terms init
-        convergence_tolerance = 0.01
+        convergence_tolerance = CostCloud.convergence_tolerance
         battery_kwh = vehicle.battery_kwh  # for now...
 
         # build a list of dicts that will be dumped into the cloud at the end faster than sequentially
@@ -484,23 +589,9 @@ class CostCloud(OMEGABase, CostCloudBase):
             for tf in tech_flags:
                 vehicle.__setattr__(tf, tech_flags[tf])
 
-            if vehicle.bev:
-                rated_hp = vehicle.motor_kw * 1.34102
-            elif vehicle.ice:
-                rated_hp = vehicle.eng_rated_hp
-            else:  # RV
-                rated_hp = vehicle.eng_rated_hp + vehicle.motor_kw * 1.34102
-
-            if vehicle.bev:
-                vehicle.powertrain_type = 'BEV'
-            elif vehicle.hev or vehicle.mhev:  # mhev/hev have same mass calcs for now
-                vehicle.powertrain_type = 'HEV'
-            elif vehicle.phev:
-                vehicle.powertrain_type = 'PHEV'
-            # elif vehicle.fcv:
-            #     vehicle.powertrain_type = 'FCV'
-            else:
-                vehicle.powertrain_type = 'ICE'
+            rated_hp = CostCloud._get_initial_rated_hp(vehicle)
+
+            vehicle.powertrain_type = CostCloud._get_powertrain_type(vehicle)
 
             for structure_material in structure_materials:
                 for footprint_ft2 in vehicle_footprints:
@@ -623,28 +714,370 @@ class CostCloud(OMEGABase, CostCloudBase):
                             powertrain_costs = \
                                 PowertrainCost.calc_cost(vehicle, cloud_point,
                                                          cloud_point['powertrain_type'])  # includes battery cost
-                            powertrain_cost_terms = ['engine_cost', 'driveline_cost', 'emachine_cost', 'battery_cost',
-                                                     'electrified_driveline_cost']
-                            for idx, ct in enumerate(powertrain_cost_terms):
+                            for idx, ct in enumerate(CostCloud.powertrain_cost_terms):
                                 cloud_point[ct] = powertrain_costs[idx]
 
                             cloud_points.append(cloud_point)
 
-        cost_cloud = pd.DataFrame(cloud_points)
+        return pd.DataFrame(cloud_points)
+
+    @staticmethod
+    def calc_cloud_points_batched(vehicle, cost_curve_classes, structure_materials, vehicle_footprints, rlhp20s,
+                                  rlhp60s):
+        """
+        Calculate cost cloud points as arrays covering every cost curve class, structure material, footprint and
+        roadload variant at once.  Mass terms, RSEs and the convergence test are evaluated on the not-yet-converged
+        points of each pass, converged points are masked off and keep the values from their final pass.
+
+        Each point starts from the vehicle's base rated horsepower and battery size rather than from the result of the
+        previously calculated point, so results match ``calc_cloud_points()`` to within the effect of the convergence
+        tolerance on the fixed-point mass iteration, typically well under 0.1% relative on any numeric column.
+
+        Args:
+            vehicle (Vehicle): the vehicle to calculate the cloud for
+            cost_curve_classes (dict): cost curve class data from ``_cache``, by cost curve class
+            structure_materials (list): structure materials to sweep, e.g. ['steel', 'aluminum']
+            vehicle_footprints (list): footprints to sweep, square feet
+            rlhp20s (list): 20 mph roadload horsepowers to sweep
+            rlhp60s (list): 60 mph roadload horsepowers to sweep
+
+        Returns:
+            Cost cloud DataFrame, including powertrain costs, with points in the same order as
+            ``calc_cloud_points()``
+
+        """
+        convergence_tolerance = CostCloud.convergence_tolerance
+
+        ccc_names = list(cost_curve_classes)
+        num_variants = len(structure_materials) * len(vehicle_footprints) * len(rlhp20s) * len(rlhp60s)
+        num_points = len(ccc_names) * num_variants
+
+        # per cost curve class tech flags, initial rated hp and powertrain type
+        ccc_tech_flags = []
+        ccc_rated_hp = []
+        ccc_powertrain_type = []
+        for ccc in ccc_names:
+            tech_flags = cost_curve_classes[ccc]['tech_flags'].to_dict()
+            # RV
+            tech_flags['ac_leakage'] = 1
+            tech_flags['ac_efficiency'] = 1
+
+            for tf in CostCloud.tech_flags:
+                vehicle.__setattr__(tf, None)
+
+            for tf in tech_flags:
+                vehicle.__setattr__(tf, tech_flags[tf])
+
+            ccc_tech_flags.append(tech_flags)
+            ccc_rated_hp.append(CostCloud._get_initial_rated_hp(vehicle))
+            ccc_powertrain_type.append(CostCloud._get_powertrain_type(vehicle))
+
+        # expand sweeps to per-point arrays, in the same order as the nested loops in ``calc_cloud_points()``
+        ccc_index, structure_material, footprint_ft2, rlhp20, rlhp60 = \
+            [a.ravel() for a in np.meshgrid(np.arange(len(ccc_names)), np.array(structure_materials),
+                                            np.array(vehicle_footprints, dtype=float),
+                                            np.array(rlhp20s, dtype=float), np.array(rlhp60s, dtype=float),
+                                            indexing='ij')]
+
+        powertrain_type = np.array(ccc_powertrain_type)[ccc_index]
+        is_bev = powertrain_type == 'BEV'
+        tech_flag_names = list(ccc_tech_flags[0])
+        tech_flag_values = \
+            dict((tf, np.array([ccc_tech_flags[i][tf] for i in range(len(ccc_names))])[ccc_index])
+                 for tf in tech_flag_names)
+
+        rated_hp = np.array(ccc_rated_hp, dtype=float)[ccc_index]
+        battery_kwh = np.full(num_points, vehicle.battery_kwh, dtype=float)
+
+        prior_powertrain_mass_lbs = np.ones(num_points)
+        prior_rated_hp = np.ones(num_points)
+        prior_battery_kwh = np.ones(num_points)
+
+        structure_mass_lbs = np.zeros(num_points)
+        battery_mass_lbs = np.zeros(num_points)
+        powertrain_mass_lbs = np.zeros(num_points)
+        delta_glider_non_structure_mass_lbs = np.zeros(num_points)
+        curbweight_lbs = np.zeros(num_points)
+        etw_lbs = np.zeros(num_points)
+
+        rse_names = _cache[vehicle.fueling_class][ccc_names[0]]['rse_names']
+        rse_values = dict((rn, np.zeros(num_points)) for rn in rse_names)
+        stacked_rses = _rse_stack_cache[vehicle.fueling_class]['rse']
+        stack_index = np.array([_rse_stack_cache[vehicle.fueling_class]['ccc_index'][ccc]
+                                for ccc in ccc_names])[ccc_index]
+        battery_sizing_columns = dict()
+
+        converged = np.zeros(num_points, dtype=bool)
+
+        while not converged.all():
+            active = np.flatnonzero(~converged)
+            num_active = len(active)
+
+            # set tech flags and powertrain type in vehicle temporarily, for the active points
+            for tf in tech_flag_names:
+                vehicle.__setattr__(tf, tech_flag_values[tf][active])
+            vehicle.powertrain_type = powertrain_type[active]
+
+            # rated hp sizing ----------------------------------------------------------------------------------------- #
+            mass_terms = MassScaling.calc_mass_terms(vehicle, structure_material[active], rated_hp[active],
+                                                     battery_kwh[active], footprint_ft2[active])
+
+            structure_mass, battery_mass, powertrain_mass, delta_glider_non_structure_mass, \
+                usable_battery_capacity_norm = [np.broadcast_to(mt, num_active) for mt in mass_terms]
+
+            # update curbweight in case it's needed by DriveCycleBallast (medium-duty)
+            vehicle.curbweight_lbs = sum((vehicle.base_year_glider_non_structure_mass_lbs,
+                                          delta_glider_non_structure_mass, powertrain_mass, structure_mass,
+                                          battery_mass))
+
+            # vehicle ballast is f(curbweight_lbs) for medium-duty:
+            vehicle_ballast = DriveCycleBallast.get_ballast_lbs(vehicle)
+
+            rated_hp[active] = vehicle.curbweight_lbs / vehicle.base_year_curbweight_lbs_to_hp
+
+            # set up RSE terms and run RSEs, for all cost curve classes sharing an RSE form at once
+            ETW = vehicle.curbweight_lbs + vehicle_ballast
+
+            RLHP20 = rlhp20[active] / ETW
+            RLHP60 = rlhp60[active] / ETW
+            HP_ETW = rated_hp[active] / ETW
+
+            rse_terms = {'ETW': ETW, 'RLHP20': RLHP20, 'RLHP60': RLHP60, 'HP_ETW': HP_ETW}
+            active_stack_index = stack_index[active]
+            for rn, rse_stack in stacked_rses.items():
+                active_group_index = rse_stack['group_index'][active_stack_index]
+                active_group_row = rse_stack['group_row'][active_stack_index]
+                for group_idx, (rse_code, rse_coefficients) in enumerate(rse_stack['groups']):
+                    if len(rse_stack['groups']) == 1:
+                        group_mask = slice(None)
+                        rse_locals = dict(rse_terms)
+                    else:
+                        group_mask = active_group_index == group_idx
+                        if not group_mask.any():
+                            continue
+                        rse_locals = dict((k, v[group_mask]) for k, v in rse_terms.items())
+                    group_coefficients = rse_coefficients[active_group_row[group_mask]]
+                    rse_locals.update(('_c%d' % i, group_coefficients[:, i])
+                                      for i in range(group_coefficients.shape[1]))
+                    rse_values[rn][active[group_mask]] = eval(rse_code, {}, rse_locals)
+
+            # battery sizing ---------------------------------------------------------------------------------------- #
+            active_bev = is_bev[active]
+            if active_bev.any():  # TODO: or 'PHEV'
+                bev_points = active[active_bev]
+                bev_cloud = dict((rn, rse_values[rn][bev_points]) for rn in rse_names)
+                bev_cloud = vehicle.calc_battery_sizing_onroad_direct_kWh_per_mile(bev_cloud)
+
+                for c in [c for c in bev_cloud if c not in rse_values]:
+                    if c not in battery_sizing_columns:
+                        battery_sizing_columns[c] = np.full(num_points, np.nan)
+                    battery_sizing_columns[c][bev_points] = bev_cloud[c]
+
+                battery_kwh[bev_points] = vehicle.charge_depleting_range_mi * \
+                    battery_sizing_columns['battery_sizing_onroad_direct_kwh_per_mile'][bev_points] / \
+                    usable_battery_capacity_norm[active_bev]
+
+            # determine convergence --------------------------------------------------------------------------------- #
+            active_converged = \
+                (abs(1 - powertrain_mass / prior_powertrain_mass_lbs[active]) <= convergence_tolerance) & \
+                (abs(1 - rated_hp[active] / prior_rated_hp[active]) <= convergence_tolerance)
+
+            active_converged[active_bev] &= \
+                abs(1 - battery_kwh[active[active_bev]] / prior_battery_kwh[active[active_bev]]) < \
+                convergence_tolerance
+
+            prior_powertrain_mass_lbs[active] = powertrain_mass
+            prior_rated_hp[active] = rated_hp[active]
+            prior_battery_kwh[active] = battery_kwh[active]
+
+            structure_mass_lbs[active] = structure_mass
+            battery_mass_lbs[active] = battery_mass
+            powertrain_mass_lbs[active] = powertrain_mass
+            delta_glider_non_structure_mass_lbs[active] = delta_glider_non_structure_mass
+            curbweight_lbs[active] = vehicle.curbweight_lbs
+            etw_lbs[active] = ETW
+
+            converged[active] = active_converged
+
+        # build the cloud as arrays, columns in the same order as ``calc_cloud_points()`` -------------------------- #
+        for tf in tech_flag_names:
+            vehicle.__setattr__(tf, tech_flag_values[tf])
+        vehicle.powertrain_type = powertrain_type
+        vehicle.curbweight_lbs = curbweight_lbs
+
+        cloud = dict(tech_flag_values)
+        cloud['powertrain_type'] = powertrain_type
+        cloud.update(rse_values)
+        cloud.update(battery_sizing_columns)
+
+        cloud = vehicle.calc_cert_values(cloud)
+
+        v = copy.copy(vehicle)
+        target_co2e_Mg_per_vehicle = np.zeros(num_points)
+        for idx in range(num_points):
+            v.footprint_ft2 = footprint_ft2[idx]
+            v.curbweight_lbs = curbweight_lbs[idx]
+            target_co2e_Mg_per_vehicle[idx] = \
+                omega_globals.options.VehicleTargets.calc_target_co2e_Mg(v, sales_variants=1)
+
+        cloud['target_co2e_Mg_per_vehicle'] = target_co2e_Mg_per_vehicle
+
+        cloud['cert_co2e_Mg_per_vehicle'] = \
+            omega_globals.options.VehicleTargets.calc_cert_co2e_Mg(
+                v, co2_gpmi_variants=np.broadcast_to(cloud['cert_co2e_grams_per_mile'], num_points), sales_variants=1)
+
+        cloud['credits_co2e_Mg_per_vehicle'] = \
+            cloud['target_co2e_Mg_per_vehicle'] - cloud['cert_co2e_Mg_per_vehicle']
+
+        # required cloud data for powertrain costing, etc:
+        cloud['cost_curve_class'] = np.array(ccc_names, dtype=object)[ccc_index]
+        cloud['structure_mass_lbs'] = structure_mass_lbs
+        cloud['footprint_ft2'] = footprint_ft2
+        cloud['structure_material'] = structure_material.astype(object)
+        cloud['curbweight_lbs'] = curbweight_lbs
+        cloud['rated_hp'] = rated_hp
+        # battery size and total motor/generator power come from RSEs for ICE/HEV, battery size and motor power
+        # determined by vehicle and iterative range calculation for BEV
+        cloud['battery_kwh'] = np.where(is_bev, battery_kwh, cloud.get('hev_batt_kwh', 0))
+        cloud['motor_kw'] = np.where(is_bev, rated_hp / 1.34102, cloud.get('hev_motor_kw', 0))
+
+        # informative data for troubleshooting:
+        if vehicle.model_year in omega_globals.options.log_vehicle_cloud_years or \
+                omega_globals.options.log_vehicle_cloud_years == 'all':
+            cloud['vehicle_id'] = vehicle.vehicle_id
+            cloud['vehicle_base_year_id'] = vehicle.base_year_vehicle_id
+            cloud['vehicle_name'] = vehicle.name
+            cloud['model_year'] = vehicle.model_year
+            cloud['delta_glider_non_structure_mass_lbs'] = delta_glider_non_structure_mass_lbs
+            cloud['glider_non_structure_mass_lbs'] = \
+                vehicle.base_year_glider_non_structure_mass_lbs + delta_glider_non_structure_mass_lbs
+            cloud['battery_mass_lbs'] = battery_mass_lbs
+            cloud['powertrain_mass_lbs'] = powertrain_mass_lbs
+            cloud['etw_lbs'] = etw_lbs
+            cloud['vehicle_eng_rated_hp'] = vehicle.eng_rated_hp
+            cloud['vehicle_mot_rated_kw'] = vehicle.motor_kw
+            cloud['rlhp20'] = rlhp20
+            cloud['rlhp60'] = rlhp60
+
+        cost_cloud = pd.DataFrame(cloud, index=range(num_points))
+
+        # leave the vehicle as the per-point calculation would, i.e. with the last point's attributes
+        vehicle.powertrain_type = powertrain_type[-1]
+        vehicle.curbweight_lbs = curbweight_lbs[-1]
+
+        # add powertrain costs
+        powertrain_costs = PowertrainCost.calc_costs(vehicle, cost_cloud)  # includes battery cost
+
+        for idx, ct in enumerate(CostCloud.powertrain_cost_terms):
+            cost_cloud[ct] = powertrain_costs[:, idx]
+
+        return cost_cloud
+
+    @staticmethod
+    def get_cloud(vehicle):
+        """
+        Retrieve cost cloud for the given vehicle.
+
+        Cloud points are calculated by ``calc_cloud_points_batched()`` if
+        ``omega_globals.options.cost_cloud_batch_mode`` is ``True``, else by ``calc_cloud_points()``.
+
+        If the on-disk cloud cache is enabled (see ``common.omega_cache``) the cloud points and costs, up to but not
+        including the producer generalized cost, are reused from prior calculations with the same vehicle attributes,
+        cloud parameters and cloud-related session inputs.
+
+        Args:
+            vehicle (Vehicle): the vehicle to get the cloud for
+
+        Returns:
+            Copy of the requested cost cload data.
+
+        """
+
+        vehicle_rlhp20 = \
+            calc_roadload_hp(vehicle.base_year_target_coef_a, vehicle.base_year_target_coef_b,
+                             vehicle.base_year_target_coef_c, 20)
+
+        vehicle_rlhp60 = \
+            calc_roadload_hp(vehicle.base_year_target_coef_a, vehicle.base_year_target_coef_b,
+                             vehicle.base_year_target_coef_c, 60)
+
+        if is_up_for_redesign(vehicle):
+            # sweep vehicle params
+            rlhp20s = np.unique((vehicle_rlhp20 * omega_globals.options.rlhp20_min_scaler,
+                                 vehicle_rlhp20,
+                                 vehicle_rlhp20 * omega_globals.options.rlhp20_max_scaler))
+
+            rlhp60s = np.unique((vehicle_rlhp60 * omega_globals.options.rlhp60_min_scaler,
+                                 vehicle_rlhp60,
+                                 vehicle_rlhp60 * omega_globals.options.rlhp60_max_scaler))
+
+            vehicle_footprints = \
+                np.unique((vehicle.base_year_footprint_ft2 * omega_globals.options.footprint_min_scaler,
+                           vehicle.base_year_footprint_ft2,
+                           vehicle.base_year_footprint_ft2 * omega_globals.options.footprint_max_scaler))
+
+            structure_materials = MassScaling.structure_materials
+
+            cost_curve_classes = _cache[vehicle.fueling_class]
+
+            vehicle.prior_redesign_year = vehicle.model_year
+        else:
+            # maintain vehicle params
+            rlhp20s = [vehicle_rlhp20]
+            rlhp60s = [vehicle_rlhp60]
+            vehicle_footprints = [vehicle.footprint_ft2]
+            structure_materials = [vehicle.structure_material]
+
+            cost_curve_classes = {vehicle.cost_curve_class: _cache[vehicle.fueling_class][vehicle.cost_curve_class]}
+
+        cloud_cache = get_cloud_cache('cost_clouds')
+
+        cached_cloud = None
+        if cloud_cache:
+            excluded_attributes = CostCloud.tech_flags | CostCloud.cloud_cache_excluded_attributes
+            vehicle.cloud_cache_key = \
+                hash_values(get_cloud_inputs_key(),
+                            get_object_attributes_key(vehicle, excluded_attributes,
+                                                      vehicle.frontier_record_attributes),
+                            sorted(cost_curve_classes), structure_materials, vehicle_footprints, rlhp20s, rlhp60s)
+            cached_cloud = cloud_cache.get(vehicle.cloud_cache_key)
+
+        if cached_cloud is not None:
+            # restore the cloud and the vehicle attributes updated by the cloud calculations
+            cost_cloud, updated_vehicle_attributes = cached_cloud
+            for k, v in updated_vehicle_attributes.items():
+                vehicle.__setattr__(k, v)
+        else:
+            prior_vehicle_attributes = dict(vars(vehicle))
+
+            if omega_globals.options.cost_cloud_batch_mode:
+                cost_cloud = CostCloud.calc_cloud_points_batched(vehicle, cost_curve_classes, structure_materials,
+                                                                 vehicle_footprints, rlhp20s, rlhp60s)
+            else:
+                cost_cloud = CostCloud.calc_cloud_points(vehicle, cost_curve_classes, structure_materials,
+                                                         vehicle_footprints, rlhp20s, rlhp60s)
+
+            glider_costs = \
+                GliderCost.calc_cost(vehicle, cost_cloud)  # includes structure_cost and glider_non_structure_cost
+
+            glider_cost_terms = ['structure_cost', 'glider_non_structure_cost']
+            for idx, ct in enumerate(glider_cost_terms):
+                cost_cloud[ct] = glider_costs[idx]
 
-        glider_costs = \
-            GliderCost.calc_cost(vehicle, cost_cloud)  # includes structure_cost and glider_non_structure_cost
+            powertrain_cost_terms = list(CostCloud.powertrain_cost_terms)
 
-        glider_cost_terms = ['structure_cost', 'glider_non_structure_cost']
-        for idx, ct in enumerate(glider_cost_terms):
-            cost_cloud[ct] = glider_costs[idx]
+            cost_terms = powertrain_cost_terms + glider_cost_terms
 
-        cost_terms = powertrain_cost_terms + glider_cost_terms
+            cost_cloud['new_vehicle_mfr_cost_dollars'] = cost_cloud[cost_terms].sum(axis=1)
 
-        cost_cloud['new_vehicle_mfr_cost_dollars'] = cost_cloud[cost_terms].sum(axis=1)
+            powertrain_cost_terms.remove('battery_cost')
+            cost_cloud['powertrain_cost'] = cost_cloud[powertrain_cost_terms].sum(axis=1)
 
-        powertrain_cost_terms.remove('battery_cost')
-        cost_cloud['powertrain_cost'] = cost_cloud[powertrain_cost_terms].sum(axis=1)
+            if cloud_cache:
+                updated_vehicle_attributes = \
+                    dict((k, v) for k, v in vars(vehicle).items()
+                         if k not in prior_vehicle_attributes or prior_vehicle_attributes[k] is not v)
+                cloud_cache.put(vehicle.cloud_cache_key, cost_cloud, updated_vehicle_attributes)
 
         # calculate producer generalized cost
         cost_cloud = omega_globals.options.ProducerGeneralizedCost.\
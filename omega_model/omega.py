@@ -13,6 +13,8 @@ Runs a single session, writes info to log files and the console, executes sessio
 print('importing %s' % __file__)
 
 import sys, os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 path = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(path, '..'))  # picks up omega_model sub-packages
@@ -28,11 +30,15 @@ import postproc_session
 
 def calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id, producer_decision,
                                             cross_subsidy_options_and_response, producer_consumer_iteration_num,
-                                            iteration_log, node_name='', verbose=False):
+                                            iteration_log, node_name='', verbose=False, cross_subsidy_steps=None):
     """
     Traverse the market class tree and generate cross subsidy multipliers and the associated consumer response for
     responsive market categories/classes
 
+    If ``cross_subsidy_steps`` is provided then the cross subsidy searches (and only-child responses) are not run,
+    they are added to ``cross_subsidy_steps`` instead, in tree traversal order, see
+    ``calc_parallel_cross_subsidy_options_and_response()``.
+
     Args:
         calendar_year (int): the year in which the compliance calculations take place
         market_class_tree (dict): a dict of CompositeVehicle object lists hiearchically grouped by market categories
@@ -45,6 +51,7 @@ def calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, co
         iteration_log (DataFrame): DataFrame of producer-consumer iteration data
         node_name (str): name of the current node
         verbose (bool): enable additional console output if True
+        cross_subsidy_steps (list): optional list of deferred cross subsidy steps
 
     Returns:
         tuple of ``cross_subsidy_options_and_response``, updated ``iteration_log``
@@ -68,22 +75,22 @@ def calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, co
 
         if all(mc in market_class_data[compliance_id] for mc in cross_subsidy_pair):
             # search cross subsidy options at this level of the tree
-            cross_subsidy_options_and_response, iteration_log = \
-                search_cross_subsidies(calendar_year, compliance_id, node_name, cross_subsidy_pair,
-                                       producer_decision,
-                                       cross_subsidy_options_and_response, producer_consumer_iteration_num,
-                                       iteration_log)
+            step = partial(search_cross_subsidies, calendar_year, compliance_id, node_name, cross_subsidy_pair,
+                           producer_decision)
         elif any(mc in market_class_data[compliance_id] for mc in cross_subsidy_pair):
             # only one child available from the manufacturer for this market class (e.g. ICE or BEV-only)
             only_child = [mc for mc in cross_subsidy_pair if mc in market_class_data[compliance_id]]
-            cross_subsidy_options_and_response = \
-                omega_globals.options.SalesShare.calc_shares(calendar_year, compliance_id, producer_decision,
-                                                             cross_subsidy_options_and_response, node_name,
-                                                             only_child)
-            if type(cross_subsidy_options_and_response) is pd.DataFrame:
-                cross_subsidy_options_and_response = cross_subsidy_options_and_response.loc[0].copy()
+            step = partial(calc_only_child_response, calendar_year, compliance_id, node_name, only_child,
+                           producer_decision)
         else:
-            pass
+            step = None
+
+        if step is not None:
+            if cross_subsidy_steps is not None:
+                cross_subsidy_steps.append(step)
+            else:
+                cross_subsidy_options_and_response, iteration_log = \
+                    step(cross_subsidy_options_and_response, producer_consumer_iteration_num, iteration_log)
 
     else:
         if verbose:
@@ -99,7 +106,125 @@ def calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, co
                 calc_cross_subsidy_options_and_response(calendar_year, market_class_tree[child], compliance_id,
                                                         producer_decision, cross_subsidy_options_and_response,
                                                         producer_consumer_iteration_num, iteration_log,
-                                                        node_name=child, verbose=verbose)
+                                                        node_name=child, verbose=verbose,
+                                                        cross_subsidy_steps=cross_subsidy_steps)
+
+    return cross_subsidy_options_and_response, iteration_log
+
+
+def calc_only_child_response(calendar_year, compliance_id, mcat, only_child, producer_decision,
+                             cross_subsidy_options_and_response, producer_consumer_iteration_num, iteration_log):
+    """
+    Calculate the consumer response for a market category with only one child market class available from the
+    manufacturer (e.g. ICE or BEV-only), no cross subsidy search is required.
+
+    Args:
+        calendar_year (int): the year in which the compliance calculations take place
+        compliance_id (str): name of manufacturer, e.g. 'consolidated_OEM'
+        mcat (str): market category, e.g. 'hauling' / 'non_hauling'
+        only_child (list): list of the available market class, e.g. ['hauling.ICE']
+        producer_decision (Series): result of producer compliance search, *without* consumer response
+        cross_subsidy_options_and_response (DataFrame, Series): initially empty dataframe or Series containing cross
+            subsidy options and response
+        producer_consumer_iteration_num (int): producer-consumer iteration number, unused, for compatibility with
+            ``search_cross_subsidies()``
+        iteration_log (DataFrame): DataFrame of producer-consumer iteration data
+
+    Returns:
+        tuple of ``cross_subsidy_options_and_response``, ``iteration_log``
+
+    """
+    cross_subsidy_options_and_response = \
+        omega_globals.options.SalesShare.calc_shares(calendar_year, compliance_id, producer_decision,
+                                                     cross_subsidy_options_and_response, mcat, only_child)
+
+    if type(cross_subsidy_options_and_response) is pd.DataFrame:
+        cross_subsidy_options_and_response = cross_subsidy_options_and_response.loc[0].copy()
+
+    return cross_subsidy_options_and_response, iteration_log
+
+
+def merge_cross_subsidy_response(prior_response, response):
+    """
+    Merge a cross subsidy response, calculated independently of the prior market categories, into the prior response,
+    as if the response had been calculated starting from the prior response.
+
+    Args:
+        prior_response (DataFrame, Series): empty DataFrame or the Series of the prior cross subsidy responses
+        response (DataFrame, Series): cross subsidy response (Series) or cross subsidy options and response
+            (DataFrame)
+
+    Returns:
+        The merged response
+
+    """
+    if type(prior_response) is pd.DataFrame:
+        return response  # nothing to merge
+
+    if type(response) is pd.DataFrame:
+        merged_response = pd.DataFrame([prior_response] * len(response), index=response.index)
+        for k in response.columns:
+            merged_response[k] = response[k].values
+    else:
+        merged_response = prior_response.copy()
+        merged_response.name = response.name
+        for k, v in response.items():
+            merged_response[k] = v
+
+    return merged_response
+
+
+def calc_parallel_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id,
+                                                     producer_decision, producer_consumer_iteration_num,
+                                                     iteration_log):
+    """
+    Equivalent to ``calc_cross_subsidy_options_and_response()`` but runs the cross subsidy searches of the market
+    categories concurrently, on a thread pool.  The searches are independent given the producer decision, each one
+    starts from an empty response and the responses are then merged in tree traversal order, so the results don't
+    depend on the order in which the searches complete.
+
+    A thread pool is used rather than the worker process pool, ``common.omega_pool``, since the searches depend on
+    session state that is not available to the worker processes (e.g. the current production constraints and prior
+    year consumer response).
+
+    Args:
+        calendar_year (int): the year in which the compliance calculations take place
+        market_class_tree (dict): a dict of CompositeVehicle object lists hiearchically grouped by market categories
+            into market classes
+        compliance_id (str): name of manufacturer, e.g. 'consolidated_OEM'
+        producer_decision (Series): result of producer compliance search, *without* consumer response
+        producer_consumer_iteration_num (int): producer-consumer iteration number
+        iteration_log (DataFrame): DataFrame of producer-consumer iteration data
+
+    Returns:
+        tuple of ``cross_subsidy_options_and_response``, updated ``iteration_log``
+
+    """
+    cross_subsidy_steps = []
+
+    cross_subsidy_options_and_response, iteration_log = \
+        calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id, producer_decision,
+                                                pd.DataFrame(), producer_consumer_iteration_num, iteration_log,
+                                                node_name='', verbose=False, cross_subsidy_steps=cross_subsidy_steps)
+
+    if cross_subsidy_steps:
+        with ThreadPoolExecutor(max_workers=len(cross_subsidy_steps)) as executor:
+            results = [executor.submit(step, pd.DataFrame(), producer_consumer_iteration_num, [])
+                       for step in cross_subsidy_steps]
+
+            for result in results:
+                response, step_iteration_log = result.result()
+
+                merged_response = merge_cross_subsidy_response(cross_subsidy_options_and_response, response)
+
+                for entry in step_iteration_log:
+                    if entry is response:
+                        # the response is logged by reference, as with serial searches
+                        iteration_log.append(merged_response)
+                    else:
+                        iteration_log.append(merge_cross_subsidy_response(cross_subsidy_options_and_response, entry))
+
+                cross_subsidy_options_and_response = merged_response
 
     return cross_subsidy_options_and_response, iteration_log
 
@@ -260,8 +385,10 @@ def run_producer_consumer(pass_num, manufacturer_annual_data_table):
          updates omega database with final vehicle technology and market share data
 
     """
+    import time
     from producer.vehicles import VehicleFinal
     from policy.credit_banking import CreditBank
+    from policy import credit_strategy
     from producer import compliance_search
 
     iteration_log = []
@@ -282,10 +409,14 @@ def run_producer_consumer(pass_num, manufacturer_annual_data_table):
         prior_producer_decision_and_response = None
 
         for calendar_year in range(omega_globals.options.analysis_initial_year, analysis_end_year):
+            year_start_time = time.time()
 
             credit_banks[compliance_id].update_credit_age(calendar_year)
 
-            if manufacturer_annual_data_table is None or omega_globals.options.credit_market_efficiency == 0.0:
+            if credit_strategy.get_strategic_offset(compliance_id, calendar_year) is not None:
+                # strategy: use the searched credit strategy, see policy.credit_strategy
+                strategic_target_offset_Mg = credit_strategy.get_strategic_offset(compliance_id, calendar_year)
+            elif manufacturer_annual_data_table is None or omega_globals.options.credit_market_efficiency == 0.0:
                 # strategy: use credits and pay debits over their remaining lifetime, instead of all at once:
                 strategic_target_offset_Mg = 0
                 current_credits, current_debits = credit_banks[compliance_id].get_credit_info(calendar_year)
@@ -393,12 +524,24 @@ def run_producer_consumer(pass_num, manufacturer_annual_data_table):
 
             credit_banks[compliance_id].handle_credit(calendar_year, total_credits_co2e_megagrams)  # CU RV
 
+            if credit_strategy.is_search_pass(pass_num):
+                credit_strategy.probe_strategic_offsets(compliance_id, calendar_year, producer_decision_and_response,
+                                                        producer_consumer_iteration_num, strategic_target_offset_Mg,
+                                                        prior_producer_decision_and_response)
+
             omega_globals.options.SalesShare.store_producer_decision_and_response(producer_decision_and_response)
 
             stock.update_stock(calendar_year, compliance_id)
 
             prior_producer_decision_and_response = producer_decision_and_response
 
+            omega_log.send_progress('year', omega_globals.options.session_name,
+                                    {'calendar_year': calendar_year, 'compliance_id': compliance_id,
+                                     'pass_num': pass_num, 'iterations': producer_consumer_iteration_num + 1,
+                                     'elapsed_time': time.time() - year_start_time})
+
+            omega_log.flush()
+
         credit_banks[compliance_id].credit_bank.to_csv(omega_globals.options.output_folder +
                                                        omega_globals.options.session_unique_name +
                                                        ' %s GHG_credit_balances.csv' % compliance_id, index=False)
@@ -407,6 +550,8 @@ def run_producer_consumer(pass_num, manufacturer_annual_data_table):
             omega_globals.options.output_folder + omega_globals.options.session_unique_name +
             ' %s GHG_credit_transactions.csv' % compliance_id, index=False)
 
+    compliance_search.log_search_stats()
+
     iteration_log_df = pd.DataFrame(iteration_log)
 
     iteration_log_df.to_csv(
@@ -505,10 +650,17 @@ def iterate_producer_cross_subsidy(calendar_year, compliance_id, best_producer_d
 
     market_class_tree = omega_globals.options.MarketClass.get_market_class_tree()
 
-    cross_subsidy_options_and_response, iteration_log = \
-        calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id, producer_decision,
-                                                cross_subsidy_options_and_response, producer_consumer_iteration_num,
-                                                iteration_log, node_name='', verbose=False)
+    if omega_globals.options.producer_cross_subsidy_parallel_search:
+        cross_subsidy_options_and_response, iteration_log = \
+            calc_parallel_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id,
+                                                             producer_decision, producer_consumer_iteration_num,
+                                                             iteration_log)
+    else:
+        cross_subsidy_options_and_response, iteration_log = \
+            calc_cross_subsidy_options_and_response(calendar_year, market_class_tree, compliance_id,
+                                                    producer_decision, cross_subsidy_options_and_response,
+                                                    producer_consumer_iteration_num, iteration_log, node_name='',
+                                                    verbose=False)
 
     max_error = 0
     cross_subsidy_options_and_response['max_share_delta_market_class'] = None
@@ -1473,6 +1625,8 @@ def init_omega(session_runtime_options):
 
     from consumer.sales_volume import init_sales_volume
 
+    from common.omega_cache import init_cloud_cache
+
     file_io.validate_folder(omega_globals.options.output_folder)
 
     verbose_init = omega_globals.options.verbose
@@ -1572,6 +1726,8 @@ def init_omega(session_runtime_options):
 
         init_fail += VehicleAnnualData.init_vehicle_annual_data()
 
+        init_fail += init_cloud_cache()
+
         if not init_fail:
             init_fail += VehicleAggregation.init_from_file(omega_globals.options.vehicles_file,
                                                            verbose=verbose_init)
@@ -1644,6 +1800,16 @@ def run_omega(session_runtime_options, standalone_run=False):
         # no trading
         consolidate = [False]
 
+    from policy import credit_strategy
+    from common import omega_pool
+
+    if session_runtime_options.credit_strategy_search:
+        # search credit strategies during the last pass then run them in an added pass
+        consolidate.append(consolidate[-1])
+        credit_strategy.init_credit_strategy(search_pass_num=len(consolidate) - 2)
+    else:
+        credit_strategy.init_credit_strategy()
+
     output_folders = []
 
     if session_runtime_options.notification_destination and session_runtime_options.notification_email \
@@ -1687,7 +1853,8 @@ def run_omega(session_runtime_options, standalone_run=False):
 
             init_fail = init_omega(copy.copy(session_runtime_options))
 
-            output_folders.append(omega_globals.options.output_folder)
+            if omega_globals.options.output_folder not in output_folders:
+                output_folders.append(omega_globals.options.output_folder)
 
             omega_globals.options.database_dump_folder = omega_globals.options.output_folder + '__dump' + os.sep
 
@@ -1695,9 +1862,7 @@ def run_omega(session_runtime_options, standalone_run=False):
 
             if not init_fail:
                 if omega_globals.options.multiprocessing:
-                    from omega_model import omega
-
-                    from multiprocessing import Pool, freeze_support
+                    from multiprocessing import freeze_support
 
                     freeze_support()
 
@@ -1707,17 +1872,11 @@ def run_omega(session_runtime_options, standalone_run=False):
                         num_processes = \
                             max(1, int(num_processes / omega_globals.options.non_context_session_process_scaler))
 
-                    start_time = time.time()
-                    omega_globals.pool = Pool(processes=num_processes,
-                                              initializer=omega.init_omega, initargs=[omega_globals.options])
-
-                    results = []
-                    for i in range(num_processes):
-                        results.append(omega_globals.pool.apply_async(func=omega.poolstart,
-                                                                      callback=None,
-                                                                      error_callback=omega.error_callback))
+                    if omega_globals.options.session_max_processes:
+                        num_processes = min(num_processes, omega_globals.options.session_max_processes)
 
-                    [r.get() for r in results]
+                    start_time = time.time()
+                    omega_pool.start_pool(num_processes)
 
                     # print('Elapsed init time = %f' % (time.time() - start_time))
 
@@ -1767,10 +1926,8 @@ def run_omega(session_runtime_options, standalone_run=False):
                                                       (omega_globals.options.output_folder_base,
                                                        omega_globals.options.consolidate_manufacturers), index=False)
 
-                # everybody out of the pool
-                if omega_globals.options.multiprocessing:
-                    omega_globals.pool.close()
-                    omega_globals.pool.join()
+                if credit_strategy.is_search_pass(omega_globals.pass_num):
+                    credit_strategy.search_credit_strategies(credit_banks)
 
                 # save context calibration files
                 from context.new_vehicle_market import NewVehicleMarket
@@ -1815,6 +1972,11 @@ def run_omega(session_runtime_options, standalone_run=False):
                 omega_globals.options.output_folder +
                 f'{omega_globals.options.session_unique_name}_inputfile_metadata.csv', index=False, header=True)
 
+            if omega_globals.options.cloud_cache_folder:
+                from common.omega_cache import get_cloud_cache
+                for kind in ['cost_clouds', 'cost_curves']:
+                    omega_log.logwrite('Cloud cache %s' % get_cloud_cache(kind).get_stats())
+
             omega_log.end_logfile("\nSession Complete")
 
             if omega_globals.options.run_profiler:
@@ -1836,7 +1998,12 @@ def run_omega(session_runtime_options, standalone_run=False):
             for f in output_folders:
                 file_io.delete_folder(f)
 
+        # everybody out of the pool, batch sessions may reuse it
+        if standalone_run:
+            omega_pool.shutdown_pool()
+
     except:
+        omega_pool.shutdown_pool()
         omega_log.logwrite("\n#RUNTIME FAIL\n%s\n" % traceback.format_exc())
         print("### Check OMEGA log for error messages ###")
         omega_log.end_logfile("\nSession Fail")
@@ -107,6 +107,10 @@ Data Row Name and Description
 :Analysis Dollar Basis:
     The dollar valuation for all monetized values in the cost effects outputs, i.e., costs are expressed in "Dollar Basis" dollars
 
+:Cloud Cache *(TRUE or FALSE)*:
+    Optional, ``TRUE`` to share an on-disk cache of vehicle cost clouds and cost curves between the sessions of a
+    bundled batch, in the bundle's ``__cloud_cache`` folder.  The cache is disabled if the row is absent or ``FALSE``
+
 ----
 
 :Batch Analysis Context Settings:
@@ -321,6 +325,11 @@ from common.file_io import *
 from omega_model.common.omega_functions import print_list
 
 bundle_input_folder_name = 'in'
+
+# effects modules used by the model, bundled with the model source files
+shared_effects_source_files = [os.path.join('omega_effects', '__init__.py'),
+                               os.path.join('omega_effects', 'general', '__init__.py'),
+                               os.path.join('omega_effects', 'general', 'compiled_expression.py')]
 bundle_output_folder_name = OMEGASessionSettings().output_folder
 
 true_false_dict = dict({True: True, False: False, 'True': True, 'False': False, 'TRUE': True, 'FALSE': False})
@@ -587,6 +596,7 @@ class OMEGABatchObject(OMEGABase):
             'Producer Compliance Search Min Share Range': 'PCSMSR',
             'Producer Compliance Search Convergence Factor': 'PCSCF',
             'Producer Compliance Search Tolerance': 'PCST',
+            'Producer Compliance Search Strategy': 'PCSS',
             'Producer Cross Subsidy Price Tolerance': 'PCSPT',
             'Flat Context Year': 'FCY',
         }
@@ -926,6 +936,11 @@ class OMEGASessionObject(OMEGABase):
             float(self.read_parameter('Producer Compliance Search Tolerance',
                                 self.settings.producer_compliance_search_tolerance))
 
+        self.settings.producer_compliance_search_strategy = validate_predefined_input(
+            self.read_parameter('Producer Compliance Search Strategy',
+                                self.settings.producer_compliance_search_strategy),
+            {'grid', 'root-finder', 'root-finder-check'})
+
         self.settings.producer_cross_subsidy_price_tolerance = \
             float(self.read_parameter('Producer Cross Subsidy Price Tolerance',
                                 self.settings.producer_cross_subsidy_price_tolerance))
@@ -1080,31 +1095,27 @@ class OMEGABatchCLIOptions(OMEGABase):
         self.network = False
         self.analysis_final_year = None
         self.calc_effects = 'No'
+        self.local_session_processes = None
 
 
-def run_bundled_sessions(options, remote_batchfile, session_list):
+def load_bundled_batch(options, remote_batchfile, batch_log):
     """
-    Run a bundled batch.  Bundling copies the source code and all input files to a single directory structure that
-    contains everything needed to run the batch at any time without any external dependencies (except of course a
-    Python install with the required packages)
+    Load a bundled batch from the remote batch file.
 
     Args:
         options (OMEGABatchCLIOptions): the command line arguments, contains the path to the remote batch, etc
         remote_batchfile (str): the name of the remote batch file, e.g. '2021_08_26_15_35_16_test_batch.csv'
-        session_list (list): a list containing the session number(s) to run from the remote batch, e.g. ``[0]`` or
-            ``[0, 1, 4, ...], etc``
+        batch_log (OMEGABatchLog): the batch log to write to
 
     Returns:
         The ``OMEGABatchObject`` created to run the remote batch
 
     """
     import pandas as pd
-    from common.omega_log import OMEGABatchLog
-    import time
 
     batch = OMEGABatchObject(analysis_final_year=options.analysis_final_year, calc_effects=options.calc_effects)
     batch.batch_definition_path = options.batch_path
-    batch.batch_log = OMEGABatchLog(options)
+    batch.batch_log = batch_log
     batch.batch_log.logwrite('REMOTE BATCHFILE = %s' % remote_batchfile)
     batch.dataframe = pd.read_csv(remote_batchfile, index_col=0)
     batch.dataframe.replace(to_replace={'True': True, 'False': False, 'TRUE': True, 'FALSE': False},
@@ -1116,65 +1127,293 @@ def run_bundled_sessions(options, remote_batchfile, session_list):
     batch.force_numeric_developer_params()
     batch.get_batch_settings()
     batch.settings.auto_close_figures = options.auto_close_figures
+    if 'Cloud Cache' in batch.dataframe.index and \
+            validate_predefined_input(batch.read_parameter('Cloud Cache'), true_false_dict):
+        # sessions in the batch share an on-disk cache of vehicle cost clouds and cost curves
+        batch.settings.cloud_cache_folder = os.path.join(options.bundle_path_root, batch.name, '__cloud_cache')
     batch.add_sessions(verbose=False)
-    # process sessions:
-    for s_index in session_list:
-        batch.batch_log.logwrite("\nProcessing Session %d (%s):" % (s_index, batch.sessions[s_index].name))
 
-        if not batch.sessions[s_index].enabled:
-            batch.batch_log.logwrite("Skipping Disabled Session '%s'" % batch.sessions[s_index].name)
-            batch.batch_log.logwrite('')
+    return batch
+
+
+def rename_session_folder(options, batch, s_index, completion_prefix):
+    """
+    Add a completion status prefix to a session folder, e.g. '_' for completed sessions or '#FAIL_' for failed
+    sessions.  Retries for up to an hour, in case files in the folder are still open.
+
+    Args:
+        options (OMEGABatchCLIOptions): the command line arguments, contains the path to the remote batch, etc
+        batch (OMEGABatchObject): the batch being run
+        s_index (int): the session number
+        completion_prefix (str): the session folder prefix
+
+    Returns:
+        Nothing, renames the session folder
+
+    """
+    import time
+
+    batch_path = os.path.join(options.bundle_path_root, batch.name)
+
+    rename_complete = False
+    wait_time = 0
+    while not rename_complete and (wait_time < 3600):
+        time.sleep(1)
+        wait_time += 1
+        try:
+            os.rename(os.path.join(batch_path, batch.sessions[s_index].name),
+                  os.path.join(batch_path, completion_prefix + batch.sessions[s_index].name))
+            rename_complete = True
+            batch.batch_log.logwrite('Rename complete after %s seconds' % wait_time)
+        except:
+            if wait_time % 15 == 0:
+                print('Retrying folder rename after fail, attempt #%d' % wait_time)
+
+
+def run_bundled_session(options, batch, s_index):
+    """
+    Run a single session of a bundled batch and add a completion status prefix to the session folder.
+
+    Args:
+        options (OMEGABatchCLIOptions): the command line arguments, contains the path to the remote batch, etc
+        batch (OMEGABatchObject): the batch being run
+        s_index (int): the number of the session to run
+
+    Returns:
+        Nothing, updates the session ``result``
+
+    """
+    import time
+
+    batch.batch_log.logwrite("\nProcessing Session %d (%s):" % (s_index, batch.sessions[s_index].name))
+
+    if not batch.sessions[s_index].enabled:
+        batch.batch_log.logwrite("Skipping Disabled Session '%s'" % batch.sessions[s_index].name)
+        batch.batch_log.logwrite('')
+    else:
+        batch.sessions[s_index].result = batch.sessions[s_index].run()
+
+        if not batch.sessions[s_index].result:
+            # normal run, no failures
+            time.sleep(1)  # wait for files to close
+            summary_filename = os.path.join(options.bundle_path_root, batch.name,
+                                            batch.sessions[s_index].name, bundle_output_folder_name,
+                                            'o2log_%s_%s.txt' % (
+                                                batch.name, batch.sessions[s_index].name))
+
+            # check session completion status and add status prefix to session folder
+            if os.path.exists(summary_filename) and os.path.getsize(summary_filename) > 0:
+                with open(summary_filename, "r") as f_read:
+                    last_line = f_read.readlines()[-1]
+                if 'Session Complete' in last_line:
+                    completion_prefix = '_'
+                    batch.batch_log.logwrite('$$$ Session Completed, Session "%s" $$$' %
+                                             batch.sessions[s_index].name)
+                elif 'Session Fail' in last_line:
+                    completion_prefix = '#FAIL_'
+                    batch.batch_log.logwrite(
+                        '*** Session Failed, Session "%s" ***' % batch.sessions[s_index].name)
+                else:
+                    completion_prefix = '#WEIRD_'
+                    batch.batch_log.logwrite('??? Weird Summary File for Session "%s" : last_line = "%s" ???' % (
+                        batch.sessions[s_index].name, last_line))
+
+                rename_session_folder(options, batch, s_index, completion_prefix)
         else:
-            batch.sessions[s_index].result = batch.sessions[s_index].run()
-
-            if not batch.sessions[s_index].result:
-                # normal run, no failures
-                time.sleep(1)  # wait for files to close
-                summary_filename = os.path.join(options.bundle_path_root, batch.name,
-                                                batch.sessions[s_index].name, bundle_output_folder_name,
-                                                'o2log_%s_%s.txt' % (
-                                                    batch.name, batch.sessions[s_index].name))
-
-                # check session completion status and add status prefix to session folder
-                if os.path.exists(summary_filename) and os.path.getsize(summary_filename) > 0:
-                    with open(summary_filename, "r") as f_read:
-                        last_line = f_read.readlines()[-1]
-                    batch_path = os.path.join(options.bundle_path_root, batch.name)
-                    if 'Session Complete' in last_line:
-                        completion_prefix = '_'
-                        batch.batch_log.logwrite('$$$ Session Completed, Session "%s" $$$' %
-                                                 batch.sessions[s_index].name)
-                    elif 'Session Fail' in last_line:
-                        completion_prefix = '#FAIL_'
-                        batch.batch_log.logwrite(
-                            '*** Session Failed, Session "%s" ***' % batch.sessions[s_index].name)
-                    else:
-                        completion_prefix = '#WEIRD_'
-                        batch.batch_log.logwrite('??? Weird Summary File for Session "%s" : last_line = "%s" ???' % (
-                            batch.sessions[s_index].name, last_line))
-
-                    rename_complete = False
-                    wait_time = 0
-                    while not rename_complete and (wait_time < 3600):
-                        time.sleep(1)
-                        wait_time += 1
-                        try:
-                            os.rename(os.path.join(batch_path, batch.sessions[s_index].name),
-                                  os.path.join(batch_path, completion_prefix + batch.sessions[s_index].name))
-                            rename_complete = True
-                            batch.batch_log.logwrite('Rename complete after %s seconds' % wait_time)
-                        except:
-                            if wait_time % 15 == 0:
-                                print('Retrying folder rename after fail, attempt #%d' % wait_time)
-            else:
-                # abnormal run, display fault
-                batch.batch_log.logwrite(
-                    '\n*** Session Failed, Session "%s" ***' % batch.sessions[s_index].name)
-                for idx, r in enumerate(batch.sessions[s_index].result):
-                    if idx == 0:
-                        # strip leading '\n'
-                        r = r[1:]
-                    batch.batch_log.logwrite(r)
+            # abnormal run, display fault
+            batch.batch_log.logwrite(
+                '\n*** Session Failed, Session "%s" ***' % batch.sessions[s_index].name)
+            for idx, r in enumerate(batch.sessions[s_index].result):
+                if idx == 0:
+                    # strip leading '\n'
+                    r = r[1:]
+                batch.batch_log.logwrite(r)
+
+
+def run_bundled_session_process(options, remote_batchfile, s_index, max_session_processes, status_queue,
+                                progress_queue=None):
+    """
+    Run a single session of a bundled batch in a separate process, see ``run_bundled_sessions()``.  Batch log messages
+    and the session result are sent to the parent process via the status queue.
+
+    Args:
+        options (OMEGABatchCLIOptions): the command line arguments, contains the path to the remote batch, etc
+        remote_batchfile (str): the name of the remote batch file, e.g. '2021_08_26_15_35_16_test_batch.csv'
+        s_index (int): the number of the session to run
+        max_session_processes (int): the maximum number of vehicle-level processes the session may use
+        status_queue (multiprocessing.Queue): queue for batch log messages
+        progress_queue (multiprocessing.Queue): optional queue for session progress events, see
+            ``common.omega_log.send_progress()``
+
+    Returns:
+        Nothing
+
+    """
+    from common import omega_globals, omega_pool, omega_log
+    from common.omega_log import OMEGABatchQueueLog
+
+    omega_globals.options = options
+
+    omega_log.set_progress_queue(progress_queue)
+
+    batch = load_bundled_batch(options, remote_batchfile, OMEGABatchQueueLog(status_queue, s_index))
+    batch.settings.session_max_processes = max_session_processes
+
+    if max_session_processes <= 1:
+        batch.settings.multiprocessing = False
+
+    run_bundled_session(options, batch, s_index)
+
+    omega_pool.shutdown_pool()
+
+    status_queue.put(('result', s_index, batch.sessions[s_index].result))
+
+
+def get_session_process_budget(num_sessions, local_session_processes=None):
+    """
+    Divide the available cores between session-level processes and the vehicle-level processes of each session, so
+    the combination doesn't oversubscribe the machine.
+
+    Args:
+        num_sessions (int): the number of sessions to run
+        local_session_processes (int): optional maximum number of sessions to run at once, otherwise limited by
+            the number of available cores
+
+    Returns:
+        Tuple of the number of sessions to run at once and the maximum number of vehicle-level processes per session
+
+    """
+    available_cores = max(1, os.cpu_count() - 2)
+
+    if local_session_processes:
+        num_session_processes = local_session_processes
+    else:
+        num_session_processes = available_cores
+
+    num_session_processes = max(1, min(num_sessions, num_session_processes))
+
+    return num_session_processes, max(1, available_cores // num_session_processes)
+
+
+def handle_session_status(batch, status):
+    """
+    Handle a status message from a session running in a separate process, see ``run_bundled_session_process()``.
+
+    Args:
+        batch (OMEGABatchObject): the batch being run
+        status (tuple): ('log', session number, message) or ('result', session number, session result)
+
+    Returns:
+        Nothing, writes to the batch log or updates the session ``result``
+
+    """
+    status_type, s_index, value = status
+
+    if status_type == 'result':
+        batch.sessions[s_index].result = value
+    else:
+        leading_newlines = len(value) - len(value.lstrip('\n'))
+        batch.batch_log.logwrite('%s[%s] %s' % (value[:leading_newlines], batch.sessions[s_index].name,
+                                                value[leading_newlines:]))
+
+
+def run_bundled_sessions(options, remote_batchfile, session_list):
+    """
+    Run a bundled batch.  Bundling copies the source code and all input files to a single directory structure that
+    contains everything needed to run the batch at any time without any external dependencies (except of course a
+    Python install with the required packages)
+
+    The reference session (session 0), if present, is run first, the remaining sessions are then run in parallel in
+    local processes if there are enough cores available, see ``get_session_process_budget()``.  Status messages from
+    sessions running in parallel are written to the batch log, prefixed by the session name.
+
+    Args:
+        options (OMEGABatchCLIOptions): the command line arguments, contains the path to the remote batch, etc
+        remote_batchfile (str): the name of the remote batch file, e.g. '2021_08_26_15_35_16_test_batch.csv'
+        session_list (list): a list containing the session number(s) to run from the remote batch, e.g. ``[0]`` or
+            ``[0, 1, 4, ...], etc``
+
+    Returns:
+        The ``OMEGABatchObject`` created to run the remote batch
+
+    """
+    import multiprocessing
+    import queue
+    from common import omega_pool, omega_log
+    from common.omega_log import OMEGABatchLog
+
+    batch = load_bundled_batch(options, remote_batchfile, OMEGABatchLog(options))
+
+    # run reference session first, it may generate outputs required by the other sessions
+    if 0 in session_list:
+        run_bundled_session(options, batch, 0)
+
+    session_list = [s_index for s_index in session_list if s_index != 0]
+
+    num_session_processes, max_session_processes = \
+        get_session_process_budget(len(session_list), options.local_session_processes)
+
+    if num_session_processes == 1 or getattr(sys, 'frozen', False):
+        for s_index in session_list:
+            run_bundled_session(options, batch, s_index)
+    else:
+        # free the reference session's worker processes for the session processes
+        omega_pool.shutdown_pool()
+
+        batch.batch_log.logwrite('\nRunning %d sessions, %d at a time, up to %d processes per session...' %
+                                 (len(session_list), num_session_processes, max_session_processes))
+
+        mp_context = multiprocessing.get_context('spawn')
+        status_queue = mp_context.Queue()
+
+        pending_sessions = list(session_list)
+        running_sessions = dict()
+
+        while pending_sessions or running_sessions:
+            while pending_sessions and len(running_sessions) < num_session_processes:
+                s_index = pending_sessions.pop(0)
+                process = mp_context.Process(target=run_bundled_session_process,
+                                             args=(options, remote_batchfile, s_index, max_session_processes,
+                                                   status_queue, omega_log.get_progress_queue()),
+                                             name=batch.sessions[s_index].name)
+                process.start()
+                running_sessions[s_index] = process
+                batch.batch_log.logwrite('Started Session %d (%s), pid %d' %
+                                         (s_index, batch.sessions[s_index].name, process.pid))
+
+            try:
+                handle_session_status(batch, status_queue.get(timeout=1))
+            except queue.Empty:
+                pass
+
+            for s_index, process in list(running_sessions.items()):
+                if not process.is_alive():
+                    process.join()
+                    running_sessions.pop(s_index)
+
+                    # get session settings for post-processing
+                    batch.sessions[s_index].init(verbose=True)
+
+                    if process.exitcode != 0:
+                        batch.sessions[s_index].result = ['\nSession process exit code %s' % process.exitcode]
+                        batch.batch_log.logwrite('\n*** Session Failed, Session "%s", exit code %s ***' %
+                                                 (batch.sessions[s_index].name, process.exitcode))
+                        if os.path.exists(os.path.join(options.bundle_path_root, batch.name,
+                                                       batch.sessions[s_index].name)):
+                            rename_session_folder(options, batch, s_index, '#FAIL_')
+
+                    batch.batch_log.logwrite('Session %d (%s) finished, %d running, %d pending' %
+                                             (s_index, batch.sessions[s_index].name, len(running_sessions),
+                                              len(pending_sessions)))
+
+        # handle any remaining status messages
+        while True:
+            try:
+                handle_session_status(batch, status_queue.get(timeout=1))
+            except queue.Empty:
+                break
+
+    omega_pool.shutdown_pool()
 
     batch.batch_log.end_logfile("$$$ batch complete $$$")
     return batch
@@ -1183,7 +1422,8 @@ def run_bundled_sessions(options, remote_batchfile, session_list):
 def run_omega_batch(no_validate=False, no_sim=False, bundle_path=None, no_bundle=False,
                     batch_file='', session_num=None, verbose=False, timestamp=None, show_figures=False, dispy=False,
                     dispy_ping=False, dispy_debug=False, dispy_exclusive=False, dispy_scheduler=None, local=False,
-                    network=False, analysis_final_year=None, calc_effects='No'):
+                    network=False, analysis_final_year=None, calc_effects='No', local_session_processes=None,
+                    progress_queue=None):
     """
     The top-level entry point for running a batch with the given settings, called from the GUI with a dictionary
     of arguments.  Reads the source batch file, expanding factorially where there are multi-valued parameters, bundles
@@ -1212,6 +1452,11 @@ def run_omega_batch(no_validate=False, no_sim=False, bundle_path=None, no_bundle
         analysis_final_year (int): optional override for the analysis final year batch parameter
         calc_effects (str): 'No', 'Physical' or 'Physical and Costs', determines what kind of effects post-processing
             to run
+        local_session_processes (int): optional maximum number of sessions to run at once on the local machine,
+            otherwise determined by the number of available cores
+        progress_queue (multiprocessing.Queue): optional queue for batch and session log text and analysis year
+            progress events, e.g. for the GUI event monitor, see ``common.omega_log.send_progress()``.  Sessions run
+            on ``dispy`` nodes don't send progress events
 
     Returns:
         Nothing
@@ -1220,7 +1465,9 @@ def run_omega_batch(no_validate=False, no_sim=False, bundle_path=None, no_bundle
     import sys
 
     # print('run_omega_batch sys.path = %s' % sys.path)
-    from common import omega_globals
+    from common import omega_globals, omega_log
+
+    omega_log.set_progress_queue(progress_queue)
 
     if bundle_path is None:
         bundle_path = os.getcwd() + os.sep + 'bundle'
@@ -1245,6 +1492,7 @@ def run_omega_batch(no_validate=False, no_sim=False, bundle_path=None, no_bundle
     options.network = network
     options.analysis_final_year = analysis_final_year
     options.calc_effects = calc_effects
+    options.local_session_processes = local_session_processes
 
     if options.no_bundle:
         batchfile_path = os.path.split(args.batch_file)[0]
@@ -1382,6 +1630,12 @@ def run_omega_batch(no_validate=False, no_sim=False, bundle_path=None, no_bundle
                 for f in source_files:
                     relocate_file(options.batch_path + source_folder, source_folder + os.sep + f)
 
+            # effects modules shared with the model, e.g. the expression compiler used by common.omega_eval
+            for source_file in shared_effects_source_files:
+                source_folder = os.path.dirname(source_file)
+                validate_folder(options.batch_path + source_folder)
+                relocate_file(options.batch_path + source_folder, source_file)
+
             # write a copy of the original batch definition file to the bundle
             relocate_file(options.batch_path, options.batch_file)
 
@@ -1552,6 +1806,8 @@ if __name__ == '__main__':
     parser.add_argument('--dispy_exclusive', action='store_true', help='Run exclusive job, do not share dispynodes')
     parser.add_argument('--dispy_scheduler', type=str, help='Override default dispy scheduler IP address',
                         default=None)
+    parser.add_argument('--local_session_processes', type=int,
+                        help='Max number of sessions to run at once on the local machine', default=None)
     parser.add_argument('--collate_bundle', action='store_true',
                         help='Find and collate summary files in a bundle folder')
 
@@ -1617,7 +1873,8 @@ if __name__ == '__main__':
                             dispy_exclusive=args.dispy_exclusive, dispy_scheduler=args.dispy_scheduler,
                             local=args.local,
                             network=args.network, analysis_final_year=args.analysis_final_year,
-                            calc_effects=args.calc_effects)
+                            calc_effects=args.calc_effects,
+                            local_session_processes=args.local_session_processes)
         except:
             import traceback
 
@@ -119,7 +119,18 @@ class CreditBank(OMEGABase):
 
     Each manufacturer will use its own unique credit bank object.
 
+    Credits and debits are stored in a columnar ledger, one row per credit (or debit) vintage per calendar year, with
+    an index of ledger rows by calendar year.  Transactions are buffered as tuples.  The ``credit_bank`` and
+    ``transaction_log`` DataFrames are created on demand, e.g. to write the output files at the end of the session.
+
     """
+    ledger_columns = {'calendar_year': int, 'model_year': int, 'beginning_balance_Mg': float,
+                      'ending_balance_Mg': float, 'age': int}
+
+    transaction_columns = ['calendar_year', 'model_year', 'compliance_id', 'credit_value_Mg', 'credit_destination']
+
+    _initial_capacity = 64
+
     def __init__(self, ghg_credit_params_filename, ghg_credits_filename, compliance_id, verbose=False):
         """
 
@@ -138,9 +149,18 @@ class CreditBank(OMEGABase):
 
         """
         self.compliance_id = compliance_id
+        self.update_manufacturer_annual_data = True  # False for credit path simulations, see ``pay_debit()``
         self.credit_params = CreditBank.init_ghg_credit_params(ghg_credit_params_filename, verbose)
-        self.credit_bank = CreditBank.init_ghg_credit_bank(ghg_credits_filename, compliance_id, verbose)
-        self.transaction_log = pd.DataFrame()
+        self._credit_param_start_years = np.sort(self.credit_params.index.values)
+
+        self._ledger = dict()
+        self._num_rows = 0
+        self._calendar_year_index = dict()
+        self._transactions = []
+
+        credit_bank = CreditBank.init_ghg_credit_bank(ghg_credits_filename, compliance_id, verbose)
+
+        self.add_ledger_rows(*[credit_bank[c].values for c in CreditBank.ledger_columns])
 
     @staticmethod
     def init_ghg_credit_params(ghg_credit_params_filename, verbose):
@@ -256,50 +276,130 @@ class CreditBank(OMEGABase):
 
         return template_errors
 
-    @staticmethod
-    def create_credit(calendar_year, compliance_id, beginning_balance_Mg):
+    def _reserve(self, num_rows):
         """
-        Create a new GHG credit data structure.
+        Make sure the ledger column arrays can hold the given number of additional rows, doubling their capacity as
+        needed.
 
         Args:
-            calendar_year (numeric): calendar year of credit creation
-            compliance_id (str): manufacturer name, or 'consolidated_OEM'
-            beginning_balance_Mg (numeric): starting balance of credit in CO2e Mg
+            num_rows (int): number of rows to be added
 
         Returns:
-            DataFrame of new (age zero) credit info
+            Nothing, updates the ledger column arrays
 
         """
-        new_credit = dict()
-        new_credit['calendar_year'] = calendar_year
-        new_credit['model_year'] = calendar_year
-        new_credit['compliance_id'] = compliance_id
-        new_credit['beginning_balance_Mg'] = beginning_balance_Mg
-        new_credit['ending_balance_Mg'] = beginning_balance_Mg
-        new_credit['age'] = 0
-        new_credit = pd.DataFrame(new_credit, columns=new_credit.keys(), index=[0])
-        return new_credit
+        capacity = len(self._ledger.get('age', []))
 
-    @staticmethod
-    def create_credit_transaction(credit):
+        if self._num_rows + num_rows > capacity:
+            capacity = max(2 * capacity, self._num_rows + num_rows, CreditBank._initial_capacity)
+            for column, dtype in CreditBank.ledger_columns.items():
+                values = np.zeros(capacity, dtype=dtype)
+                if column in self._ledger:
+                    values[:self._num_rows] = self._ledger[column][:self._num_rows]
+                self._ledger[column] = values
+
+    def add_ledger_rows(self, calendar_year, model_year, beginning_balance_Mg, ending_balance_Mg, age):
+        """
+        Add credit (and/or debit) rows to the ledger.
+
+        Args:
+            calendar_year (array-like): calendar year of each row
+            model_year (array-like): model year of each credit or debit
+            beginning_balance_Mg (array-like): calendar year beginning balance of each credit or debit, CO2e Mg
+            ending_balance_Mg (array-like): calendar year ending balance of each credit or debit, CO2e Mg
+            age (array-like): age of each credit or debit, in years
+
+        Returns:
+            Array of the new ledger row numbers
+
+        """
+        num_rows = len(calendar_year)
+
+        self._reserve(num_rows)
+
+        rows = np.arange(self._num_rows, self._num_rows + num_rows)
+
+        for column, values in zip(CreditBank.ledger_columns,
+                                  (calendar_year, model_year, beginning_balance_Mg, ending_balance_Mg, age)):
+            self._ledger[column][rows] = values
+
+        for row, year in zip(rows, calendar_year):
+            self._calendar_year_index.setdefault(int(year), []).append(row)
+
+        self._num_rows += num_rows
+
+        return rows
+
+    def get_rows(self, calendar_year):
+        """
+        Get the ledger rows for the given calendar year.
+
+        Args:
+            calendar_year (int): the calendar year
+
+        Returns:
+            Array of ledger row numbers, in the order added
+
+        """
+        return np.array(self._calendar_year_index.get(calendar_year, []), dtype=int)
+
+    def copy(self):
+        """
+        Copy the credit bank, e.g. to simulate alternative credit paths.  The ledger and transactions are copied, the
+        (read-only) credit parameters are shared.
+
+        Returns:
+            A new ``CreditBank`` with the same ledger and transactions
+
+        """
+        bank = copy.copy(self)
+        bank._ledger = {column: values.copy() for column, values in self._ledger.items()}
+        bank._calendar_year_index = {year: list(rows) for year, rows in self._calendar_year_index.items()}
+        bank._transactions = list(self._transactions)
+
+        return bank
+
+    def log_transaction(self, calendar_year, model_year, credit_value_Mg, credit_destination):
         """
-        Create an empty (no value, no destination) credit transaction.
+        Add a transaction to the ``transaction_log``.
 
         Args:
-            credit (Series): see GHG_credit_bank.create_credit()
+            calendar_year (int): calendar year of the transaction
+            model_year (int): model year of the source credit (or debit)
+            credit_value_Mg (float): transaction value, CO2e Mg
+            credit_destination (int or str): destination model year, or 'EXPIRATION' or 'PAST_DUE'
+
+        Returns:
+            Nothing, updates the transaction buffer
+
+        """
+        self._transactions.append((int(calendar_year), int(model_year), self.compliance_id, credit_value_Mg,
+                                   credit_destination))
+
+    @property
+    def credit_bank(self):
+        """
+        Get the credit bank ledger.
+
+        Returns:
+            DataFrame of credit bank data, one row per credit or debit per calendar year, in the order added
+
+        """
+        credit_bank = pd.DataFrame({c: self._ledger[c][:self._num_rows] for c in CreditBank.ledger_columns})
+        credit_bank.insert(2, 'compliance_id', self.compliance_id)
+
+        return credit_bank
+
+    @property
+    def transaction_log(self):
+        """
+        Get the credit transaction log.
 
         Returns:
-            DataFrame of new, empty, credit transaction
+            DataFrame of credit transactions, in the order they occurred
 
         """
-        new_credit_transaction = dict()
-        new_credit_transaction['calendar_year'] = credit['calendar_year']
-        new_credit_transaction['model_year'] = credit['model_year']
-        new_credit_transaction['compliance_id'] = credit['compliance_id']
-        new_credit_transaction['credit_value_Mg'] = None
-        new_credit_transaction['credit_destination'] = None
-        new_credit_transaction = pd.DataFrame(new_credit_transaction, columns=new_credit_transaction.keys(), index=[0])
-        return new_credit_transaction
+        return pd.DataFrame(self._transactions, columns=CreditBank.transaction_columns)
 
     def get_credit_param(self, model_year, param):
         """
@@ -313,11 +413,54 @@ class CreditBank(OMEGABase):
             The given credit parameter for the given model year.
 
         """
-        start_years = self.credit_params.index
+        return self.get_credit_params(np.array([model_year]), param)[0]
+
+    def get_credit_params(self, model_years, param):
+        """
+        Get the given credit parameter for each of the given model years.
+
+        Args:
+            model_years (array): the model years
+            param (str): the name of the paramter to retrieve
+
+        Returns:
+            Array of the given credit parameter for each of the given model years.
+
+        """
+        start_year_index = np.searchsorted(self._credit_param_start_years, model_years, side='right') - 1
+
+        if np.any(start_year_index < 0):
+            raise ValueError('No %s credit parameter for model year(s) %s' %
+                             (param, model_years[start_year_index < 0]))
+
+        return self.credit_params.loc[self._credit_param_start_years[start_year_index], param].values
+
+    def get_net_balance_Mg(self, calendar_year):
+        """
+        Get the net balance of the credits and debits in the bank for the given year.
+
+        Args:
+            calendar_year (int): calendar year to query
+
+        Returns:
+            Sum of the credit and debit ending balances, CO2e Mg
+
+        """
+        return self._ledger['ending_balance_Mg'][self.get_rows(calendar_year)].sum() if self._num_rows else 0
+
+    def get_transactions_Mg(self, calendar_year, credit_destination):
+        """
+        Get the total value of the given year's transactions with the given destination.
+
+        Args:
+            calendar_year (int): calendar year of the transactions
+            credit_destination (int or str): destination model year, or 'EXPIRATION' or 'PAST_DUE'
 
-        model_year = max(start_years[start_years <= model_year])
+        Returns:
+            Total transaction value, CO2e Mg
 
-        return self.credit_params.loc[model_year, param]
+        """
+        return sum(t[3] for t in self._transactions if t[0] == calendar_year and t[4] == credit_destination)
 
     def get_credit_info(self, calendar_year):
         """
@@ -330,30 +473,24 @@ class CreditBank(OMEGABase):
             Tuple of lists of ``GHG_credit_info`` objects ([current_credits], [current_debits])
 
         """
-        current_credits = []
-        this_years_credits = self.credit_bank[self.credit_bank['calendar_year'] == calendar_year]
+        rows = self.get_rows(calendar_year)
 
-        # apply lifetime rules
-        ghg_credits = this_years_credits[this_years_credits['ending_balance_Mg'] >= 0]
-        if not ghg_credits.empty:
-            for _, credit in ghg_credits.iterrows():
-                credit_max_life_years = self.get_credit_param(credit['model_year'], 'credit_carryforward_years')
-                if credit['age'] <= credit_max_life_years:
-                    current_credits.append(
-                        CreditInfo(credit['ending_balance_Mg'], credit_max_life_years - credit['age'] + 1,
-                                   credit['model_year']))
+        model_year = self._ledger['model_year'][rows]
+        ending_balance_Mg = self._ledger['ending_balance_Mg'][rows]
+        age = self._ledger['age'][rows]
 
-        current_debits = []
+        is_credit = ending_balance_Mg >= 0
+        max_life_years = np.where(is_credit, self.get_credit_params(model_year, 'credit_carryforward_years'),
+                                  self.get_credit_params(model_year, 'credit_carryback_years'))
 
         # apply lifetime rules
-        ghg_debits = this_years_credits[this_years_credits['ending_balance_Mg'] < 0]
-        if not ghg_debits.empty:
-            for _, debit in ghg_debits.iterrows():
-                debit_max_life_years = self.get_credit_param(debit['model_year'], 'credit_carryback_years')
-                if debit['age'] <= debit_max_life_years:
-                    current_debits.append(
-                        CreditInfo(debit['ending_balance_Mg'], debit_max_life_years - debit['age'] + 1,
-                                   debit['model_year']))
+        current = age <= max_life_years
+
+        current_credits = [CreditInfo(ending_balance_Mg[i], max_life_years[i] - age[i] + 1, model_year[i])
+                           for i in np.flatnonzero(current & is_credit)]
+
+        current_debits = [CreditInfo(ending_balance_Mg[i], max_life_years[i] - age[i] + 1, model_year[i])
+                          for i in np.flatnonzero(current & ~is_credit)]
 
         return current_credits, current_debits
 
@@ -368,16 +505,18 @@ class CreditBank(OMEGABase):
             Value of expiring credits in CO2e Mg
 
         """
-        expiring_credits_Mg = 0
-        this_years_credits = self.credit_bank[self.credit_bank['calendar_year'] == calendar_year]
+        rows = self.get_rows(calendar_year)
+
+        ending_balance_Mg = self._ledger['ending_balance_Mg'][rows]
 
         # apply lifetime rules
-        ghg_credits = this_years_credits[this_years_credits['ending_balance_Mg'] >= 0]
-        if not ghg_credits.empty:
-            for _, credit in ghg_credits.iterrows():
-                credit_max_life_years = self.get_credit_param(credit['model_year'], 'credit_carryforward_years')
-                if credit['age'] == credit_max_life_years:
-                    expiring_credits_Mg = credit['ending_balance_Mg']
+        expiring = (ending_balance_Mg >= 0) & \
+            (self._ledger['age'][rows] ==
+             self.get_credit_params(self._ledger['model_year'][rows], 'credit_carryforward_years'))
+
+        expiring_credits_Mg = 0
+        if expiring.any():
+            expiring_credits_Mg = ending_balance_Mg[expiring][-1]
 
         return expiring_credits_Mg
 
@@ -392,19 +531,16 @@ class CreditBank(OMEGABase):
             Value of expiring debits in CO2e Mg
 
         """
+        rows = self.get_rows(calendar_year)
 
-        expiring_debits_Mg = 0
-        this_years_credits = self.credit_bank[self.credit_bank['calendar_year'] == calendar_year]
+        ending_balance_Mg = self._ledger['ending_balance_Mg'][rows]
 
         # apply lifetime rules
-        ghg_debits = this_years_credits[this_years_credits['ending_balance_Mg'] < 0]
-        if not ghg_debits.empty:
-            for _, debit in ghg_debits.iterrows():
-                debit_max_life_years = self.get_credit_param(debit['model_year'], 'credit_carryback_years')
-                if debit['age'] >= debit_max_life_years:
-                    expiring_debits_Mg += debit['ending_balance_Mg']
+        expiring = (ending_balance_Mg < 0) & \
+            (self._ledger['age'][rows] >=
+             self.get_credit_params(self._ledger['model_year'][rows], 'credit_carryback_years'))
 
-        return expiring_debits_Mg
+        return ending_balance_Mg[expiring].sum()
 
     def update_credit_age(self, calendar_year):
         """
@@ -424,46 +560,35 @@ class CreditBank(OMEGABase):
             calendar_year (numeric): calendar year to update credits in
 
         """
-
         # grab last years
-        last_years_credits = self.credit_bank[self.credit_bank['calendar_year'] == calendar_year - 1].copy()
+        last_years_rows = self.get_rows(calendar_year - 1)
 
-        # last_years_credits = last_years_credits.loc[last_years_credits['credit_transfer_action'] != 'EXPIRATION']
-        last_years_credits['age'] = last_years_credits['age'] + 1
-        last_years_credits['calendar_year'] = calendar_year
-        last_years_credits['beginning_balance_Mg'] = last_years_credits['ending_balance_Mg']
+        if len(last_years_rows):
+            model_year = self._ledger['model_year'][last_years_rows]
+            balance_Mg = self._ledger['ending_balance_Mg'][last_years_rows]
+            age = self._ledger['age'][last_years_rows] + 1
 
-        # apply lifetime rules
-        ghg_credits = last_years_credits[last_years_credits['ending_balance_Mg'] >= 0]
-        if not ghg_credits.empty:
-            for idx, credit in ghg_credits.iterrows():
-                # log the death of non-zero value credits
-                credit_max_life_years = self.get_credit_param(credit['model_year'], 'credit_carryforward_years')
-                if ((credit['age'] > 0) and (credit['ending_balance_Mg'] == 0)) or \
-                        credit['age'] > credit_max_life_years:
-                    if credit['ending_balance_Mg'] > 0:
-                        t = self.create_credit_transaction(credit)
-                        t['credit_value_Mg'] = credit['ending_balance_Mg']
-                        t['credit_destination'] = 'EXPIRATION'
-                        self.transaction_log = pd.concat([self.transaction_log, t])
-                    last_years_credits = last_years_credits.drop(idx)
-
-        ggh_debits = last_years_credits[last_years_credits['beginning_balance_Mg'] < 0]
-        if not ggh_debits.empty:
-            for idx, debit in ggh_debits.iterrows():
-                debit_max_life_years = self.get_credit_param(debit['model_year'], 'credit_carryback_years')
-                if (debit['age'] > 0) and (debit['ending_balance_Mg'] == 0):
-                    # silently drop zero-value debits after age 0
-                    last_years_credits = last_years_credits.drop(idx)
-                elif debit['age'] > debit_max_life_years:
-                    # mark past due debits
-                    t = self.create_credit_transaction(debit)
-                    t['credit_value_Mg'] = debit['ending_balance_Mg']
-                    t['credit_destination'] = 'PAST_DUE'
-                    self.transaction_log = pd.concat([self.transaction_log, t])
-                    last_years_credits = last_years_credits.drop(idx)
-
-        self.credit_bank = pd.concat([self.credit_bank, last_years_credits])
+            # apply lifetime rules
+            is_credit = balance_Mg >= 0
+            drop_credit = is_credit & \
+                (((age > 0) & (balance_Mg == 0)) |
+                 (age > self.get_credit_params(model_year, 'credit_carryforward_years')))
+
+            # zero-value debits can't occur since zero balances are credits, so debits are only dropped when past due
+            past_due_debit = ~is_credit & (age > self.get_credit_params(model_year, 'credit_carryback_years'))
+
+            keep = ~(drop_credit | past_due_debit)
+
+            self.add_ledger_rows(np.full(keep.sum(), calendar_year), model_year[keep], balance_Mg[keep],
+                                            balance_Mg[keep], age[keep])
+
+            # log the death of non-zero value credits
+            for i in np.flatnonzero(drop_credit & (balance_Mg > 0)):
+                self.log_transaction(calendar_year, model_year[i], balance_Mg[i], 'EXPIRATION')
+
+            # mark past due debits
+            for i in np.flatnonzero(past_due_debit):
+                self.log_transaction(calendar_year, model_year[i], balance_Mg[i], 'PAST_DUE')
 
     def handle_credit(self, calendar_year, beginning_balance_Mg):
         """
@@ -485,8 +610,8 @@ class CreditBank(OMEGABase):
         Note:
 
             It's possible to conceive of many different credit/debit strategies (once mandatory credit behavior has been
-            handled).  In the case of OMEGA, strategic over- and under-compliance will eventually be handled by the
-            year-over-year compliance tree which will allow a search of various "earn and burn" credit paths.  As such,
+            handled).  In the case of OMEGA, strategic over- and under-compliance is handled by the year-over-year
+            compliance tree search of various "earn and burn" credit paths, see ``policy.credit_strategy``.  As such,
             it's important to leave the implimentation of such schemes out of this method and the default handling here
             allows for that.
 
@@ -495,34 +620,26 @@ class CreditBank(OMEGABase):
             beginning_balance_Mg (numeric): starting balance of credit (or debit) in CO2e Mg
 
         """
-        new_credit = self.create_credit(calendar_year, self.compliance_id, beginning_balance_Mg)
-        self.credit_bank = pd.concat([self.credit_bank, new_credit], ignore_index=True)
-        new_credit = self.credit_bank.iloc[-1].copy()  # grab credit as a Series
+        new_row = self.add_ledger_rows([calendar_year], [calendar_year], [beginning_balance_Mg],
+                                       [beginning_balance_Mg], [0])[0]
 
-        this_years_credits = self.credit_bank[self.credit_bank['calendar_year'] == calendar_year].copy()
+        this_years_rows = self.get_rows(calendar_year)
+        ending_balance_Mg = self._ledger['ending_balance_Mg']
 
         # if credit is positive, see if there any debts to be paid
-        if new_credit['ending_balance_Mg'] > 0:
-            debits = this_years_credits[this_years_credits['ending_balance_Mg'] < 0]
-            if not debits.empty:
-                for _, debit in debits.iterrows():
-                    if debit['ending_balance_Mg'] < 0:
-                        if new_credit['ending_balance_Mg'] > 0:
-                            self.pay_debit(new_credit, debit, this_years_credits)
+        if ending_balance_Mg[new_row] > 0:
+            for debit_row in this_years_rows[ending_balance_Mg[this_years_rows] < 0]:
+                if ending_balance_Mg[new_row] > 0:
+                    self.pay_debit(new_row, debit_row)
 
         # if credit is negative, see if there are any credits that can pay it
-        elif new_credit['ending_balance_Mg'] < 0:
-            debit = new_credit
-            available_credits = this_years_credits[this_years_credits['ending_balance_Mg'] >= 0]
-            if not available_credits.empty:
-                for _, credit in available_credits.iterrows():
-                    if debit['ending_balance_Mg'] < 0:
-                        if credit['ending_balance_Mg'] > 0:
-                            self.pay_debit(credit, debit, this_years_credits)
-
-        self.credit_bank[self.credit_bank['calendar_year'] == calendar_year] = this_years_credits  # update bank
+        elif ending_balance_Mg[new_row] < 0:
+            for credit_row in this_years_rows[ending_balance_Mg[this_years_rows] >= 0]:
+                if ending_balance_Mg[new_row] < 0:
+                    if ending_balance_Mg[credit_row] > 0:
+                        self.pay_debit(credit_row, new_row)
 
-    def pay_debit(self, credit, debit, this_years_credits):
+    def pay_debit(self, credit_row, debit_row):
         """
         Pay a debit with a credit, create a transaction in the ``transaction_log`` and update manufacter model year
         compliance status (in CO2e Mg).
@@ -537,26 +654,27 @@ class CreditBank(OMEGABase):
             ``manufacturer_annual_data.ManufacturerAnnualData.update_model_year_cert_co2e_Mg()``
 
         Args:
-            credit (Series): source credit to pay from
-            debit (Series): destination debit to pay
-            this_years_credits (DataFrame): DataFrame containing the valid, non-expired credits and debits in the
-                current year.
+            credit_row (int): ledger row of the source credit to pay from
+            debit_row (int): ledger row of the destination debit to pay
 
         """
         from producer.manufacturer_annual_data import ManufacturerAnnualData
-        transaction_amount_Mg = min(abs(debit['ending_balance_Mg']), credit['ending_balance_Mg'])
-        t = self.create_credit_transaction(credit)
-        t['credit_value_Mg'] = transaction_amount_Mg
-        t['credit_destination'] = debit['model_year']
-        credit['ending_balance_Mg'] -= transaction_amount_Mg
-        debit['ending_balance_Mg'] += transaction_amount_Mg
-        self.transaction_log = pd.concat([self.transaction_log, t])
-        this_years_credits.loc[credit.name] = credit  # update credit
-        this_years_credits.loc[debit.name] = debit  # update debit
-        ManufacturerAnnualData.update_model_year_cert_co2e_Mg(debit['model_year'], debit['compliance_id'],
-                                                              -transaction_amount_Mg)
-        ManufacturerAnnualData.update_model_year_cert_co2e_Mg(credit['model_year'], credit['compliance_id'],
-                                                              +transaction_amount_Mg)
+
+        ending_balance_Mg = self._ledger['ending_balance_Mg']
+        credit_model_year = int(self._ledger['model_year'][credit_row])
+        debit_model_year = int(self._ledger['model_year'][debit_row])
+
+        transaction_amount_Mg = min(abs(ending_balance_Mg[debit_row]), ending_balance_Mg[credit_row])
+        self.log_transaction(self._ledger['calendar_year'][credit_row], credit_model_year, transaction_amount_Mg,
+                             debit_model_year)
+        ending_balance_Mg[credit_row] -= transaction_amount_Mg
+        ending_balance_Mg[debit_row] += transaction_amount_Mg
+
+        if self.update_manufacturer_annual_data:
+            ManufacturerAnnualData.update_model_year_cert_co2e_Mg(debit_model_year, self.compliance_id,
+                                                                  -transaction_amount_Mg)
+            ManufacturerAnnualData.update_model_year_cert_co2e_Mg(credit_model_year, self.compliance_id,
+                                                                  +transaction_amount_Mg)
 
 
 if __name__ == '__main__':
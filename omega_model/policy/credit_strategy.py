@@ -0,0 +1,459 @@
+"""
+
+**Routines to search multi-year GHG credit "earn and burn" strategies.**
+
+By default, the producer's strategic target offset spreads available credits and debits over their remaining life (see
+``omega.run_producer_consumer()``).  When ``omega_globals.options.credit_strategy_search`` is enabled, the session adds
+a pass and the producer compliance paths are searched instead:
+
+    * During the search pass, after each year's production is finalized, the compliance search is repeated for a range
+      of strategic target offsets around the offset that was used (``credit_strategy_offset_fractions`` of the year's
+      target CO2e Mg).  The generalized cost and credits of each result are memoized by compliance ID, year and offset.
+
+    * After the search pass, a tree of per-year offset choices is searched for the lowest cumulative generalized cost
+      path, using the memoized compliance search results (no compliance searches are run during the tree search).  The
+      tree is searched ``credit_strategy_lookahead_years`` at a time; the first year of the best path is kept and the
+      search moves forward one year.  Credits are handled by a copy of the producer's ``CreditBank`` so
+      credit lifetimes are respected, paths with past-due debits are not allowed.
+
+    * Credits remaining at the end of the search horizon are valued at the marginal generalized cost of credits, as
+      estimated from the compliance search results, so burning credits is not free.  Branches are pruned when their
+      cumulative generalized cost plus a lower bound on the cost of the remaining years exceeds the best path cost.
+      The branches of the first year of each search are independent and are evaluated in parallel if
+      ``omega_globals.options.multiprocessing`` is enabled.
+
+    * The session's final pass uses the strategic target offsets of the best paths.
+
+----
+
+**CODE**
+
+"""
+
+print('importing %s' % __file__)
+
+from omega_model import *
+
+from common import omega_pool
+from common.omega_trees import _OMEGATree, _OMEGANode
+
+_cache = dict()  # memoized compliance search results, by (compliance_id, calendar_year, strategic_target_offset_Mg)
+
+_strategic_offsets = dict()  # searched strategic target offsets, by compliance_id and calendar_year
+
+_search_pass = {'pass_num': None}
+
+
+def init_credit_strategy(search_pass_num=None):
+    """
+    Initialize the module by clearing memoized compliance search results and searched strategic offsets.
+
+    Args:
+        search_pass_num (int): the session pass number that probes the compliance search, or ``None`` if the credit
+            strategy search is disabled
+
+    Returns:
+        Empty list on success
+
+    """
+    _cache.clear()
+    _strategic_offsets.clear()
+    _search_pass['pass_num'] = search_pass_num
+
+    return []
+
+
+def is_search_pass(pass_num):
+    """
+    Check if the given session pass probes the compliance search for the credit strategy search.
+
+    Args:
+        pass_num (int): the session pass number
+
+    Returns:
+        ``True`` if the given pass is the credit strategy search pass
+
+    """
+    return pass_num == _search_pass['pass_num']
+
+
+def get_strategic_offset(compliance_id, calendar_year):
+    """
+    Get the searched strategic target offset for the given compliance ID and year, if any.
+
+    Args:
+        compliance_id (str): manufacturer name, or 'consolidated_OEM'
+        calendar_year (int): the calendar year
+
+    Returns:
+        The strategic target offset, CO2e Mg, or ``None`` if the credit strategy has not been searched
+
+    """
+    return _strategic_offsets.get(compliance_id, dict()).get(calendar_year)
+
+
+def probe_strategic_offsets(compliance_id, calendar_year, producer_decision_and_response,
+                            producer_consumer_iteration_num, strategic_target_offset_Mg,
+                            prior_producer_decision_and_response):
+    """
+    Run the producer compliance search for a range of strategic target offsets around the given offset and memoize
+    the results.  Call after the year's production has been finalized so the finalized vehicles are not disturbed.
+
+    Args:
+        compliance_id (str): manufacturer name, or 'consolidated_OEM'
+        calendar_year (int): the year of the compliance search
+        producer_decision_and_response (Series): the year's final producer decision and consumer response
+        producer_consumer_iteration_num (int): the number of the final producer-consumer iteration
+        strategic_target_offset_Mg (float): the strategic target offset used for the year, CO2e Mg
+        prior_producer_decision_and_response (Series): prior-year producer decision and response
+
+    Returns:
+        Nothing, updates the memoized compliance search results
+
+    """
+    from producer import compliance_search
+    from producer.vehicles import Vehicle
+
+    next_vehicle_id = Vehicle.next_vehicle_id
+
+    target_co2e_Mg = producer_decision_and_response['total_target_co2e_megagrams']
+
+    for offset_frac in sorted(set(omega_globals.options.credit_strategy_offset_fractions) | {0.0}):
+        offset_Mg = strategic_target_offset_Mg + offset_frac * target_co2e_Mg
+        cache_key = (compliance_id, calendar_year, offset_Mg)
+
+        if cache_key not in _cache:
+            selected_production_decision = \
+                compliance_search.search_production_options(compliance_id, calendar_year,
+                                                            producer_decision_and_response,
+                                                            producer_consumer_iteration_num, offset_Mg,
+                                                            prior_producer_decision_and_response)[2]
+
+            if selected_production_decision is None:
+                _cache[cache_key] = None
+            else:
+                _cache[cache_key] = {
+                    'offset_frac': offset_frac,
+                    'strategic_target_offset_Mg': offset_Mg,
+                    'total_generalized_cost_dollars': selected_production_decision['total_generalized_cost_dollars'],
+                    'total_credits_co2e_megagrams': selected_production_decision['total_credits_co2e_megagrams'],
+                }
+
+    # discard probe composite vehicles and vehicle IDs
+    compliance_search._cache.clear()
+    Vehicle.next_vehicle_id = next_vehicle_id
+
+
+def get_strategy_options(compliance_id, calendar_year):
+    """
+    Get the memoized compliance search results for the given compliance ID and year.
+
+    Args:
+        compliance_id (str): manufacturer name, or 'consolidated_OEM'
+        calendar_year (int): the calendar year
+
+    Returns:
+        List of (strategic target offset Mg, generalized cost dollars, credits Mg) tuples, in order of offset, and the
+        index of the baseline (zero offset fraction) option, or ``None`` if there is no baseline option
+
+    """
+    results = sorted([v for k, v in _cache.items() if k[0] == compliance_id and k[1] == calendar_year and v],
+                     key=lambda v: v['strategic_target_offset_Mg'])
+
+    options = [(r['strategic_target_offset_Mg'], r['total_generalized_cost_dollars'],
+                r['total_credits_co2e_megagrams']) for r in results]
+
+    offset_fracs = [r['offset_frac'] for r in results]
+
+    baseline_index = offset_fracs.index(0.0) if 0.0 in offset_fracs else None
+
+    return options, baseline_index
+
+
+def calc_credit_value(year_options):
+    """
+    Estimate the marginal generalized cost of credits from the compliance search results, used to value credits
+    remaining at the end of the search horizon.
+
+    Args:
+        year_options (list): lists of (strategic target offset Mg, generalized cost dollars, credits Mg) tuples, by year
+
+    Returns:
+        The median (non-negative) slope of generalized cost versus credits, dollars per CO2e Mg
+
+    """
+    slopes = []
+    for options in year_options:
+        credits_Mg = np.array([o[2] for o in options])
+        if len(np.unique(credits_Mg)) > 1:
+            slopes.append(np.polyfit(credits_Mg, np.array([o[1] for o in options]), 1)[0])
+
+    return max(0.0, float(np.median(slopes))) if slopes else 0.0
+
+
+def simulate_credit_path(credit_bank, calendar_years, credits_Mg):
+    """
+    Simulate a credit path by handling the given credits in a copy of the given credit bank.
+
+    Args:
+        credit_bank (CreditBank): the starting credit bank, as of the year before the first year of the path
+        calendar_years (list): the years of the path
+        credits_Mg (list): the credits earned (or debits incurred, if negative) in each year, CO2e Mg
+
+    Returns:
+        Tuple of the updated copy of the credit bank and ``True`` if no debits went past due
+
+    """
+    credit_bank = credit_bank.copy()
+    feasible = True
+
+    for calendar_year, year_credits_Mg in zip(calendar_years, credits_Mg):
+        credit_bank.update_credit_age(calendar_year)
+        feasible &= credit_bank.get_transactions_Mg(calendar_year, 'PAST_DUE') == 0
+        credit_bank.handle_credit(calendar_year, year_credits_Mg)
+
+    return credit_bank, feasible
+
+
+def calc_terminal_balance_Mg(credit_bank, calendar_year):
+    """
+    Calculate the net credit balance carried beyond the end of a search horizon, i.e. after the next year's credit
+    expiration.
+
+    Args:
+        credit_bank (CreditBank): the credit bank, as of the last year of the search horizon
+        calendar_year (int): the last year of the search horizon
+
+    Returns:
+        Tuple of the net credit balance, CO2e Mg, and ``True`` if no debits go past due
+
+    """
+    credit_bank = credit_bank.copy()
+    credit_bank.update_credit_age(calendar_year + 1)
+
+    return credit_bank.get_net_balance_Mg(calendar_year + 1), \
+        credit_bank.get_transactions_Mg(calendar_year + 1, 'PAST_DUE') == 0
+
+
+def search_credit_path_tree(credit_bank, calendar_years, year_options, credit_value_dollars_per_Mg,
+                            baseline_balance_Mg, best_path_cost, first_choice=None):
+    """
+    Depth-first branch and bound search of a tree of per-year strategy options.  Tree nodes hold the credit bank and
+    cumulative generalized cost of the path so far.  The path cost includes the value of the difference between the
+    baseline terminal credit balance and the path's terminal credit balance.
+
+    Runs in a worker process when the session uses multiprocessing.
+
+    Args:
+        credit_bank (CreditBank): the starting credit bank, as of the year before the first year of the tree
+        calendar_years (list): the years of the tree
+        year_options (list): lists of (strategic target offset Mg, generalized cost dollars, credits Mg) tuples, by
+            year
+        credit_value_dollars_per_Mg (float): the value of credits remaining at the end of the search horizon
+        baseline_balance_Mg (float): the terminal credit balance of the baseline path, CO2e Mg
+        best_path_cost (float): the cost of the best known path, branches that can't beat it are pruned
+        first_choice (int): if not ``None``, search only the branch of this first-year option
+
+    Returns:
+        Tuple of the best path cost, the best path (tuple of option indices by year) or ``None`` if no path beats
+        ``best_path_cost``, and the number of tree nodes evaluated
+
+    """
+    # lower bound of the remaining years' generalized cost less the value of their credits
+    min_net_costs = [min(cost - credit_value_dollars_per_Mg * credits_Mg for _, cost, credits_Mg in options)
+                     for options in year_options]
+    remaining_bound = np.append(np.cumsum(min_net_costs[::-1])[::-1], 0)
+
+    tree = _OMEGATree(_OMEGANode(None, tuple(), credit_bank, None, 0))
+    tree.best_path_cost = best_path_cost
+
+    nodes = [tree.root]
+
+    while nodes:
+        node = nodes.pop()
+        depth = len(node.name)
+        calendar_year = calendar_years[depth]
+
+        if depth == 0 and first_choice is not None:
+            choices = [first_choice]
+        else:
+            choices = range(len(year_options[depth]))
+
+        child_nodes = []
+        for choice in choices:
+            _, cost, credits_Mg = year_options[depth][choice]
+
+            ghg_credit_bank, feasible = simulate_credit_path(node.ghg_credit_bank, [calendar_year], [credits_Mg])
+            tree.num_nodes += 1
+
+            if not feasible:
+                continue
+
+            path_cost = node.path_cost + cost
+
+            balance_Mg = ghg_credit_bank.get_net_balance_Mg(calendar_year)
+
+            if path_cost + credit_value_dollars_per_Mg * (baseline_balance_Mg - balance_Mg) + \
+                    remaining_bound[depth + 1] >= tree.best_path_cost:
+                continue
+
+            child = _OMEGANode(node.name, node.name + (choice,), ghg_credit_bank, None, path_cost)
+
+            if depth + 1 == len(calendar_years):
+                balance_Mg, feasible = calc_terminal_balance_Mg(ghg_credit_bank, calendar_year)
+                path_cost += credit_value_dollars_per_Mg * (baseline_balance_Mg - balance_Mg)
+
+                if feasible and path_cost < tree.best_path_cost:
+                    tree.best_path_cost = path_cost
+                    tree.best_path = child.name
+            else:
+                child_nodes.append(child)
+
+        # search the cheapest branches first for earlier pruning
+        nodes.extend(sorted(child_nodes, key=lambda n: -n.path_cost))
+
+    return tree.best_path_cost, tree.best_path, tree.num_nodes
+
+
+def search_credit_strategy(compliance_id):
+    """
+    Search the strategic target offsets of the given compliance ID, ``credit_strategy_lookahead_years`` at a time,
+    keeping the first year of each search's best path.
+
+    Args:
+        compliance_id (str): manufacturer name, or 'consolidated_OEM'
+
+    Returns:
+        DataFrame of the baseline and searched strategy by year, updates the searched strategic target offsets
+
+    """
+    from policy.credit_banking import CreditBank
+
+    calendar_years = []
+    year_options = []
+    baseline_choices = []
+    for calendar_year in range(omega_globals.options.analysis_initial_year,
+                               omega_globals.options.analysis_final_year + 1):
+        options, baseline_index = get_strategy_options(compliance_id, calendar_year)
+        if baseline_index is None:
+            break  # search up to the first year without a baseline compliance search result
+        calendar_years.append(calendar_year)
+        year_options.append(options)
+        baseline_choices.append(baseline_index)
+
+    credit_value_dollars_per_Mg = calc_credit_value(year_options)
+
+    lookahead_years = omega_globals.options.credit_strategy_lookahead_years or len(calendar_years)
+
+    credit_bank = CreditBank(omega_globals.options.ghg_credit_params_file, omega_globals.options.ghg_credits_file,
+                             compliance_id)
+    credit_bank.update_manufacturer_annual_data = False
+    initial_credit_bank = credit_bank
+
+    strategy = []
+    num_nodes = 0
+    for i, calendar_year in enumerate(calendar_years):
+        window = slice(i, i + lookahead_years)
+        window_years = calendar_years[window]
+        window_options = year_options[window]
+        window_baseline = baseline_choices[window]
+
+        # the baseline path is the initial best path
+        baseline_bank, feasible = \
+            simulate_credit_path(credit_bank, window_years,
+                                 [options[choice][2] for options, choice in zip(window_options, window_baseline)])
+        baseline_balance_Mg, terminal_feasible = calc_terminal_balance_Mg(baseline_bank, window_years[-1])
+
+        best_path = tuple(window_baseline)
+        best_path_cost = np.inf
+        if feasible and terminal_feasible:
+            best_path_cost = sum(options[choice][1] for options, choice in zip(window_options, window_baseline))
+
+        search_args = [(credit_bank, window_years, window_options, credit_value_dollars_per_Mg, baseline_balance_Mg,
+                        best_path_cost, first_choice) for first_choice in range(len(window_options[0]))]
+
+        if omega_globals.options.multiprocessing:
+            results = [omega_pool.apply_async(func=search_credit_path_tree, args=args,
+                                              error_callback=error_callback) for args in search_args]
+            results = [r.get() for r in results]
+        else:
+            results = [search_credit_path_tree(*args) for args in search_args]
+
+        for path_cost, path, branch_nodes in results:
+            num_nodes += branch_nodes
+            if path is not None and path_cost < best_path_cost:
+                best_path_cost, best_path = path_cost, path
+
+        # keep the first year of the best path
+        offset_Mg, cost, credits_Mg = window_options[0][best_path[0]]
+        baseline_offset_Mg, baseline_cost, baseline_credits_Mg = window_options[0][window_baseline[0]]
+
+        credit_bank, _ = simulate_credit_path(credit_bank, [calendar_year], [credits_Mg])
+
+        _strategic_offsets.setdefault(compliance_id, dict())[calendar_year] = offset_Mg
+
+        strategy.append({'calendar_year': calendar_year,
+                         'baseline_strategic_target_offset_Mg': baseline_offset_Mg,
+                         'baseline_total_generalized_cost_dollars': baseline_cost,
+                         'baseline_total_credits_co2e_megagrams': baseline_credits_Mg,
+                         'strategic_target_offset_Mg': offset_Mg,
+                         'total_generalized_cost_dollars': cost,
+                         'total_credits_co2e_megagrams': credits_Mg,
+                         'net_credit_balance_Mg': credit_bank.get_net_balance_Mg(calendar_year)})
+
+    strategy = pd.DataFrame(strategy)
+
+    if not strategy.empty:
+        baseline_bank, _ = simulate_credit_path(initial_credit_bank, calendar_years,
+                                                strategy['baseline_total_credits_co2e_megagrams'])
+
+        omega_log.logwrite('Credit strategy search %s: %d years, %d tree nodes, credit value $%.2f/Mg, '
+                           'generalized cost $%.0f, net credit balance %.0f Mg '
+                           '(baseline generalized cost $%.0f, net credit balance %.0f Mg)' %
+                           (compliance_id, len(strategy), num_nodes, credit_value_dollars_per_Mg,
+                            strategy['total_generalized_cost_dollars'].sum(),
+                            credit_bank.get_net_balance_Mg(calendar_years[-1]),
+                            strategy['baseline_total_generalized_cost_dollars'].sum(),
+                            baseline_bank.get_net_balance_Mg(calendar_years[-1])), echo_console=True)
+
+    return strategy
+
+
+def search_credit_strategies(compliance_ids):
+    """
+    Search the credit strategies of the given compliance IDs, call after the credit strategy search pass.
+
+    Args:
+        compliance_ids (iterable): the compliance IDs of the search pass
+
+    Returns:
+        Nothing, updates the searched strategic target offsets and writes the strategies to the output folder
+
+    """
+    for compliance_id in compliance_ids:
+        strategy = search_credit_strategy(compliance_id)
+
+        strategy.to_csv(omega_globals.options.output_folder + omega_globals.options.session_unique_name +
+                        ' %s credit_strategy.csv' % compliance_id, index=False)
+
+
+def error_callback(e):
+    """
+    Print multiprocess error callback to the console.
+
+    Args:
+        e (BaseException): exception info
+
+    """
+    print('error_callback_%s' % __name__)
+    print(e)
+
+
+if __name__ == '__main__':
+    try:
+        if '__file__' in locals():
+            print(file_io.get_filenameext(__file__))
+
+    except:
+        print("\n#RUNTIME FAIL\n%s\n" % traceback.format_exc())
+        sys.exit(-1)
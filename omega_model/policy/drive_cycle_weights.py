@@ -12,6 +12,10 @@ the tests to each other.
 and provides methods to query the tree for weighted results.  Most of the heavy lifting is done by
 ``class WeightedTree``, see ``omega_trees.py``
 
+For speed, each queried tree node is compiled into a vector of overall drive cycle weights (the products of the node
+weights down to each drive cycle leaf) so that weighted results are the matrix product of the drive cycle results and
+the weights.
+
 Child share weights must add up to 1.0 at each node of the tree, with the exception of weights with the value ``None``,
 these are used to ignore unused nodes (different vehicle types have different numbers of drive cycle phases but share
 the same overall tree).
@@ -92,7 +96,8 @@ class DriveCycleWeights(OMEGABase):
     """
     
     _data = dict()  # private dict, drive cycle weights by fuel class and calendar year
-    
+    _weights = dict()  # private dict, compiled drive cycle weights by calendar year, fuel class and node
+
     @staticmethod
     def validate_drive_cycle_names(tree, filename):
         """
@@ -132,6 +137,7 @@ class DriveCycleWeights(OMEGABase):
 
         """
         DriveCycleWeights._data.clear()
+        DriveCycleWeights._weights.clear()
 
         if verbose:
             omega_log.logwrite('\nInitializing data from %s...' % filename)
@@ -172,55 +178,97 @@ class DriveCycleWeights(OMEGABase):
                             template_errors = ['weight error %s: %s' %
                                                (calendar_year, error) for error in weight_errors]
                         else:
-                            if not DriveCycleWeights._data:
-                                # validate drive cycle names on first tree
-                                cycle_name_errors = DriveCycleWeights.validate_drive_cycle_names(tree, filename)
-                                if cycle_name_errors:
-                                    template_errors = ['cyclename error %s' % error for error in cycle_name_errors]
-                            if not cycle_name_errors:
+                            # validate drive cycle names on every tree, trees may differ by year and fueling class
+                            tree_cycle_name_errors = DriveCycleWeights.validate_drive_cycle_names(tree, filename)
+                            cycle_name_errors += [error for error in tree_cycle_name_errors
+                                                  if error not in cycle_name_errors]
+                            if cycle_name_errors:
+                                template_errors = ['cyclename error %s' % error for error in cycle_name_errors]
+                            else:
                                 if fc not in DriveCycleWeights._data:
                                     DriveCycleWeights._data[fc] = dict()
                                 DriveCycleWeights._data[fc][calendar_year] = tree
 
-                DriveCycleWeights._data[fc]['start_year'] = np.array([*DriveCycleWeights._data[fc]])  # CU
+                if fc in DriveCycleWeights._data:
+                    DriveCycleWeights._data[fc]['start_year'] = np.array([*DriveCycleWeights._data[fc]])  # CU
 
         return template_errors
 
     @staticmethod
-    def calc_weighted_value(calendar_year, fueling_class, cycle_values, node_id=None, weighted=True):
+    def get_weights(calendar_year, fueling_class, node_id=None, weighted=False):
         """
-        Query the share tree for a value or weighted value.  A node's value is either a raw cycle result
-        (for leaves) or the sum of the weighted values of its children.  A node's weighted value is it's value
-        times its weight.
+        Get the share tree node value (or weighted value) as a vector of overall drive cycle weights, compiled from the
+        share tree on first use.  Drive cycles are in the order of ``DriveCycles.drive_cycle_names``, drive cycles with
+        a weight of ``None`` (or zero) are omitted, see ``WeightedTree.calc_leaf_weights()``.
 
         Args:
             calendar_year (numeric): calendar year to calculated weighted value in
             fueling_class (str): e.g. 'ICE', 'BEV', etc
-            cycle_values (DataFrame): contains cycle values to be weighted (e.g. the simulated vehicles input
-                data with results (columns) for each drive cycle phase)
             node_id (str): name of tree node at which to calculated weighted value,
                 e.g. 'cs_cert_direct_oncycle_co2e_grams_per_mile'
-            weighted (bool): if True, return weighted value at node (node value * weight),
-                else return node value (e.g. cycle result)
+            weighted (bool): if True, return weights of the weighted value at node (node value * weight),
+                else return weights of the node value (e.g. cycle result)
 
         Returns:
-            A pandas ``Series`` object of the weighted results
+            Tuple of the list of drive cycle names and the numpy array of weights, raises an Exception if the share tree
+            has an unknown drive cycle leaf
 
         """
-        cache_key = calendar_year, fueling_class
+        cache_key = calendar_year, fueling_class, node_id, weighted
 
-        if cache_key not in DriveCycleWeights._data:
+        if cache_key not in DriveCycleWeights._weights:
 
             start_years = DriveCycleWeights._data[fueling_class]['start_year']
             if len(start_years[start_years <= calendar_year]) > 0:
-                calendar_year = max(start_years[start_years <= calendar_year])
-                eq_str = DriveCycleWeights._data[fueling_class][calendar_year].calc_value(cycle_values, node_id=node_id,
-                                                                      weighted=weighted)[1]
-                DriveCycleWeights._data[cache_key] = eq_str
+                start_year = max(start_years[start_years <= calendar_year])
+                leaf_weights = DriveCycleWeights._data[fueling_class][start_year].calc_leaf_weights(node_id=node_id,
+                                                                                                   weighted=weighted)
+                unknown_drive_cycles = [dc for dc in leaf_weights if not DriveCycles.validate_drive_cycle_id(dc)]
+                if unknown_drive_cycles:
+                    raise Exception('Unknown drive cycle(s) %s in drive cycle weights for %s, %d' %
+                                    (unknown_drive_cycles, fueling_class, start_year))
+                drive_cycle_names = [dc for dc in DriveCycles.drive_cycle_names if dc in leaf_weights]
+                DriveCycleWeights._weights[cache_key] = \
+                    (drive_cycle_names, np.array([leaf_weights[dc] for dc in drive_cycle_names], dtype=float))
             else:
                 raise Exception('Missing drive cycle weights for %s, %d or prior' % (fueling_class, calendar_year))
 
-        return Eval.eval(DriveCycleWeights._data[cache_key], {}, {'results': cycle_values})
+        return DriveCycleWeights._weights[cache_key]
+
+    @staticmethod
+    def calc_weighted_value(calendar_year, fueling_class, cycle_values, node_id=None, weighted=True,
+                            column_names=None):
+        """
+        Query the share tree for a value or weighted value.  A node's value is either a raw cycle result
+        (for leaves) or the sum of the weighted values of its children.  A node's weighted value is it's value
+        times its weight.
+
+        Args:
+            calendar_year (numeric): calendar year to calculated weighted value in
+            fueling_class (str): e.g. 'ICE', 'BEV', etc
+            cycle_values (DataFrame, dict-like or 2-D numpy array): contains cycle values to be weighted (e.g. the
+                simulated vehicles input data with results (columns) for each drive cycle phase)
+            node_id (str): name of tree node at which to calculated weighted value,
+                e.g. 'cs_cert_direct_oncycle_co2e_grams_per_mile'
+            weighted (bool): if True, return weighted value at node (node value * weight),
+                else return node value (e.g. cycle result)
+            column_names (list): the column names of ``cycle_values``, required if ``cycle_values`` is a numpy array
+
+        Returns:
+            A numpy array of the weighted results, one per row of ``cycle_values``, or a scalar if ``cycle_values``
+            contains scalars
+
+        """
+        drive_cycle_names, weights = \
+            DriveCycleWeights.get_weights(calendar_year, fueling_class, node_id=node_id, weighted=weighted)
+
+        if isinstance(cycle_values, pd.DataFrame):
+            # stacking the columns is much faster than selecting them with a list
+            return np.column_stack([cycle_values[dc].values for dc in drive_cycle_names]) @ weights
+        elif isinstance(cycle_values, np.ndarray):
+            return cycle_values[:, [column_names.index(dc) for dc in drive_cycle_names]] @ weights
+        else:
+            return np.array([cycle_values[dc] for dc in drive_cycle_names]).T @ weights
 
     @staticmethod
     def calc_cert_direct_oncycle_co2e_grams_per_mile(calendar_year, fueling_class, cycle_values):
@@ -230,11 +278,11 @@ class DriveCycleWeights(OMEGABase):
         Args:
             calendar_year (numeric): calendar year to calculated weighted value in
             fueling_class (str): e.g. 'ICE', 'BEV', etc
-            cycle_values (DataFrame): contains cycle values to be weighted
+            cycle_values (DataFrame or dict-like): contains cycle values to be weighted
                 (e.g. the simulated vehicles input data with results (columns) for each drive cycle phase)
 
         Returns:
-            A pandas ``Series`` object of the weighted results
+            A numpy array of the weighted results
 
         """
         return DriveCycleWeights.calc_weighted_value(calendar_year, fueling_class, cycle_values,
@@ -248,11 +296,11 @@ class DriveCycleWeights(OMEGABase):
         Args:
             calendar_year (numeric): calendar year to calculated weighted value in
             fueling_class (str): e.g. 'ICE', 'BEV', etc
-            cycle_values (DataFrame): contains cycle values to be weighted
+            cycle_values (DataFrame or dict-like): contains cycle values to be weighted
                 (e.g. the simulated vehicles input data with results (columns) for each drive cycle phase)
 
         Returns:
-            A pandas ``Series`` object of the weighted results
+            A numpy array of the weighted results
 
         """
         cd_cert_direct_oncycle_kwh_per_mile = \
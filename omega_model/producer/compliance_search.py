@@ -14,7 +14,7 @@ import time
 import pandas as pd
 import numpy as np
 
-from common import omega_globals, omega_log, TRUE, FALSE
+from common import omega_globals, omega_log, omega_pool, TRUE, FALSE
 
 from producer.vehicles import *
 from common.omega_functions import *
@@ -32,6 +32,11 @@ import matplotlib.pyplot as plt
 
 _cache = dict()
 
+# compliance search counters, see log_search_stats()
+_search_stats = {'searches': 0, 'search_iterations': 0, 'production_options': 0, 'warm_starts': 0,
+                 'warm_start_fallbacks': 0, 'search_iterations_saved': 0, 'search_time': 0.0,
+                 'root_finder_searches': 0, 'root_finder_evaluations': 0, 'root_finder_max_cost_delta_frac': 0.0}
+
 
 def error_callback(e):
     """
@@ -651,6 +656,16 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
     (``producer_consumer_iteration_num`` > 0) the producer decision and consumer response is used to constrain the range
     of market shares under consideration by the producer.
 
+    If ``omega_globals.options.producer_compliance_search_warm_start`` is enabled, subsequent iterations start the
+    search around the prior iteration's selected production decision (technology and market shares) at a reduced share
+    range, ``producer_compliance_search_warm_start_share_range``, skipping the wider share ranges.  If the warm start
+    production options don't bracket the compliance target then the search falls back to a full sweep.
+
+    If ``omega_globals.options.producer_compliance_search_strategy`` is ``'root-finder'`` then, as soon as the candidate
+    production decisions bracket the compliance target, the target is solved for along the line between the bracketing
+    decisions, see ``find_compliance_root()``, instead of narrowing the sweeps further.  The ``'root-finder-check'``
+    strategy also completes the sweeps and reports the root-finder's distance from the sweep result.
+
     Args:
         compliance_id (str): manufacturer name, or 'consolidated_OEM'
         calendar_year (int): the year of the compliance search
@@ -670,6 +685,8 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
         achievable)
 
     """
+    start_time = time.time()
+
     candidate_production_decisions = None
     producer_compliance_possible = False
 
@@ -685,11 +702,41 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
     best_candidate_production_decision = None
     most_strategic_production_decision = None
 
-    while continue_search:
-        share_range = omega_globals.options.producer_compliance_search_convergence_factor ** search_iteration
+    composite_vehicles, pre_production_vehicles, market_class_tree, context_based_total_sales = \
+        create_composite_vehicles(calendar_year, compliance_id)
+
+    # share range exponent of the first search iteration, non-zero for warm starts
+    share_range_offset = 0
+
+    warm_start_key = 'warm_start_%s_%d' % (compliance_id, calendar_year)
+
+    root_finder = omega_globals.options.producer_compliance_search_strategy != 'grid' and \
+        not omega_globals.options.producer_voluntary_overcompliance
+    root_finder_decision = None
+
+    warm_start = omega_globals.options.producer_compliance_search_warm_start and \
+        producer_consumer_iteration_num > 0 and _cache.get(warm_start_key) is not None
+
+    if warm_start:
+        # set up share constraints as for a full sweep, then narrow the search around the prior selected decision
+        create_share_sweeps(calendar_year, market_class_tree, None, 1.0, producer_decision_and_response,
+                            context_based_total_sales, prior_producer_decision_and_response,
+                            producer_consumer_iteration_num)
 
-        composite_vehicles, pre_production_vehicles, market_class_tree, context_based_total_sales = \
-            create_composite_vehicles(calendar_year, compliance_id)
+        share_range_offset = \
+            int(np.ceil(np.log(omega_globals.options.producer_compliance_search_warm_start_share_range) /
+                        np.log(omega_globals.options.producer_compliance_search_convergence_factor)))
+
+        candidate_production_decisions = _cache[warm_start_key].to_frame().T
+
+        for cv in composite_vehicles:
+            cv.tech_option_iteration_num = share_range_offset - 1
+
+        _search_stats['warm_starts'] += 1
+
+    while continue_search:
+        share_range = omega_globals.options.producer_compliance_search_convergence_factor ** \
+                      (search_iteration + share_range_offset)
 
         tech_sweeps = create_tech_sweeps(composite_vehicles, candidate_production_decisions, share_range)
 
@@ -702,17 +749,11 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
         tech_sweeps = tech_sweeps.astype(np.float32)
         share_sweeps = share_sweeps.astype(np.float32)
 
-        tech_and_share_sweeps = cartesian_prod(tech_sweeps, share_sweeps)
-
         # CU
 
-        production_options = create_production_options_from_shares(composite_vehicles, tech_and_share_sweeps,
-                                                                   context_based_total_sales)
-
-        # insert code to cull production options based on policy here #
-
-        if omega_globals.options.manufacturer_gigawatthour_data is None:
-            # individual OEM data not yet be populated, use the default values
+        if omega_globals.options.manufacturer_gigawatthour_data is None or \
+                compliance_id not in omega_globals.options.manufacturer_gigawatthour_data:
+            # individual OEM data not yet be populated (or consolidated), use the default values
             battery_GWh_limit = np.interp(calendar_year, omega_globals.options.battery_GWh_limit_years,
                               omega_globals.options.battery_GWh_limit)
         else:
@@ -721,22 +762,20 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
                                           omega_globals.options.manufacturer_gigawatthour_data['analysis_years'],
                                           omega_globals.options.manufacturer_gigawatthour_data[compliance_id])
 
+        # evaluate the tech and share sweep combinations, in chunks, and keep the production options within the
+        # battery GWh limit, or the closest one(s) if none are within the limit
+        production_option_evaluator = \
+            ProductionOptionEvaluator(composite_vehicles, list(tech_sweeps.columns) + list(share_sweeps.columns))
+
+        production_options = \
+            production_option_evaluator.evaluate_sweeps(tech_sweeps.values, share_sweeps.values,
+                                                        context_based_total_sales, battery_GWh_limit,
+                                                        strategic_target_offset_Mg,
+                                                        omega_globals.options.producer_compliance_search_chunk_size)
+
+        # insert code to cull production options based on policy here #
+
         production_options['battery_GWh_limit'] = battery_GWh_limit
-        valid_production_options = \
-            production_options[production_options['total_battery_GWh'] <= battery_GWh_limit].copy()
-
-        if valid_production_options.empty:
-            # omega_log.logwrite('%%%%%% Production Constraints Violated ... limit: %f, min / max: %f / %f %%%%%%' %
-            #                    (battery_GWh_limit,
-            #                     production_options['total_battery_GWh'].min(),
-            #                     production_options['total_battery_GWh'].max())
-            #                    )
-            # take the closest one(s), see how that goes...
-            valid_production_options = \
-                production_options[production_options['total_battery_GWh'] ==
-                                   production_options['total_battery_GWh'].min()].copy()
-
-        production_options = valid_production_options
 
         if production_options.empty:
             producer_compliance_possible = None
@@ -745,19 +784,30 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
         if producer_compliance_possible is not None:
             production_options['share_range'] = share_range
 
-            buffered_strategic_target_offset_Mg = strategic_target_offset_Mg - \
-                production_options['total_target_co2e_megagrams'] * \
-                omega_globals.options.producer_strategic_compliance_buffer
-
-            production_options['strategic_compliance_ratio'] = \
-                (production_options['total_cert_co2e_megagrams'] - buffered_strategic_target_offset_Mg) / \
-                np.maximum(1, production_options['total_target_co2e_megagrams'])
+            production_options['strategic_compliance_ratio'], buffered_strategic_target_offset_Mg = \
+                calc_strategic_compliance_ratio(production_options, strategic_target_offset_Mg)
 
             production_options['strategic_target_offset_Mg'] = buffered_strategic_target_offset_Mg
 
+            _search_stats['search_iterations'] += 1
+            _search_stats['production_options'] += len(production_options)
+
+            if warm_start:
+                # only the first warm start pass needs to bracket the compliance target
+                warm_start = False
+                if not (production_options['strategic_compliance_ratio'].min() <= 1.0 <=
+                        production_options['strategic_compliance_ratio'].max()):
+                    # warm start doesn't bracket the compliance target, fall back to a full sweep from share range 1.0
+                    search_iteration = 0
+                    share_range_offset = 0
+                    candidate_production_decisions = None
+                    _search_stats['warm_start_fallbacks'] += 1
+                    continue
+
             candidate_production_decisions, compliance_possible = \
                 select_candidate_manufacturing_decisions(production_options, calendar_year, search_iteration,
-                                                         producer_iteration_log, buffered_strategic_target_offset_Mg)
+                                                         producer_iteration_log, buffered_strategic_target_offset_Mg,
+                                                         production_option_evaluator)
 
             producer_compliance_possible |= compliance_possible
 
@@ -801,6 +851,12 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
             else:
                 best_candidate_production_decision = most_strategic_production_decision
 
+            if root_finder and root_finder_decision is None:
+                root_finder_decision = \
+                    find_compliance_root(production_option_evaluator, composite_vehicles,
+                                         candidate_production_decisions, strategic_target_offset_Mg,
+                                         battery_GWh_limit)
+
             if omega_globals.options.producer_compliance_search_multipoint:
                 # enable multi-point search, might still be a single point
                 candidate_production_decisions = candidate_production_decisions
@@ -819,6 +875,33 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
 
             continue_search = (share_range > omega_globals.options.producer_compliance_search_min_share_range)  # RV
 
+            if root_finder_decision is not None and \
+                    omega_globals.options.producer_compliance_search_strategy == 'root-finder':
+                continue_search = False
+
+    if root_finder_decision is not None:
+        if omega_globals.options.producer_compliance_search_strategy == 'root-finder-check':
+            # report the distance from the sweep result
+            root_finder_decision['grid_total_generalized_cost_dollars'] = \
+                best_candidate_production_decision['total_generalized_cost_dollars']
+            root_finder_decision['grid_strategic_compliance_ratio'] = \
+                best_candidate_production_decision['strategic_compliance_ratio']
+            root_finder_decision['root_finder_cost_delta_frac'] = \
+                root_finder_decision['total_generalized_cost_dollars'] / \
+                best_candidate_production_decision['total_generalized_cost_dollars'] - 1
+
+            _search_stats['root_finder_max_cost_delta_frac'] = \
+                max(_search_stats['root_finder_max_cost_delta_frac'],
+                    abs(root_finder_decision['root_finder_cost_delta_frac']))
+
+            omega_log.logwrite('%d %s root-finder vs grid: generalized cost delta %.6f%%, compliance ratio %.8f vs %.8f'
+                               % (calendar_year, compliance_id,
+                                  100 * root_finder_decision['root_finder_cost_delta_frac'],
+                                  root_finder_decision['strategic_compliance_ratio'],
+                                  best_candidate_production_decision['strategic_compliance_ratio']))
+
+        best_candidate_production_decision = root_finder_decision
+
     if producer_compliance_possible is not None:
         if 'producer_compliance_search' in omega_globals.options.verbose_console_modules:
             omega_log.logwrite('PRODUCER FINAL COMPLIANCE DELTA %f' %
@@ -839,6 +922,8 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
 
         selected_production_decision = best_candidate_production_decision
 
+        _cache[warm_start_key] = selected_production_decision
+
         selected_production_decision = \
             selected_production_decision.rename({'strategic_compliance_ratio': 'strategic_compliance_ratio_initial',
                                                  'strategic_compliance_error': 'strategic_compliance_error_initial'})
@@ -849,10 +934,182 @@ def search_production_options(compliance_id, calendar_year, producer_decision_an
         composite_vehicles = apply_production_decision_to_composite_vehicles(composite_vehicles,
                                                                              selected_production_decision)
 
+    _search_stats['searches'] += 1
+    _search_stats['search_time'] += time.time() - start_time
+    # share_range_offset is only non-zero for warm starts that didn't fall back to a full sweep
+    _search_stats['search_iterations_saved'] += share_range_offset
+
     return composite_vehicles, pre_production_vehicles, selected_production_decision, market_class_tree, \
            producer_compliance_possible, battery_GWh_limit
 
 
+def log_search_stats():
+    """
+    Log the compliance search counters, e.g. the number of search iterations and production options evaluated and the
+    number of search iterations saved by warm starts, then reset them.
+
+    Returns:
+        Nothing, writes the counters to the session log
+
+    """
+    omega_log.logwrite('Compliance search: %d searches, %d search iterations, %d production options, %.1f seconds, '
+                       '%d warm starts, %d warm start fallbacks, %d search iterations saved' %
+                       (_search_stats['searches'], _search_stats['search_iterations'],
+                        _search_stats['production_options'], _search_stats['search_time'],
+                        _search_stats['warm_starts'], _search_stats['warm_start_fallbacks'],
+                        _search_stats['search_iterations_saved']), echo_console=True)
+
+    if _search_stats['root_finder_searches']:
+        message = 'Compliance search root-finder: %d searches, %d production options' % \
+                  (_search_stats['root_finder_searches'], _search_stats['root_finder_evaluations'])
+
+        if omega_globals.options.producer_compliance_search_strategy == 'root-finder-check':
+            message += ', max generalized cost delta from grid %.6f%%' % \
+                       (100 * _search_stats['root_finder_max_cost_delta_frac'])
+
+        omega_log.logwrite(message, echo_console=True)
+
+    for k in _search_stats:
+        _search_stats[k] = 0
+
+
+def calc_strategic_compliance_ratio(production_options, strategic_target_offset_Mg):
+    """
+    Calculate the strategic compliance ratio of production options, the ratio of the cert CO2e Mg, less the buffered
+    strategic target offset, to the target CO2e Mg.
+
+    Args:
+        production_options (DataFrame, Series or dict): production option totals
+        strategic_target_offset_Mg (float): the strategic target offset, CO2e Mg
+
+    Returns:
+        Tuple of the strategic compliance ratio and buffered strategic target offset, CO2e Mg
+
+    """
+    buffered_strategic_target_offset_Mg = strategic_target_offset_Mg - \
+        production_options['total_target_co2e_megagrams'] * \
+        omega_globals.options.producer_strategic_compliance_buffer
+
+    strategic_compliance_ratio = \
+        (production_options['total_cert_co2e_megagrams'] - buffered_strategic_target_offset_Mg) / \
+        np.maximum(1, production_options['total_target_co2e_megagrams'])
+
+    return strategic_compliance_ratio, buffered_strategic_target_offset_Mg
+
+
+def interpolate_production_option(production_option_evaluator, composite_vehicles, option_a, option_b, t):
+    """
+    Create the production option a fraction of the way between two production options.  Market shares and cost curve
+    indices are interpolated linearly, vehicle costs and battery kWh are taken from the composite vehicle cost curves.
+
+    Args:
+        production_option_evaluator (ProductionOptionEvaluator): the production option evaluator
+        composite_vehicles (list): list of ``CompositeVehicle`` objects, in production option evaluator order
+        option_a (Array): production option at ``t = 0``, columns as given by the evaluator's ``columns``
+        option_b (Array): production option at ``t = 1``, columns as given by the evaluator's ``columns``
+        t (float): the interpolation fraction, 0 to 1
+
+    Returns:
+        2-D Array of the interpolated production option, one row
+
+    """
+    option = (1 - t) * option_a + t * option_b
+
+    for idx, cv in enumerate(composite_vehicles):
+        cost_curve_index = option[production_option_evaluator.cost_curve_index_columns[idx]]
+        option[production_option_evaluator.cost_columns[idx]] = \
+            cv.get_from_cost_curve('new_vehicle_mfr_cost_dollars', cost_curve_index)
+        option[production_option_evaluator.generalized_cost_columns[idx]] = \
+            cv.get_from_cost_curve('new_vehicle_mfr_generalized_cost_dollars', cost_curve_index)
+        option[production_option_evaluator.battery_kwh_columns[idx]] = \
+            cv.get_from_cost_curve('battery_kwh', cost_curve_index)
+
+    return option.reshape(1, -1)
+
+
+def find_compliance_root(production_option_evaluator, composite_vehicles, candidate_production_decisions,
+                         strategic_target_offset_Mg, battery_GWh_limit, max_evaluations=50):
+    """
+    Solve for the production option that meets the strategic compliance target, on the line between the most strategic
+    compliant and non-compliant candidate production decisions, using the Illinois variant of the method of false
+    position, a bracketing root-finder.  Each step evaluates a single production option.
+
+    Args:
+        production_option_evaluator (ProductionOptionEvaluator): the production option evaluator of the candidates
+        composite_vehicles (list): list of ``CompositeVehicle`` objects, in production option evaluator order
+        candidate_production_decisions (DataFrame): candidate production decisions, from
+            ``select_candidate_manufacturing_decisions()``
+        strategic_target_offset_Mg (float): the strategic target offset, CO2e Mg
+        battery_GWh_limit (float): the battery GWh production limit
+        max_evaluations (int): the maximum number of production options to evaluate
+
+    Returns:
+        The production decision (Series), or ``None`` if the candidate production decisions don't bracket the
+        strategic compliance target
+
+    """
+    strategic_compliance_ratio = candidate_production_decisions['strategic_compliance_ratio'].values
+    compliant = strategic_compliance_ratio <= 1.0
+
+    if compliant.all() or not compliant.any():
+        return None
+
+    compliant_index = np.flatnonzero(compliant)[strategic_compliance_ratio[compliant].argmax()]
+    non_compliant_index = np.flatnonzero(~compliant)[strategic_compliance_ratio[~compliant].argmin()]
+    compliant_decision = candidate_production_decisions.iloc[compliant_index]
+
+    columns = production_option_evaluator.columns
+    option_a = compliant_decision[columns].values.astype(float)
+    option_b = candidate_production_decisions[columns].iloc[non_compliant_index].values.astype(float)
+
+    t_lo, error_lo = 0.0, strategic_compliance_ratio[compliant_index] - 1
+    t_hi, error_hi = 1.0, strategic_compliance_ratio[non_compliant_index] - 1
+    t = t_lo
+    side = 0
+
+    num_evaluations = 0
+    while num_evaluations < max_evaluations and error_hi > error_lo:
+        t = t_lo - error_lo * (t_hi - t_lo) / (error_hi - error_lo)
+
+        option = \
+            interpolate_production_option(production_option_evaluator, composite_vehicles, option_a, option_b, t)
+        results = production_option_evaluator.evaluate(option, production_option_evaluator.total_sales)
+        error = calc_strategic_compliance_ratio(results, strategic_target_offset_Mg)[0][0] - 1
+        num_evaluations += 1
+
+        if abs(error) <= omega_globals.options.producer_compliance_search_tolerance:
+            break
+        elif error > 0:
+            t_hi, error_hi = t, error
+            if side == 1:
+                error_lo /= 2  # Illinois step, keeps the retained end of the bracket from stalling
+            side = 1
+        else:
+            t_lo, error_lo = t, error
+            if side == -1:
+                error_hi /= 2
+            side = -1
+
+    _search_stats['root_finder_searches'] += 1
+    _search_stats['root_finder_evaluations'] += num_evaluations
+
+    option = interpolate_production_option(production_option_evaluator, composite_vehicles, option_a, option_b, t)
+    production_option = production_option_evaluator.get_production_options_from_matrix(option).iloc[0]
+
+    root_decision = compliant_decision.copy()
+
+    if production_option['total_battery_GWh'] <= battery_GWh_limit or \
+            compliant_decision['total_battery_GWh'] > battery_GWh_limit:
+        root_decision[production_option.index] = production_option.values
+
+    root_decision['strategic_compliance_ratio'], root_decision['strategic_target_offset_Mg'] = \
+        calc_strategic_compliance_ratio(root_decision, strategic_target_offset_Mg)
+    root_decision['strategic_compliance_error'] = abs(1 - root_decision['strategic_compliance_ratio'])
+    root_decision['root_finder_evaluations'] = num_evaluations
+
+    return root_decision
+
+
 def calc_composite_vehicle(mc, rc, alt, mctrc):
     """
     Calculate composite vehicle for the set of vehicles in the given market class / reg class / alt class
@@ -919,11 +1176,13 @@ def create_composite_vehicles(calendar_year, compliance_id):
         if omega_globals.options.multiprocessing:
             results = []
             for new_veh in manufacturer_vehicles:
-                results.append(omega_globals.pool.apply_async(func=calc_vehicle_frontier,
-                                                              args=[new_veh],
-                                                              callback=None,
-                                                              error_callback=error_callback))
-            manufacturer_vehicles = [r.get() for r in results]
+                results.append(omega_pool.apply_async(func=calc_vehicle_frontier_record,
+                                                      args=[new_veh.to_record()],
+                                                      error_callback=error_callback))
+
+            for new_veh, r in zip(manufacturer_vehicles, results):
+                for k, v in r.get().items():
+                    new_veh.__setattr__(k, v)
         else:
             for new_veh in manufacturer_vehicles:
                 calc_vehicle_frontier(new_veh)
@@ -1065,10 +1324,9 @@ def create_composite_vehicles(calendar_year, compliance_id):
             results = []
             # start longest jobs first!
             for mc, rc, alt, _ in mcrc_priority_list:
-                results.append(omega_globals.pool.apply_async(func=calc_composite_vehicle,
-                                                              args=[mc, rc, alt, mctrc],
-                                                              callback=None,
-                                                              error_callback=error_callback))
+                results.append(omega_pool.apply_async(func=calc_composite_vehicle,
+                                                      args=[mc, rc, alt, mctrc],
+                                                      error_callback=error_callback))
 
             composite_vehicles = [r.get() for r in results]
         else:
@@ -1285,6 +1543,373 @@ def decompose_candidate_vehicles(candidate_mfr_composite_vehicles, producer_deci
         cv.decompose()  # propagate sales to source vehicles and interpolate cost curve data
 
 
+class ProductionOptionEvaluator(OMEGABase):
+    """
+    **Evaluates production options stored as a 2-D array of tech and share values.**
+
+    The array column positions of the composite vehicle tech and share values are mapped once, when the evaluator is
+    created, so production option sales, costs, battery GWh and CO2e Mg can be calculated as arrays.  A ``DataFrame``
+    is only created for the production options that are actually needed, e.g. the selected candidate production
+    options, see ``get_production_options()``.
+
+    The production options are the cartesian product of the tech sweeps and the share sweeps.  The product is never
+    fully created, production options are created and evaluated in chunks, see ``evaluate_sweeps()``, and re-created
+    as needed from their production option number (the row number of the product).
+
+    Equivalent to ``create_production_options_from_shares()`` for ``DataFrame`` tech and share combinations.
+
+    """
+    total_columns = ['total_battery_GWh', 'total_NO_ALT_battery_GWh', 'total_ALT_battery_GWh',
+                     'total_target_co2e_megagrams', 'total_cert_co2e_megagrams', 'total_cost_dollars',
+                     'total_generalized_cost_dollars', 'total_credits_co2e_megagrams', 'total_sales']
+
+    def __init__(self, composite_vehicles, columns):
+        """
+        Create the production option column map and cost curve interpolation tables.
+
+        Args:
+            composite_vehicles (list): list of ``CompositeVehicle`` objects
+            columns (list): names of the production option array columns, the tech sweep and share sweep columns
+
+        """
+        self.columns = list(columns)
+        self.vehicle_ids = [cv.vehicle_id for cv in composite_vehicles]
+
+        column_index = dict(zip(self.columns, range(len(self.columns))))
+
+        self.share_columns = []
+        for cv in composite_vehicles:
+            share_id = cv.market_class_id + '.' + cv.alt_type
+            if ('consumer_abs_share_frac_%s' % share_id) in column_index and not omega_globals.producer_shares_mode:
+                self.share_columns.append(column_index['consumer_abs_share_frac_%s' % share_id])
+            else:
+                self.share_columns.append(column_index['producer_abs_share_frac_%s' % share_id])
+
+        self.cost_curve_index_columns = \
+            [column_index['veh_%s_cost_curve_indices' % vehicle_id] for vehicle_id in self.vehicle_ids]
+        self.cost_columns = [column_index['veh_%s_cost_dollars' % vehicle_id] for vehicle_id in self.vehicle_ids]
+        self.generalized_cost_columns = \
+            [column_index['veh_%s_generalized_cost_dollars' % vehicle_id] for vehicle_id in self.vehicle_ids]
+        self.battery_kwh_columns = [column_index['veh_%s_battery_kwh' % vehicle_id] for vehicle_id in self.vehicle_ids]
+
+        self.market_class_share_frac = \
+            np.array([cv.market_class_share_frac for cv in composite_vehicles], dtype=np.float32)
+        self.is_no_alt = np.array([cv.alt_type == 'NO_ALT' for cv in composite_vehicles])
+
+        # each vehicle's cost curve is offset to a range of the interpolation axis that doesn't overlap the other
+        # vehicles so all vehicles can be interpolated with a single call to np.interp()
+        self.cost_curve_min = np.zeros(len(composite_vehicles))
+        self.cost_curve_max = np.zeros(len(composite_vehicles))
+        self.cost_curve_offset = np.zeros(len(composite_vehicles))
+
+        xp = []
+        cert_co2e_Mg_per_vehicle = []
+        target_co2e_Mg_per_vehicle = []
+        offset_start = 0
+        for idx, cv in enumerate(composite_vehicles):
+            cost_curve_index = cv.cost_curve[cost_curve_interp_key].values.astype(float)
+            self.cost_curve_min[idx] = cost_curve_index[0]
+            self.cost_curve_max[idx] = cost_curve_index[-1]
+            self.cost_curve_offset[idx] = offset_start - cost_curve_index[0]
+            xp.append(cost_curve_index + self.cost_curve_offset[idx])
+            cert_co2e_Mg_per_vehicle.append(cv.cost_curve['cert_co2e_Mg_per_vehicle'].values.astype(float))
+            target_co2e_Mg_per_vehicle.append(cv.cost_curve['target_co2e_Mg_per_vehicle'].values.astype(float))
+            offset_start = xp[-1][-1] + 1
+
+        self.xp = np.concatenate(xp)
+        self.cert_co2e_Mg_per_vehicle = np.concatenate(cert_co2e_Mg_per_vehicle)
+        self.target_co2e_Mg_per_vehicle = np.concatenate(target_co2e_Mg_per_vehicle)
+
+        self.tech_sweeps = None
+        self.share_sweeps = None
+        self.total_sales = None
+
+    def evaluate(self, option_matrix, total_sales):
+        """
+        Calculate production option sales, costs, battery GWh and CO2e Mg.
+
+        Args:
+            option_matrix (2-D numeric Array): production options, one row per option, columns as given by ``columns``
+            total_sales (float): manufacturer total vehicle sales based on the context or the consumer response
+
+        Returns:
+            Dict of per-vehicle (2-D, one column per composite vehicle) and total (1-D) result arrays
+
+        """
+        num_vehicles = len(self.vehicle_ids)
+
+        sales = total_sales * option_matrix[:, self.share_columns] * self.market_class_share_frac
+        total_cost_dollars = sales * option_matrix[:, self.cost_columns]
+        total_generalized_cost_dollars = sales * option_matrix[:, self.generalized_cost_columns]
+        total_GWh = sales * option_matrix[:, self.battery_kwh_columns] / 1e6
+
+        # get cert and target Mg for the composite vehicles from the composite cost curves
+        interp_index = np.clip(option_matrix[:, self.cost_curve_index_columns], self.cost_curve_min,
+                               self.cost_curve_max) + self.cost_curve_offset
+        cert_co2e_Mg = \
+            sales * np.interp(interp_index.ravel(), self.xp, self.cert_co2e_Mg_per_vehicle).reshape(sales.shape)
+        target_co2e_Mg = \
+            sales * np.interp(interp_index.ravel(), self.xp, self.target_co2e_Mg_per_vehicle).reshape(sales.shape)
+
+        # update totals, one vehicle at a time to match create_production_options_from_shares()
+        total_battery_GWh = 0
+        total_NO_ALT_battery_GWh = 0
+        total_ALT_battery_GWh = 0
+        total_target_co2e_Mg = 0
+        total_cert_co2e_Mg = 0
+        total_cost = 0
+        total_generalized_cost = 0
+
+        for idx in range(num_vehicles):
+            total_battery_GWh += total_GWh[:, idx]
+            if self.is_no_alt[idx]:
+                total_NO_ALT_battery_GWh += total_GWh[:, idx]
+            else:
+                total_ALT_battery_GWh += total_GWh[:, idx]
+            total_target_co2e_Mg += target_co2e_Mg[:, idx]
+            total_cert_co2e_Mg += cert_co2e_Mg[:, idx]
+            total_cost += total_cost_dollars[:, idx]
+            total_generalized_cost += total_generalized_cost_dollars[:, idx]
+
+        num_options = len(option_matrix)
+
+        return {
+            'veh_sales': sales,
+            'veh_total_cost_dollars': total_cost_dollars,
+            'veh_cert_co2e_megagrams': cert_co2e_Mg,
+            'veh_target_co2e_megagrams': target_co2e_Mg,
+            'total_battery_GWh': np.broadcast_to(total_battery_GWh, num_options),
+            'total_NO_ALT_battery_GWh': np.broadcast_to(total_NO_ALT_battery_GWh, num_options),
+            'total_ALT_battery_GWh': np.broadcast_to(total_ALT_battery_GWh, num_options),
+            'total_target_co2e_megagrams': np.broadcast_to(total_target_co2e_Mg, num_options),
+            'total_cert_co2e_megagrams': np.broadcast_to(total_cert_co2e_Mg, num_options),
+            'total_cost_dollars': np.broadcast_to(total_cost, num_options),
+            'total_generalized_cost_dollars': np.broadcast_to(total_generalized_cost, num_options),
+            'total_credits_co2e_megagrams': np.broadcast_to(total_target_co2e_Mg - total_cert_co2e_Mg, num_options),
+            'total_sales': np.full(num_options, total_sales),
+        }
+
+    def evaluate_sweeps(self, tech_sweeps, share_sweeps, total_sales, battery_GWh_limit, strategic_target_offset_Mg,
+                        chunk_size):
+        """
+        Evaluate the cartesian product of the tech and share sweeps, ``chunk_size`` production options at a time.
+
+        Only the totals of the production options that are within the battery GWh limit are retained or, if there
+        are none, the totals of the production options with the lowest battery GWh.  If more than ``chunk_size``
+        totals would be retained they are reduced to the candidate frontier, see ``reduce_totals()``, so peak memory
+        use is determined by ``chunk_size`` rather than by the size of the product.
+
+        Args:
+            tech_sweeps (2-D numeric Array): tech options, columns as given by the first ``columns``
+            share_sweeps (2-D numeric Array): share options, columns as given by the remaining ``columns``
+            total_sales (float): manufacturer total vehicle sales based on the context or the consumer response
+            battery_GWh_limit (float): the battery GWh production limit
+            strategic_target_offset_Mg (float): the strategic target offset, CO2e Mg
+            chunk_size (int): the maximum number of production options to evaluate, or retain, at once
+
+        Returns:
+            DataFrame of production option totals, indexed by production option number
+
+        """
+        self.tech_sweeps = tech_sweeps
+        self.share_sweeps = share_sweeps
+        self.total_sales = total_sales
+
+        num_options = len(tech_sweeps) * len(share_sweeps)
+        chunk_size = max(1, int(chunk_size))
+
+        valid_totals = []
+        min_GWh_totals = []
+        min_GWh = np.inf
+
+        for chunk_start in range(0, num_options, chunk_size):
+            option_indices = np.arange(chunk_start, min(chunk_start + chunk_size, num_options))
+            results = self.evaluate(self.get_option_matrix(option_indices), total_sales)
+            total_battery_GWh = results['total_battery_GWh']
+
+            valid_options = total_battery_GWh <= battery_GWh_limit
+
+            if valid_options.any():
+                valid_totals.append(ProductionOptionEvaluator.get_totals(results, valid_options, option_indices))
+                valid_totals = ProductionOptionEvaluator.reduce_totals(valid_totals, strategic_target_offset_Mg,
+                                                                       chunk_size)
+            elif not valid_totals:
+                # track the closest one(s) in case there are no valid options
+                chunk_min_GWh = total_battery_GWh.min()
+                if chunk_min_GWh < min_GWh:
+                    min_GWh = chunk_min_GWh
+                    min_GWh_totals = []
+                if chunk_min_GWh == min_GWh:
+                    min_GWh_totals.append(ProductionOptionEvaluator.get_totals(
+                        results, total_battery_GWh == min_GWh, option_indices))
+                    min_GWh_totals = ProductionOptionEvaluator.reduce_totals(min_GWh_totals,
+                                                                             strategic_target_offset_Mg, chunk_size)
+
+        if valid_totals:
+            return pd.concat(valid_totals)
+        elif min_GWh_totals:
+            return pd.concat(min_GWh_totals)
+        else:
+            return pd.DataFrame(columns=ProductionOptionEvaluator.total_columns)
+
+    @staticmethod
+    def reduce_totals(totals_list, strategic_target_offset_Mg, max_options):
+        """
+        Reduce retained production option totals to the candidate frontier if there are more than ``max_options``.
+
+        The frontier is, for the compliant and the non-compliant production options separately, the lowest generalized
+        cost option in each of ``max_options / 4`` equal-width bins of strategic compliance ratio, plus the options
+        with the lowest and highest strategic compliance ratio.  The highest generalized cost option is also kept so
+        the cost range of the production options, used to normalize costs, is unchanged.
+        ``select_candidate_manufacturing_decisions()`` selects the lowest cost options at a given compliance ratio, but
+        it weighs cost slopes over the whole option set, so the selected non-compliant option may differ from the one
+        selected from the unreduced totals, e.g. by up to 1% in strategic compliance ratio and cost in the quick test
+        with ``max_options`` forced to 200.
+
+        Args:
+            totals_list (list): list of DataFrames of production option totals, in production option number order
+            strategic_target_offset_Mg (float): the strategic target offset, CO2e Mg
+            max_options (int): the maximum number of production option totals to retain before reducing them
+
+        Returns:
+            ``totals_list``, or a list of one DataFrame of the reduced production option totals
+
+        """
+        if sum(len(totals) for totals in totals_list) <= max_options:
+            return totals_list
+
+        totals = pd.concat(totals_list)
+
+        strategic_compliance_ratio, buffered_strategic_target_offset_Mg = \
+            calc_strategic_compliance_ratio(totals, strategic_target_offset_Mg)
+        strategic_compliance_ratio = strategic_compliance_ratio.values
+        cost = totals['total_generalized_cost_dollars'].values
+        compliant = totals['total_credits_co2e_megagrams'].values + buffered_strategic_target_offset_Mg.values >= 0
+
+        num_bins = max(1, max_options // 4)
+
+        retained = np.zeros(len(totals), dtype=bool)
+        retained[np.argmax(cost)] = True
+
+        for rows in (np.flatnonzero(compliant), np.flatnonzero(~compliant)):
+            if len(rows):
+                ratio = strategic_compliance_ratio[rows]
+                retained[rows[np.argmin(ratio)]] = True
+                retained[rows[np.argmax(ratio)]] = True
+
+                ratio_span = max(ratio.max() - ratio.min(), sys.float_info.epsilon)
+                bins = ((ratio - ratio.min()) / ratio_span * (num_bins - 1)).astype(int)
+
+                # lowest cost option of each bin, the first one in case of a tie
+                order = np.lexsort((cost[rows], bins))
+                bin_start = np.ones(len(order), dtype=bool)
+                bin_start[1:] = bins[order][1:] != bins[order][:-1]
+                retained[rows[order[bin_start]]] = True
+
+        return [totals[retained]]
+
+    def get_option_matrix(self, option_indices):
+        """
+        Create production options from the tech and share sweeps.
+
+        Args:
+            option_indices (int Array): production option numbers
+
+        Returns:
+            2-D Array of production options, one row per option, columns as given by ``columns``
+
+        """
+        tech_indices, share_indices = np.divmod(option_indices, len(self.share_sweeps))
+
+        return np.hstack([self.tech_sweeps[tech_indices], self.share_sweeps[share_indices]])
+
+    @staticmethod
+    def get_totals(results, selected_options, option_indices):
+        """
+        Get production option totals, e.g. total sales, costs and CO2e Mg, for the selected production options.
+
+        Args:
+            results (dict): production option results, from ``evaluate()``
+            selected_options (bool or int Array): the selected rows of ``results``
+            option_indices (int Array): production option numbers of the rows of ``results``
+
+        Returns:
+            DataFrame of production option totals, indexed by production option number
+
+        """
+        totals = dict()
+        for k in ProductionOptionEvaluator.total_columns:
+            totals[k] = results[k][selected_options]
+
+        return pd.DataFrame(totals, index=option_indices[selected_options])
+
+    def get_production_options(self, production_option_totals):
+        """
+        Create production options, including the tech and share values and per-vehicle sales, costs and CO2e Mg, from
+        production option totals.
+
+        Args:
+            production_option_totals (DataFrame): production option totals, from ``evaluate_sweeps()``, and any
+                additional columns added since
+
+        Returns:
+            DataFrame of production options, as returned by ``create_production_options_from_shares()``, plus any
+            additional columns in ``production_option_totals``
+
+        """
+        option_matrix = self.get_option_matrix(production_option_totals.index.values.astype(int))
+        results = self.evaluate(option_matrix, self.total_sales)
+
+        return pd.concat([pd.DataFrame(self.get_production_data(option_matrix, results),
+                                       index=production_option_totals.index),
+                          production_option_totals], axis=1)
+
+    def get_production_options_from_matrix(self, option_matrix):
+        """
+        Create a ``DataFrame`` of production options, including per-vehicle results and totals, from production options
+        that are not from the tech and share sweeps, e.g. from ``interpolate_production_option()``.
+
+        Args:
+            option_matrix (2-D numeric Array): production options, one row per option, columns as given by ``columns``
+
+        Returns:
+            DataFrame of production options
+
+        """
+        results = self.evaluate(option_matrix, self.total_sales)
+
+        option_indices = np.arange(len(option_matrix))
+
+        return pd.concat([pd.DataFrame(self.get_production_data(option_matrix, results)),
+                          ProductionOptionEvaluator.get_totals(results, slice(None), option_indices)], axis=1)
+
+    def get_production_data(self, option_matrix, results):
+        """
+        Get the production option columns and per-vehicle results, e.g. vehicle sales and CO2e Mg.
+
+        Args:
+            option_matrix (2-D numeric Array): production options, one row per option, columns as given by ``columns``
+            results (dict): production option results, from ``evaluate()``
+
+        Returns:
+            Dict of production option column arrays
+
+        """
+        production_data = dict()
+
+        for idx, column in enumerate(self.columns):
+            production_data[column] = option_matrix[:, idx]
+
+        for idx, vehicle_id in enumerate(self.vehicle_ids):
+            production_data['veh_%s_sales' % vehicle_id] = results['veh_sales'][:, idx]
+            production_data['veh_%s_total_cost_dollars' % vehicle_id] = results['veh_total_cost_dollars'][:, idx]
+            production_data['veh_%s_cert_co2e_megagrams' % vehicle_id] = results['veh_cert_co2e_megagrams'][:, idx]
+            production_data['veh_%s_target_co2e_megagrams' % vehicle_id] = \
+                results['veh_target_co2e_megagrams'][:, idx]
+
+        return production_data
+
+
 def create_production_options_from_shares(composite_vehicles, tech_and_share_combinations, total_sales):
     """
     Create a set of production options, including compliance outcomes, based on the given tech and share combinations.
@@ -1484,7 +2109,8 @@ cloud_slope = None
 
 
 def select_candidate_manufacturing_decisions(production_options, calendar_year, search_iteration,
-                                             producer_iteration_log, strategic_target_offset_Mg):
+                                             producer_iteration_log, strategic_target_offset_Mg,
+                                             production_option_evaluator=None):
     """
     Select candidate manufacturing decisions from the cloud of production options.  If possible, there will be two
     candidates, one on either side of the compliance target.  If not possible then the closest option will be selected.
@@ -1497,6 +2123,8 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
         strategic_target_offset_Mg (float): if positive, the raw compliance outcome will be under-compliance, if
             negative then the raw compliance outcome will be over-compliance. Used to strategically under- or over-
             comply, perhaps as a result of the desired to earn or burn prior credits in the credit bank
+        production_option_evaluator (ProductionOptionEvaluator): if not ``None`` then ``production_options`` contains
+            production option totals only and the evaluator provides the remaining production option data
 
     Returns:
         tuple ``candidate_production_decisions`` (the best available production decisions),
@@ -1572,7 +2200,8 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
 
         # grab lowest-cost compliant option
         lowest_cost_compliant_tech_share_option = \
-            production_options.loc[[compliant_tech_share_options[cost_name].idxmin()]]
+            get_production_option(production_options, compliant_tech_share_options[cost_name].idxmin(),
+                                  production_option_evaluator)
 
         compliant_tech_share_options = cull_compliant_points(compliant_tech_share_options,
                                                              prior_most_strategic_compliant_tech_share_option)
@@ -1584,7 +2213,8 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
 
             if np.max(dx) == 0:
                 most_strategic_non_compliant_tech_share_option = \
-                    production_options.loc[[non_compliant_tech_share_options[cost_name].idxmin()]]
+                    get_production_option(production_options, non_compliant_tech_share_options[cost_name].idxmin(),
+                                          production_option_evaluator)
             else:
                 dy = (non_compliant_tech_share_options[cost_name].values -
                       lowest_cost_compliant_tech_share_option[cost_name].item())
@@ -1594,12 +2224,15 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
                     (dx + sys.float_info.epsilon)
 
                 most_strategic_non_compliant_tech_share_option = \
-                    production_options.loc[[non_compliant_tech_share_options['weighted_slope'].idxmin()]]
+                    get_production_option(production_options,
+                                          non_compliant_tech_share_options['weighted_slope'].idxmin(),
+                                          production_option_evaluator)
 
         else:
             if len(non_compliant_tech_share_options.columns) == len(mini_df.columns):
                 most_strategic_non_compliant_tech_share_option = \
-                    production_options.loc[[non_compliant_tech_share_options.index[0]]]
+                    get_production_option(production_options, non_compliant_tech_share_options.index[0],
+                                          production_option_evaluator)
             else:
                 most_strategic_non_compliant_tech_share_option = non_compliant_tech_share_options.iloc[[0]]
 
@@ -1611,7 +2244,8 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
 
                 if np.max(dx) == 0:
                     most_strategic_compliant_tech_share_option = \
-                        production_options.loc[[compliant_tech_share_options[cost_name].idxmin()]]
+                        get_production_option(production_options, compliant_tech_share_options[cost_name].idxmin(),
+                                              production_option_evaluator)
                 else:
                     dy = (compliant_tech_share_options[cost_name].values -
                            most_strategic_non_compliant_tech_share_option[cost_name].item())
@@ -1622,11 +2256,14 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
                         (dx + sys.float_info.epsilon)
 
                     most_strategic_compliant_tech_share_option = \
-                        production_options.loc[[compliant_tech_share_options['weighted_slope'].idxmax()]]
+                        get_production_option(production_options,
+                                              compliant_tech_share_options['weighted_slope'].idxmax(),
+                                              production_option_evaluator)
             else:
                 if len(compliant_tech_share_options.columns) == len(mini_df.columns):
                     most_strategic_compliant_tech_share_option = \
-                        production_options.loc[[compliant_tech_share_options.index[0]]]
+                        get_production_option(production_options, compliant_tech_share_options.index[0],
+                                              production_option_evaluator)
                 else:
                     most_strategic_compliant_tech_share_option = compliant_tech_share_options.iloc[[0]]
 
@@ -1665,7 +2302,9 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
 
         if len(non_compliant_tech_share_options.columns) == len(mini_df.columns):
             most_strategic_non_compliant_tech_share_option = \
-                production_options.loc[[non_compliant_tech_share_options['strategic_compliance_ratio'].idxmin()]]
+                get_production_option(production_options,
+                                      non_compliant_tech_share_options['strategic_compliance_ratio'].idxmin(),
+                                      production_option_evaluator)
         else:
             most_strategic_non_compliant_tech_share_option = non_compliant_tech_share_options.iloc[[0]]
 
@@ -1697,11 +2336,14 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
                     omega_globals.options.producer_voluntary_overcompliance_min_benefit_frac:
                 # take lowest cost if it's at least X percent cheaper than the most strategic
                 most_strategic_compliant_tech_share_option = \
-                    production_options.loc[[compliant_tech_share_options[cost_name].idxmin()]]
+                    get_production_option(production_options, compliant_tech_share_options[cost_name].idxmin(),
+                                          production_option_evaluator)
             else:
                 # take closest to strategic taraget
                 most_strategic_compliant_tech_share_option = \
-                    production_options.loc[[compliant_tech_share_options['strategic_compliance_ratio'].idxmax()]]
+                    get_production_option(production_options,
+                                          compliant_tech_share_options['strategic_compliance_ratio'].idxmax(),
+                                          production_option_evaluator)
         else:
             most_strategic_compliant_tech_share_option = compliant_tech_share_options.iloc[[0]]
 
@@ -1721,6 +2363,8 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
                 pass
             if omega_globals.options.slice_tech_combo_cloud_tables:
                 production_options = production_options[production_options['strategic_compliance_ratio'].values <= 1.2]
+            if production_option_evaluator is not None:
+                production_options = production_option_evaluator.get_production_options(production_options)
             producer_iteration_log.write(production_options)
         else:
             # log candidate production decisions only
@@ -1731,6 +2375,28 @@ def select_candidate_manufacturing_decisions(production_options, calendar_year,
     return candidate_production_decisions.copy(), compliance_possible
 
 
+def get_production_option(production_options, option_index, production_option_evaluator=None):
+    """
+    Get a production option from the production options.
+
+    Args:
+        production_options (DataFrame): dataframe of the production options, or production option totals if
+            ``production_option_evaluator`` is not ``None``
+        option_index (int): ``production_options`` index of the production option
+        production_option_evaluator (ProductionOptionEvaluator): the production option evaluator, if any
+
+    Returns:
+        Single-row DataFrame of the production option
+
+    """
+    production_option = production_options.loc[[option_index]]
+
+    if production_option_evaluator is not None:
+        production_option = production_option_evaluator.get_production_options(production_option)
+
+    return production_option
+
+
 def cull_compliant_points(compliant_tech_share_options, prior_most_strategic_compliant_tech_share_option):
     """
     Remove compliant points that aren't as good as the prior most strategic compliant point.
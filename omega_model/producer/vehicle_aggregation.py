@@ -271,6 +271,105 @@ class VehicleAggregation(OMEGABase):
     def __init__(self):
         pass
 
+    @staticmethod
+    def calc_base_year_costs(df):
+        """
+        Calculate base year vehicle glider non-structure costs and workfactors.  Vehicles that share the attributes
+        used by the cost calculations (model year, powertrain type, body style, etc) are costed together, the costs of
+        each group are calculated as arrays.
+
+        Args:
+            df (DataFrame): the detailed base year vehicle data, with mass terms
+
+        Returns:
+            Nothing, updates the ``glider_non_structure_cost_dollars`` and ``workfactor`` columns of ``df``
+
+        """
+        from producer.vehicles import Vehicle
+        from context.glider_cost import GliderCost
+        from context.powertrain_cost import PowertrainCost, get_trans
+        from policy.workfactor_definition import WorkFactor
+
+        # costing vehicles are temporary, don't use up vehicle IDs
+        next_vehicle_id = Vehicle.next_vehicle_id
+
+        powertrain_type = df['base_year_powertrain_type'].replace({'FCV': 'BEV'})  # RV
+
+        trans_flags = [tf for tf in ['trx10', 'trx11', 'trx12', 'trx21', 'trx22', 'ecvt'] if tf in df]
+
+        group_columns = ['model_year', 'powertrain_type', 'body_style', 'reg_class_id', 'cert_fuel_id',
+                         'drive_system', 'unibody_structure', 'structure_material'] + trans_flags
+
+        group_df = df[group_columns].assign(powertrain_type=powertrain_type)
+
+        glider_non_structure_cost_dollars = np.zeros(len(df))
+
+        for group_key, group_rows in group_df.groupby(group_columns, sort=False, dropna=False).indices.items():
+            group_info = dict(zip(group_columns, group_key))
+
+            pkg_df = df.iloc[group_rows].assign(powertrain_type=group_info['powertrain_type'])
+
+            # calc powertrain cost
+            veh = Vehicle()
+            veh.model_year = group_info['model_year']
+            veh.base_year_powertrain_type = group_info['powertrain_type']
+            veh.body_style = group_info['body_style']
+            veh.base_year_reg_class_id = group_info['reg_class_id']
+            veh.base_year_cert_fuel_id = group_info['cert_fuel_id']
+
+            veh.market_class_id = omega_globals.options.MarketClass.get_vehicle_market_class(veh)
+            veh.drive_system = group_info['drive_system']
+
+            veh.global_cumulative_battery_GWh = omega_globals.cumulative_battery_GWh
+
+            trans = None
+            if veh.base_year_powertrain_type in ['ICE', 'HEV', 'PHEV', 'MHEV']:
+                trans = get_trans(pkg_df.iloc[0])
+
+            pkg_info = dict((c, pkg_df[c].values) for c in pkg_df.columns)
+
+            powertrain_cost = sum(PowertrainCost.calc_cost(veh, pkg_info, veh.base_year_powertrain_type, trans=trans))
+
+            # calc glider cost
+            veh.structure_material = group_info['structure_material']
+            veh.height_in = pkg_df['height_in'].values
+            veh.ground_clearance_in = pkg_df['ground_clearance_in'].values
+            veh.base_year_msrp_dollars = pkg_df['msrp_dollars'].values
+
+            veh.unibody_structure = group_info['unibody_structure']
+
+            veh.base_year_glider_non_structure_cost_dollars = \
+                GliderCost.get_base_year_glider_non_structure_cost(veh, pkg_df['structure_mass_lbs'].values,
+                                                                   powertrain_cost)
+
+            veh.base_year_footprint_ft2 = pkg_df['footprint_ft2'].values
+
+            veh.base_year_curbweight_lbs = pkg_df['curbweight_lbs'].values
+
+            glider_non_structure_cost_dollars[group_rows] = GliderCost.calc_cost(veh, pkg_df)[1]
+
+        df['glider_non_structure_cost_dollars'] = glider_non_structure_cost_dollars
+
+        Vehicle.next_vehicle_id = next_vehicle_id
+
+        # calc medium-duty workfactors
+        mediumduty_rows = np.flatnonzero(df['reg_class_id'].values == 'mediumduty')
+
+        if len(mediumduty_rows):
+            workfactor = np.zeros(len(df))
+
+            mediumduty_df = df.iloc[mediumduty_rows]
+
+            for (model_year, drive_system), group_rows in \
+                    mediumduty_df.groupby(['model_year', 'drive_system'], sort=False).indices.items():
+                group_df = mediumduty_df.iloc[group_rows]
+                workfactor[mediumduty_rows[group_rows]] = \
+                    WorkFactor.calc_workfactor(model_year, group_df['curbweight_lbs'].values,
+                                               group_df['gvwr_lbs'].values, group_df['gcwr_lbs'].values,
+                                               drive_system)
+
+            df['workfactor'] = workfactor
+
     @staticmethod
     def init_from_file(filename, verbose=False):
         """
@@ -287,11 +386,8 @@ class VehicleAggregation(OMEGABase):
         #     ``DecompositionAttributes``
 
         """
-        from producer.vehicles import Vehicle, VehicleFinal
+        from producer.vehicles import VehicleFinal
         from context.new_vehicle_market import NewVehicleMarket
-        from context.glider_cost import GliderCost
-        from context.powertrain_cost import PowertrainCost
-        from policy.workfactor_definition import WorkFactor
 
         # omega_log.logwrite('\nAggregating vehicles from %s...' % filename)
 
@@ -395,7 +491,7 @@ class VehicleAggregation(OMEGABase):
 
             import time
             start_time = time.time()
-            # print('starting iterrows')
+            # print('starting base year costs')
 
             df['base_year_footprint_ft2'] = df['footprint_ft2']
 
@@ -414,59 +510,7 @@ class VehicleAggregation(OMEGABase):
                 df['prior_redesign_year'] += model_year_delta
                 df['model_year'] += model_year_delta
 
-            for idx, row in df.iterrows():
-                # calc powertrain cost
-                veh = Vehicle()
-                veh.model_year = row['model_year']
-                veh.base_year_powertrain_type = row['base_year_powertrain_type']
-                veh.body_style = row['body_style']
-
-                if veh.base_year_powertrain_type == 'FCV':
-                    veh.base_year_powertrain_type = 'BEV'  # RV
-
-                veh.base_year_reg_class_id = row['reg_class_id']
-                veh.base_year_cert_fuel_id = row['cert_fuel_id']
-
-                veh.market_class_id = omega_globals.options.MarketClass.get_vehicle_market_class(veh)
-                row['market_class_id'] = omega_globals.options.MarketClass.get_vehicle_market_class(veh)
-                veh.drive_system = row['drive_system']
-
-                veh.global_cumulative_battery_GWh = omega_globals.cumulative_battery_GWh
-
-                powertrain_cost = sum(PowertrainCost.calc_cost(veh, row, veh.base_year_powertrain_type))
-
-                # calc glider cost
-                veh.structure_material = row['structure_material']
-                veh.height_in = row['height_in']
-                veh.ground_clearance_in = row['ground_clearance_in']
-                veh.base_year_msrp_dollars = row['msrp_dollars']
-                row['base_year_msrp_dollars'] = row['msrp_dollars']
-
-                veh.unibody_structure = row['unibody_structure']
-                veh.body_style = row['body_style']
-
-                veh.base_year_glider_non_structure_cost_dollars = \
-                    GliderCost.get_base_year_glider_non_structure_cost(veh, row['structure_mass_lbs'], powertrain_cost)
-
-                veh.base_year_footprint_ft2 = row['footprint_ft2']
-
-                veh.base_year_curbweight_lbs = row['curbweight_lbs']
-
-                df.loc[idx, 'glider_non_structure_cost_dollars'] = \
-                    float(GliderCost.calc_cost(veh, pd.DataFrame([row]))[1])
-
-                workfactor = 0
-                if row['reg_class_id'] == 'mediumduty':
-                    model_year, curbweight_lbs, gvwr_lbs, gcwr_lbs, drive_system \
-                        = row['model_year'], row['curbweight_lbs'], row['gvwr_lbs'], row['gcwr_lbs'], \
-                        row['drive_system']
-                    workfactor = \
-                        WorkFactor.calc_workfactor(model_year, curbweight_lbs, gvwr_lbs, gcwr_lbs, drive_system)
-                df.at[idx, 'workfactor'] = workfactor
-                veh.gvwr_lbs = row['gvwr_lbs']
-                veh.gcwr_lbs = row['gcwr_lbs']
-                veh.base_year_gvwr_lbs = row['gvwr_lbs']
-                veh.base_year_gcwr_lbs = row['gcwr_lbs']
+            VehicleAggregation.calc_base_year_costs(df)
 
             df['glider_non_structure_mass_lbs'] = df['curbweight_lbs'] - df['powertrain_mass_lbs'] \
                                                   - df['structure_mass_lbs'] - df['battery_mass_lbs']
@@ -17,13 +17,71 @@ from omega_model import *
 _cache = dict()
 
 
+class VehicleAnnualDataRecord(OMEGABase):
+    """
+    **A single vehicle annual data record, a view of one row of the ``VehicleAnnualData`` column arrays.**
+
+    Supports dict-style access, e.g. ``vad['registered_count']``, updates are written directly to the column arrays.
+
+    """
+    __slots__ = ['row']
+
+    def __init__(self, row):
+        """
+        Create a view of a vehicle annual data row.
+
+        Args:
+            row (int): the row index into the vehicle annual data column arrays
+
+        """
+        self.row = row
+
+    def __getitem__(self, key):
+        return VehicleAnnualData.get_value(key, self.row)
+
+    def __setitem__(self, key, value):
+        VehicleAnnualData._data[key][self.row] = value
+
+    def __getattr__(self, key):
+        if key in VehicleAnnualData.columns:
+            return self[key]
+        raise AttributeError(key)
+
+    def keys(self):
+        return list(VehicleAnnualData.columns)
+
+    def to_dict(self):
+        """
+        Get the record as a dict.
+
+        Returns:
+            A dict of the record values
+
+        """
+        return {k: self[k] for k in VehicleAnnualData.columns}
+
+    def __repr__(self):
+        return str(self.to_dict())
+
+
 class VehicleAnnualData(OMEGABase):
     """
     **Stores and retrieves vehicle annual data, which includes age, registered count, vehicle miles travelled, etc.**
 
+    Data is stored in append-only column arrays, indexed by calendar year and by vehicle id and calendar year, so
+    lookups don't have to scan all the data as it grows over the analysis years.
+
     """
 
-    _data = []
+    columns = {'calendar_year': int, 'compliance_id': object, 'vehicle_id': int, 'age': int,
+               'registered_count': float, 'annual_vmt': float, 'odometer': float, 'vmt': float}
+
+    _initial_capacity = 1024
+
+    _data = dict()  # column arrays, only the first ``_num_rows`` rows are valid
+    _num_rows = 0
+    _calendar_year_index = dict()  # calendar year -> list of row indices
+    _vehicle_year_index = dict()  # (vehicle_id, calendar_year) -> row index
 
     @staticmethod
     def create(calendar_year, vehicle_id, compliance_id, age, registered_count=0, annual_vmt=0, odometer=0, vmt=0):
@@ -48,23 +106,145 @@ class VehicleAnnualData(OMEGABase):
                 'age': age, 'registered_count': registered_count, 'annual_vmt': annual_vmt, 'odometer': odometer,
                 'vmt': vmt}
 
+    @staticmethod
+    def _reserve(num_rows):
+        """
+        Make sure the column arrays have room for the given number of additional rows.
+
+        Args:
+            num_rows (int): the number of rows to be added
+
+        Returns:
+            Nothing, grows ``VehicleAnnualData._data`` column arrays as needed
+
+        """
+        required_capacity = VehicleAnnualData._num_rows + num_rows
+        capacity = len(VehicleAnnualData._data.get('calendar_year', []))
+
+        if required_capacity > capacity:
+            capacity = max(required_capacity, 2 * capacity)
+            for k, dtype in VehicleAnnualData.columns.items():
+                column = np.empty(capacity, dtype=dtype)
+                if k in VehicleAnnualData._data:
+                    column[:VehicleAnnualData._num_rows] = VehicleAnnualData._data[k][:VehicleAnnualData._num_rows]
+                VehicleAnnualData._data[k] = column
+
     @staticmethod
     def add_all(vad_list):
         """
         Add all vehicle annual data records to the class data set.
 
         Args:
-            vad_list (list): list of vehicle annual data dicts
+            vad_list (list): list of vehicle annual data dicts, or a single dict
+
+        Returns:
+            Nothing, updates ``VehicleAnnualData._data`` and indexes
+
+        """
+        if type(vad_list) != list:
+            vad_list = [vad_list]
+
+        VehicleAnnualData._reserve(len(vad_list))
+
+        data = VehicleAnnualData._data
+        row = VehicleAnnualData._num_rows
+
+        for vad in vad_list:
+            for k in VehicleAnnualData.columns:
+                data[k][row] = vad[k]
+
+            calendar_year = vad['calendar_year']
+            VehicleAnnualData._calendar_year_index.setdefault(calendar_year, []).append(row)
+            # keep the first row for a vehicle and calendar year, as a search of the rows in order would find
+            VehicleAnnualData._vehicle_year_index.setdefault((vad['vehicle_id'], calendar_year), row)
+
+            row += 1
+
+        VehicleAnnualData._num_rows = row
+
+    @staticmethod
+    def add_columns(num_rows, column_values):
+        """
+        Add vehicle annual data records, in bulk, from column values.
+
+        Args:
+            num_rows (int): the number of records to add
+            column_values (dict): column values by column name, arrays of length ``num_rows`` or scalars that apply
+                to all the records, missing columns default to zero
+
+        Returns:
+            Nothing, updates ``VehicleAnnualData._data`` and indexes
+
+        """
+        VehicleAnnualData._reserve(num_rows)
+
+        start_row = VehicleAnnualData._num_rows
+        end_row = start_row + num_rows
+
+        for k in VehicleAnnualData.columns:
+            VehicleAnnualData._data[k][start_row:end_row] = column_values.get(k, 0)
+
+        rows = range(start_row, end_row)
+        calendar_years = VehicleAnnualData._data['calendar_year'][start_row:end_row].tolist()
+        vehicle_ids = VehicleAnnualData._data['vehicle_id'][start_row:end_row].tolist()
+
+        for row, vehicle_id, calendar_year in zip(rows, vehicle_ids, calendar_years):
+            VehicleAnnualData._calendar_year_index.setdefault(calendar_year, []).append(row)
+            VehicleAnnualData._vehicle_year_index.setdefault((vehicle_id, calendar_year), row)
+
+        VehicleAnnualData._num_rows = end_row
+
+    @staticmethod
+    def get_value(attribute_name, row):
+        """
+        Get a vehicle annual data value for the given row.
+
+        Args:
+            attribute_name (str): the name of the attribute to get, e.g. 'odometer'
+            row (int): row index, e.g. from ``get_rows()``
+
+        Returns:
+            The attribute value, as a Python scalar
+
+        """
+        value = VehicleAnnualData._data[attribute_name][row]
+
+        # numeric columns hold numpy scalars, object columns (e.g. 'compliance_id') hold Python objects
+        if isinstance(value, np.generic):
+            value = value.item()
+
+        return value
+
+    @staticmethod
+    def get_values(attribute_name, rows):
+        """
+        Get vehicle annual data values for the given rows.
+
+        Args:
+            attribute_name (str): the name of the attribute to get, e.g. 'odometer'
+            rows (int Array): row indices, e.g. from ``get_rows()``
+
+        Returns:
+            Array of attribute values
+
+        """
+        return VehicleAnnualData._data[attribute_name][rows]
+
+    @staticmethod
+    def set_values(attribute_name, rows, values):
+        """
+        Set vehicle annual data values for the given rows.
+
+        Args:
+            attribute_name (str): the name of the attribute to set, e.g. 'odometer'
+            rows (int Array): row indices, e.g. from ``get_rows()``
+            values (numeric or Array): the value(s) to set
 
         Returns:
             Nothing, updates ``VehicleAnnualData._data``
 
         """
-        if type(vad_list) == list:
-            for vad in vad_list:
-                VehicleAnnualData._data.append(vad)
-        else:
-            VehicleAnnualData._data.append(vad_list)  # , ignore_index=True)
+        VehicleAnnualData._data[attribute_name][rows] = values
 
     @staticmethod
     def update_registered_count(vehicle, calendar_year, registered_count):
@@ -82,15 +262,14 @@ class VehicleAnnualData(OMEGABase):
         """
         age = int(calendar_year - vehicle.model_year)
 
-        vad = [v for v in VehicleAnnualData._data
-               if v['calendar_year'] == calendar_year and v['vehicle_id'] == vehicle.vehicle_id]
+        row = VehicleAnnualData._vehicle_year_index.get((vehicle.vehicle_id, calendar_year))
 
-        if not vad:
+        if row is None:
             vad = VehicleAnnualData.create(int(calendar_year), vehicle.vehicle_id, vehicle.compliance_id, age,
                                            registered_count)
             VehicleAnnualData.add_all(vad)
         else:
-            vad['registered_count'] = registered_count
+            VehicleAnnualData._data['registered_count'][row] = registered_count
 
     @staticmethod
     def get_calendar_years():
@@ -101,7 +280,27 @@ class VehicleAnnualData(OMEGABase):
             List of calendar years that have vehicle annual data.
 
         """
-        return [v['calendar_year'] for v in VehicleAnnualData._data]
+        return VehicleAnnualData._data['calendar_year'][:VehicleAnnualData._num_rows].tolist()
+
+    @staticmethod
+    def get_rows(calendar_year, compliance_id=None):
+        """
+        Get the row indices of the vehicle annual data for the given calendar year and compliance id, if applicable.
+
+        Args:
+            calendar_year (int): calendar to get data for
+            compliance_id (str): name of manufacturer, e.g. 'consolidated_OEM'
+
+        Returns:
+            Array of row indices into the vehicle annual data column arrays
+
+        """
+        rows = np.array(VehicleAnnualData._calendar_year_index.get(calendar_year, []), dtype=int)
+
+        if compliance_id is not None and len(rows):
+            rows = rows[VehicleAnnualData._data['compliance_id'][rows] == compliance_id]
+
+        return rows
 
     @staticmethod
     def get_vehicle_annual_data(calendar_year, compliance_id=None, attributes=None):
@@ -114,18 +313,18 @@ class VehicleAnnualData(OMEGABase):
             attributes (str, [strs]): optional name of attribute(s) to retrieve instead of all data
 
         Returns:
-            A list of VehicleAnnualData objects, or a list of n-tuples of the requested attribute(s) value(s), e.g.
-            ``[(1,), (2,), (3,), ...`` which can be conveniently unpacked by ``omega_db.sql_unpack_result()``
+            A list of ``VehicleAnnualDataRecord`` objects, or a list of n-tuples of the requested attribute(s) value(s),
+            e.g. ``[(1,), (2,), (3,), ...`` which can be conveniently unpacked by ``omega_db.sql_unpack_result()``
 
         """
-        from producer.vehicles import VehicleFinal
+        rows = VehicleAnnualData.get_rows(calendar_year, compliance_id)
 
-        if attributes is None and compliance_id is None:
-            result = [v for v in VehicleAnnualData._data
-                      if v['calendar_year'] == calendar_year]
-        elif attributes is None and compliance_id is not None:
-            result = [v for v in VehicleAnnualData._data
-                      if v['calendar_year'] == calendar_year and v['compliance_id'] == compliance_id]
+        if attributes is None:
+            result = [VehicleAnnualDataRecord(row) for row in rows.tolist()]
+        else:
+            if type(attributes) is not list:
+                attributes = [attributes]
+            result = list(zip(*[VehicleAnnualData._data[a][rows].tolist() for a in attributes]))
 
         return result
 
@@ -143,10 +342,24 @@ class VehicleAnnualData(OMEGABase):
             The attribute_value for the given attribute_name
 
         """
-        result = [v[attribute_name] for v in VehicleAnnualData._data
-                  if v['calendar_year'] == calendar_year and v['vehicle_id'] == vehicle_id]
+        row = VehicleAnnualData._vehicle_year_index[(vehicle_id, calendar_year)]
+
+        return VehicleAnnualData.get_value(attribute_name, row)
 
-        return result[0]
+    @staticmethod
+    def to_dataframe():
+        """
+        Get the vehicle annual data as a DataFrame.
+
+        The DataFrame columns are views of the column arrays, no data is copied, so the DataFrame should be treated as
+        read-only and will not reflect data added after it was created.
+
+        Returns:
+            DataFrame of vehicle annual data
+
+        """
+        return pd.DataFrame({k: VehicleAnnualData._data[k][:VehicleAnnualData._num_rows]
+                             for k in VehicleAnnualData.columns}, copy=False)
 
     @staticmethod
     def init_vehicle_annual_data():
@@ -159,7 +372,11 @@ class VehicleAnnualData(OMEGABase):
         """
         _cache.clear()
 
-        VehicleAnnualData._data = []
+        VehicleAnnualData._data = {k: np.empty(VehicleAnnualData._initial_capacity, dtype=dtype)
+                                   for k, dtype in VehicleAnnualData.columns.items()}
+        VehicleAnnualData._num_rows = 0
+        VehicleAnnualData._calendar_year_index = dict()
+        VehicleAnnualData._vehicle_year_index = dict()
 
         return []
 
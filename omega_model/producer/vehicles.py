@@ -79,9 +79,10 @@ from policy.drive_cycle_weights import DriveCycleWeights
 from policy.offcycle_credits import OffCycleCredits
 from policy.upstream_methods import UpstreamMethods
 
-from common.omega_functions import cartesian_prod, calc_frontier
+from common.omega_cache import get_cloud_cache, get_cost_curve_inputs_key, hash_values
+from common.omega_functions import cartesian_prod, calc_frontier, calc_frontier_indices
 from common.omega_plot import figure, label_xyt, vlineat
-from common.omega_functions import weighted_value
+from common.omega_functions import weighted_value, interp1d_columns
 
 from context.fuel_prices import FuelPrice
 from context.onroad_fuels import OnroadFuel
@@ -458,6 +459,8 @@ class CompositeVehicle(OMEGABase):
             # CU
             self.cost_curve = self.calc_composite_cost_curve(plot=plot_cost_curve)
 
+        self.decomposition_data = None  # see get_decomposition_data()
+
         self.tech_option_iteration_num = 0
 
     def retail_fuel_price_dollars_per_unit(self, calendar_year=None):
@@ -477,6 +480,42 @@ class CompositeVehicle(OMEGABase):
         return weighted_value(self.vehicle_list, self.weight_by, 'retail_fuel_price_dollars_per_unit',
                               calendar_year)
 
+    def get_decomposition_data(self):
+        """
+        Get the source Vehicle decomposition attribute columns of the composite cost curve, stacked into a 2-D array
+        (one row per cost curve point) so the attributes of all the source Vehicles can be interpolated at once.
+        Calculated on first use.
+
+        Returns:
+            Tuple of the cost curve index values (``cost_curve_interp_key`` column), the 2-D Array of attribute values
+            (or a list of the attribute values if the cost curve has a single point), ``True`` if the index values are
+            strictly increasing (as required by ``interp1d_columns()``) and a list of
+            (attribute names, column slice, missing attribute names) tuples, one per Vehicle in the ``vehicle_list``
+
+        """
+        if self.decomposition_data is None:
+            columns = []
+            vehicle_columns = []
+
+            for v in self.vehicle_list:
+                prefix = 'veh_%s_' % v.vehicle_id
+                names = [ccv for ccv in DecompositionAttributes.values if prefix + ccv in self.cost_curve]
+                missing_names = [ccv for ccv in DecompositionAttributes.values if prefix + ccv not in self.cost_curve]
+                vehicle_columns.append((names, slice(len(columns), len(columns) + len(names)), missing_names))
+                columns += [prefix + ccv for ccv in names]
+
+            index_values = self.cost_curve[cost_curve_interp_key].values.astype(float)
+
+            if len(self.cost_curve) == 1:
+                attribute_values = [self.cost_curve[c].item() for c in columns]
+            else:
+                attribute_values = self.cost_curve[columns].values.astype(float)
+
+            self.decomposition_data = (index_values, attribute_values,
+                                       bool(np.all(index_values[1:] > index_values[:-1])), vehicle_columns)
+
+        return self.decomposition_data
+
     def decompose(self):
         """
         Decompose composite vehicle attributes to source Vehicles in the ``vehicle_list``.  In addition to assigning
@@ -500,13 +539,34 @@ class CompositeVehicle(OMEGABase):
             fig, ax1 = figure()
             label_xyt(ax1, 'CO2e [g/mi]', 'Generalized Cost [$]', '%s' % self.name)
 
-        for v in self.vehicle_list:
+        vehicle_values = [None] * len(self.vehicle_list)
+
+        if 'cost_curve' in self.__dict__ and len(self.cost_curve) > 0:
+            index_values, attribute_values, increasing_index, vehicle_columns = self.get_decomposition_data()
+            index_value = self.__getattribute__(cost_curve_interp_key)
+
+            if len(index_values) == 1:
+                values = attribute_values
+            elif increasing_index and not np.isnan(index_value):
+                # interpolate the decomposition attributes of all the source vehicles at once
+                values = interp1d_columns(index_value, index_values, attribute_values)
+            else:
+                values = None
+
+            if values is not None:
+                vehicle_values = [dict(zip(names, values[columns]), **dict.fromkeys(missing_names))
+                                  for names, columns, missing_names in vehicle_columns]
+
+        for v, values in zip(self.vehicle_list, vehicle_values):
             if 'cost_curve' in self.__dict__:
-                for ccv in DecompositionAttributes.values:
-                    v.__setattr__(ccv,
-                              DecompositionAttributes.interp1d(v, self.cost_curve, cost_curve_interp_key,
-                                                               self.__getattribute__(cost_curve_interp_key),
-                                                               ccv))
+                if values is not None:
+                    vars(v).update(values)
+                else:
+                    for ccv in DecompositionAttributes.values:
+                        v.__setattr__(ccv,
+                                  DecompositionAttributes.interp1d(v, self.cost_curve, cost_curve_interp_key,
+                                                                   self.__getattribute__(cost_curve_interp_key),
+                                                                   ccv))
 
                 for ccv in omega_globals.options.CostCloud.cloud_non_numeric_data_columns:
                     v.__setattr__(ccv,
@@ -574,6 +634,10 @@ class CompositeVehicle(OMEGABase):
         the full factorial combination of all Vehicle cost curve points is avoided, while still arriving at the correct
         weighted answer for the frontier.
 
+        The combination is performed by ``calc_composite_cost_curve_incremental()``, or by
+        ``calc_composite_cost_curve_cartesian()`` if ``omega_globals.options.incremental_composite_cost_curve`` is
+        ``False``.
+
         Args:
             plot (bool): plot composite curve if ``True``
 
@@ -585,6 +649,50 @@ class CompositeVehicle(OMEGABase):
             fig, ax1 = figure()
             label_xyt(ax1, cost_curve_interp_key, 'Generalized Cost [$]', '%s' % self.name)
 
+        if omega_globals.options.incremental_composite_cost_curve:
+            composite_frontier_df = self.calc_composite_cost_curve_incremental()
+        else:
+            composite_frontier_df = self.calc_composite_cost_curve_cartesian()
+
+        if plot:
+            for v in self.vehicle_list:
+                vehicle_frontier = v.cost_curve
+                if v.name in omega_globals.options.plot_and_log_vehicles:
+                    ax1.plot(vehicle_frontier['veh_%s_%s' % (v.vehicle_id, cost_curve_interp_key)],
+                             vehicle_frontier['veh_%s_new_vehicle_mfr_generalized_cost_dollars' % v.vehicle_id], 's-',
+                             color='black',
+                             label='veh %s %s' % (v.vehicle_id, v.name))
+                else:
+                    ax1.plot(vehicle_frontier['veh_%s_%s' % (v.vehicle_id, cost_curve_interp_key)],
+                             vehicle_frontier['veh_%s_new_vehicle_mfr_generalized_cost_dollars' % v.vehicle_id], '.--',
+                             linewidth=1, label='veh %s %s' % (v.vehicle_id, v.name))
+
+            ax1.plot(composite_frontier_df[cost_curve_interp_key],
+                     composite_frontier_df['new_vehicle_mfr_generalized_cost_dollars'], '-', linewidth=3,
+                     label='Composite Vehicle')
+
+            ax1.legend(fontsize='medium', bbox_to_anchor=(1.04, 0), loc="lower left", borderaxespad=0)
+
+            figname = '%s%s_%s_cost_curve_composition.png' % (omega_globals.options.output_folder, self.model_year,
+                                                              ax1.get_title())
+            figname = figname.replace('(', '_').replace(')', '_').replace('.', '_').replace(' ', '_')\
+                .replace('__', '_').replace('_png', '.png')
+            fig.savefig(figname, bbox_inches='tight')
+
+        return composite_frontier_df
+
+    def calc_composite_cost_curve_cartesian(self):
+        """
+        Calculate a composite ``cost_curve`` by calculating the frontier of the full factorial combination (cartesian
+        product) of the prior composite frontier with each Vehicle's cost curve, including all columns.
+
+        Reference implementation of ``calc_composite_cost_curve_incremental()``, selected by
+        ``omega_globals.options.incremental_composite_cost_curve = False``.
+
+        Returns:
+            DataFrame containing the composite cost curve
+
+        """
         composite_frontier_df = pd.DataFrame()
         composite_frontier_df['market_share_frac'] = [0]
 
@@ -622,31 +730,72 @@ class CompositeVehicle(OMEGABase):
             composite_frontier_df = \
                 composite_frontier_df.drop(drop_columns + ['frontier_factor'], axis=1, errors='ignore')
 
-            if plot:
-                if v.name in omega_globals.options.plot_and_log_vehicles:
-                    ax1.plot(vehicle_frontier['veh_%s_%s' % (v.vehicle_id, cost_curve_interp_key)],
-                             vehicle_frontier['veh_%s_new_vehicle_mfr_generalized_cost_dollars' % v.vehicle_id], 's-',
-                             color='black',
-                             label='veh %s %s' % (v.vehicle_id, v.name))
-                else:
-                    ax1.plot(vehicle_frontier['veh_%s_%s' % (v.vehicle_id, cost_curve_interp_key)],
-                             vehicle_frontier['veh_%s_new_vehicle_mfr_generalized_cost_dollars' % v.vehicle_id], '.--',
-                             linewidth=1, label='veh %s %s' % (v.vehicle_id, v.name))
+        return composite_frontier_df
 
-        if plot:
-            ax1.plot(composite_frontier_df[cost_curve_interp_key],
-                     composite_frontier_df['new_vehicle_mfr_generalized_cost_dollars'], '-', linewidth=3,
-                     label='Composite Vehicle')
+    def calc_composite_cost_curve_incremental(self):
+        """
+        Calculate a composite ``cost_curve`` by merging each Vehicle's cost curve into the prior composite frontier.
 
-            ax1.legend(fontsize='medium', bbox_to_anchor=(1.04, 0), loc="lower left", borderaxespad=0)
+        Only the cost curve interpolation key and generalized cost are combined over all pairs of prior composite
+        frontier points and Vehicle cost curve points.  The frontier of the pairs is calculated from those two arrays
+        and each composite frontier point is tracked as a row index into each Vehicle's cost curve, so the remaining
+        weighted values and the vehicle-specific decomposition columns are only gathered for the final frontier points.
 
-            figname = '%s%s_%s_cost_curve_composition.png' % (omega_globals.options.output_folder, self.model_year,
-                                                              ax1.get_title())
-            figname = figname.replace('(', '_').replace(')', '_').replace('.', '_').replace(' ', '_')\
-                .replace('__', '_').replace('_png', '.png')
-            fig.savefig(figname, bbox_inches='tight')
+        Returns:
+            DataFrame containing the composite cost curve, with market share, weighted value and vehicle-specific
+            (e.g. 'veh_0_cert_co2e_grams_per_mile') columns
 
-        return composite_frontier_df
+        """
+        market_share_frac = 0
+        weighted_values = dict()
+        for wv in self.weighted_values:
+            weighted_values[wv] = np.zeros(1)
+
+        cost_curve_indices = []  # row indices into each vehicle cost curve, for each composite frontier point
+
+        for v in self.vehicle_list:
+            veh_market_share_frac = v.composite_vehicle_share_frac
+            total_market_share_frac = market_share_frac + veh_market_share_frac
+            num_cost_curve_points = len(v.cost_curve)
+
+            # weighted interpolation key and generalized cost for every pair of composite and vehicle points
+            x = (weighted_values[cost_curve_interp_key][:, np.newaxis] * market_share_frac +
+                 v.cost_curve['veh_%s_%s' % (v.vehicle_id, cost_curve_interp_key)].values[np.newaxis, :] *
+                 veh_market_share_frac) / total_market_share_frac
+
+            y = (weighted_values['new_vehicle_mfr_generalized_cost_dollars'][:, np.newaxis] * market_share_frac +
+                 v.cost_curve['veh_%s_new_vehicle_mfr_generalized_cost_dollars' % v.vehicle_id].values[np.newaxis, :] *
+                 veh_market_share_frac) / total_market_share_frac
+
+            # calculate new sales-weighted frontier
+            if x.size > 1:
+                frontier_indices, _ = calc_frontier_indices(x.ravel(), y.ravel(), allow_upslope=True)
+            else:
+                frontier_indices = np.arange(x.size)
+
+            prior_indices, veh_indices = np.divmod(frontier_indices, num_cost_curve_points)
+
+            for wv in self.weighted_values:
+                weighted_values[wv] = \
+                    (weighted_values[wv][prior_indices] * market_share_frac +
+                     v.cost_curve['veh_%s_%s' % (v.vehicle_id, wv)].values[veh_indices] * veh_market_share_frac) / \
+                    total_market_share_frac
+
+            cost_curve_indices = [indices[prior_indices] for indices in cost_curve_indices] + [veh_indices]
+
+            # update running total market share
+            market_share_frac = total_market_share_frac
+
+        composite_frontier_dict = {'market_share_frac': np.full(len(cost_curve_indices[0]), market_share_frac)}
+        composite_frontier_dict.update(weighted_values)
+
+        for v, indices in zip(self.vehicle_list, cost_curve_indices):
+            prefix = 'veh_%s_' % v.vehicle_id
+            for c in v.cost_curve.columns:
+                if c.startswith(prefix) and not c.endswith('_market_share'):
+                    composite_frontier_dict[c] = v.cost_curve[c].values[indices]
+
+        return pd.DataFrame(composite_frontier_dict)
 
     def get_from_cost_curve(self, attribute_name, query_points):
         """
@@ -714,6 +863,27 @@ def calc_vehicle_frontier(vehicle):
     return vehicle
 
 
+def calc_vehicle_frontier_record(vehicle_record):
+    """
+    Calculate the cost cloud and the frontier of the cost cloud for the given vehicle record, e.g. in a worker process.
+
+    Args:
+        vehicle_record (tuple): the vehicle to calculate a frontier for, see ``Vehicle.to_record()``
+
+    Returns:
+        dict of the vehicle attributes updated by the calculation, by attribute name
+
+    """
+    vehicle = Vehicle.from_record(vehicle_record)
+
+    prior_vehicle_attributes = dict(vars(vehicle))
+
+    calc_vehicle_frontier(vehicle)
+
+    return dict((k, v) for k, v in vars(vehicle).items()
+                if k not in prior_vehicle_attributes or prior_vehicle_attributes[k] is not v)
+
+
 def is_up_for_redesign(vehicle):
     """
         Return ``True`` if vehicle is available for production and/or redesign
@@ -819,6 +989,18 @@ class Vehicle(OMEGABase):
 
     _cache = dict()
 
+    # vehicle attributes read by the cost cloud and frontier calculations, see ``calc_vehicle_frontier()``
+    frontier_record_attributes = ('vehicle_id', 'name', 'compliance_id', 'model_year', 'market_class_id',
+                                  'reg_class_id', 'fueling_class', 'cost_curve_class', 'body_style',
+                                  'drive_system', 'unibody_structure', 'structure_material', 'footprint_ft2',
+                                  'height_in', 'ground_clearance_in', 'eng_rated_hp', 'motor_kw', 'battery_kwh',
+                                  'charge_depleting_range_mi', 'in_use_fuel_id', 'prior_redesign_year',
+                                  'redesign_interval', 'base_year_vehicle_id', 'base_year_powertrain_type',
+                                  'base_year_cert_fuel_id', 'base_year_footprint_ft2',
+                                  'base_year_curbweight_lbs_to_hp', 'base_year_glider_non_structure_mass_lbs',
+                                  'base_year_glider_non_structure_cost_dollars', 'base_year_target_coef_a',
+                                  'base_year_target_coef_b', 'base_year_target_coef_c')
+
     def __init__(self):
         """
         Create a new ``Vehicle`` object
@@ -889,6 +1071,35 @@ class Vehicle(OMEGABase):
         for dc in VehicleFinal.dynamic_columns:
             self.__setattr__(dc, 0)
 
+    def to_record(self):
+        """
+        Get the vehicle attributes read by the frontier calculations as a compact record, e.g. to send the vehicle to
+        a worker process.
+
+        Returns:
+            Tuple of the attribute names and the attribute values, see ``Vehicle.frontier_record_attributes``
+
+        """
+        return Vehicle.frontier_record_attributes, \
+            tuple(self.__getattribute__(k) for k in Vehicle.frontier_record_attributes)
+
+    @staticmethod
+    def from_record(vehicle_record):
+        """
+        Create a ``Vehicle`` from a record.  The vehicle keeps the record's ``vehicle_id``.
+
+        Args:
+            vehicle_record (tuple): the vehicle record, see ``Vehicle.to_record()``
+
+        Returns:
+            The new ``Vehicle`` object
+
+        """
+        vehicle = Vehicle.__new__(Vehicle)
+        vehicle.__dict__.update(zip(*vehicle_record))
+
+        return vehicle
+
     @staticmethod
     def reset_vehicle_ids():
         """
@@ -1131,17 +1342,33 @@ class Vehicle(OMEGABase):
         # calculate frontier from updated cloud
         allow_upslope = False
 
-        # special handling for the case where all cost_curve_interp_key values are the same value, e.g. 0
-        if cost_cloud[cost_curve_interp_key].values.min() == cost_cloud[cost_curve_interp_key].values.max():
-            # try to take lowest generalized cost point
-            cost_curve = cost_cloud[cost_cloud['new_vehicle_mfr_generalized_cost_dollars'] == cost_cloud[
-                'new_vehicle_mfr_generalized_cost_dollars'].values.min()]
-            # if somehow more than one point, just take the first one...
-            if len(cost_curve) > 1:
-                cost_curve = cost_curve.iloc[[0]]
+        cost_curve_cache = get_cloud_cache('cost_curves')
+
+        cached_curve = None
+        if cost_curve_cache:
+            # the cloud key identifies the cost cloud without hashing its contents, the inputs key covers the
+            # generalized cost inputs
+            cost_curve_key = hash_values(self.cloud_cache_key, get_cost_curve_inputs_key(), cost_curve_interp_key,
+                                         allow_upslope, omega_globals.options.cost_curve_frontier_affinity_factor)
+            cached_curve = cost_curve_cache.get(cost_curve_key)
+
+        if cached_curve is not None:
+            cost_curve = cached_curve[0]
         else:
-            cost_curve = calc_frontier(cost_cloud, cost_curve_interp_key,
-                                       'new_vehicle_mfr_generalized_cost_dollars', allow_upslope=allow_upslope)
+            # special handling for the case where all cost_curve_interp_key values are the same value, e.g. 0
+            if cost_cloud[cost_curve_interp_key].values.min() == cost_cloud[cost_curve_interp_key].values.max():
+                # try to take lowest generalized cost point
+                cost_curve = cost_cloud[cost_cloud['new_vehicle_mfr_generalized_cost_dollars'] == cost_cloud[
+                    'new_vehicle_mfr_generalized_cost_dollars'].values.min()]
+                # if somehow more than one point, just take the first one...
+                if len(cost_curve) > 1:
+                    cost_curve = cost_curve.iloc[[0]]
+            else:
+                cost_curve = calc_frontier(cost_cloud, cost_curve_interp_key,
+                                           'new_vehicle_mfr_generalized_cost_dollars', allow_upslope=allow_upslope)
+
+            if cost_curve_cache:
+                cost_curve_cache.put(cost_curve_key, cost_curve)
 
         # CU
 
@@ -1463,10 +1690,10 @@ class VehicleFinal(SQABase, Vehicle):
                               + VehicleFinal.dynamic_attributes
 
         # model year and registered count are required to make a full-blown VehicleFinal object, compliance_id
-        # is required for vehicle annual data init
+        # is required for vehicle annual data init, the clone is added to the database by ``add_vehicles()``
         veh = VehicleFinal(model_year=vehicle.model_year,
                            compliance_id=vehicle.compliance_id,
-                           initial_registered_count=1)
+                           _initial_registered_count=1)
 
         # get the rest of the attributes from the list
         for p in inherit_properties:
@@ -1474,6 +1701,29 @@ class VehicleFinal(SQABase, Vehicle):
 
         return veh
 
+    @staticmethod
+    def add_vehicles(vehicles):
+        """
+        Add vehicles to the database, in bulk, and create their initial vehicle annual data (registered count in their
+        model year).
+
+        Args:
+            vehicles ([VehicleFinal]): the vehicles to add, with model year, compliance ID and initial registered count
+
+        Returns:
+            Nothing, updates the database and vehicle annual data
+
+        """
+        omega_globals.session.add_all(vehicles)
+        omega_globals.session.flush()  # update vehicle_ids, otherwise they're None
+
+        VehicleAnnualData.add_columns(len(vehicles),
+                                      {'calendar_year': [int(v.model_year) for v in vehicles],
+                                       'vehicle_id': [v.vehicle_id for v in vehicles],
+                                       'compliance_id': [v.compliance_id for v in vehicles],
+                                       'age': 0,
+                                       'registered_count': [v.initial_registered_count for v in vehicles]})
+
     @staticmethod
     def init_vehicles_from_dataframe(df, verbose=False):
         """
@@ -1502,56 +1752,59 @@ class VehicleFinal(SQABase, Vehicle):
         from context.mass_scaling import MassScaling
         from context.body_styles import BodyStyles
 
-        # load data into database
-        for i in df.index:
+        # convert the data to column arrays once, rather than looking up values by row and column
+        columns = dict((c, df[c].values) for c in df.columns)
+
+        # create vehicles, they are added to the database in bulk, see ``add_vehicles()``
+        for row, i in enumerate(df.index):
             veh = VehicleFinal(
-                name=df.loc[i, 'vehicle_name'],
+                name=columns['vehicle_name'][row],
                 vehicle_id=i,
-                manufacturer_id=df.loc[i, 'manufacturer_id'],
-                model_year=df.loc[i, 'model_year'],
-                context_size_class=df.loc[i, 'context_size_class'],
-                cost_curve_class=df.loc[i, 'cost_curve_class'],
-                in_use_fuel_id=df.loc[i, 'in_use_fuel_id'],
-                cert_fuel_id=df.loc[i, 'cert_fuel_id'],
-                unibody_structure=df.loc[i, 'unibody_structure'],
-                drive_system=df.loc[i, 'drive_system'],
-                dual_rear_wheel=df.loc[i, 'dual_rear_wheel'],
-                curbweight_lbs=df.loc[i, 'curbweight_lbs'],
-                footprint_ft2=df.loc[i, 'footprint_ft2'],
-                eng_rated_hp=df.loc[i, 'eng_rated_hp'],
-                base_year_target_coef_a=df.loc[i, 'target_coef_a'],
-                base_year_target_coef_b=df.loc[i, 'target_coef_b'],
-                base_year_target_coef_c=df.loc[i, 'target_coef_c'],
-                body_style=df.loc[i, 'body_style'],
-                structure_material=df.loc[i, 'structure_material'],
-                base_year_reg_class_id=df.loc[i, 'reg_class_id'],
-                base_year_footprint_ft2=df.loc[i, 'footprint_ft2'],
-                base_year_curbweight_lbs=df.loc[i, 'curbweight_lbs'],
-                base_year_msrp_dollars=df.loc[i, 'msrp_dollars'],
-                base_year_glider_non_structure_mass_lbs=df.loc[i, 'glider_non_structure_mass_lbs'],
-                base_year_glider_non_structure_cost_dollars=df.loc[i, 'glider_non_structure_cost_dollars'],
-                base_year_workfactor=df.loc[i, 'workfactor'],
+                manufacturer_id=columns['manufacturer_id'][row],
+                model_year=columns['model_year'][row],
+                context_size_class=columns['context_size_class'][row],
+                cost_curve_class=columns['cost_curve_class'][row],
+                in_use_fuel_id=columns['in_use_fuel_id'][row],
+                cert_fuel_id=columns['cert_fuel_id'][row],
+                unibody_structure=columns['unibody_structure'][row],
+                drive_system=columns['drive_system'][row],
+                dual_rear_wheel=columns['dual_rear_wheel'][row],
+                curbweight_lbs=columns['curbweight_lbs'][row],
+                footprint_ft2=columns['footprint_ft2'][row],
+                eng_rated_hp=columns['eng_rated_hp'][row],
+                base_year_target_coef_a=columns['target_coef_a'][row],
+                base_year_target_coef_b=columns['target_coef_b'][row],
+                base_year_target_coef_c=columns['target_coef_c'][row],
+                body_style=columns['body_style'][row],
+                structure_material=columns['structure_material'][row],
+                base_year_reg_class_id=columns['reg_class_id'][row],
+                base_year_footprint_ft2=columns['footprint_ft2'][row],
+                base_year_curbweight_lbs=columns['curbweight_lbs'][row],
+                base_year_msrp_dollars=columns['msrp_dollars'][row],
+                base_year_glider_non_structure_mass_lbs=columns['glider_non_structure_mass_lbs'][row],
+                base_year_glider_non_structure_cost_dollars=columns['glider_non_structure_cost_dollars'][row],
+                base_year_workfactor=columns['workfactor'][row],
                 base_year_vehicle_id=i,  # i.e. aggregated_vehicles.csv index number...
-                base_year_cert_fuel_id=df.loc[i, 'cert_fuel_id'],
-                battery_kwh=df.loc[i, 'battery_kwh'],
-                motor_kw=df.loc[i, 'motor_kw'],
-                charge_depleting_range_mi=df.loc[i, 'charge_depleting_range_mi'],
-                base_year_powertrain_type=df.loc[i, 'base_year_powertrain_type'],
-                prior_redesign_year=df.loc[i, 'prior_redesign_year'],
-                redesign_interval=df.loc[i, 'redesign_interval'],
+                base_year_cert_fuel_id=columns['cert_fuel_id'][row],
+                battery_kwh=columns['battery_kwh'][row],
+                motor_kw=columns['motor_kw'][row],
+                charge_depleting_range_mi=columns['charge_depleting_range_mi'][row],
+                base_year_powertrain_type=columns['base_year_powertrain_type'][row],
+                prior_redesign_year=columns['prior_redesign_year'][row],
+                redesign_interval=columns['redesign_interval'][row],
                 in_production=True,
                 base_year_product=True,
-                workfactor=df.loc[i, 'workfactor'],
-                gvwr_lbs=df.loc[i, 'gvwr_lbs'],
-                gcwr_lbs=df.loc[i, 'gcwr_lbs'],
-                base_year_gvwr_lbs=df.loc[i, 'gvwr_lbs'],
-                base_year_gcwr_lbs=df.loc[i, 'gcwr_lbs'],
+                workfactor=columns['workfactor'][row],
+                gvwr_lbs=columns['gvwr_lbs'][row],
+                gcwr_lbs=columns['gcwr_lbs'][row],
+                base_year_gvwr_lbs=columns['gvwr_lbs'][row],
+                base_year_gcwr_lbs=columns['gcwr_lbs'][row],
             )
 
-            electrification_class = df.loc[i, 'electrification_class']
+            electrification_class = columns['electrification_class'][row]
 
             for attr, dc in zip(VehicleFinal.dynamic_attributes, VehicleFinal.dynamic_columns):
-                veh.__setattr__(attr, df.loc[i, dc])
+                veh.__setattr__(attr, columns[dc][row])
 
             if omega_globals.options.consolidate_manufacturers:
                 veh.compliance_id = 'consolidated_OEM'
@@ -1563,8 +1816,8 @@ class VehicleFinal(SQABase, Vehicle):
 
             VehicleFinal.compliance_ids.add(veh.compliance_id)
 
-            # update initial registered count >after< setting compliance id, it's required for vehicle annual data
-            veh.initial_registered_count = df.loc[i, 'sales']
+            # vehicle annual data is created when the vehicles are added to the database
+            veh._initial_registered_count = columns['sales'][row]
 
             # RV
             if veh.base_year_powertrain_type in ['BEV', 'FCV']:
@@ -1577,11 +1830,11 @@ class VehicleFinal(SQABase, Vehicle):
             else:
                 veh.fueling_class = 'ICE'
 
-            veh.cert_direct_oncycle_co2e_grams_per_mile = df.loc[i, 'cert_direct_oncycle_co2e_grams_per_mile']
+            veh.cert_direct_oncycle_co2e_grams_per_mile = columns['cert_direct_oncycle_co2e_grams_per_mile'][row]
             veh.cert_direct_co2e_grams_per_mile = veh.cert_direct_oncycle_co2e_grams_per_mile
 
             veh.cert_co2e_grams_per_mile = None
-            veh.cert_direct_kwh_per_mile = df.loc[i, 'cert_direct_oncycle_kwh_per_mile']  # RV
+            veh.cert_direct_kwh_per_mile = columns['cert_direct_oncycle_kwh_per_mile'][row]  # RV
             veh.onroad_direct_co2e_grams_per_mile = 0
             veh.onroad_direct_kwh_per_mile = 0
 
@@ -1606,7 +1859,7 @@ class VehicleFinal(SQABase, Vehicle):
 
             # assign user-definable market class
             veh.market_class_id = omega_globals.options.MarketClass.get_vehicle_market_class(veh)
-            veh.manufacturer.update_market_class_data(veh.compliance_id, veh.market_class_id)
+            Manufacturer.update_market_class_data(veh.compliance_id, veh.market_class_id)
 
             non_responsive_market_category = \
                 omega_globals.options.MarketClass.get_non_responsive_market_category(veh.market_class_id)
@@ -1669,11 +1922,13 @@ class VehicleFinal(SQABase, Vehicle):
         # Alternative vehicles maintain fleet utility mix across model years and prevent all future vehicles
         # from becoming midsize car BEVs, for example, just because that's the dominant BEV in the base year
         # fleet
+        alt_vehicles_list = []
         for v in vehicles_list:
             v.base_year_market_share = v.initial_registered_count / vehicle_shares_dict['total']
 
             if v.fueling_class != 'BEV' or omega_globals.options.allow_ice_of_bev:
                 alt_veh = v.clone_vehicle(v)  # create alternative powertrain clone of vehicle
+                alt_vehicles_list.append(alt_veh)
                 alt_veh.in_production = is_up_for_redesign(alt_veh)
                 alt_veh.base_year_product = False
 
@@ -1712,12 +1967,14 @@ class VehicleFinal(SQABase, Vehicle):
                     alt_veh.eng_disp_liters = None
 
                 alt_veh.market_class_id = omega_globals.options.MarketClass.get_vehicle_market_class(alt_veh)
-                v.manufacturer.update_market_class_data(v.compliance_id, alt_veh.market_class_id)
+                Manufacturer.update_market_class_data(v.compliance_id, alt_veh.market_class_id)
 
                 alt_veh.cert_direct_oncycle_co2e_grams_per_mile = 0
                 alt_veh.cert_direct_co2e_grams_per_mile = 0
                 alt_veh.cert_direct_kwh_per_mile = 0
 
+        VehicleFinal.add_vehicles(vehicles_list + alt_vehicles_list)
+
         for nrmc in NewVehicleMarket.context_size_class_info_by_nrmc:
             for csc in NewVehicleMarket.context_size_class_info_by_nrmc[nrmc]:
                 NewVehicleMarket.context_size_class_info_by_nrmc[nrmc][csc]['share'] = \